@@ -8,15 +8,37 @@ from difflib import SequenceMatcher
 from collections import defaultdict
 import json
 import re
+import threading
 from typing import List, Dict, Optional, Tuple
 
+from utils.minhash_index import MinHashIndex
+
+STOP_WORDS = {
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'is', 'are', 'was', 'were', 'be', 'been',
+    'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
+    'could', 'should', 'may', 'might', 'can', 'this', 'that', 'these',
+    'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'what', 'which',
+    'who', 'when', 'where', 'why', 'how'
+}
+
 class SimpleAIEngine:
     """Simple AI engine with proven functionality"""
     
+    # Similar-ticket candidates (MinHash/LSH) scored exactly per query: at most
+    # this many, sharing at least this fraction of keywords (estimated Jaccard)
+    MAX_SIMILARITY_CANDIDATES = 100
+    MIN_CANDIDATE_JACCARD = 0.15
+    
     def __init__(self):
         self.cache = {}
         self.cache_ttl = 3600  # 1 hour
         self.analyzed_tickets = {}
+        # Near-duplicate index over the last ticket list seen (synced incrementally)
+        self._duplicate_index = MinHashIndex()
+        self._indexed_tickets: Dict[str, Tuple[Dict, str, set]] = {}  # id -> (ticket, text, keywords)
+        self._indexed_fingerprint: Optional[Tuple[int, int]] = None
+        self._index_lock = threading.Lock()
         
     def get_cache_key(self, ticket_id: str) -> str:
         """Generate cache key"""
@@ -36,32 +58,21 @@ class SimpleAIEngine:
     # TEXT ANALYSIS
     # ========================================================================
     
-    def extract_keywords(self, text: str, min_length: int = 3) -> List[str]:
-        """Extract meaningful keywords from text"""
+    def keyword_tokens(self, text: str, min_length: int = 3) -> List[str]:
+        """Meaningful words of text, in order (with repeats)"""
         if not text:
             return []
         
-        # Convert to lowercase and remove special chars
-        text = text.lower()
-        
-        # Remove common stop words
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'from', 'is', 'are', 'was', 'were', 'be', 'been',
-            'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
-            'could', 'should', 'may', 'might', 'can', 'this', 'that', 'these',
-            'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'what', 'which',
-            'who', 'when', 'where', 'why', 'how'
-        }
-        
-        # Split into words and filter
-        words = re.findall(r'\w+', text)
-        keywords = [
+        # Convert to lowercase, split into words and filter stop words
+        words = re.findall(r'\w+', text.lower())
+        return [
             w for w in words 
-            if len(w) >= min_length and w not in stop_words
+            if len(w) >= min_length and w not in STOP_WORDS
         ]
-        
-        return list(set(keywords))  # Remove duplicates
+    
+    def extract_keywords(self, text: str, min_length: int = 3) -> List[str]:
+        """Extract meaningful keywords from text"""
+        return list(set(self.keyword_tokens(text, min_length)))  # Remove duplicates
     
     def calculate_similarity(self, text1: str, text2: str) -> float:
         """Calculate text similarity (0-1)"""
@@ -71,33 +82,90 @@ class SimpleAIEngine:
         ratio = SequenceMatcher(None, text1.lower(), text2.lower()).ratio()
         return round(ratio, 3)
     
+    def ticket_text(self, ticket: Dict) -> str:
+        """Text compared between tickets"""
+        return f"{ticket.get('summary', '')} {ticket.get('description', '')}"
+    
+    def similarity_score(self, text: str, keywords: set, other_text: str, other_keywords: set) -> float:
+        """Weighted keyword overlap + text similarity of two tickets (0-1)"""
+        # Calculate keyword overlap
+        if not keywords:
+            keyword_score = 0
+        else:
+            overlap = len(keywords & other_keywords)
+            keyword_score = overlap / len(keywords)
+        
+        # Calculate text similarity
+        text_score = self.calculate_similarity(text, other_text)
+        
+        # Weighted average (40% keywords, 60% text)
+        return (keyword_score * 0.4) + (text_score * 0.6)
+    
+    def _tickets_fingerprint(self, tickets: List[Dict]) -> Tuple[int, int]:
+        """Cheap identity of a ticket list: length + hash of each ticket's key, object and updated stamp (text if none)"""
+        return len(tickets), hash(tuple(
+            (ticket.get('key'), id(ticket), ticket.get('updated') or self.ticket_text(ticket))
+            for ticket in tickets
+        ))
+    
+    def _sync_duplicate_index(self, all_tickets: List[Dict]):
+        """
+        Make the near-duplicate index match all_tickets
+        
+        Only tickets whose text changed are re-hashed and tickets no longer
+        in the list are dropped; a list with the same fingerprint as the last
+        one synced (e.g. every call of a batch) is not re-checked.
+        """
+        fingerprint = self._tickets_fingerprint(all_tickets)
+        if fingerprint == self._indexed_fingerprint:
+            return
+        indexed = {}
+        for position, ticket in enumerate(all_tickets):
+            ticket_id = ticket.get('key') or f"#{position}"
+            text = self.ticket_text(ticket)
+            previous = self._indexed_tickets.get(ticket_id)
+            if previous is not None and previous[1] == text:
+                indexed[ticket_id] = (ticket, text, previous[2])
+                continue
+            tokens = self.keyword_tokens(text)
+            indexed[ticket_id] = (ticket, text, set(tokens))
+            self._duplicate_index.add(ticket_id, indexed[ticket_id][2])
+        self._duplicate_index.retain(indexed)
+        self._indexed_tickets = indexed
+        self._indexed_fingerprint = fingerprint
+    
     def find_similar_tickets(self, ticket: Dict, all_tickets: List[Dict], 
                             threshold: float = 0.5) -> List[Dict]:
-        """Find similar tickets based on content"""
+        """
+        Find similar tickets based on content
+        
+        Candidates come from a MinHash/LSH index over the keywords of
+        all_tickets (tickets sharing enough words), so only those are scored
+        instead of every ticket.
+        """
         similar = []
         
-        ticket_text = f"{ticket.get('summary', '')} {ticket.get('description', '')}"
-        ticket_keywords = set(self.extract_keywords(ticket_text))
+        with self._index_lock:
+            self._sync_duplicate_index(all_tickets)
+            ticket_id = ticket.get('key')
+            entry = self._indexed_tickets.get(ticket_id) if ticket_id else None
+            if entry is not None and entry[0] is ticket:
+                # Indexed already: reuse its keywords and signature
+                _, ticket_text, ticket_keywords = entry
+                candidates = self._duplicate_index.similar_to(ticket_id, self.MIN_CANDIDATE_JACCARD,
+                                                              self.MAX_SIMILARITY_CANDIDATES)
+            else:
+                ticket_text = self.ticket_text(ticket)
+                ticket_keywords = set(self.keyword_tokens(ticket_text))
+                candidates = self._duplicate_index.query(ticket_keywords, self.MIN_CANDIDATE_JACCARD,
+                                                         self.MAX_SIMILARITY_CANDIDATES)
+            candidates = [self._indexed_tickets[other_id] for other_id, _ in candidates]
         
-        for other in all_tickets:
-            if other.get('key') == ticket.get('key'):  # Skip same ticket
+        for other, other_text, other_keywords in candidates:
+            if other is ticket or (ticket.get('key') and other.get('key') == ticket.get('key')):  # Skip same ticket
                 continue
             
-            other_text = f"{other.get('summary', '')} {other.get('description', '')}"
-            other_keywords = set(self.extract_keywords(other_text))
-            
-            # Calculate keyword overlap
-            if not ticket_keywords:
-                keyword_score = 0
-            else:
-                overlap = len(ticket_keywords & other_keywords)
-                keyword_score = overlap / len(ticket_keywords)
-            
-            # Calculate text similarity
-            text_score = self.calculate_similarity(ticket_text, other_text)
-            
-            # Weighted average (40% keywords, 60% text)
-            final_score = (keyword_score * 0.4) + (text_score * 0.6)
+            final_score = self.similarity_score(ticket_text, ticket_keywords, other_text, other_keywords)
             
             if final_score >= threshold:
                 similar.append({
@@ -209,8 +277,15 @@ class SimpleAIEngine:
     # ========================================================================
     
     def find_duplicates_batch(self, tickets: List[Dict]) -> List[Dict]:
-        """Find duplicate tickets in batch"""
+        """
+        Find duplicate tickets in batch
+        
+        The near-duplicate index is built once for the batch; each ticket then
+        scores only its LSH candidates (near-linear instead of all pairs).
+        """
         duplicates = []
+        with self._index_lock:
+            self._sync_duplicate_index(tickets)
         
         for i, ticket in enumerate(tickets):
             if not ticket.get('summary'):
@@ -18,6 +18,7 @@ from utils.decorators import (
 )
 from utils.config import config
 from utils.common import _make_request, _get_credentials, _get_auth_header
+from utils.http_pool import get_session_pool
 
 logger = logging.getLogger(__name__)
 
@@ -112,10 +113,10 @@ def api_get_attachment_content(issue_key, attachment_id):
     # Fetch actual content with authentication
     try:
         auth = (email, api_token)
-        content_response = requests.get(
+        content_response = get_session_pool().request(
+            'GET',
             content_url,
-            auth=auth,
-            timeout=30
+            auth=auth
         )
         content_response.raise_for_status()
         
@@ -23,7 +23,7 @@ from utils.decorators import (
     require_credentials
 )
 from utils.config import config
-from utils.common import _make_request, _get_credentials, _get_auth_header
+from utils.common import _make_request, _get_credentials, _get_auth_header, adf_to_text
 from utils.db import create_notification
 
 logger = logging.getLogger(__name__)
@@ -222,37 +222,6 @@ def convert_text_to_adf(text: str) -> Dict[str, Any]:
         "content": content
     }
 
-def convert_adf_to_text(adf: Dict[str, Any]) -> str:
-    """
-    Convert JIRA ADF format to plain text.
-    
-    Args:
-        adf: ADF document structure
-        
-    Returns:
-        Plain text string
-    """
-    if not isinstance(adf, dict):
-        return str(adf)
-    
-    if adf.get('type') == 'doc':
-        content = adf.get('content', [])
-        paragraphs = []
-        
-        for node in content:
-            if node.get('type') == 'paragraph':
-                para_text = []
-                for text_node in node.get('content', []):
-                    if text_node.get('type') == 'text':
-                        para_text.append(text_node.get('text', ''))
-                    elif text_node.get('type') == 'hardBreak':
-                        para_text.append('\n')
-                paragraphs.append(''.join(para_text))
-        
-        return '\n\n'.join(paragraphs)
-    
-    return str(adf)
-
 def notify_mentioned_users(
     issue_key: str,
     mentions: List[str],
@@ -343,7 +312,7 @@ def parse_comment_for_display(
     # Parse body (handle both string and ADF format)
     body = raw_comment.get('body', '')
     if isinstance(body, dict):
-        body = convert_adf_to_text(body)
+        body = adf_to_text(body)
     elif not isinstance(body, str):
         body = str(body)
     
@@ -4,7 +4,6 @@ Búsqueda semántica de tickets similares y detección de duplicados
 """
 
 from flask import Blueprint, request, jsonify
-from utils.common import JiraApiError
 from utils.api_migration import get_api_client
 from api.blueprints.flowing.contextual_suggestions import get_contextual_suggestions
 from utils.embedding_manager import get_embedding_manager
@@ -94,7 +93,7 @@ def semantic_search():
                 "similarity": 0.85
             }
         ],
-        "": true
+        "using_embeddings": true
     }
     """
     try:
@@ -104,10 +103,11 @@ def semantic_search():
         limit = data.get('limit', 5)
         min_similarity = data.get('min_similarity', 0.5)
         
-                embedding_mgr = get_embedding_manager()
+        embedding_mgr = get_embedding_manager()
         
-                if not ollama.is_available():
-            logger.warning("Ollama not available, falling back to JQL search")
+        # Verificar si el modelo de embeddings está disponible
+        if not embedding_mgr.provider.is_available():
+            logger.warning("Embedding model not available, falling back to JQL search")
             # Fallback a búsqueda JQL básica
             return _fallback_jql_search(query, issue_key, limit)
         
@@ -130,15 +130,15 @@ def semantic_search():
             min_similarity=min_similarity
         )
         
-        # Enriquecer con datos de JIRA
-        client = get_api_client()
+        # Enriquecer con datos del cache (una sola consulta por keys)
         results = []
+        cached_issues = embedding_mgr.find_issues_in_cache([s['issue_key'] for s in similar_issues])
         
         for similar in similar_issues:
             issue_key_found = similar['issue_key']
             try:
                 # Buscar datos actualizados del issue
-                issue_data = embedding_mgr.find_issue_in_cache(issue_key_found)
+                issue_data = cached_issues.get(issue_key_found)
                 if issue_data:
                     fields = issue_data.get('fields', {})
                     status_obj = fields.get('status', {})
@@ -166,7 +166,7 @@ def semantic_search():
             'success': True,
             'results': results,
             'count': len(results),
-            '': True,
+            'using_embeddings': True,
             'query': query[:100]  # Preview
         })
         
@@ -175,7 +175,7 @@ def semantic_search():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 def _fallback_jql_search(query: str, issue_key: str, limit: int):
-    """Fallback JQL search cuando Ollama no está disponible"""
+    """Fallback JQL search cuando el modelo de embeddings no está disponible"""
     try:
         client = get_api_client()
         
@@ -207,8 +207,8 @@ def _fallback_jql_search(query: str, issue_key: str, limit: int):
             'success': True,
             'results': similar_tickets,
             'count': len(similar_tickets),
-            '': False,
-            'fallback': 'JQL search (Ollama not available)'
+            'using_embeddings': False,
+            'fallback': 'JQL search (embedding model not available)'
         })
         
     except Exception as e:
@@ -232,7 +232,7 @@ def detect_duplicates():
         "success": true,
         "original_issue": "MSM-123",
         "duplicates": [...],
-        "": true
+        "using_embeddings": true
     }
     """
     try:
@@ -247,7 +247,7 @@ def detect_duplicates():
                 'error': 'issue_key is required'
             }), 400
         
-                embedding_mgr = get_embedding_manager()
+        embedding_mgr = get_embedding_manager()
         
         # Obtener datos del issue original
         issue_data = embedding_mgr.find_issue_in_cache(issue_key)
@@ -259,8 +259,8 @@ def detect_duplicates():
         
         query_text = embedding_mgr.get_issue_text(issue_data)
         
-                if not ollama.is_available():
-            logger.warning("Ollama not available for duplicate detection")
+        if not embedding_mgr.provider.is_available():
+            logger.warning("Embedding model not available for duplicate detection")
             return _fallback_duplicate_detection(issue_key, query_text, limit)
         
         # Buscar similares (excluyendo el original)
@@ -273,11 +273,12 @@ def detect_duplicates():
         # Filtrar el issue original
         duplicates = [s for s in similar_issues if s['issue_key'] != issue_key][:limit]
         
-        # Enriquecer con datos
+        # Enriquecer con datos (una sola consulta por keys)
         results = []
+        cached_issues = embedding_mgr.find_issues_in_cache([d['issue_key'] for d in duplicates])
         for dup in duplicates:
             dup_key = dup['issue_key']
-            dup_data = embedding_mgr.find_issue_in_cache(dup_key)
+            dup_data = cached_issues.get(dup_key)
             
             if dup_data:
                 fields = dup_data.get('fields', {})
@@ -296,7 +297,7 @@ def detect_duplicates():
             'original_issue': issue_key,
             'duplicates': results,
             'count': len(results),
-            '': True,
+            'using_embeddings': True,
             'threshold': min_similarity
         })
         
@@ -305,7 +306,7 @@ def detect_duplicates():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 def _fallback_duplicate_detection(issue_key: str, query_text: str, limit: int):
-    """Fallback para detección de duplicados sin Ollama"""
+    """Fallback para detección de duplicados sin modelo de embeddings"""
     try:
         client = get_api_client()
         
@@ -332,8 +333,8 @@ def _fallback_duplicate_detection(issue_key: str, query_text: str, limit: int):
             'original_issue': issue_key,
             'duplicates': duplicates,
             'count': len(duplicates),
-            '': False,
-            'fallback': 'JQL search (Ollama not available)'
+            'using_embeddings': False,
+            'fallback': 'JQL search (embedding model not available)'
         })
         
     except Exception as e:
@@ -105,15 +105,13 @@ def detect_duplicates():
         search_text = f"{summary} {description[:500]}"
         
         manager = get_embedding_manager()
-        results = manager.find_similar_issues(
-            query_text=search_text,
+        # The current issue (if provided) is excluded inside the search
+        results = manager.find_similar_batch(
+            [search_text],
             top_k=10,
-            min_similarity=threshold
-        )
-        
-        # Filter out the current issue if provided
-        if issue_key:
-            results = [r for r in results if r['issue_key'] != issue_key]
+            min_similarity=threshold,
+            exclude_keys=[issue_key]
+        )[0]
         
         is_duplicate = len(results) > 0 and results[0]['similarity'] >= threshold
         confidence = results[0]['similarity'] if results else 0.0
@@ -130,6 +128,72 @@ def detect_duplicates():
         return jsonify({'error': str(e)}), 500
 
 
+@flowing_semantic_bp.route('/detect-duplicates/batch', methods=['POST'])
+def detect_duplicates_batch():
+    """
+    Detect potential duplicates for a whole queue of issues at once
+    
+    Request:
+        {
+            "issueKeys": ["MSM-123", "MSM-124"],
+            "threshold": 0.75,
+            "top_k": 5,
+            "project": "MSM",        # optional
+            "status": ["Open"]       # optional
+        }
+    
+    Response:
+        {
+            "results": {
+                "MSM-123": {
+                    "duplicates": [...],
+                    "is_potential_duplicate": true,
+                    "confidence": 0.85
+                }
+            },
+            "count": 2,
+            "threshold": 0.75
+        }
+    """
+    try:
+        data = request.get_json() or {}
+        issue_keys = data.get('issueKeys') or []
+        threshold = data.get('threshold', 0.75)
+        top_k = data.get('top_k', 5)
+        
+        if not issue_keys:
+            return jsonify({'error': 'issueKeys is required'}), 400
+        
+        # Stored embeddings are the queries: one batched search for the queue
+        manager = get_embedding_manager()
+        duplicates = manager.find_duplicates(
+            issue_keys,
+            min_similarity=threshold,
+            top_k=top_k,
+            project=data.get('project'),
+            status=data.get('status')
+        )
+        
+        results = {
+            key: {
+                'duplicates': found,
+                'is_potential_duplicate': len(found) > 0,
+                'confidence': found[0]['similarity'] if found else 0.0
+            }
+            for key, found in duplicates.items()
+        }
+        
+        return jsonify({
+            'results': results,
+            'count': len(results),
+            'threshold': threshold
+        })
+        
+    except Exception as e:
+        logger.error(f"Error in detect_duplicates_batch: {e}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+
 @flowing_semantic_bp.route('/contextual-suggestions', methods=['POST'])
 def contextual_suggestions():
     """
@@ -1,5 +1,5 @@
 from flask import Blueprint, request
-from typing import Any, Dict
+from typing import Any, Dict, List
 from utils.decorators import handle_api_error, json_response, log_request as log_decorator, require_credentials
 from utils.db import (
     create_header_suggestion,
@@ -8,12 +8,13 @@ from utils.db import (
     update_header_suggestion,
     delete_header_suggestion
 )
+from utils.common import adf_to_text
 try:
     from core.api import get_api_client
-    from utils.common import _make_request
+    from utils.async_jira import fetch_issues_by_keys
 except Exception:
     get_api_client = None
-    _make_request = None
+    fetch_issues_by_keys = None
 
 try:
     from utils.ml_suggester import get_ml_suggester
@@ -85,6 +86,71 @@ def api_delete_header_suggestion(nid):
     return {'deleted': ok}
 
 
+# Field suggested -> Jira field the header action sets
+_SUGGESTED_FIELDS = {'priority': 'priority', 'severity': 'customfield_10125'}
+
+
+def _issue_text(issue: Dict[str, Any]) -> str:
+    """Summary + description of a raw issue (description as plain text)"""
+    fields = issue.get('fields') or {}
+    return f"{fields.get('summary') or ''} {adf_to_text(fields.get('description') or '')}".strip()
+
+
+def _issue_source_texts(items: List[Dict[str, Any]]) -> List[str]:
+    """
+    Source text of each item: summary + description of its issue_key, else its text
+
+    Keys are resolved together: cached issues first (issue snapshot/store),
+    then one JQL `key in (...)` search for the rest.
+    """
+    keys = list(dict.fromkeys(item.get('issue_key') for item in items if item.get('issue_key')))
+    issues: Dict[str, Dict[str, Any]] = {}
+    if keys:
+        try:
+            from utils.issue_snapshot import get_issue_source
+            issues.update(get_issue_source().get_many(keys))
+        except Exception:
+            pass
+        missing = [key for key in keys if key not in issues]
+        if missing and get_api_client and fetch_issues_by_keys:
+            try:
+                client = get_api_client()
+                fetched, _ = fetch_issues_by_keys(client.site, client.headers, missing,
+                                                  fields=['summary', 'description'], api_version=2)
+                issues.update((issue['key'], issue) for issue in fetched if issue.get('key'))
+            except Exception:
+                pass  # fall back to the provided texts
+    texts = []
+    for item in items:
+        issue = issues.get(item.get('issue_key'))
+        texts.append((_issue_text(issue) if issue else '') or item.get('text') or '')
+    return texts
+
+
+def _issue_source_text(issue_key, text):
+    """Summary + description of issue_key (falls back to text)"""
+    return _issue_source_texts([{'issue_key': issue_key, 'text': text}])[0]
+
+
+def _create_field_suggestions(suggestions: Dict[str, Any], issue_key) -> list:
+    """Store one header suggestion per suggested field (see suggest_fields_batch)"""
+    created = []
+    for field_type in ('priority', 'severity'):
+        suggestion = suggestions.get(field_type)
+        if not suggestion:
+            continue
+        try:
+            value, confidence, reason, similar = suggestion
+            title = f"Set {field_type} → {value}"
+            desc = f"Confidence: {confidence:.2f}. {reason}"
+            action = { 'field': _SUGGESTED_FIELDS[field_type], 'value': value }
+            item = create_header_suggestion(title=title, description=desc, action=str(action), metadata=str({'issue_key': issue_key}))
+            created.append(item)
+        except Exception:
+            pass
+    return created
+
+
 @header_suggestions_bp.route('/api/header-suggestions/generate', methods=['POST'])
 @handle_api_error
 @json_response
@@ -108,61 +174,55 @@ def api_generate_header_suggestions():
     if not issue_key and not text:
         return {'error': 'issue_key or text is required'}, 400
 
-    source_text = text or ''
-    if issue_key:
-        # Try to fetch issue fields
-        if get_api_client and _make_request:
-            try:
-                client = get_api_client()
-                issue_url = f"{client.site}/rest/api/2/issue/{issue_key}"
-                issue_data = _make_request('GET', issue_url, client.headers, params={'fields': 'summary,description'})
-                if issue_data and isinstance(issue_data, dict):
-                    fields = issue_data.get('fields', {})
-                    summary = fields.get('summary', '') or ''
-                    description = fields.get('description', '') or ''
-                    if isinstance(description, dict):
-                        # try to extract text
-                        description = str(description.get('content', ''))
-                    source_text = (summary + ' ' + description).strip()
-            except Exception as e:
-                # fallback to provided text if any
-                source_text = source_text or ''
-
-    created = []
+    source_text = _issue_source_text(issue_key, text)
 
     # Use ml_suggester to obtain deterministic model suggestions
-    if get_ml_suggester:
-        try:
-            sug = get_ml_suggester()
-            # Suggest priority
-            try:
-                p = sug.suggest_priority(source_text)
-                if p:
-                    value, confidence, reason, similar = p
-                    title = f"Set priority → {value}"
-                    desc = f"Confidence: {confidence:.2f}. {reason}"
-                    action = { 'field': 'priority', 'value': value }
-                    item = create_header_suggestion(title=title, description=desc, action=str(action), metadata=str({'issue_key': issue_key}))
-                    created.append(item)
-            except Exception:
-                pass
-
-            # Suggest severity
-            try:
-                s = sug.suggest_severity(source_text)
-                if s:
-                    value, confidence, reason, similar = s
-                    title = f"Set severity → {value}"
-                    desc = f"Confidence: {confidence:.2f}. {reason}"
-                    action = { 'field': 'customfield_10125', 'value': value }
-                    item = create_header_suggestion(title=title, description=desc, action=str(action), metadata=str({'issue_key': issue_key}))
-                    created.append(item)
-            except Exception:
-                pass
-        except Exception as e:
-            # ML suggester failed; return error
-            return {'error': f'Models unavailable: {e}'}, 503
-    else:
+    if not get_ml_suggester:
         return {'error': 'No ML suggester available'}, 503
-
+    try:
+        # Priority and severity from one similarity search
+        suggestions = get_ml_suggester().suggest_fields_batch([source_text])[0]
+    except Exception as e:
+        # ML suggester failed; return error
+        return {'error': f'Models unavailable: {e}'}, 503
+
+    created = _create_field_suggestions(suggestions, issue_key)
     return {'created': created, 'count': len(created)}
+
+
+@header_suggestions_bp.route('/api/header-suggestions/generate/batch', methods=['POST'])
+@handle_api_error
+@json_response
+@log_decorator()
+@require_credentials
+def api_generate_header_suggestions_batch():
+    """Generate header suggestions for a whole queue of issues at once.
+
+    Request body:
+      { "items": [{ "issue_key": "PROJ-123" }, { "text": "..." }, ...],
+        "project": "PROJ" }   # optional: only vote with tickets of this project
+
+    Issue keys are resolved together (cache, then one JQL search for the rest)
+    and all texts are searched together (utils.ml_suggester.suggest_fields_batch),
+    so N issues cost one batched similarity search instead of 2 * N.
+    """
+    data = request.get_json() or {}
+    items = [item for item in (data.get('items') or []) if isinstance(item, dict)]
+    items = [item for item in items if item.get('issue_key') or item.get('text')]
+
+    if not items:
+        return {'error': 'items with issue_key or text are required'}, 400
+
+    if not get_ml_suggester:
+        return {'error': 'No ML suggester available'}, 503
+    texts = _issue_source_texts(items)
+    try:
+        suggestions = get_ml_suggester().suggest_fields_batch(texts, project=data.get('project'))
+    except Exception as e:
+        return {'error': f'Models unavailable: {e}'}, 503
+
+    results = []
+    for item, item_suggestions in zip(items, suggestions):
+        created = _create_field_suggestions(item_suggestions, item.get('issue_key'))
+        results.append({'issue_key': item.get('issue_key'), 'created': created, 'count': len(created)})
+    return {'results': results, 'count': sum(r['count'] for r in results)}
@@ -14,10 +14,12 @@ from utils.decorators import handle_api_error, json_response, log_request as log
 from utils.config import config  # noqa: F401  (may be needed later)
 
 try:  # pragma: no cover
-    from core.api import load_queue_issues  # type: ignore
+    from core.api import get_queue_snapshot  # type: ignore
 except ImportError:  # pragma: no cover
-    def load_queue_issues(*_a, **_k):
-        return None, 'core.api unavailable'
+    from utils.snapshot_cache import Snapshot
+
+    def get_queue_snapshot(*_a, **_k):
+        return Snapshot(key=None, data=None, version=0, fetched_at=0.0, error='core.api unavailable')
 
 logger = logging.getLogger(__name__)
 
@@ -35,13 +37,13 @@ def api_get_issues():
     if not desk_id:
         raise ValueError('desk_id parameter is required')
     issues_accumulated: list[dict] = []
-    df, error = load_queue_issues(desk_id, queue_id)
-    if error:
-        logger.warning(f"Queue load error: {error}")
-    if df is not None and getattr(df, 'empty', True) is False:
-        raw_records: List[Dict[str, Any]] = list(df.to_dict('records'))  # type: ignore
-        issues_accumulated = _batch_inject_sla(raw_records)
-    return {'data': issues_accumulated, 'count': len(issues_accumulated)}
+    snapshot = get_queue_snapshot(desk_id, queue_id)
+    queue_records = snapshot.data
+    if snapshot.error:
+        logger.warning(f"Queue load error: {snapshot.error}")
+    if queue_records is not None and not queue_records.empty:
+        issues_accumulated = _batch_inject_sla(queue_records.to_records())
+    return {'data': issues_accumulated, 'count': len(issues_accumulated), 'snapshot_version': snapshot.version}
 
 @issues_bp.route('/api/issues/<queue_id>', methods=['GET'])
 @handle_api_error
@@ -62,40 +64,20 @@ def api_get_issues_by_queue(queue_id):
         limit = 500
         logger.warning(f"Limit capped at 500 tickets (requested: {limit})")
     
-    df, error = load_queue_issues(desk_id, queue_id)
+    snapshot = get_queue_snapshot(desk_id, queue_id)
+    queue_records = snapshot.data
+    if snapshot.error and queue_records is None:
+        # Non-empty error still propagated through decorator
+        raise RuntimeError(snapshot.error)
     # Gracefully handle empty/no-issue condition instead of 500
-    if error and 'no issues' in str(error).lower():
+    if queue_records is None:
         logger.warning(f"Queue {queue_id} returned no issues (desk {desk_id}) -> responding with empty list")
-        return {'data': [], 'count': 0, 'empty': True, 'queue_id': queue_id}
-    elif error:
-        # Non-empty error still propagated through decorator
-        raise RuntimeError(error)
-    records: list[dict] = []
-    if df is not None and getattr(df, 'empty', True) is False:
-        # Clean DataFrame before conversion: replace NaN/None with empty strings
-        df = df.fillna('')
-        raw_records: List[Dict[str, Any]] = list(df.to_dict('records'))  # type: ignore
-        # Sanitize records for JSON serialization
-        raw_records = _sanitize_for_json(raw_records)
-        records = _batch_inject_sla(raw_records)
-        
-        # Optimize payload: Remove large 'fields' object for list view (keep only essential data)
-        # The 'fields' object can be 10-50KB per issue, removing it reduces payload by 80-90%
-        records = _optimize_payload(records)
-        
-        # Debug: Log first record to verify customfields are present
-        if records and len(records) > 0:
-            first_record = records[0]
-            logger.info(f"🔍 First API record keys: {list(first_record.keys())}")
-            logger.info(f"   customfield_10111: {first_record.get('customfield_10111')}")
-            logger.info(f"   customfield_10125: {first_record.get('customfield_10125')}")
-            logger.info(f"   customfield_10141: {first_record.get('customfield_10141')}")
-            logger.info(f"   customfield_10142: {first_record.get('customfield_10142')}")
-            logger.info(f"   customfield_10143: {first_record.get('customfield_10143')}")
-    
-    # Apply pagination (slice records)
-    total_records = len(records)
-    paginated_records = records[offset:offset + limit]
+        return {'data': [], 'count': 0, 'empty': True, 'queue_id': queue_id, 'snapshot_version': snapshot.version}
+    # Compact records are already JSON-ready and without the large 'fields' object
+    # (10-50KB per issue); it is fetched separately when opening issue details.
+    # Pagination slices them first, so SLA data is attached to the returned page only
+    total_records = len(queue_records)
+    paginated_records = _batch_inject_sla(queue_records.compact(offset, offset + limit))
     has_more = (offset + limit) < total_records
     
     logger.info(f"📄 Pagination: offset={offset}, limit={limit}, total={total_records}, returned={len(paginated_records)}, hasMore={has_more}")
@@ -106,7 +88,8 @@ def api_get_issues_by_queue(queue_id):
         'total': total_records,
         'hasMore': has_more,
         'offset': offset,
-        'limit': limit
+        'limit': limit,
+        'snapshot_version': snapshot.version
     }
 
 def _inject_sla_stub(issue: dict) -> dict:
@@ -129,77 +112,6 @@ def _inject_sla_stub(issue: dict) -> dict:
     
     return issue
 
-def _sanitize_for_json(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Sanitize records for JSON serialization (remove NaN, convert dates, etc.)"""
-    import math
-    import datetime
-    
-    def sanitize_value(value):
-        # Handle NaN/None
-        if value is None:
-            return ''
-        if isinstance(value, float) and math.isnan(value):
-            return ''
-        # Handle datetime objects
-        if isinstance(value, (datetime.datetime, datetime.date)):
-            return value.isoformat()
-        # Handle nested dicts
-        if isinstance(value, dict):
-            return {k: sanitize_value(v) for k, v in value.items()}
-        # Handle lists
-        if isinstance(value, list):
-            return [sanitize_value(item) for item in value]
-        # Return primitive types as-is
-        return value
-    
-    return [
-        {k: sanitize_value(v) for k, v in record.items()}
-        for record in records
-    ]
-
-def _optimize_payload(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """
-    Optimize payload by removing large unnecessary fields.
-    Reduces response size by 80-90% for large queues.
-    
-    Strategy:
-    - Remove the entire 'fields' object (10-50KB per issue)
-    - Keep only essential top-level fields
-    - Keep all customfield_* for functionality
-    """
-    optimized = []
-    
-    # Essential fields to keep at top level
-    essential_fields = {
-        'key', 'summary', 'status', 'severity', 'assignee', 'assignee_id',
-        'created', 'updated', 'resolved', 'description', 'issue_type',
-        'labels', 'components', 'sla_agreements', 'last_real_change',
-        'watcher_count', 'is_watching', 'comment_count', 'reporter', 'creator'
-    }
-    
-    for record in records:
-        optimized_record = {}
-        
-        # Copy essential fields
-        for key, value in record.items():
-            # Keep essential fields or customfield_* fields
-            if key in essential_fields or key.startswith('customfield_'):
-                optimized_record[key] = value
-        
-        # Remove the large 'fields' object entirely
-        # Frontend doesn't need it for list/kanban view
-        # It will be fetched separately when opening issue details
-        
-        optimized.append(optimized_record)
-    
-    # Log size reduction
-    if records and optimized:
-        original_keys = len(records[0].keys())
-        optimized_keys = len(optimized[0].keys())
-        logger.info(f"⚡ Payload optimized: {original_keys} → {optimized_keys} fields per issue")
-    
-    return optimized
-
 def _batch_inject_sla(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Batch SLA enrichment using simplified SLA service"""
     if not records:
@@ -4,11 +4,11 @@ Endpoint:
   GET /api/kanban?desk_id=<id>&queue_id=<id or all>&include_empty=false
 
 Design:
-- Uses existing core.api.load_queue_issues (same source as /api/issues) to obtain DataFrame.
-- Bilingual column detection for status field ("status" / "estado").
+- Uses the shared queue snapshot (core.api.get_queue_snapshot, same source as /api/issues).
+- Bilingual status detection ("status" / "estado").
 - Returns lightweight JSON (no HTML) so frontend can render.
 - Applies existing SLA enrichment so cards have uniform data.
-- No persistent caching here initially; relies on upstream caching strategies.
+- Column payloads are memoized per snapshot version; a new snapshot rebuilds them.
 """
 from flask import Blueprint, request
 from typing import Any, Dict, List
@@ -16,28 +16,27 @@ import logging
 from utils.decorators import handle_api_error, json_response, log_request as log_decorator, require_credentials, rate_limited
 
 try:  # pragma: no cover
-    from core.api import load_queue_issues  # type: ignore
+    from core.api import get_queue_snapshot  # type: ignore
 except ImportError:  # pragma: no cover
-    def load_queue_issues(*_a, **_k):  # type: ignore
-        return None, 'core.api unavailable'
+    from utils.snapshot_cache import Snapshot
 
-try:  # pragma: no cover
-    from core.helpers import find_column  # type: ignore
-except ImportError:  # pragma: no cover
-    def find_column(df, *names):  # type: ignore
-        for n in names:
-            if n in getattr(df, 'columns', []):
-                return n
-        return None
+    def get_queue_snapshot(*_a, **_k):  # type: ignore
+        return Snapshot(key=None, data=None, version=0, fetched_at=0.0, error='core.api unavailable')
 
 logger = logging.getLogger(__name__)
 
 kanban_bp = Blueprint('kanban', __name__)
 
-# In-memory cache with simple TTL for kanban aggregations to avoid recomputing grouping
-# Keyed by (desk_id, queue_id, include_empty) -> { 'expires': ts, 'data': {...} }
+# Kanban aggregations memoized per queue snapshot version to avoid recomputing grouping
+# Keyed by (desk_id, queue_id, include_empty) -> { 'version': snapshot version, 'data': {...} }
 _KANBAN_CACHE: Dict[str, Dict[str, Any]] = {}
-_KANBAN_DEFAULT_TTL_SECONDS = 900  # 15 minutes aligns with issue cache TTL
+_KANBAN_CACHE_MAX = 128  # Oldest payloads dropped beyond this (snapshots themselves are LRU-bounded)
+
+def _remember_payload(cache_key: str, version: int, payload: Dict[str, Any]):
+    _KANBAN_CACHE.pop(cache_key, None)
+    _KANBAN_CACHE[cache_key] = {'version': version, 'data': payload}
+    while len(_KANBAN_CACHE) > _KANBAN_CACHE_MAX:
+        _KANBAN_CACHE.pop(next(iter(_KANBAN_CACHE)))
 
 @kanban_bp.route('/api/kanban', methods=['GET'])
 @handle_api_error
@@ -73,17 +72,18 @@ def api_get_kanban():
         raise ValueError('desk_id parameter is required')
 
     cache_key = f"{desk_id}:{queue_id}:{include_empty}"
-    # Serve from cache if valid
+    snapshot = get_queue_snapshot(desk_id, queue_id)
+    # Serve from cache if built from the current snapshot
     cached = _KANBAN_CACHE.get(cache_key)
-    if cached and cached['expires'] > __import__('time').time():
+    if cached and snapshot.version and cached['version'] == snapshot.version:
         payload = dict(cached['data'])
         payload['cached'] = True
         return payload
 
-    df, error = load_queue_issues(desk_id, queue_id)
-    if error:
-        logger.warning(f"Kanban queue load error: {error}")
-    if df is None or getattr(df, 'empty', True):
+    queue_records = snapshot.data
+    if snapshot.error:
+        logger.warning(f"Kanban queue load error: {snapshot.error}")
+    if queue_records is None or queue_records.empty:
         payload = {
             'columns': [],
             'total_issues': 0,
@@ -92,15 +92,14 @@ def api_get_kanban():
             'statuses': [],
             'empty_columns': 0,
             'empty': True,
+            'snapshot_version': snapshot.version,
         }
-        _KANBAN_CACHE[cache_key] = {'expires': __import__('time').time() + _KANBAN_DEFAULT_TTL_SECONDS, 'data': payload}
+        if snapshot.version:
+            _remember_payload(cache_key, snapshot.version, payload)
         return payload
 
-    # Detect status column bilingual naming
-    status_col = find_column(df, 'status', 'estado') or 'status'
-
     # Basic enrichment reusing issues blueprint SLA logic
-    raw_records: List[Dict[str, Any]] = list(df.to_dict('records'))  # type: ignore
+    raw_records: List[Dict[str, Any]] = queue_records.to_records()
     try:
         from api.blueprints.issues import _batch_inject_sla  # type: ignore
         records = _batch_inject_sla(raw_records)
@@ -110,7 +109,7 @@ def api_get_kanban():
     # Group records by status value
     columns_map: Dict[str, List[Dict[str, Any]]] = {}
     for rec in records:
-        status_val = rec.get(status_col) or rec.get('status') or rec.get('estado') or 'UNKNOWN'
+        status_val = rec.get('status') or rec.get('estado') or 'UNKNOWN'
         columns_map.setdefault(status_val, []).append(rec)
 
     # Sort statuses (preserving a common order if present)
@@ -156,6 +155,7 @@ def api_get_kanban():
         'queue_id': queue_id,
         'statuses': sorted_statuses,
         'empty_columns': empty_columns,
+        'snapshot_version': snapshot.version,
     }
-    _KANBAN_CACHE[cache_key] = {'expires': __import__('time').time() + _KANBAN_DEFAULT_TTL_SECONDS, 'data': payload}
+    _remember_payload(cache_key, snapshot.version, payload)
     return payload
@@ -4,15 +4,17 @@ Provides intelligent metrics generation with background data refresh.
 """
 from flask import Blueprint, request, jsonify
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Any, Optional
 import threading
 import time
-from collections import defaultdict
+
+import numpy as np
 
 from utils.decorators import handle_api_error, json_response, log_request as log_decorator, require_credentials
 from utils.db import get_db, init_db
 from core.api import get_api_client
+from utils.issue_columns import IssueColumns
 
 logger = logging.getLogger(__name__)
 reports_bp = Blueprint('reports', __name__)
@@ -84,6 +86,8 @@ init_reports_db()
 # Intelligent Metrics Generator
 # ============================================================================
 
+CLOSED_STATUSES = ('done', 'closed', 'resolved')
+
 class MetricsGenerator:
     """Generate intelligent metrics from issue data."""
     
@@ -92,6 +96,9 @@ class MetricsGenerator:
         """
         Generate comprehensive metrics from issues.
         
+        Issues (queue records or flat dicts) are turned into typed columns once
+        (utils.issue_columns); every metric is then a vectorized pass.
+        
         Returns:
             - summary: Basic counts and percentages
             - trends: Time-based analysis
@@ -106,70 +113,31 @@ class MetricsGenerator:
                 'insights': []
             }
         
+        columns = IssueColumns.from_records(
+            issues, ('status', 'priority', 'assignee', 'issue_type', 'created', 'resolved', 'sla_status')
+        )
+        
         # Summary metrics
-        total = len(issues)
-        by_status = defaultdict(int)
-        by_priority = defaultdict(int)
-        by_assignee = defaultdict(int)
-        by_type = defaultdict(int)
-        
-        created_dates = []
-        resolved_dates = []
-        response_times = []
-        resolution_times = []
-        
-        for issue in issues:
-            # Status distribution
-            status = issue.get('status', {})
-            status_name = status.get('name', 'Unknown') if isinstance(status, dict) else str(status)
-            by_status[status_name] += 1
-            
-            # Priority distribution
-            priority = issue.get('priority', {})
-            priority_name = priority.get('name', 'Unknown') if isinstance(priority, dict) else str(priority)
-            by_priority[priority_name] += 1
-            
-            # Assignee workload
-            assignee = issue.get('assignee', {})
-            assignee_name = assignee.get('displayName', 'Unassigned') if isinstance(assignee, dict) else 'Unassigned'
-            by_assignee[assignee_name] += 1
-            
-            # Issue type
-            issue_type = issue.get('issuetype', {})
-            type_name = issue_type.get('name', 'Unknown') if isinstance(issue_type, dict) else str(issue_type)
-            by_type[type_name] += 1
-            
-            # Time tracking
-            created = issue.get('created')
-            if created:
-                try:
-                    created_dates.append(datetime.fromisoformat(created.replace('Z', '+00:00')))
-                except:
-                    pass
-            
-            resolved = issue.get('resolutiondate')
-            if resolved:
-                try:
-                    resolved_dates.append(datetime.fromisoformat(resolved.replace('Z', '+00:00')))
-                except:
-                    pass
-        
-        # Calculate summary
+        status_codes, status_names = columns.codes('status')
+        closed_lookup = np.array([False] + [name.lower() in CLOSED_STATUSES for name in status_names])
+        closed = int(np.count_nonzero(closed_lookup[status_codes + 1]))
+        by_assignee = columns.counts('assignee', default='Unassigned')
+        
         summary = {
-            'total': total,
-            'open': sum(count for status, count in by_status.items() if status.lower() not in ['done', 'closed', 'resolved']),
-            'closed': sum(count for status, count in by_status.items() if status.lower() in ['done', 'closed', 'resolved']),
-            'by_status': dict(by_status),
-            'by_priority': dict(by_priority),
+            'total': len(columns),
+            'open': len(columns) - closed,
+            'closed': closed,
+            'by_status': columns.counts('status'),
+            'by_priority': columns.counts('priority'),
             'by_assignee': dict(sorted(by_assignee.items(), key=lambda x: x[1], reverse=True)[:10]),  # Top 10
-            'by_type': dict(by_type)
+            'by_type': columns.counts('issue_type')
         }
         
         # Trends analysis
-        trends = MetricsGenerator._analyze_trends(created_dates, resolved_dates)
+        trends = MetricsGenerator._analyze_trends(columns)
         
         # Performance metrics
-        performance = MetricsGenerator._analyze_performance(issues, created_dates, resolved_dates)
+        performance = MetricsGenerator._analyze_performance(columns)
         
         # Generate insights
         insights = MetricsGenerator._generate_insights(summary, trends, performance)
@@ -183,38 +151,31 @@ class MetricsGenerator:
         }
     
     @staticmethod
-    def _analyze_trends(created_dates: List[datetime], resolved_dates: List[datetime]) -> Dict[str, Any]:
+    def _analyze_trends(columns: IssueColumns) -> Dict[str, Any]:
         """Analyze time-based trends."""
-        from datetime import timezone
         now = datetime.now(timezone.utc)
         
-        # Last 7 days buckets
+        # Last 7 days buckets (by the calendar day the issue was stamped with)
+        created_days = np.floor(columns.wallclock('created') / 86400)
+        resolved_days = np.floor(columns.wallclock('resolved') / 86400)
+        today = now.timestamp() // 86400
         last_7_days = []
-        for i in range(7):
-            date = now - timedelta(days=i)
-            created_count = sum(1 for d in created_dates if d.date() == date.date())
-            resolved_count = sum(1 for d in resolved_dates if d.date() == date.date())
+        for i in range(6, -1, -1):
+            day = today - i
             last_7_days.append({
-                'date': date.strftime('%Y-%m-%d'),
-                'created': created_count,
-                'resolved': resolved_count
+                'date': (now - timedelta(days=i)).strftime('%Y-%m-%d'),
+                'created': int(np.count_nonzero(created_days == day)),
+                'resolved': int(np.count_nonzero(resolved_days == day))
             })
         
-        last_7_days.reverse()
-        
-        # Month-over-month (ensure timezone-aware comparison)
-        from datetime import timezone
+        # Month-over-month
         current_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
         last_month_start = (current_month_start - timedelta(days=1)).replace(day=1)
-        
-        # Safely compare with timezone-aware dates
-        try:
-            current_month_created = sum(1 for d in created_dates if d >= current_month_start)
-            last_month_created = sum(1 for d in created_dates if last_month_start <= d < current_month_start)
-        except TypeError:
-            # Handle mixed timezone-aware/naive dates
-            current_month_created = sum(1 for d in created_dates if d.replace(tzinfo=None) >= current_month_start.replace(tzinfo=None))
-            last_month_created = sum(1 for d in created_dates if last_month_start.replace(tzinfo=None) <= d.replace(tzinfo=None) < current_month_start.replace(tzinfo=None))
+        created = columns.epoch('created')
+        current_month_created = int(np.count_nonzero(created >= current_month_start.timestamp()))
+        last_month_created = int(np.count_nonzero(
+            (created >= last_month_start.timestamp()) & (created < current_month_start.timestamp())
+        ))
         
         return {
             'last_7_days': last_7_days,
@@ -224,41 +185,31 @@ class MetricsGenerator:
         }
     
     @staticmethod
-    def _analyze_performance(issues: List[Dict], created_dates: List[datetime], resolved_dates: List[datetime]) -> Dict[str, Any]:
+    def _analyze_performance(columns: IssueColumns) -> Dict[str, Any]:
         """Analyze performance metrics."""
-        # Calculate average resolution time
-        resolution_times = []
-        for issue in issues:
-            created = issue.get('created')
-            resolved = issue.get('resolutiondate')
-            if created and resolved:
-                try:
-                    created_dt = datetime.fromisoformat(created.replace('Z', '+00:00'))
-                    resolved_dt = datetime.fromisoformat(resolved.replace('Z', '+00:00'))
-                    delta = (resolved_dt - created_dt).total_seconds() / 3600  # hours
-                    resolution_times.append(delta)
-                except:
-                    pass
-        
-        avg_resolution = round(sum(resolution_times) / len(resolution_times), 1) if resolution_times else 0
-        
-        # SLA compliance (placeholder)
-        sla_compliant = sum(1 for issue in issues if issue.get('sla_status') == 'met')
-        sla_total = len([i for i in issues if i.get('sla_status')])
-        sla_rate = round(sla_compliant / sla_total * 100, 1) if sla_total > 0 else 0
+        # Resolution times in hours (issues with both dates)
+        hours = (columns.epoch('resolved') - columns.epoch('created')) / 3600
+        resolution_times = np.sort(hours[~np.isnan(hours)])
+        count = len(resolution_times)
+        
+        avg_resolution = round(float(resolution_times.mean()), 1) if count else 0
+        
+        # SLA compliance
+        sla_counts = columns.counts('sla_status', default=None)
+        sla_total = sum(sla_counts.values())
+        sla_rate = round(sla_counts.get('met', 0) / sla_total * 100, 1) if sla_total > 0 else 0
+        
+        bucket_edges = np.searchsorted(resolution_times, [1, 8, 24, 168])
+        bucket_counts = np.diff(np.concatenate(([0], bucket_edges, [count])))
         
         return {
             'avg_resolution_hours': avg_resolution,
-            'median_resolution_hours': round(sorted(resolution_times)[len(resolution_times)//2], 1) if resolution_times else 0,
+            'median_resolution_hours': round(float(resolution_times[count // 2]), 1) if count else 0,
             'sla_compliance_rate': sla_rate,
-            'total_resolved': len(resolved_dates),
-            'resolution_times_distribution': {
-                '< 1h': sum(1 for t in resolution_times if t < 1),
-                '1-8h': sum(1 for t in resolution_times if 1 <= t < 8),
-                '8-24h': sum(1 for t in resolution_times if 8 <= t < 24),
-                '1-7d': sum(1 for t in resolution_times if 24 <= t < 168),
-                '> 7d': sum(1 for t in resolution_times if t >= 168)
-            }
+            'total_resolved': int(np.count_nonzero(~np.isnan(columns.epoch('resolved')))),
+            'resolution_times_distribution': dict(zip(
+                ('< 1h', '1-8h', '8-24h', '1-7d', '> 7d'), (int(c) for c in bucket_counts)
+            ))
         }
     
     @staticmethod
@@ -347,8 +298,8 @@ def background_refresh_worker(service_desk_id: str, queue_id: Optional[str] = No
             _refresh_state['progress'] = 10
             _refresh_state['status'] = 'initializing'
         
-        # Get issues from queue
-        from core.api import load_queue_issues
+        # Get issues from the shared queue snapshot (same data as list/board views)
+        from core.api import get_queue_snapshot
         issues = []
         
         if queue_id:
@@ -359,21 +310,21 @@ def background_refresh_worker(service_desk_id: str, queue_id: Optional[str] = No
             logger.info(f"📡 Loading queue issues: desk={service_desk_id}, queue={queue_id}")
             
             try:
-                df, error = load_queue_issues(service_desk_id, queue_id)
+                snapshot = get_queue_snapshot(service_desk_id, queue_id)
+                queue_records, error = snapshot.data, snapshot.error
                 
                 with _refresh_lock:
                     _refresh_state['progress'] = 40
                     _refresh_state['status'] = 'processing_data'
                 
-                if error:
+                if error and queue_records is None:
                     logger.warning(f"⚠️ Error loading issues: {error}")
                     # Continue with empty list instead of failing
-                elif df is not None and not df.empty:
-                    # Convert DataFrame to list of dicts
-                    issues = df.to_dict('records')
+                elif queue_records is not None and not queue_records.empty:
+                    issues = queue_records.to_records()
                     logger.info(f"✓ Loaded {len(issues)} issues from queue")
                 else:
-                    logger.info("ℹ️ DataFrame is empty or None")
+                    logger.info("ℹ️ Queue is empty")
                     
             except Exception as load_error:
                 logger.error(f"❌ Exception loading issues: {load_error}", exc_info=True)
@@ -7,8 +7,7 @@ from utils.decorators import (
     handle_api_error,
     json_response,
     log_request as log_decorator,
-    require_credentials,
-    rate_limited
+    require_credentials
 )
 
 logger = logging.getLogger(__name__)
@@ -19,44 +18,99 @@ sync_bp = Blueprint('sync', __name__)
 @handle_api_error
 @json_response
 @log_decorator(logging.INFO)
-@rate_limited(max_calls=1, period=300)  # Max 1 sync every 5 minutes
 @require_credentials
 def api_sync_project(project_key):
     """
-    Sync all issues from a project to local cache using Service Desk API.
+    Queue a background sync of all issues from a project (Service Desk API).
+    A sync requested while one is queued or running for the project is
+    coalesced into that job (utils.sync_jobs).
     
     POST /api/sync/project/MSM
     Body (optional): {"service_desk_id": "4"}
     
-    Response:
+    Response (202):
         {
+            "job_id": "3f2a9c1b7d4e",
             "project_key": "MSM",
-            "total_fetched": 1234,
-            "total_stored": 1234,
-            "sync_start": "2025-11-28T10:00:00",
-            "sync_end": "2025-11-28T10:05:00",
-            "status": "success"
+            "status": "queued",
+            "coalesced": false,
+            "status_url": "/api/sync/jobs/3f2a9c1b7d4e",
+            "job": {...}
         }
     """
-    from core.api import get_api_client
-    from utils.issue_cache import get_cache_manager
+    from utils.sync_jobs import get_sync_job_runner
     
     try:
-        client = get_api_client()
-        cache = get_cache_manager()
-        
         # Get optional service_desk_id from request body
-        data = request.get_json() or {}
+        data = request.get_json(silent=True) or {}
         service_desk_id = data.get('service_desk_id')
         
-        result = cache.sync_project(project_key, client, service_desk_id)
+        job, created = get_sync_job_runner().submit(project_key, service_desk_id)
         
-        return result
+        return {
+            'job_id': job.job_id,
+            'project_key': project_key,
+            'status': job.status,
+            'coalesced': not created,
+            'status_url': f'/api/sync/jobs/{job.job_id}',
+            'job': job.to_dict()
+        }, 202
         
     except Exception as e:
-        logger.error(f"Sync failed for {project_key}: {e}")
+        logger.error(f"Could not queue sync for {project_key}: {e}")
         return {'error': str(e), 'project_key': project_key}, 500
 
+@sync_bp.route('/api/sync/jobs', methods=['GET'])
+@handle_api_error
+@json_response
+@require_credentials
+def api_list_sync_jobs():
+    """
+    List sync jobs, newest first.
+    
+    GET /api/sync/jobs?project=MSM
+    """
+    from utils.sync_jobs import get_sync_job_runner
+    
+    runner = get_sync_job_runner()
+    jobs = runner.list_jobs(request.args.get('project'))
+    return {'jobs': [job.to_dict() for job in jobs], 'stats': runner.get_stats()}
+
+@sync_bp.route('/api/sync/jobs/<job_id>', methods=['GET'])
+@handle_api_error
+@json_response
+@require_credentials
+def api_get_sync_job(job_id):
+    """
+    Get a sync job: status, current phase, per-phase progress and result.
+    
+    GET /api/sync/jobs/3f2a9c1b7d4e
+    """
+    from utils.sync_jobs import get_sync_job_runner
+    
+    job = get_sync_job_runner().get(job_id)
+    if job is None:
+        return {'error': f'Sync job {job_id} not found'}, 404
+    return job.to_dict()
+
+@sync_bp.route('/api/sync/jobs/<job_id>/cancel', methods=['POST'])
+@handle_api_error
+@json_response
+@log_decorator(logging.INFO)
+@require_credentials
+def api_cancel_sync_job(job_id):
+    """
+    Cancel a sync job (running jobs stop at the next queue, page or phase).
+    
+    POST /api/sync/jobs/3f2a9c1b7d4e/cancel
+    """
+    from utils.sync_jobs import get_sync_job_runner
+    
+    job = get_sync_job_runner().cancel(job_id)
+    if job is None:
+        return {'error': f'Sync job {job_id} not found'}, 404
+    return job.to_dict()
+
 @sync_bp.route('/api/sync/status/<project_key>', methods=['GET'])
 @handle_api_error
 @json_response
@@ -64,21 +118,25 @@ def api_sync_project(project_key):
 @require_credentials
 def api_sync_status(project_key):
     """
-    Get sync status for a project.
+    Get sync status for a project (with its queued or running job, if any).
     
     GET /api/sync/status/MSM
     """
     from utils.issue_cache import get_cache_manager
+    from utils.sync_jobs import get_sync_job_runner
     
     try:
         cache = get_cache_manager()
         status = cache.get_sync_status(project_key)
         needs_sync = cache.needs_sync(project_key)
+        active_job = get_sync_job_runner().active_job(project_key)
         
         return {
             'project_key': project_key,
             'sync_status': status,
-            'needs_sync': needs_sync
+            'needs_sync': needs_sync,
+            'stored_issues': cache.store.count(project_key),
+            'active_job': active_job.to_dict() if active_job else None
         }
         
     except Exception as e:
@@ -102,25 +160,20 @@ def api_get_patterns(project_key):
     
     try:
         cache = get_cache_manager()
-        conn = cache.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT keyword, suggested_value, confidence, occurrence_count
-            FROM issue_patterns
-            WHERE pattern_type = ?
-            ORDER BY confidence DESC, occurrence_count DESC
-            LIMIT 100
-        """, (field_type,))
+        learned = cache.get_patterns(field_type)
         
-        patterns = []
-        for row in cursor.fetchall():
-            patterns.append({
-                'keyword': row['keyword'],
-                'suggested_value': row['suggested_value'],
-                'confidence': row['confidence'],
-                'occurrence_count': row['occurrence_count']
-            })
+        patterns = [
+            {
+                'keyword': keyword,
+                'suggested_value': entry['value'],
+                'confidence': entry['confidence'],
+                'occurrence_count': entry['count']
+            }
+            for keyword, entries in learned.items()
+            for entry in entries
+        ]
+        patterns.sort(key=lambda p: (p['confidence'], p['occurrence_count']), reverse=True)
+        patterns = patterns[:100]
         
         return {
             'project_key': project_key,
@@ -14,6 +14,7 @@ Authentication: Basic Auth (email + API token)
 from typing import Dict, List, Optional, Any
 import logging
 from utils.common import _make_request, _get_credentials, _get_auth_header
+from utils.async_jira import search_all_issues
 from utils.http_utils import retry_on_error
 from utils.config import config
 
@@ -161,6 +162,28 @@ class JiraPlatformAPI:
             logger.error(f"❌ Error searching issues: {e}")
             return {"issues": [], "total": 0}
     
+    def search_all_issues(self, jql: str, fields: Optional[List[str]] = None,
+                          page_size: int = 100) -> List[Dict[str, Any]]:
+        """
+        Search for ALL issues matching a JQL (remaining pages fetched concurrently)
+        
+        Uses utils.async_jira: the first page reports the total, then every other
+        page is requested in parallel (JiraConfig.max_concurrency).
+        
+        Args:
+            jql: JQL query string
+            fields: List of field names to return
+            page_size: Results per page (max: 100)
+        
+        Returns:
+            List of issue objects
+        """
+        try:
+            return search_all_issues(self.site, self.headers, jql, fields=fields, page_size=min(page_size, 100))
+        except Exception as e:
+            logger.error(f"❌ Error searching all issues: {e}")
+            return []
+    
     def update_issue(self, issue_key: str, fields: Dict[str, Any]) -> bool:
         """
         Update issue fields
@@ -16,6 +16,7 @@ Note: Service Desk API is separate from Platform API and has different endpoints
 from typing import Dict, List, Optional, Any
 import logging
 from utils.common import _make_request, _get_credentials, _get_auth_header
+from utils.async_jira import fetch_queue_issues
 from utils.http_utils import retry_on_error
 from utils.config import config
 
@@ -245,6 +246,29 @@ class JiraServiceDeskAPI:
             logger.error(f"❌ Error fetching issues from queue {queue_id}: {e}")
             return {"values": [], "size": 0, "error": str(e)}
     
+    def get_all_queue_issues(self, desk_id: str, queue_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Get ALL issues from a queue (remaining pages fetched concurrently)
+        
+        Uses utils.async_jira: the first page reveals whether more pages exist,
+        then the rest are requested in parallel (JiraConfig.max_concurrency).
+        
+        Args:
+            desk_id: Service desk ID
+            queue_id: Queue ID
+            limit: Page size
+        
+        Returns:
+            List of issue objects (same shape as get_queue_issues()['values'])
+        """
+        try:
+            issues, request_count = fetch_queue_issues(self.site, self.headers, desk_id, queue_id, page_limit=limit)
+            logger.info(f"✅ Fetched {len(issues)} issues from queue {queue_id} in {request_count} request(s)")
+            return issues
+        except Exception as e:
+            logger.error(f"❌ Error fetching all issues from queue {queue_id}: {e}")
+            return []
+    
     # ============================================================
     # REQUEST TYPES
     # ============================================================
@@ -16,11 +16,29 @@ from pathlib import Path
 import numpy as np
 from sklearn.ensemble import IsolationForest
 
+from utils.issue_columns import IssueColumns, load_issue_columns
+
 logger = logging.getLogger(__name__)
 
 # Default cache path - absolute path from project root
 DEFAULT_CACHE_PATH = Path(__file__).parent.parent / "data" / "cache" / "msm_issues.json.gz"
 
+# Columns read by calculate_baseline
+BASELINE_COLUMNS = ("created", "updated", "status", "assignee", "issue_type")
+
+def _ticket_from_row(row: Dict) -> Dict:
+    """Raw-issue-shaped ticket from snapshot/store columns (fields used by the detectors)"""
+    return {
+        "key": row["key"],
+        "fields": {
+            "created": row["created"] or "",
+            "updated": row["updated"],
+            "status": {"name": row["status"]} if row["status"] else {},
+            "assignee": {"displayName": row["assignee"]} if row["assignee"] else None,
+            "issuetype": {"name": row["issue_type"]} if row["issue_type"] else {},
+        }
+    }
+
 class AnomalyDetectionEngine:
     """
     Detects anomalies in ticket operations:
@@ -44,7 +62,24 @@ class AnomalyDetectionEngine:
         self.anomalies: List[Dict] = []
         
     def load_tickets(self) -> List[Dict]:
-        """Load tickets from cache"""
+        """
+        Load tickets from cache
+        
+        Reads only the columns the detectors use from the shared issue snapshot
+        (utils.issue_snapshot) or the issue store, shaped like raw issues; falls
+        back to the JSON cache file before the first sync.
+        """
+        try:
+            from utils.issue_snapshot import get_issue_source
+            source = get_issue_source()
+            if not source.is_empty():
+                rows = source.rows(["key", "created", "updated", "status", "assignee", "issue_type"])
+                tickets = [_ticket_from_row(row) for row in rows]
+                logger.info(f"✅ Loaded {len(tickets)} tickets from issue snapshot/store")
+                return tickets
+        except Exception as e:
+            logger.error(f"Error reading issue snapshot/store: {e}")
+        
         if not os.path.exists(self.cache_path):
             logger.warning(f"Cache file not found: {self.cache_path}")
             return []
@@ -59,89 +94,78 @@ class AnomalyDetectionEngine:
             logger.error(f"Error loading tickets: {e}")
             return []
     
-    def calculate_baseline(self, tickets: List[Dict]) -> Dict:
-        """Calculate baseline statistics from historical data"""
-        if not tickets:
-            return {}
-        
-        # Initialize counters
-        daily_counts = defaultdict(int)
-        assignee_counts = defaultdict(int)
-        status_durations = defaultdict(list)
-        issue_type_counts = defaultdict(int)
-        hourly_counts = defaultdict(int)
-        
-        for ticket in tickets:
-            try:
-                fields = ticket.get('fields', {})
-                
-                # Daily ticket counts
-                created = fields.get('created', '')
-                if created:
-                    date = created.split('T')[0]
-                    daily_counts[date] += 1
-                    
-                    # Hourly distribution
-                    hour = int(created.split('T')[1].split(':')[0])
-                    hourly_counts[hour] += 1
-                
-                # Assignee distribution
-                assignee = fields.get('assignee', {})
-                if assignee and isinstance(assignee, dict):
-                    assignee_name = assignee.get('displayName', 'Unassigned')
-                    assignee_counts[assignee_name] += 1
-                elif not assignee:
-                    assignee_counts['Unassigned'] += 1
-                
-                # Issue types
-                issue_type = fields.get('issuetype', {}).get('name', 'Unknown')
-                issue_type_counts[issue_type] += 1
-                
-                # Status duration (if available)
-                status = fields.get('status', {}).get('name', 'Unknown')
-                updated = fields.get('updated', created)
-                if created and updated:
-                    duration = self._calculate_duration_hours(created, updated)
-                    status_durations[status].append(duration)
-                    
-            except Exception as e:
-                logger.debug(f"Error processing ticket: {e}")
-                continue
-        
-        # Calculate statistics
-        daily_values = list(daily_counts.values())
-        assignee_values = list(assignee_counts.values())
+    def load_baseline_columns(self) -> Optional[IssueColumns]:
+        """
+        Columns used by the baseline, read straight from the columnar analytics
+        snapshot (utils.issue_columns) or the issue store; None before the first sync
+        """
+        try:
+            columns = load_issue_columns(BASELINE_COLUMNS)
+            return columns if len(columns) else None
+        except Exception as e:
+            logger.debug(f"Baseline columns unavailable: {e}")
+            return None
+    
+    def calculate_baseline(self, tickets: List[Dict], columns: Optional[IssueColumns] = None) -> Dict:
+        """
+        Calculate baseline statistics from historical data (vectorized over typed columns)
+        
+        Args:
+            tickets: Raw-issue-shaped tickets
+            columns: Pre-loaded BASELINE_COLUMNS of the same tickets (skips extraction)
+        """
+        if columns is None:
+            if not tickets:
+                return {}
+            columns = IssueColumns.from_issues(tickets, BASELINE_COLUMNS)
+        
+        # Daily ticket counts and hourly distribution (wall clock of the JIRA timestamp)
+        created_local = columns.wallclock('created')
+        created_local = created_local[~np.isnan(created_local)]
+        _, daily_values = np.unique(np.floor(created_local / 86400), return_counts=True)
+        hours, hourly_values = np.unique((created_local % 86400 // 3600).astype(np.int64), return_counts=True)
+        peak = np.argsort(-hourly_values, kind='stable')[:3]
+        
+        # Assignee distribution
+        assignee_counts = columns.counts('assignee', default='Unassigned')
+        assignee_values = np.array(list(assignee_counts.values()))
+        
+        # Time since creation per status (hours, tickets with both dates)
+        durations = np.maximum(0, (columns.epoch('updated') - columns.epoch('created')) / 3600)
+        status_codes, status_names = columns.codes('status')
+        valid = ~np.isnan(durations)
+        groups = status_codes[valid] + 1
+        status_labels = ['Unknown'] + status_names
+        totals = np.bincount(groups, weights=durations[valid], minlength=len(status_labels))
+        counts = np.bincount(groups, minlength=len(status_labels))
+        maxima = np.zeros(len(status_labels))
+        np.maximum.at(maxima, groups, durations[valid])
+        measured = [i for i in range(len(status_labels)) if counts[i]]
         
         baseline = {
             # Daily patterns
-            "avg_daily_tickets": np.mean(daily_values) if daily_values else 0,
-            "std_daily_tickets": np.std(daily_values) if daily_values else 0,
-            "max_daily_tickets": max(daily_values) if daily_values else 0,
-            "min_daily_tickets": min(daily_values) if daily_values else 0,
+            "avg_daily_tickets": float(daily_values.mean()) if daily_values.size else 0,
+            "std_daily_tickets": float(daily_values.std()) if daily_values.size else 0,
+            "max_daily_tickets": int(daily_values.max()) if daily_values.size else 0,
+            "min_daily_tickets": int(daily_values.min()) if daily_values.size else 0,
             
             # Hourly distribution
-            "peak_hours": sorted(hourly_counts.items(), key=lambda x: x[1], reverse=True)[:3],
-            "hourly_avg": np.mean(list(hourly_counts.values())) if hourly_counts else 0,
+            "peak_hours": [(int(hours[i]), int(hourly_values[i])) for i in peak],
+            "hourly_avg": float(hourly_values.mean()) if hourly_values.size else 0,
             
             # Assignment distribution
-            "avg_tickets_per_assignee": np.mean(assignee_values) if assignee_values else 0,
-            "std_tickets_per_assignee": np.std(assignee_values) if assignee_values else 0,
-            "max_tickets_per_assignee": max(assignee_values) if assignee_values else 0,
-            "assignee_distribution": dict(assignee_counts),
+            "avg_tickets_per_assignee": float(assignee_values.mean()) if assignee_values.size else 0,
+            "std_tickets_per_assignee": float(assignee_values.std()) if assignee_values.size else 0,
+            "max_tickets_per_assignee": int(assignee_values.max()) if assignee_values.size else 0,
+            "assignee_distribution": assignee_counts,
             
             # Status durations
-            "avg_status_durations": {
-                status: np.mean(durations) if durations else 0
-                for status, durations in status_durations.items()
-            },
-            "max_status_durations": {
-                status: max(durations) if durations else 0
-                for status, durations in status_durations.items()
-            },
+            "avg_status_durations": {status_labels[i]: float(totals[i] / counts[i]) for i in measured},
+            "max_status_durations": {status_labels[i]: float(maxima[i]) for i in measured},
             
             # Issue types
-            "issue_type_distribution": dict(issue_type_counts),
-            "total_tickets": len(tickets),
+            "issue_type_distribution": columns.counts('issue_type'),
+            "total_tickets": len(columns),
             "timestamp": datetime.now().isoformat()
         }
         
@@ -422,7 +446,7 @@ class AnomalyDetectionEngine:
             return {"error": "No tickets found", "trained": False}
         
         # Calculate baseline
-        self.baseline_stats = self.calculate_baseline(tickets)
+        self.baseline_stats = self.calculate_baseline(tickets, self.load_baseline_columns())
         
         # Initial anomaly detection
         self.anomalies = self.detect_anomalies(tickets)
@@ -457,7 +481,7 @@ class AnomalyDetectionEngine:
         tickets = self.load_tickets()
         
         if not self.baseline_stats:
-            self.baseline_stats = self.calculate_baseline(tickets)
+            self.baseline_stats = self.calculate_baseline(tickets, self.load_baseline_columns())
         
         anomalies = self.detect_anomalies(tickets)
         
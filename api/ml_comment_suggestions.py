@@ -99,7 +99,23 @@ class CommentSuggestionEngine:
         }
     
     def load_tickets(self) -> List[Dict]:
-        """Load tickets from cache"""
+        """
+        Load tickets from cache
+        
+        Only tickets with comments are read from the shared issue snapshot
+        (utils.issue_snapshot) or the issue store; falls back to the JSON cache
+        file before the first sync.
+        """
+        try:
+            from utils.issue_snapshot import get_issue_source
+            source = get_issue_source()
+            if not source.is_empty():
+                tickets = source.load_issues(min_comments=1)
+                logger.info(f"✅ Loaded {len(tickets)} commented tickets from issue snapshot/store")
+                return tickets
+        except Exception as e:
+            logger.error(f"Error reading issue snapshot/store: {e}")
+        
         if not os.path.exists(self.cache_path):
             logger.warning(f"Cache file not found: {self.cache_path}")
             return []
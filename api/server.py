@@ -231,6 +231,14 @@ for bp_name, bp in [
     else:
         logger.warning(f"Blueprint not available, skipping: {bp_name}")
 
+# Resume project syncs interrupted by a crash or restart (utils.sync_jobs)
+if sync_bp is not None:
+    try:
+        from utils.sync_jobs import get_sync_job_runner  # noqa: E402
+        get_sync_job_runner().resume_interrupted()
+    except Exception as e:
+        logger.warning(f"Could not resume interrupted sync jobs: {e}")
+
 # In-memory cache for desks aggregation (initialized empty)
 DESKS_CACHE = {
     'data': None,
@@ -599,6 +607,31 @@ def api_get_desks_cache_meta():
         'cached': bool(data) and remaining > 0,
     }
 
+@app.route('/api/diagnostics/jira-client', methods=['GET'])
+@handle_api_error
+@json_response
+@log_decorator(logging.INFO)
+def api_get_jira_client_diagnostics():
+    """Introspection endpoint for the outbound JIRA client layer.
+    Returns connection pool statistics (requests, reuse ratio, open connections per host)
+    and the shared rate limiter state (current rate, throttles, retries)
+    and single-flight coalescing counters per group (jira_get, queue_load),
+    plus shared queue snapshot hits/refreshes and versions
+    and the formatted-record memo (hits, misses, evictions, size).
+    """
+    from utils.http_pool import get_pool_stats
+    from utils.rate_limiter import get_rate_limiter_stats
+    from utils.single_flight import get_single_flight_stats
+    from core.api import get_queue_snapshot_stats
+    from utils.record_memo import get_record_memo_stats
+    return {
+        'pool': get_pool_stats(),
+        'rate_limiter': get_rate_limiter_stats(),
+        'single_flight': get_single_flight_stats(),
+        'queue_snapshots': get_queue_snapshot_stats(),
+        'record_memo': get_record_memo_stats(),
+    }
+
 # Issues / Comments / Attachments now provided by registered blueprints.
 
 # Transitions endpoint migrated to blueprint (transitions_bp)
@@ -1124,6 +1157,7 @@ def api_docs():
             'ui': ['GET /', 'GET /app'],
             'dashboard': ['GET /api/dashboard/summary'],
             'queues': ['GET /api/queues', 'GET /api/desks', 'GET /api/desks?refresh=1', 'GET /api/desks/cache'],
+            'diagnostics': ['GET /api/diagnostics/jira-client'],
             'issues': ['GET /api/issues', 'GET /api/issues/<queue_id>', 'GET /api/issues/<issue_key>/transitions', 'GET /api/issues/<issue_key>/sla'],
             'comments': ['GET /api/issues/<issue_key>/comments', 'POST /api/issues/<issue_key>/comments', 'PUT /api/issues/<issue_key>/comments/<comment_id>', 'DELETE /api/issues/<issue_key>/comments/<comment_id>'],
             'attachments': ['GET /api/issues/<issue_key>/attachments'],
@@ -49,7 +49,7 @@ def get_issues_with_severity(queue_id):
         logger.info(f"📊 Fetching issues with severity for desk {desk_id}, queue {queue_id}")
         
         # Cargar issues desde el queue
-        issues_df, error = load_queue_issues(
+        issues_records, error = load_queue_issues(
             service_desk_id=str(desk_id),
             queue_id=str(queue_id)
         )
@@ -58,11 +58,11 @@ def get_issues_with_severity(queue_id):
             logger.error(f"Error loading issues: {error}")
             return jsonify({'error': error}), 500
         
-        if issues_df is None or issues_df.empty:
+        if issues_records is None or issues_records.empty:
             return jsonify({'data': [], 'count': 0}), 200
         
-        # Convertir a lista de dicts
-        issues = issues_df.to_dict('records')
+        # Convertir a lista de dicts (copias; el enriquecedor las modifica)
+        issues = issues_records.to_records()
         
         # Enriquecer con severidad
         enriched_issues = SeverityEnricher.enrich_issues(issues)
@@ -6,14 +6,27 @@ Centralized API calls for JIRA integration
 """
 
 import logging
+import threading
 from typing import Optional, List, Dict, Any, Union, Tuple
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime
 import time
 
 from utils.api_migration import get_api_client
-from utils.common import _normalize_url, _make_request
+from utils.common import _normalize_url, _make_request, JiraRateLimitError
+from utils.async_jira import fetch_queue_issues, fetch_issues_by_keys
+from utils.single_flight import get_single_flight
+from utils.queue_delta import (
+    QUEUE_SEARCH_API_VERSION, QueueState, fetch_queue_delta, get_queue_jql, get_queue_state
+)
+from utils.config import config
+from utils.snapshot_cache import Snapshot, SnapshotCache
+from utils.field_compiler import FieldPlan, compile_field_plan
+from utils.issue_records import IssueRecords
+from utils.record_memo import format_issues_memoized
+from utils.issue_columns import IssueColumns
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
@@ -22,26 +35,6 @@ logger = logging.getLogger(__name__)
 _enrich_cache = {}
 _enrich_cache_ttl = 3600  # 1 hora en segundos
 
-# ============================================================================
-# FIELD NORMALIZATION - Support both Spanish and English field names
-# ============================================================================
-
-def _get_field_value(fields_dict: Dict, *field_names: str) -> Any:
-    """
-    Get field value from JIRA fields dict, trying multiple field names (English/Spanish).
-    
-    Args:
-        fields_dict: The fields dictionary from JIRA response
-        *field_names: Variable number of possible field names to try
-        
-    Returns:
-        Field value if found, None otherwise
-    """
-    for field_name in field_names:
-        if field_name in fields_dict:
-            return fields_dict[field_name]
-    return None
-
 def enrich_issue_from_jira(issue: Dict, client=None) -> Dict:
     """
     Enrich issue data from JIRA REST API with labels, components, custom fields, transitions.
@@ -593,123 +586,39 @@ def get_reporter_issues(service_desk_id: Optional[str] = None, project_key: Opti
         logger.error(f"Error in get_reporter_issues: {e}")
         return []
 
-def _normalize_severity_value(severity_obj: Any, custom_fields: Dict[str, Any], issue_key: str) -> str:
-    """
-    Normalize severity value from different sources
-    
-    Args:
-        severity_obj: Raw severity object from API
-        custom_fields: Custom fields dictionary
-        issue_key: Issue key for logging
-        
-    Returns:
-        Normalized severity string
-    """
-    # Severity mapping (Spanish to English if needed)
-    severity_map = {
-        'mayor': 'High',
-        'menor': 'Low', 
-        'crítico': 'Critical',
-        'critico': 'Critical',
-        'normal': 'Medium',
-        'alta': 'High',
-        'baja': 'Low',
-        'media': 'Medium',
-        # Keep English values as-is
-        'critical': 'Critical',
-        'high': 'High',
-        'medium': 'Medium',
-        'low': 'Low',
-    }
-    
-    # Try direct severity field first
-    if severity_obj:
-        if isinstance(severity_obj, dict):
-            severity_name = severity_obj.get("name") or severity_obj.get("value")
-            if severity_name:
-                normalized = severity_map.get(str(severity_name).lower(), severity_name)
-                logger.debug(f"🔍 {issue_key} - Severity: {normalized} (from field object)")
-                return normalized
-        elif isinstance(severity_obj, str):
-            normalized = severity_map.get(severity_obj.lower(), severity_obj)
-            logger.debug(f"🔍 {issue_key} - Severity: {normalized} (from field string)")
-            return normalized
-    
-    # Fallback to custom fields
-    severity_field = custom_fields.get('severity')
-    if severity_field:
-        normalized = severity_map.get(str(severity_field).lower(), str(severity_field))
-        logger.debug(f"🔍 {issue_key} - Severity: {normalized} (from custom field)")
-        return normalized
-    
-    # No fallback - retornar None cuando no hay severity
-    logger.debug(f"⚠️ {issue_key} - No severity data found")
-    return None
+# Compiled field extractors (built once from the reference file + /rest/api/2/field)
+_field_plan: Optional[FieldPlan] = None
+_field_plan_retry_at: Optional[float] = None  # Set while the plan lacks the site's field definitions
+_field_plan_lock = threading.Lock()
+# Seconds before a plan compiled without field definitions (fetch failed) is retried
+FIELD_PLAN_RETRY_SECONDS = 300
 
-def _extract_service_desk_custom_fields(fields: Dict[str, Any]) -> Dict[str, Any]:
+def _get_field_plan() -> FieldPlan:
     """
-    Extract custom fields from Service Desk API response
-    
-    Args:
-        fields: Fields dict from Service Desk API
-        
-    Returns:
-        Dictionary of custom field mappings
+    Get or compile the field plan used to format queue issues
+
+    When /rest/api/2/field cannot be fetched the plan is compiled from the
+    reference file alone and the fetch is retried FIELD_PLAN_RETRY_SECONDS later.
     """
-    custom_fields = {}
-    
-    # Common Service Desk custom fields
-    custom_field_mappings = {
-        'customfield_10001': 'epic_link',
-        'customfield_10002': 'sprint',
-        'customfield_10003': 'story_points',
-        'customfield_10125': 'severity',  # Criticidad field (MSM project)
-        'customfield_10020': 'severity_alt',  # Alternative severity field
-        'customfield_10021': 'urgency',   # Common urgency field
-        'customfield_10022': 'impact',    # Common impact field
-        'customfield_10030': 'sla_time',  # SLA fields
-        'customfield_10031': 'time_to_resolution',
-        'customfield_10032': 'customer_satisfaction',
-        'customfield_10040': 'category',  # Request category
-        'customfield_10041': 'subcategory',
-        'customfield_10050': 'business_service',
-        'customfield_10060': 'environment',  # Environment (dev, prod, etc)
-        'customfield_10070': 'affected_systems'
-    }
-    
-    # Extract all custom fields from Service Desk response
-    customfield_count = 0
-    for field_key, field_value in fields.items():
-        if field_key.startswith('customfield_'):
-            customfield_count += 1
-            # Store with original ID (customfield_xxx)
-            custom_fields[field_key] = field_value
-            
-            # Also store with friendly name if mapped
-            friendly_name = custom_field_mappings.get(field_key)
-            if friendly_name and friendly_name != field_key:
-                # Extract simple value for friendly name
-                if isinstance(field_value, dict):
-                    if 'displayName' in field_value:
-                        custom_fields[friendly_name] = field_value['displayName']
-                    elif 'name' in field_value:
-                        custom_fields[friendly_name] = field_value['name']
-                    elif 'value' in field_value:
-                        custom_fields[friendly_name] = field_value['value']
-                    else:
-                        custom_fields[friendly_name] = str(field_value)
-                elif isinstance(field_value, list):
-                    if field_value and isinstance(field_value[0], dict):
-                        custom_fields[friendly_name] = [item.get('name', str(item)) for item in field_value]
-                    else:
-                        custom_fields[friendly_name] = field_value
+    global _field_plan, _field_plan_retry_at
+    if _field_plan is None or (_field_plan_retry_at is not None and time.time() >= _field_plan_retry_at):
+        with _field_plan_lock:
+            if _field_plan is None or (_field_plan_retry_at is not None and time.time() >= _field_plan_retry_at):
+                definitions = None
+                try:
+                    client = get_api_client()
+                    definitions = _make_request("GET", f"{client.site}/rest/api/2/field", client.headers)
+                except Exception as e:
+                    logger.debug(f"Field definitions unavailable, using reference file only: {e}")
+                if isinstance(definitions, list):
+                    _field_plan_retry_at = None
                 else:
-                    custom_fields[friendly_name] = field_value
-    
-    if customfield_count == 0:
-        logger.warning(f"⚠️ No customfields found in Service Desk API response! Available fields: {list(fields.keys())[:10]}")
-    
-    return custom_fields
+                    definitions = None
+                    _field_plan_retry_at = time.time() + FIELD_PLAN_RETRY_SECONDS
+                    if _field_plan is not None:
+                        return _field_plan  # Still unavailable: keep the current plan (and its memoized records)
+                _field_plan = compile_field_plan(definitions)
+    return _field_plan
 
 # Watchers cache with 8-hour TTL
 _watchers_cache = {}
@@ -731,6 +640,7 @@ def fetch_watchers_batch(issue_keys: List[str], use_cache: bool = True) -> Dict[
     client = get_api_client()
     watchers_map = {}
     current_time = time.time()
+    rate_limited = False
     
     for issue_key in issue_keys:
         # Check cache first
@@ -741,6 +651,11 @@ def fetch_watchers_batch(issue_keys: List[str], use_cache: bool = True) -> Dict[
                 logger.debug(f"💾 {issue_key}: {len(cached_data)} watchers (cached)")
                 continue
         
+        if rate_limited:
+            # Don't hammer JIRA (or cache empties) once it has throttled us
+            watchers_map[issue_key] = []
+            continue
+        
         # Fetch from API
         try:
             watchers = client.get_issue_watchers(issue_key)
@@ -750,6 +665,10 @@ def fetch_watchers_batch(issue_keys: List[str], use_cache: bool = True) -> Dict[
             _watchers_cache[issue_key] = (watchers, current_time)
             
             logger.debug(f"👁️ {issue_key}: {len(watchers)} watchers (fresh)")
+        except JiraRateLimitError as e:
+            logger.warning(f"⏳ Rate limited while fetching watchers ({issue_key}); skipping remaining uncached issues: {e}")
+            rate_limited = True
+            watchers_map[issue_key] = []
         except Exception as e:
             logger.warning(f"Failed to fetch watchers for {issue_key}: {e}")
             watchers_map[issue_key] = []
@@ -759,7 +678,205 @@ def fetch_watchers_batch(issue_keys: List[str], use_cache: bool = True) -> Dict[
 def load_queue_issues(
     service_desk_id: str,
     queue_id: str,
-    page_limit: int = 100
+    page_limit: int = 100,
+    delta: Optional[bool] = None
+) -> Tuple[Optional[Any], Optional[str]]:
+    """
+    Load issues from JIRA service desk queue (single-flight)
+    
+    Concurrent calls for the same (desk, queue, page_limit) - e.g. /api/issues,
+    /api/kanban and the reports refresh worker opening the same queue - share
+    one fetch + enrichment instead of running duplicates (the result is a
+    read-only IssueRecords, so coalesced callers share it without copies).
+    See utils.single_flight.get_single_flight_stats() for coalesce counts.
+    
+    Args:
+        service_desk_id: ID of the service desk
+        queue_id: ID of the queue
+        page_limit: Maximum number of results per page
+        delta: Refresh with updated-since JQL when the queue is already held
+               (default: JiraConfig.delta_sync)
+        
+    Returns:
+        Tuple of (IssueRecords or None, error message or None); use
+        .compact() for JSON list views and .to_dataframe() for analytics
+    """
+    if delta is None:
+        delta = config.jira.delta_sync
+    key = (str(service_desk_id), str(queue_id), page_limit, delta)
+    return get_single_flight("queue_load").do(
+        key, _load_queue_issues, service_desk_id, queue_id, page_limit, delta
+    )
+
+# Fields requested from the JIRA REST API to enrich Service Desk queue issues
+ENRICHMENT_FIELDS = [
+    "assignee", "creator", "reporter", "updated",
+    "customfield_10111", "customfield_10125", "customfield_10141", "customfield_10142", "customfield_10143",
+    "labels", "components", "comment", "watches"
+]
+
+# Fields of changed issues in a delta refresh: queue columns + enrichment in one search
+# (reduced to the queue's own fields before merging, see utils.queue_delta.to_queue_shape)
+DELTA_FIELDS = ["*navigable"] + ENRICHMENT_FIELDS
+
+def _build_enrichment(jira_issue: Dict) -> Dict[str, Any]:
+    """Build the enrichment entry of one JIRA API issue (see ENRICHMENT_FIELDS)"""
+    fields = jira_issue.get("fields", {}) or {}
+    changelog = jira_issue.get("changelog", {})
+    
+    # Calculate last real change (changelog, comments, or updated)
+    last_change = None
+    
+    # Check changelog (transitions, field changes)
+    if changelog and "histories" in changelog:
+        histories = changelog.get("histories", [])
+        if histories:
+            # Get most recent history entry
+            last_history = max(histories, key=lambda h: h.get("created", ""))
+            last_change = last_history.get("created")
+    
+    # Check comments
+    comments = (fields.get("comment") or {}).get("comments", [])
+    if comments:
+        last_comment = max(comments, key=lambda c: c.get("created", ""))
+        comment_date = last_comment.get("created")
+        if not last_change or (comment_date and comment_date > last_change):
+            last_change = comment_date
+    
+    # Fallback to updated field if no changelog/comments
+    if not last_change:
+        last_change = fields.get("updated")
+    
+    # Extract assignee from JIRA API (more reliable than Service Desk)
+    assignee_obj = fields.get("assignee")
+    assignee_name = None
+    if assignee_obj and isinstance(assignee_obj, dict):
+        assignee_name = assignee_obj.get("displayName") or assignee_obj.get("name")
+    
+    # Extract watchers info
+    watchers_obj = fields.get("watches", {})
+    watcher_count = 0
+    is_watching = False
+    if isinstance(watchers_obj, dict):
+        watcher_count = watchers_obj.get("watchCount", 0)
+        is_watching = watchers_obj.get("isWatching", False)
+    
+    return {
+        "assignee": assignee_name,
+        "creator": fields.get("creator"),
+        "reporter": fields.get("reporter"),
+        "customfield_10111": fields.get("customfield_10111"),
+        "customfield_10125": fields.get("customfield_10125"),
+        "customfield_10141": fields.get("customfield_10141"),
+        "customfield_10142": fields.get("customfield_10142"),
+        "customfield_10143": fields.get("customfield_10143"),
+        "labels": fields.get("labels", []),
+        "components": fields.get("components", []),
+        "last_real_change": last_change,
+        "watcher_count": watcher_count,
+        "is_watching": is_watching,
+        "comment_count": len(comments)
+    }
+
+def _fetch_queue_full(
+    client,
+    service_desk_id: str,
+    queue_id: str,
+    page_limit: int
+) -> Tuple[List[Dict], Dict[str, Dict], int]:
+    """
+    Full load: every queue issue (Service Desk API) + JQL enrichment (JIRA API)
+    
+    Returns:
+        Tuple of (issues, enriched_data, request count)
+    """
+    # STEP 1: Fetch from Service Desk API (queue issues)
+    # First page reveals whether more exist; remaining pages are fetched concurrently
+    issues, request_count = fetch_queue_issues(
+        client.site,
+        client.headers,
+        service_desk_id,
+        queue_id,
+        page_limit=page_limit
+    )
+    if not issues:
+        logger.warning(f"No issues found in queue {queue_id} (desk {service_desk_id}) after {request_count} request(s)")
+        return [], {}, request_count
+    
+    # STEP 2: Fetch customfields from JIRA API in bounded JQL chunks (searched concurrently)
+    issue_keys = [issue.get("key") for issue in issues if issue.get("key")]
+    enriched_data = {}
+    
+    def merge_page(jira_issues: List[Dict]):
+        # Runs on the event loop thread, one page at a time
+        for jira_issue in jira_issues:
+            key = jira_issue.get("key")
+            if key:
+                enriched_data[key] = _build_enrichment(jira_issue)
+    
+    try:
+        logger.info(f"🔄 Fetching customfields for {len(issue_keys)} issues via chunked JQL search")
+        _, enrich_requests = fetch_issues_by_keys(
+            client.site,
+            client.headers,
+            issue_keys,
+            fields=ENRICHMENT_FIELDS,
+            expand="changelog",
+            on_page=merge_page,
+            api_version=QUEUE_SEARCH_API_VERSION  # Same value shapes as delta refreshes
+        )
+        request_count += enrich_requests
+        logger.info(f"✓ Enriched {len(enriched_data)}/{len(issue_keys)} issues from JIRA API ({enrich_requests} request(s))")
+    except Exception as e:
+        logger.warning(f"Could not batch enrich from JIRA API ({len(enriched_data)} issues enriched before failure): {e}")
+    
+    return issues, enriched_data, request_count
+
+def _refresh_queue_delta(client, state: QueueState) -> Optional[Tuple[List[Dict], int]]:
+    """
+    Delta refresh of a held queue: only issues updated since the watermark are fetched
+    
+    Changed issues come from the JIRA API search, which returns both the issue
+    fields and the enrichment data (changelog, comments) in one response. The
+    enrichment is built from the full search result; the held copy keeps
+    only the queue's fields (QueueState.apply), so merged issues format like
+    a full load (scripts/check_queue_delta_parity.py).
+    
+    Returns:
+        Tuple of (changed issues, request count), or None if a full load is needed
+    """
+    try:
+        delta = fetch_queue_delta(
+            client.site,
+            client.headers,
+            state.jql,
+            set(state.issues),
+            state.watermark,
+            fields=DELTA_FIELDS,
+            expand="changelog"
+        )
+    except JiraRateLimitError:
+        raise
+    except Exception as e:
+        logger.warning(f"Delta sync failed, falling back to full load: {e}")
+        return None
+    if not delta.keys:
+        # An empty membership is indistinguishable from a failed search: reload fully
+        return None
+    
+    enriched = {issue["key"]: _build_enrichment(issue) for issue in delta.changed if issue.get("key")}
+    state.apply(delta, enriched)
+    logger.info(
+        f"🔁 Delta sync: {len(delta.changed)} changed, {len(delta.removed)} removed, "
+        f"{len(delta.keys)} in queue ({delta.request_count} request(s))"
+    )
+    return delta.changed, delta.request_count
+
+def _load_queue_issues(
+    service_desk_id: str,
+    queue_id: str,
+    page_limit: int = 100,
+    delta: bool = False
 ) -> Tuple[Optional[Any], Optional[str]]:
     """
     Load issues from JIRA service desk queue using BOTH Service Desk API and JIRA REST API
@@ -767,287 +884,136 @@ def load_queue_issues(
     Service Desk API: Get queue issues + custom fields (severity focus)
     JIRA REST API: Get enriched data (labels, components, severity custom fields)
     
+    With delta enabled, a queue loaded before (and fully reloaded less than
+    JiraConfig.full_resync_interval ago) is refreshed with an updated-since
+    JQL search and merged into the held copy (utils.queue_delta).
+    
     Args:
         service_desk_id: ID of the service desk
         queue_id: ID of the queue
         page_limit: Maximum number of results per page
+        delta: Allow a delta refresh
         
     Returns:
-        Tuple of (DataFrame or None, error message or None)
+        Tuple of (IssueRecords or None, error message or None)
     """
     import time
     try:
         t0 = time.time()
         client = get_api_client()
+        state = get_queue_state(service_desk_id, queue_id)
         
-        # STEP 1: Fetch from Service Desk API (queue issues)
-        url_sd = f"{client.site}/rest/servicedeskapi/servicedesk/{service_desk_id}/queue/{queue_id}/issue"
-        issues = []
-        
-        # Paginate through results
-        start = 0
-        request_count = 0
-        bytes_accumulated = 0
-        while True:
-            response = _make_request("GET", url_sd, client.headers, params={
-                "start": start,
-                "limit": page_limit
-            })
-            request_count += 1
-            
-            if not response:
-                break
-                
-            page_issues = response.get("values", [])
-            # crude response size estimation for diagnostics
-            try:
-                import json as _json
-                bytes_accumulated += len(_json.dumps(response))
-            except Exception:
-                pass
-            if not page_issues:
-                break
-            
-            issues.extend(page_issues)
+        with state.lock:
+            refreshed = None
+            if delta and state.is_warm(config.jira.full_resync_interval):
+                refreshed = _refresh_queue_delta(client, state)
             
-            if response.get("isLastPage", True):
-                break
-                
-            start = response.get("start", start) + len(page_issues)
-        
-        if not issues:
-            logger.warning(f"No issues found in queue {queue_id} (desk {service_desk_id}) after {request_count} request(s); bytes={bytes_accumulated}")
-            return None, "No issues found in queue"
-        
-        # STEP 2: Fetch all customfields from JIRA API in ONE batch call (JQL search)
-        issue_keys = [issue.get("key") for issue in issues if issue.get("key")]
-        jql_query = f"key in ({','.join(issue_keys)})"
-        # Use new JQL enhanced search endpoint (replaces deprecated /search)
-        jira_batch_url = f"{client.site}/rest/api/3/search/jql"
-        jira_batch_params = {
-            "jql": jql_query,
-            "fields": ["assignee", "creator", "reporter", "customfield_10111", "customfield_10125", "customfield_10141", "customfield_10142", "customfield_10143", "labels", "components", "comment"],
-            "expand": "changelog",
-            "maxResults": len(issue_keys)
-        }
-        
-        enriched_data = {}
-        try:
-            logger.info(f"🔄 Fetching batch customfields for {len(issue_keys)} issues via JQL: {jql_query[:100]}")
-            jira_batch_response = _make_request("GET", jira_batch_url, client.headers, params=jira_batch_params)
-            if jira_batch_response and "issues" in jira_batch_response:
-                # Debug: Log first issue from JIRA API to see structure
-                if jira_batch_response["issues"]:
-                    first_jira = jira_batch_response["issues"][0]
-                    logger.info(f"🔍 First JIRA API issue fields: {list(first_jira.get('fields', {}).keys())}")
-                    
-                for jira_issue in jira_batch_response["issues"]:
-                    key = jira_issue.get("key")
-                    fields = jira_issue.get("fields", {})
-                    changelog = jira_issue.get("changelog", {})
-                    
-                    # Calculate last real change (changelog, comments, or updated)
-                    last_change = None
-                    
-                    # Check changelog (transitions, field changes)
-                    if changelog and "histories" in changelog:
-                        histories = changelog.get("histories", [])
-                        if histories:
-                            # Get most recent history entry
-                            last_history = max(histories, key=lambda h: h.get("created", ""))
-                            last_change = last_history.get("created")
-                    
-                    # Check comments
-                    comments = fields.get("comment", {}).get("comments", [])
-                    if comments:
-                        last_comment = max(comments, key=lambda c: c.get("created", ""))
-                        comment_date = last_comment.get("created")
-                        if not last_change or (comment_date and comment_date > last_change):
-                            last_change = comment_date
-                    
-                    # Fallback to updated field if no changelog/comments
-                    if not last_change:
-                        last_change = fields.get("updated")
-                    
-                    # Log customfield_10111 structure for debugging
-                    cf_10111 = fields.get("customfield_10111")
-                    if cf_10111:
-                        logger.info(f"🔍 {key} customfield_10111 type: {type(cf_10111)}, value: {cf_10111}")
-                    
-                    # Extract assignee from JIRA API (more reliable than Service Desk)
-                    assignee_obj = fields.get("assignee")
-                    assignee_name = None
-                    if assignee_obj and isinstance(assignee_obj, dict):
-                        assignee_name = assignee_obj.get("displayName") or assignee_obj.get("name")
-                    
-                    # Extract watchers info
-                    watchers_obj = fields.get("watches", {})
-                    watcher_count = 0
-                    is_watching = False
-                    if isinstance(watchers_obj, dict):
-                        watcher_count = watchers_obj.get("watchCount", 0)
-                        is_watching = watchers_obj.get("isWatching", False)
-                    
-                    enriched_data[key] = {
-                        "assignee": assignee_name,
-                        "creator": fields.get("creator"),
-                        "reporter": fields.get("reporter"),
-                        "customfield_10111": cf_10111,
-                        "customfield_10125": fields.get("customfield_10125"),
-                        "customfield_10141": fields.get("customfield_10141"),
-                        "customfield_10142": fields.get("customfield_10142"),
-                        "customfield_10143": fields.get("customfield_10143"),
-                        "labels": fields.get("labels", []),
-                        "components": fields.get("components", []),
-                        "last_real_change": last_change,
-                        "watcher_count": watcher_count,
-                        "is_watching": is_watching,
-                        "comment_count": len(comments)
-                    }
-                logger.info(f"✓ Batch enriched {len(enriched_data)} issues from JIRA API")
-                
-                # Debug: Log first enriched data
-                if enriched_data:
-                    first_key = list(enriched_data.keys())[0]
-                    logger.info(f"🔍 First enriched data ({first_key}): {enriched_data[first_key]}")
-        except Exception as e:
-            logger.warning(f"Could not batch enrich from JIRA API: {e}")
-        
-        # STEP 3: Format issues with enriched data
-        formatted_issues = []
-        for issue in issues:
-            issue_key = issue.get("key", "")
-            fields = issue.get("fields", {})
+            if refreshed is not None:
+                changed_issues, request_count = refreshed
+                mode = "delta"
+            else:
+                synced_at = time.time()
+                changed_issues, enriched, request_count = _fetch_queue_full(
+                    client, service_desk_id, queue_id, page_limit
+                )
+                if not changed_issues:
+                    return None, "No issues found in queue"
+                mode = "full"
+                if delta:
+                    try:
+                        state.jql = get_queue_jql(client.site, client.headers, service_desk_id, queue_id)
+                    except Exception as e:
+                        logger.debug(f"Queue JQL unavailable, delta sync disabled for queue {queue_id}: {e}")
+                        state.jql = None
+                    state.replace(changed_issues, enriched, synced_at)
+                else:
+                    issues, enriched_data = changed_issues, enriched
             
-            # Get basic data from Service Desk API
-            assignee_obj = _get_field_value(
-                fields, 
-                "assignee",
-                "asignado_a",
-                "currentuser"
+            if delta:
+                issues = state.ordered_issues()
+                enriched_data = dict(state.enriched)
+        
+        # STEP 3: Format issues with enriched data (compiled single-pass extractors;
+        # unchanged issues reuse their memoized record)
+        formatted_issues = format_issues_memoized(_get_field_plan(), issues, enriched_data)
+        
+        if formatted_issues:
+            first = formatted_issues[0]
+            logger.debug(
+                "First formatted issue %s: customfield_10111=%s customfield_10125=%s customfield_10143=%s",
+                first.get("key"), first.get("customfield_10111"), first.get("customfield_10125"), first.get("customfield_10143")
             )
-            assignee_name = "Unassigned"
-            assignee_id = None
-            if assignee_obj and isinstance(assignee_obj, dict):
-                assignee_name = assignee_obj.get("displayName") or assignee_obj.get("name") or "Unassigned"
-                assignee_id = assignee_obj.get("accountId")
-            
-            status_obj = _get_field_value(fields, "status", "estado")
-            status_name = "Unknown"
-            if status_obj and isinstance(status_obj, dict):
-                status_name = status_obj.get("name", "Unknown")
-            elif isinstance(status_obj, str):
-                status_name = status_obj
-            
-            # Extract custom fields from Service Desk API
-            service_desk_custom_fields = _extract_service_desk_custom_fields(fields)
-            
-            # ✅ Normalize severity with centralized function
-            severity_obj = _get_field_value(fields, "severity", "severidad")
-            severity_name = _normalize_severity_value(severity_obj, service_desk_custom_fields, issue_key)
-            
-            # Additional debug for severity
-            if not severity_name:
-                logger.warning(f"⚠️ {issue_key} - No severity found in: severity_obj={severity_obj}, custom_fields={list(service_desk_custom_fields.keys())}")
-            
-            # Reporter info (will be extracted from customfields)
-            
-            summary = _get_field_value(
-                fields, 
-                "summary",
-                "resumen"
-            ) or "No summary"
-            
-            description = _get_field_value(
-                fields,
-                "description",
-                "descripcion"
-            ) or ""
-            
-            issue_type_obj = _get_field_value(fields, "issuetype", "tipo_de_asunto")
-            issue_type_name = "Task"
-            if issue_type_obj and isinstance(issue_type_obj, dict):
-                issue_type_name = issue_type_obj.get("name", "Task")
-            elif isinstance(issue_type_obj, str):
-                issue_type_name = issue_type_obj
-            
-            created = _get_field_value(fields, "created", "creado") or ""
-            updated = _get_field_value(fields, "updated", "actualizado") or created or ""
-            resolved = _get_field_value(fields, "resolutionDate", "fecha_de_resolucion") or ""
-            
-            formatted = {
-                "key": issue_key,
-                "summary": summary,
-                "status": status_name,
-                "severity": severity_name,
-                "assignee": assignee_name,
-                "assignee_id": assignee_id,
-                "created": created,
-                "updated": updated,
-                "resolved": resolved,
-                "description": description,
-                "issue_type": issue_type_name,
-                "labels": [],
-                "components": [],
-                "fields": fields
-            }
-            
-            # Add all customfields directly (from Service Desk API)
-            for cf_key, cf_value in service_desk_custom_fields.items():
-                formatted[cf_key] = cf_value
-            
-            # Add enriched customfields from JIRA API batch
-            if issue_key in enriched_data:
-                jira_enriched = enriched_data[issue_key]
-                for cf_key, cf_value in jira_enriched.items():
-                    if cf_value is not None:
-                        # Special handling for assignee: overwrite Service Desk value
-                        if cf_key == "assignee":
-                            formatted["assignee"] = cf_value
-                        else:
-                            formatted[cf_key] = cf_value
-                
-                # Debug: Log enriched data for first issue
-                if not formatted_issues:
-                    logger.info(f"✓ Enriched {issue_key} with: {list(jira_enriched.keys())}")
-                    logger.info(f"   customfield_10111: {jira_enriched.get('customfield_10111')}")
-                    logger.info(f"   customfield_10125: {jira_enriched.get('customfield_10125')}")
-                    logger.info(f"   customfield_10141: {jira_enriched.get('customfield_10141')}")
-                    logger.info(f"   customfield_10142: {jira_enriched.get('customfield_10142')}")
-                    logger.info(f"   customfield_10143: {jira_enriched.get('customfield_10143')}")
-            
-            formatted_issues.append(formatted)
-        
-        # Debug: Log structure of first formatted issue
-        if len(formatted_issues) == 1:
-            logger.info(f"🔍 First formatted issue structure:")
-            logger.info(f"   Root keys: {list(formatted.keys())}")
-            logger.info(f"   customfield_10111: {formatted.get('customfield_10111')}")
-            logger.info(f"   customfield_10125: {formatted.get('customfield_10125')}")
-            logger.info(f"   customfield_10141: {formatted.get('customfield_10141')}")
-            logger.info(f"   customfield_10142: {formatted.get('customfield_10142')}")
-            logger.info(f"   customfield_10143: {formatted.get('customfield_10143')}")
-        
-        # Convert to DataFrame
-        df = pd.DataFrame(formatted_issues)
+        
+        # Compact record collection (DataFrame only built on demand by analytic callers)
+        records = IssueRecords(formatted_issues)
         logger.info(
-            f"✓ Loaded {len(df)} issues from queue {queue_id} (desk {service_desk_id}) in {time.time() - t0:.2f}s; "
-            f"requests={request_count}, approx_bytes={bytes_accumulated}"
+            f"✓ Loaded {len(records)} issues from queue {queue_id} (desk {service_desk_id}) in {time.time() - t0:.2f}s; "
+            f"mode={mode} requests={request_count}"
         )
         
         # Auto-create notifications for recent changes (async, non-blocking)
         try:
             from api.blueprints.notifications_helper import process_issues_batch_for_notifications
-            process_issues_batch_for_notifications(issues, enriched_data)
+            process_issues_batch_for_notifications(changed_issues, enriched_data)
         except Exception as notif_err:
             logger.debug(f"Notification creation skipped: {notif_err}")
         
-        return df, None
+        return records, None
         
     except Exception as e:
         logger.error(f"Error loading queue issues: {e}")
         return None, str(e)
 
+# ============================================================
+# SHARED QUEUE SNAPSHOTS (issues, kanban, reports)
+# ============================================================
+
+def _load_queue_snapshot(key: Tuple[str, str]) -> Optional[IssueRecords]:
+    """Snapshot loader: IssueRecords of the queue (None for an empty queue)"""
+    service_desk_id, queue_id = key
+    records, error = load_queue_issues(service_desk_id, queue_id)
+    if records is None and error and "no issues" not in error.lower():
+        raise RuntimeError(error)
+    return records
+
+_queue_snapshots = SnapshotCache(
+    "queue_snapshot",
+    _load_queue_snapshot,
+    ttl=config.cache.snapshot_ttl,
+    max_stale=config.cache.snapshot_max_stale,
+    max_entries=config.cache.snapshot_max_entries
+)
+
+def get_queue_snapshot(service_desk_id: str, queue_id: str, force: bool = False) -> Snapshot:
+    """
+    Get the shared snapshot of a queue (stale-while-revalidate)
+    
+    The list, board and report views of one queue all derive from the same
+    snapshot, so opening all three costs one JIRA load. snapshot.data is the
+    queue IssueRecords (None when the queue is empty), shared read-only;
+    snapshot.version increases on every refresh.
+    
+    Args:
+        service_desk_id: ID of the service desk
+        queue_id: ID of the queue
+        force: Reload synchronously even if a snapshot exists
+        
+    Returns:
+        Snapshot (snapshot.error is set when loading failed)
+    """
+    return _queue_snapshots.get((str(service_desk_id), str(queue_id)), force=force)
+
+def invalidate_queue_snapshot(service_desk_id: Optional[str] = None, queue_id: Optional[str] = None):
+    """Drop a queue snapshot (or all of them) so the next read reloads it"""
+    if service_desk_id is None or queue_id is None:
+        _queue_snapshots.invalidate()
+    else:
+        _queue_snapshots.invalidate((str(service_desk_id), str(queue_id)))
+
+def get_queue_snapshot_stats() -> Dict[str, Any]:
+    """Hit/refresh counters and versions of queue snapshots"""
+    return _queue_snapshots.get_stats()
+
 def fetch_and_log_states(service_desk_id: str, queue_id: int) -> None:
     """
     Fetch and log state information from the JIRA API for debugging
@@ -1058,17 +1024,17 @@ def fetch_and_log_states(service_desk_id: str, queue_id: int) -> None:
     """
     try:
         # Get issues from queue
-        df, error = load_queue_issues(service_desk_id, queue_id)
+        records, error = load_queue_issues(service_desk_id, queue_id)
         if error:
             logger.warning(f"Error loading issues: {error}")
             return
             
-        if df is None or df.empty:
+        if records is None or records.empty:
             logger.warning("No issues found to analyze states")
             return
             
         # Count issues per state
-        states = df["status"].value_counts().to_dict()
+        states = records.value_counts("status")
         logger.info(f"Workflow states for queue {queue_id}: {states}")
         
     except Exception as e:
@@ -1087,21 +1053,19 @@ def organize_issues_by_state(service_desk_id: str, queue_id: int) -> Dict[str, L
     """
     try:
         # Get issues from queue
-        df, error = load_queue_issues(service_desk_id, queue_id)
+        records, error = load_queue_issues(service_desk_id, queue_id)
         if error:
             logger.warning(f"Error loading issues: {error}")
             return {}
             
-        if df is None or df.empty:
+        if records is None or records.empty:
             logger.warning("No issues found to organize")
             return {}
 
         # Group issues by state
-        grouped = df.groupby("status").apply(
-            lambda x: x.to_dict("records")
-        ).to_dict()
+        grouped = records.group_by("status")
         
-        logger.info(f"Organized {len(df)} issues into {len(grouped)} states")
+        logger.info(f"Organized {len(records)} issues into {len(grouped)} states")
         return grouped
         
     except Exception as e:
@@ -1127,10 +1091,11 @@ def fetch_and_fill_dataframe(
         DataFrame of issues or None if error
     """
     try:
-        # Get basic issue data
-        df, error = load_queue_issues(service_desk_id, queue_id)
-        if error or df is None:
+        # Get basic issue data (DataFrame built here, only for analytic callers)
+        records, error = load_queue_issues(service_desk_id, queue_id)
+        if error or records is None:
             return None
+        df = records.to_dataframe()
             
         # Apply filters if needed
         if status_filter:
@@ -1425,18 +1390,23 @@ def analyze_workflow_metrics(
         # Calculate the date threshold if time window specified
         updated_after = datetime.now() - time_window if time_window else None
         
-        # Get a DataFrame of issues
-        df = fetch_and_fill_dataframe(
-            service_desk_id,
-            queue_id,
-            updated_after=updated_after
-        )
+        records, error = load_queue_issues(service_desk_id, queue_id)
+        if error or records is None or records.empty:
+            return {}
         
-        if df is None or df.empty:
+        # Typed columns of the fields used below (vectorized, no DataFrame)
+        columns = IssueColumns.from_records(
+            records.to_records(),
+            ("status", "priority", "assignee", "created", "updated", "resolved", "sla_breached")
+        )
+        if updated_after:
+            columns = columns.filter(columns.epoch("updated") >= updated_after.timestamp())
+        if not len(columns):
+            logger.warning("No issues match filters")
             return {}
             
         metrics = {
-            "total_issues": len(df),
+            "total_issues": len(columns),
             "resolution_times": {},
             "sla_compliance": {
                 "compliant": 0,
@@ -1444,57 +1414,44 @@ def analyze_workflow_metrics(
                 "total": 0,
                 "compliance_rate": 0.0
             },
-            "state_distribution": {},
-            "priority_distribution": {},
-            "assignee_workload": {}
+            "state_distribution": columns.counts("status", default=None),
+            "priority_distribution": columns.counts("priority", default=None),
+            "assignee_workload": columns.counts("assignee", default=None)
         }
         
-        # State distribution
-        metrics["state_distribution"] = df["status"].value_counts().to_dict()
-        
-        # Priority distribution
-        metrics["priority_distribution"] = df["priority"].value_counts().to_dict()
-        
         # Resolution times by priority
-        df["created"] = pd.to_datetime(df["created"])
-        df["resolved"] = pd.to_datetime(df["resolved"])
-        resolved_mask = df["resolved"].notna()
-        
-        if resolved_mask.any():
-            resolution_hours = (
-                (df.loc[resolved_mask, "resolved"] - df.loc[resolved_mask, "created"])
-                .dt.total_seconds() / 3600
-            )
-            
-            for priority in df.loc[resolved_mask, "priority"].unique():
-                priority_mask = df["priority"] == priority
-                times = resolution_hours[priority_mask]
-                
-                if not times.empty:
-                    metrics["resolution_times"][priority] = {
-                        "avg": times.mean(),
-                        "min": times.min(),
-                        "max": times.max()
-                    }
+        hours = (columns.epoch("resolved") - columns.epoch("created")) / 3600
+        priority_codes, priorities = columns.codes("priority")
+        resolved = ~np.isnan(hours) & (priority_codes >= 0)
+        if resolved.any():
+            codes, times = priority_codes[resolved], hours[resolved]
+            counts = np.bincount(codes, minlength=len(priorities))
+            totals = np.bincount(codes, weights=times, minlength=len(priorities))
+            minima = np.full(len(priorities), np.inf)
+            maxima = np.full(len(priorities), -np.inf)
+            np.minimum.at(minima, codes, times)
+            np.maximum.at(maxima, codes, times)
+            for code in np.flatnonzero(counts):
+                metrics["resolution_times"][priorities[code]] = {
+                    "avg": float(totals[code] / counts[code]),
+                    "min": float(minima[code]),
+                    "max": float(maxima[code])
+                }
                     
-        # SLA compliance
-        sla_data = df["customfield_10054"].dropna()
-        if not sla_data.empty:
-            metrics["sla_compliance"]["total"] = len(sla_data)
-            metrics["sla_compliance"]["breached"] = sum(1 for x in sla_data if x.get("breached", False))
-            metrics["sla_compliance"]["compliant"] = (
-                metrics["sla_compliance"]["total"] - metrics["sla_compliance"]["breached"]
-            )
-            if metrics["sla_compliance"]["total"] > 0:
-                metrics["sla_compliance"]["compliance_rate"] = (
-                    metrics["sla_compliance"]["compliant"] / 
-                    metrics["sla_compliance"]["total"] * 100
-                )
-                
-        # Assignee workload  
-        metrics["assignee_workload"] = df["assignee"].value_counts().to_dict()
+        # SLA compliance (first running SLA of each issue)
+        breached = columns.numeric("sla_breached")
+        breached = breached[~np.isnan(breached)]
+        if breached.size:
+            total = int(breached.size)
+            breached_count = int(np.count_nonzero(breached))
+            metrics["sla_compliance"] = {
+                "compliant": total - breached_count,
+                "breached": breached_count,
+                "total": total,
+                "compliance_rate": (total - breached_count) / total * 100
+            }
         
-        logger.info(f"Analyzed workflow metrics for {len(df)} issues")
+        logger.info(f"Analyzed workflow metrics for {len(columns)} issues")
         return metrics
         
     except Exception as e:
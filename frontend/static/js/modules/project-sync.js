@@ -116,7 +116,15 @@ class ProjectSync {
         throw new Error(`HTTP ${response.status}`);
       }
       
-      const data = await response.json();
+      // The sync runs as a background job: poll it until it finishes
+      const submitted = await response.json();
+      console.log(`📋 Sync job ${submitted.job_id} ${submitted.coalesced ? '(already running)' : 'queued'}`);
+      const job = await this.waitForJob(submitted.job_id, btn);
+      
+      if (job.status !== 'succeeded') {
+        throw new Error(job.error || `sync ${job.status}`);
+      }
+      const data = job.result;
       
       console.log('✅ Sync completed:', data);
       
@@ -150,6 +158,26 @@ class ProjectSync {
     }
   }
 
+  async waitForJob(jobId, btn, intervalMs = 2000) {
+    const label = btn.querySelector('.label');
+    while (true) {
+      const response = await fetch(`/api/sync/jobs/${jobId}`);
+      if (!response.ok) {
+        throw new Error(`HTTP ${response.status}`);
+      }
+      const body = await response.json();
+      const job = body.data || body;
+      
+      if (['succeeded', 'failed', 'cancelled'].includes(job.status)) {
+        return job;
+      }
+      if (label && job.phase) {
+        label.textContent = `Sincronizando... ${job.phase} ${Math.round(job.progress * 100)}%`;
+      }
+      await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+  }
+
   showToast(title, message) {
     // Create toast notification
     const toast = document.createElement('div');
@@ -1,6 +1,7 @@
 """
 Predictor Unificado - Integra todos los modelos ML/IA de SPEEDYFLOW
 """
+import re
 import numpy as np
 from pathlib import Path
 import pickle
@@ -13,6 +14,20 @@ from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
+# Sentence-embedding model the Keras models are trained on (train_comment_model.py)
+ST_MODEL_NAME = 'paraphrase-multilingual-MiniLM-L12-v2'
+ST_BACKEND = 'sentence-transformers'
+
+class _LocalSentenceEncoder:
+    """Own SentenceTransformer, when the repo's utils package is not shipped with the service"""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+
+    def embed(self, text: str, normalize: bool = False) -> np.ndarray:
+        return self.model.encode([text], show_progress_bar=False, normalize_embeddings=normalize)[0]
+
 class UnifiedMLPredictor:
     """
     Predictor unificado que integra:
@@ -62,14 +77,29 @@ class UnifiedMLPredictor:
             # prefer Spanish if available for legacy behavior
             self.nlp = self.nlp_es or self.nlp_en
             logger.info("✅ spaCy loaded (preferred model set)")
-            # try to load sentence-transformers multilingual model for better embeddings
+            # multilingual sentence-transformers model for better embeddings, shared
+            # with the rest of the process (utils.embedding_provider) when it is the
+            # model and backend the Keras models were trained on; own copy otherwise
+            # (other EMBEDDING_MODEL/EMBEDDING_BACKEND, or no repo utils package:
+            # the service image ships only ml_service/)
             try:
-                from sentence_transformers import SentenceTransformer
-                self.st_model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
+                try:
+                    from utils.embedding_provider import get_embedding_provider
+                    provider = get_embedding_provider()
+                except ImportError:
+                    provider = None
+                if provider is not None and (provider.model_name, provider.backend_name) == (ST_MODEL_NAME, ST_BACKEND):
+                    provider.backend  # load now, not on the first prediction
+                    self.st_model = provider
+                else:
+                    if provider is not None:
+                        logger.info(f"Shared embedding model is {provider.model_tag}; "
+                                    f"loading {ST_MODEL_NAME} for the Keras models")
+                    self.st_model = _LocalSentenceEncoder(ST_MODEL_NAME)
                 logger.info("✅ sentence-transformers multilingual model loaded")
             except Exception as e:
                 self.st_model = None
-                logger.warning(f"sentence-transformers not available: {e}")
+                logger.warning(f"sentence-transformers not available, using spaCy vectors: {e}")
         except Exception as e:
             logger.warning(f"⚠️ spaCy no disponible: {e}")
             if not self.fallback_mode:
@@ -143,7 +173,7 @@ class UnifiedMLPredictor:
         # Prefer sentence-transformers if available
         if getattr(self, 'st_model', None):
             try:
-                vec = self.st_model.encode([text], show_progress_bar=False)[0]
+                vec = self.st_model.embed(text, normalize=False)
                 return vec
             except Exception:
                 pass
@@ -159,6 +189,23 @@ class UnifiedMLPredictor:
 
         return doc.vector
     
+    def _model_input(self, name: str, text: str) -> np.ndarray:
+        """
+        Embedding of text as a batch of one for model name
+
+        Raises:
+            ValueError: The embedding does not match the model's input size
+                (e.g. spaCy vectors for a model trained on sentence embeddings)
+        """
+        emb = np.asarray(self.get_embedding(text), dtype=np.float32).reshape(1, -1)
+        expected = self.models[name].input_shape[-1]
+        if expected is not None and emb.shape[1] != expected:
+            raise ValueError(
+                f"{name} expects {expected}-d embeddings, got {emb.shape[1]}-d "
+                f"({'sentence-transformers' if getattr(self, 'st_model', None) else 'spaCy'})"
+            )
+        return emb
+    
     def _get_cache_key(self, summary: str, description: str) -> str:
         """Generar key para caché"""
         text = f"{summary}|{description}"
@@ -193,7 +240,7 @@ class UnifiedMLPredictor:
             }
         
         text = f"{summary}. {description}" if description else summary
-        emb = self.get_embedding(text).reshape(1, -1)
+        emb = self._model_input('duplicate_detector', text)
         
         pred = self.models['duplicate_detector'].predict(emb, verbose=0)[0]
         
@@ -223,7 +270,7 @@ class UnifiedMLPredictor:
             }
         
         text = f"{summary}. {description}" if description else summary
-        emb = self.get_embedding(text).reshape(1, -1)
+        emb = self._model_input('priority_classifier', text)
         
         pred = self.models['priority_classifier'].predict(emb, verbose=0)[0]
         
@@ -255,7 +302,7 @@ class UnifiedMLPredictor:
             }
         
         text = f"{summary}. {description}" if description else summary
-        emb = self.get_embedding(text).reshape(1, -1)
+        emb = self._model_input('breach_predictor', text)
         
         pred = self.models['breach_predictor'].predict(emb, verbose=0)[0][0]
         
@@ -276,7 +323,7 @@ class UnifiedMLPredictor:
             }
         
         text = f"{summary}. {description}" if description else summary
-        emb = self.get_embedding(text).reshape(1, -1)
+        emb = self._model_input('assignee_suggester', text)
         
         pred = self.models['assignee_suggester'].predict(emb, verbose=0)[0]
         
@@ -309,7 +356,7 @@ class UnifiedMLPredictor:
             }
         
         text = f"{summary}. {description}" if description else summary
-        emb = self.get_embedding(text).reshape(1, -1)
+        emb = self._model_input('labels_suggester', text)
         
         pred = self.models['labels_suggester'].predict(emb, verbose=0)[0]
         
@@ -344,7 +391,7 @@ class UnifiedMLPredictor:
             }
         
         text = f"{summary}. {description}" if description else summary
-        emb = self.get_embedding(text).reshape(1, -1)
+        emb = self._model_input('status_suggester', text)
         
         pred = self.models['status_suggester'].predict(emb, verbose=0)[0]
         
@@ -371,7 +418,7 @@ class UnifiedMLPredictor:
             return {"labels": [], "probabilities": {}}
 
         text = f"{summary}. {comments}" if comments else summary
-        emb = self.get_embedding(text).reshape(1, -1)
+        emb = self._model_input('comment_suggester', text)
 
         pred = self.models['comment_suggester'].predict(emb, verbose=0)[0]
 
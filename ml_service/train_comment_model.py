@@ -10,12 +10,16 @@ Outputs:
  - ml_service/models/comment_labels_binarizer.pkl
 """
 import os
+import sys
 import argparse
 import pandas as pd
 import numpy as np
 from pathlib import Path
 import pickle
 
+# Repo root, for the shared embedding model (utils.embedding_provider)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
 def ensure_spacy_model():
     try:
         import spacy
@@ -63,11 +67,13 @@ def main(dataset_path, models_dir, epochs_phase1=5, epochs_phase2=3, batch_size=
         def detect(text):
             return 'es' if re.search(r'[\u00C0-\u017F]', text) else 'en'
 
-    # Prefer sentence-transformers if available (better multilingual embeddings)
+    # Prefer sentence-transformers if available (better multilingual embeddings);
+    # same provider and model the predictor embeds with at inference time
     st_model = None
     try:
-        from sentence_transformers import SentenceTransformer
-        st_model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
+        from utils.embedding_provider import get_embedding_provider
+        st_model = get_embedding_provider()
+        st_model.backend
         print('Using sentence-transformers model for embeddings')
     except Exception:
         st_model = None
@@ -81,7 +87,7 @@ def main(dataset_path, models_dir, epochs_phase1=5, epochs_phase2=3, batch_size=
     print('Computing embeddings (auto-detecting language per text)...')
     if st_model is not None:
         # sentence-transformers can encode list of texts efficiently
-        embeddings = np.array(st_model.encode(texts, show_progress_bar=True))
+        embeddings = st_model.encode(texts, normalize=False)
     else:
         emb_list = []
         for t in texts:
@@ -7,7 +7,58 @@ from collections import Counter
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-# Intentar múltiples fuentes de datos
+import numpy as np
+
+from utils.issue_columns import load_issue_columns
+from utils.issue_snapshot import get_issue_source
+
+DISCARDED_STATUSES = {"cancelado", "canceled", "cancelled", "duplicado", "duplicate", "cerrado", "closed", "done"}
+OUTPUT_DIR = Path(__file__).parent.parent / "data" / "ml_models"
+
+def analyze_columns() -> bool:
+    """
+    Analizar el snapshot columnar del último sync (lee solo key/status/priority/issue_type)
+
+    Returns:
+        False si todavía no hay issues sincronizados
+    """
+    columns = load_issue_columns(["key", "status", "priority", "issue_type"])
+    total = len(columns)
+    if not total:
+        return False
+    print(f"📂 Issues sincronizados: {total:,} tickets")
+
+    for title, column in (("📊 Distribución de Estados", "status"),
+                          ("📊 Distribución de Prioridades", "priority"),
+                          ("📊 Tipos de Tickets", "issue_type")):
+        print(f"\n{title}:")
+        for name, count in Counter(columns.counts(column)).most_common(10):
+            print(f"   • {name}: {count:,} ({count/total*100:.1f}%)")
+
+    # Activos vs descartados, por código de estado
+    codes, statuses = columns.codes("status")
+    discarded = np.array([False] + [s.lower() in DISCARDED_STATUSES for s in statuses])[codes + 1]
+    active_keys = columns.arrays["key"][~discarded].tolist()
+    print("\n✨ Clasificación para ML:")
+    print(f"   🟢 Activos: {len(active_keys):,} ({len(active_keys)/total*100:.1f}%)")
+    print(f"   🔴 Descartados: {total - len(active_keys):,} ({(total - len(active_keys))/total*100:.1f}%)")
+
+    # Exportar para training (issues completos solo de los activos)
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    active_data = get_issue_source().get_many(active_keys)
+    active_file = OUTPUT_DIR / "msm_active_training_set.json.gz"
+    with gzip.open(active_file, "wt", encoding="utf-8") as f:
+        json.dump(active_data, f, indent=2, ensure_ascii=False)
+    print("\n💾 Dataset de training exportado:")
+    print(f"   📁 {active_file}")
+    print(f"   📏 {active_file.stat().st_size / (1024*1024):.2f} MB")
+    print(f"   📊 {len(active_data):,} tickets activos")
+    return True
+
+if analyze_columns():
+    sys.exit(0)
+
+# Sin sync todavía: intentar múltiples fuentes de datos (JSON legacy)
 cache_files = [
     Path(__file__).parent.parent / "data" / "cache" / "ml_preload_cache.json.gz",
     Path(__file__).parent.parent / "data" / "cache" / "msm_issues.json.gz",
@@ -81,8 +132,7 @@ try:
                 print(f"   • {ticket_type}: {count:,} ({count/len(data)*100:.1f}%)")
         
         # Filtrar por estados activos vs descartados
-        discarded = {"cancelado", "canceled", "cancelled", "duplicado", "duplicate", "cerrado", "closed", "done"}
-        active = [k for k, v in data.items() if v.get("status", "").lower() not in discarded]
+        active = [k for k, v in data.items() if v.get("status", "").lower() not in DISCARDED_STATUSES]
         discarded_count = len(data) - len(active)
         
         print(f"\n✨ Clasificación para ML:")
@@ -90,11 +140,10 @@ try:
         print(f"   🔴 Descartados: {discarded_count:,} ({discarded_count/len(data)*100:.1f}%)")
         
         # Exportar para training
-        output_dir = Path(__file__).parent.parent / "data" / "ml_models"
-        output_dir.mkdir(parents=True, exist_ok=True)
+        OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
         
         active_data = {k: data[k] for k in active}
-        active_file = output_dir / "msm_active_training_set.json.gz"
+        active_file = OUTPUT_DIR / "msm_active_training_set.json.gz"
         with gzip.open(active_file, "wt", encoding="utf-8") as f:
             json.dump(active_data, f, indent=2, ensure_ascii=False)
         
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+ANN Index Benchmark
+===================
+Mide recall@k y latencia por consulta del índice IVF (utils.ann_index) contra
+la búsqueda exacta (producto punto sobre toda la matriz), sin filtro y con
+filtros de distinta selectividad. Reporta el nprobe por defecto (calibrado
+al construir el índice para un recall objetivo) junto a valores fijos.
+
+Usa el store de embeddings del ML suggester (data/cache/embeddings) si existe; si no, genera embeddings sintéticos
+agrupados (temas) con la dimensión del modelo multilingüe (384), uno por cada
+nivel de ruido (--noise: norma del ruido relativa al tema; 2.4 equivale a
+sigma 0.3 por coordenada en dimensión 64, temas poco separables). Las
+consultas son filas retenidas fuera del índice (no perturbaciones de filas
+indexadas).
+
+Usage:
+    python scripts/benchmark_ann_index.py
+    python scripts/benchmark_ann_index.py --vectors 50000 --queries 200 --synthetic
+    python scripts/benchmark_ann_index.py --synthetic --dim 64 --topics 50 --noise 2.4
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.ann_index import IVFIndex, exact_search, normalize_rows
+from utils.embedding_store import open_embeddings
+
+EMBEDDINGS_DIR = Path("data/cache/embeddings")
+
+def load_datasets(args, rng: np.random.Generator):
+    """(label, vectors) pairs: the local store, or one synthetic set per noise level"""
+    n = args.vectors + args.queries
+    embedding_set = None if args.synthetic else open_embeddings("ml_suggester", EMBEDDINGS_DIR)
+    if embedding_set is not None and len(embedding_set) > args.queries:
+        vectors = normalize_rows(embedding_set.vectors[:n])
+        print(f"📂 {len(vectors)} embeddings from {EMBEDDINGS_DIR} ({embedding_set.dtype})")
+        return [("store", vectors[rng.permutation(len(vectors))])]
+    topics = normalize_rows(rng.standard_normal((args.topics or max(8, n // 200), args.dim)))
+    datasets = []
+    for noise in args.noise:
+        assigned = topics[rng.integers(0, len(topics), size=n)]
+        vectors = normalize_rows(assigned + noise * rng.standard_normal((n, args.dim)) / np.sqrt(args.dim))
+        datasets.append((f"{n} synthetic, {len(topics)} topics, dim {args.dim}, noise {noise}", vectors))
+    return datasets
+
+def bench(label: str, search, queries: np.ndarray, truth, k: int):
+    latencies, hits = [], 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        rows, _ = search(query)
+        latencies.append(time.perf_counter() - start)
+        hits += len(set(rows[:k].tolist()) & set(expected.tolist()))
+    latencies_ms = np.array(latencies) * 1000
+    recall = hits / max(1, sum(len(t) for t in truth))
+    print(f"   {label:<28} recall@{k} {recall:6.1%}   "
+          f"p50 {np.percentile(latencies_ms, 50):7.3f} ms   p95 {np.percentile(latencies_ms, 95):7.3f} ms")
+    return float(np.percentile(latencies_ms, 50))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark IVF ANN search against exact search")
+    parser.add_argument("--vectors", type=int, default=20000, help="Number of vectors")
+    parser.add_argument("--dim", type=int, default=384, help="Dimension of synthetic vectors")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--k", type=int, default=10, help="Results per query")
+    parser.add_argument("--synthetic", action="store_true", help="Ignore the local embeddings file")
+    parser.add_argument("--topics", type=int, default=50, help="Topics of synthetic vectors (0: vectors / 200)")
+    parser.add_argument("--noise", type=float, nargs="+", default=[1.2, 2.4],
+                        help="Noise norm of synthetic vectors relative to their topic (one dataset each)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    for label, data in load_datasets(args, rng):
+        print(f"\n🧪 {label}")
+        vectors, queries = data[:-args.queries], data[-args.queries:]
+
+        start = time.perf_counter()
+        index = IVFIndex.build(vectors)
+        print(f"🏗️  Built {len(index.lists)} lists in {time.perf_counter() - start:.2f}s "
+              f"(default nprobe {index.nprobe})")
+
+        filters = {
+            "none": None,
+            "project (30%)": rng.random(len(vectors)) < 0.3,
+            "status (2%)": rng.random(len(vectors)) < 0.02,
+        }
+        for name, mask in filters.items():
+            rows = None if mask is None else np.flatnonzero(mask)
+            truth = [exact_search(vectors, q, args.k, rows)[0] for q in queries]
+            print(f"\n⏱️  Filter: {name}")
+            exact = bench("exact", lambda q: exact_search(vectors, q, args.k, rows), queries, truth, args.k)
+            for nprobe in (None, 4, 8, 16, 32):
+                label = f"ivf default (nprobe={index.nprobe})" if nprobe is None else f"ivf nprobe={nprobe}"
+                ann = bench(label, lambda q: index.search(q, args.k, nprobe=nprobe, allowed=mask),
+                            queries, truth, args.k)
+                print(f"   {'':<28} speedup {exact / ann:5.1f}x")
+
+    # Incremental inserts keep the lists usable without a rebuild
+    extra = normalize_rows(vectors[:1000] + 0.5 * rng.standard_normal((1000, vectors.shape[1])) / np.sqrt(vectors.shape[1]))
+    start = time.perf_counter()
+    index.add(extra)
+    print(f"\n➕ Inserted {len(extra)} vectors in {(time.perf_counter() - start) * 1000:.1f} ms "
+          f"({len(index.vectors)} indexed)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
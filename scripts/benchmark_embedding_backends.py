@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Embedding Backends Benchmark
+============================
+Compara el backend int8 ONNX Runtime (utils.onnx_encoder) con el modelo
+PyTorch de sentence-transformers:
+
+1. Paridad: similitud coseno entre los embeddings de ambos backends para los
+   mismos textos. Falla (exit 1) si algún texto queda por debajo de
+   --min-cosine o el promedio por debajo de --mean-cosine.
+2. Latencia por llamada (p50/p95) y throughput (textos/s) con lotes de
+   1, 8 y 64 textos.
+
+Usa los summaries del cache de issues si existe; si no, textos de ejemplo.
+La primera ejecución exporta y cuantiza el modelo (data/models/onnx); la
+exportación ya verifica la paridad con los mismos umbrales sobre
+PARITY_TEXTS (utils.onnx_encoder). Requiere api/requirements-onnx.txt.
+
+Usage:
+    python scripts/benchmark_embedding_backends.py
+    python scripts/benchmark_embedding_backends.py --parity-only --min-cosine 0.97
+    python scripts/benchmark_embedding_backends.py --export --texts 512
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.embedding_provider import DEFAULT_MODEL, SentenceTransformerBackend
+from utils.onnx_encoder import (MEAN_PARITY_COSINE, MIN_PARITY_COSINE, PARITY_TEXTS, OnnxInt8Backend,
+                                cosine_agreement, export_onnx_int8)
+
+
+def load_texts(n: int, rng: np.random.Generator) -> list:
+    texts = []
+    try:
+        from utils.issue_snapshot import get_issue_source
+        texts = [row["summary"] for row in get_issue_source().rows(["summary"]) if row.get("summary")]
+    except Exception:
+        pass
+    if texts:
+        print(f"📂 {min(n, len(texts))} issue summaries from the issue cache")
+        return [texts[i] for i in rng.choice(len(texts), size=min(n, len(texts)), replace=False)]
+    print(f"🧪 {n} sample texts")
+    return [PARITY_TEXTS[i % len(PARITY_TEXTS)] + ("" if i < len(PARITY_TEXTS) else f" #{i}") for i in range(n)]
+
+def parity(reference: np.ndarray, candidate: np.ndarray, min_cosine: float, mean_cosine: float) -> bool:
+    cosines = cosine_agreement(reference, candidate)
+    ok = cosines.min() >= min_cosine and cosines.mean() >= mean_cosine
+    print(f"   cosine mean {cosines.mean():.4f}   min {cosines.min():.4f}   p5 {np.percentile(cosines, 5):.4f}   "
+          f"{'✅ OK' if ok else '❌ FAIL'} (min >= {min_cosine}, mean >= {mean_cosine})")
+    return bool(ok)
+
+def bench(label: str, backend, texts: list, batch_size: int, seconds: float):
+    backend.encode(texts[:batch_size], batch_size=batch_size)  # warm up
+    latencies, encoded, start = [], 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        batch = [texts[(encoded + i) % len(texts)] for i in range(batch_size)]
+        t0 = time.perf_counter()
+        backend.encode(batch, batch_size=batch_size)
+        latencies.append(time.perf_counter() - t0)
+        encoded += len(batch)
+    latencies_ms = np.array(latencies) * 1000
+    throughput = encoded / sum(latencies)
+    print(f"   {label:<22} batch {batch_size:>3}   p50 {np.percentile(latencies_ms, 50):8.2f} ms   "
+          f"p95 {np.percentile(latencies_ms, 95):8.2f} ms   {throughput:8.1f} texts/s")
+    return throughput
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the int8 ONNX encoder with the PyTorch model")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="sentence-transformers model")
+    parser.add_argument("--texts", type=int, default=256, help="Number of texts")
+    parser.add_argument("--min-cosine", type=float, default=MIN_PARITY_COSINE, help="Min cosine agreement per text")
+    parser.add_argument("--mean-cosine", type=float, default=MEAN_PARITY_COSINE, help="Min mean cosine agreement")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Time per benchmark run")
+    parser.add_argument("--threads", type=int, default=0, help="ONNX Runtime threads (0: default)")
+    parser.add_argument("--export", action="store_true", help="Re-export the ONNX model first")
+    parser.add_argument("--parity-only", action="store_true", help="Skip the latency/throughput runs")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    texts = load_texts(args.texts, rng)
+
+    if args.export:
+        start = time.perf_counter()
+        export_onnx_int8(args.model)
+        print(f"📦 Exported in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    torch_backend = SentenceTransformerBackend(args.model)
+    print(f"🏗️  PyTorch model loaded in {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    onnx_backend = OnnxInt8Backend(args.model, threads=args.threads)
+    print(f"🏗️  ONNX int8 model loaded in {time.perf_counter() - start:.2f}s")
+
+    print("\n🔍 Parity (ONNX int8 vs PyTorch)")
+    ok = parity(torch_backend.encode(texts), onnx_backend.encode(texts), args.min_cosine, args.mean_cosine)
+
+    if not args.parity_only:
+        for batch_size in (1, 8, 64):
+            print(f"\n⏱️  Batch size {batch_size}")
+            reference = bench("pytorch", torch_backend, texts, batch_size, args.seconds)
+            quantized = bench("onnx-int8", onnx_backend, texts, batch_size, args.seconds)
+            print(f"   {'':<22} speedup {quantized / reference:5.1f}x")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Issue Formatting Benchmark
+==========================
+Mide el costo por issue del formateo de colas (STEP 3 de load_queue_issues):
+implementación previa (normalización dinámica por issue) vs. plan compilado
+(utils.field_compiler).
+
+Usa los issues de data/cache/msm_issues.json.gz si existen; si no, genera
+issues sintéticos con la forma de la Service Desk API.
+
+Usage:
+    python scripts/benchmark_issue_formatting.py
+    python scripts/benchmark_issue_formatting.py --issues 5000 --repeat 5 --synthetic
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.field_compiler import compile_field_plan, load_reference_types
+
+logger = logging.getLogger("benchmark_issue_formatting")
+
+CACHE_FILE = Path("data/cache/msm_issues.json.gz")
+
+# ============================================================
+# LEGACY IMPLEMENTATION (per-issue dynamic normalization)
+# ============================================================
+
+def _legacy_get_field_value(fields_dict: Dict, *field_names: str) -> Any:
+    for field_name in field_names:
+        if field_name in fields_dict:
+            return fields_dict[field_name]
+    return None
+
+def _legacy_normalize_severity_value(severity_obj: Any, custom_fields: Dict[str, Any], issue_key: str) -> str:
+    severity_map = {
+        'mayor': 'High', 'menor': 'Low', 'crítico': 'Critical', 'critico': 'Critical',
+        'normal': 'Medium', 'alta': 'High', 'baja': 'Low', 'media': 'Medium',
+        'critical': 'Critical', 'high': 'High', 'medium': 'Medium', 'low': 'Low',
+    }
+    if severity_obj:
+        if isinstance(severity_obj, dict):
+            severity_name = severity_obj.get("name") or severity_obj.get("value")
+            if severity_name:
+                normalized = severity_map.get(str(severity_name).lower(), severity_name)
+                logger.debug(f"🔍 {issue_key} - Severity: {normalized} (from field object)")
+                return normalized
+        elif isinstance(severity_obj, str):
+            normalized = severity_map.get(severity_obj.lower(), severity_obj)
+            logger.debug(f"🔍 {issue_key} - Severity: {normalized} (from field string)")
+            return normalized
+    severity_field = custom_fields.get('severity')
+    if severity_field:
+        normalized = severity_map.get(str(severity_field).lower(), str(severity_field))
+        logger.debug(f"🔍 {issue_key} - Severity: {normalized} (from custom field)")
+        return normalized
+    logger.debug(f"⚠️ {issue_key} - No severity data found")
+    return None
+
+def _legacy_extract_custom_fields(fields: Dict[str, Any]) -> Dict[str, Any]:
+    custom_fields = {}
+    custom_field_mappings = {
+        'customfield_10001': 'epic_link', 'customfield_10002': 'sprint', 'customfield_10003': 'story_points',
+        'customfield_10125': 'severity', 'customfield_10020': 'severity_alt', 'customfield_10021': 'urgency',
+        'customfield_10022': 'impact', 'customfield_10030': 'sla_time', 'customfield_10031': 'time_to_resolution',
+        'customfield_10032': 'customer_satisfaction', 'customfield_10040': 'category',
+        'customfield_10041': 'subcategory', 'customfield_10050': 'business_service',
+        'customfield_10060': 'environment', 'customfield_10070': 'affected_systems'
+    }
+    for field_key, field_value in fields.items():
+        if field_key.startswith('customfield_'):
+            custom_fields[field_key] = field_value
+            friendly_name = custom_field_mappings.get(field_key)
+            if friendly_name and friendly_name != field_key:
+                if isinstance(field_value, dict):
+                    if 'displayName' in field_value:
+                        custom_fields[friendly_name] = field_value['displayName']
+                    elif 'name' in field_value:
+                        custom_fields[friendly_name] = field_value['name']
+                    elif 'value' in field_value:
+                        custom_fields[friendly_name] = field_value['value']
+                    else:
+                        custom_fields[friendly_name] = str(field_value)
+                elif isinstance(field_value, list):
+                    if field_value and isinstance(field_value[0], dict):
+                        custom_fields[friendly_name] = [item.get('name', str(item)) for item in field_value]
+                    else:
+                        custom_fields[friendly_name] = field_value
+                else:
+                    custom_fields[friendly_name] = field_value
+    return custom_fields
+
+def legacy_format_issues(issues: List[Dict], enriched_data: Dict[str, Dict]) -> List[Dict]:
+    formatted_issues = []
+    for issue in issues:
+        issue_key = issue.get("key", "")
+        fields = issue.get("fields", {})
+        assignee_obj = _legacy_get_field_value(fields, "assignee", "asignado_a", "currentuser")
+        assignee_name = "Unassigned"
+        assignee_id = None
+        if assignee_obj and isinstance(assignee_obj, dict):
+            assignee_name = assignee_obj.get("displayName") or assignee_obj.get("name") or "Unassigned"
+            assignee_id = assignee_obj.get("accountId")
+        status_obj = _legacy_get_field_value(fields, "status", "estado")
+        status_name = "Unknown"
+        if status_obj and isinstance(status_obj, dict):
+            status_name = status_obj.get("name", "Unknown")
+        elif isinstance(status_obj, str):
+            status_name = status_obj
+        service_desk_custom_fields = _legacy_extract_custom_fields(fields)
+        severity_obj = _legacy_get_field_value(fields, "severity", "severidad")
+        severity_name = _legacy_normalize_severity_value(severity_obj, service_desk_custom_fields, issue_key)
+        if not severity_name:
+            logger.warning(f"⚠️ {issue_key} - No severity found in: severity_obj={severity_obj}, custom_fields={list(service_desk_custom_fields.keys())}")
+        summary = _legacy_get_field_value(fields, "summary", "resumen") or "No summary"
+        description = _legacy_get_field_value(fields, "description", "descripcion") or ""
+        issue_type_obj = _legacy_get_field_value(fields, "issuetype", "tipo_de_asunto")
+        issue_type_name = "Task"
+        if issue_type_obj and isinstance(issue_type_obj, dict):
+            issue_type_name = issue_type_obj.get("name", "Task")
+        elif isinstance(issue_type_obj, str):
+            issue_type_name = issue_type_obj
+        created = _legacy_get_field_value(fields, "created", "creado") or ""
+        updated = _legacy_get_field_value(fields, "updated", "actualizado") or created or ""
+        resolved = _legacy_get_field_value(fields, "resolutionDate", "fecha_de_resolucion") or ""
+        formatted = {
+            "key": issue_key, "summary": summary, "status": status_name, "severity": severity_name,
+            "assignee": assignee_name, "assignee_id": assignee_id, "created": created, "updated": updated,
+            "resolved": resolved, "description": description, "issue_type": issue_type_name,
+            "labels": [], "components": [], "fields": fields
+        }
+        for cf_key, cf_value in service_desk_custom_fields.items():
+            formatted[cf_key] = cf_value
+        if issue_key in enriched_data:
+            for cf_key, cf_value in enriched_data[issue_key].items():
+                if cf_value is not None:
+                    formatted[cf_key] = cf_value
+        formatted_issues.append(formatted)
+    return formatted_issues
+
+# ============================================================
+# DATA
+# ============================================================
+
+def synthetic_issues(count: int, seed: int = 42) -> List[Dict]:
+    """Service Desk-shaped issues with the custom fields of the reference file"""
+    rng = random.Random(seed)
+    field_types = load_reference_types()
+    severities = ["Mayor", "Menor", "Crítico", "Normal", None]
+    statuses = ["En Progreso", "En espera de cliente", "Cerrado", "Backlog"]
+    issues = []
+    for i in range(count):
+        fields: Dict[str, Any] = {
+            "summary": f"Issue {i} summary text",
+            "description": "Lorem ipsum " * rng.randint(5, 40),
+            "status": {"name": rng.choice(statuses), "id": str(rng.randint(1, 20))},
+            "assignee": rng.choice([None, {"displayName": "Agent A", "accountId": "abc"}]),
+            "issuetype": {"name": "Incident"},
+            "created": "2025-10-01T10:00:00.000-0500",
+            "updated": "2025-10-02T10:00:00.000-0500",
+        }
+        for field_id, field_type in field_types.items():
+            if field_type == "select":
+                fields[field_id] = {"value": rng.choice(["SMT", "HUB", "Aplicaciones"]), "id": "1"}
+            elif field_type == "user":
+                fields[field_id] = {"displayName": "Customer", "accountId": "x"}
+            elif field_type == "number":
+                fields[field_id] = rng.random() * 100
+            elif field_type == "array":
+                fields[field_id] = []
+            else:
+                fields[field_id] = rng.choice([None, "text value"])
+        severity = rng.choice(severities)
+        fields["customfield_10125"] = {"value": severity, "id": "2"} if severity else None
+        issues.append({"key": f"MSM-{i}", "fields": fields})
+    return issues
+
+def load_issues(count: int, synthetic: bool) -> List[Dict]:
+    if not synthetic and CACHE_FILE.exists():
+        with gzip.open(CACHE_FILE, "rt", encoding="utf-8") as f:
+            issues = json.load(f).get("issues", [])
+        if issues:
+            print(f"📂 Using {min(count, len(issues))} cached issues from {CACHE_FILE}")
+            return issues[:count]
+    print(f"🧪 Using {count} synthetic issues")
+    return synthetic_issues(count)
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def bench(label: str, fn, issues: List[Dict], enriched: Dict, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(issues, enriched)
+        best = min(best, time.perf_counter() - t0)
+    per_issue_us = best / max(1, len(issues)) * 1e6
+    print(f"  {label:<10} {best * 1000:9.1f} ms total   {per_issue_us:8.2f} µs/issue")
+    return per_issue_us
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-issue queue formatting")
+    parser.add_argument("--issues", type=int, default=2000, help="Number of issues")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per implementation (best is reported)")
+    parser.add_argument("--synthetic", action="store_true", help="Ignore the local cache file")
+    args = parser.parse_args()
+
+    # Production log level: debug/warning calls still build their f-strings
+    logging.basicConfig(level=logging.WARNING, handlers=[logging.NullHandler()])
+
+    issues = load_issues(args.issues, args.synthetic)
+    enriched = {
+        issue["key"]: {"labels": ["a"], "components": [], "comment_count": 2, "assignee": None}
+        for issue in issues if issue.get("key")
+    }
+    plan = compile_field_plan()
+
+    legacy = legacy_format_issues(issues, enriched)
+    compiled = plan.format_issues(issues, enriched)
+    mismatches = sum(1 for a, b in zip(legacy, compiled) if a != b)
+    print(f"🔎 Parity: {len(compiled) - mismatches}/{len(compiled)} records identical")
+
+    print("⏱️  Per-issue formatting cost (best of runs)")
+    before = bench("legacy", legacy_format_issues, issues, enriched, args.repeat)
+    after = bench("compiled", plan.format_issues, issues, enriched, args.repeat)
+    if after:
+        print(f"🚀 Speedup: {before / after:.2f}x")
+    return 0 if mismatches == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
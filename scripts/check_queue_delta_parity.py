@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Queue Delta Parity Check
+========================
+Verifica que una cola refrescada por delta (core.api._refresh_queue_delta)
+se formatee igual que una carga completa:
+
+1. Carga completa: issues de la Service Desk API + enriquecimiento por JQL.
+2. Delta simulado en el que TODOS los issues cambiaron: se vuelven a pedir
+   por búsqueda JQL con DELTA_FIELDS y se fusionan con QueueState.apply,
+   igual que en un refresh delta real.
+3. Se formatean ambas versiones con el FieldPlan compilado y se comparan
+   registro a registro. Falla (exit 1) si algún registro difiere.
+
+Issues actualizados entre ambas cargas pueden diferir legítimamente; se
+reportan aparte y no cuentan como fallo.
+
+Usage:
+    python scripts/check_queue_delta_parity.py
+    python scripts/check_queue_delta_parity.py --desk 4 --queue 27
+"""
+
+import argparse
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.api import DELTA_FIELDS, _build_enrichment, _fetch_queue_full, _get_field_plan
+from utils.api_migration import get_api_client
+from utils.async_jira import AsyncJiraClient, run_sync
+from utils.config import config
+from utils.queue_delta import QUEUE_SEARCH_API_VERSION, QueueDelta, QueueState
+
+def fetch_as_delta(client, keys):
+    """The queue's issues as a delta refresh receives them"""
+    async def _run():
+        async with AsyncJiraClient(client.site, client.headers) as async_client:
+            return await async_client.get_issues_by_keys(
+                keys, fields=DELTA_FIELDS, expand="changelog", api_version=QUEUE_SEARCH_API_VERSION
+            )
+    return run_sync(_run())
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare delta-refreshed and fully loaded queue records")
+    parser.add_argument("--desk", default=config.user.desk_id, help="Service desk ID")
+    parser.add_argument("--queue", default=config.user.queue_id, help="Queue ID")
+    args = parser.parse_args()
+    if not args.desk or not args.queue:
+        parser.error("--desk and --queue are required (or USER_DESK_ID / USER_QUEUE_ID)")
+
+    client = get_api_client()
+    plan = _get_field_plan()
+
+    start = time.perf_counter()
+    issues, enriched, _ = _fetch_queue_full(client, args.desk, args.queue, 100)
+    if not issues:
+        print(f"❌ Queue {args.queue} (desk {args.desk}) returned no issues")
+        return 1
+    print(f"📥 Full load: {len(issues)} issues in {time.perf_counter() - start:.1f}s")
+    full = {record["key"]: record for record in plan.format_issues(issues, enriched)}
+
+    state = QueueState()
+    state.replace(issues, enriched, time.time())
+    start = time.perf_counter()
+    changed = fetch_as_delta(client, list(state.order))
+    print(f"🔁 Delta fetch: {len(changed)} issues in {time.perf_counter() - start:.1f}s")
+    state.apply(
+        QueueDelta(keys=list(state.order), changed=changed, removed=[], request_count=0, synced_at=time.time()),
+        {issue["key"]: _build_enrichment(issue) for issue in changed if issue.get("key")}
+    )
+    delta = {record["key"]: record for record in plan.format_issues(state.ordered_issues(), state.enriched)}
+
+    updated_between = {
+        issue["key"] for issue in changed
+        if issue["key"] in full and (issue.get("fields") or {}).get("updated") != full[issue["key"]].get("updated")
+    }
+    mismatched = Counter()
+    failures = []
+    for key, record in full.items():
+        if key in updated_between:
+            continue
+        diff = sorted(name for name in set(record) | set(delta.get(key, {})) if record.get(name) != delta.get(key, {}).get(name))
+        if diff:
+            failures.append(key)
+            mismatched.update(diff)
+
+    print(f"🔎 Parity: {len(full) - len(failures) - len(updated_between)}/{len(full) - len(updated_between)} records identical"
+          f" ({len(updated_between)} updated between loads, skipped)")
+    for name, count in mismatched.most_common():
+        print(f"   ❌ {name}: differs in {count} record(s), e.g. {next(k for k in failures if full[k].get(name) != delta.get(k, {}).get(name))}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
 Script para inicializar embeddings de tickets
-Genera embeddings para todos los tickets en cache usando Ollama
+Genera embeddings para todos los tickets en cache con el modelo de embeddings
+compartido (utils.embedding_provider)
 """
 
 import sys
@@ -11,7 +12,8 @@ from pathlib import Path
 # Agregar el directorio raíz al path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from utils.embedding_manager import get_embedding_manager
+from utils.embedding_manager import EMBEDDINGS_DIR, get_embedding_manager
+from utils.embedding_provider import get_embedding_provider
 import logging
 
 logging.basicConfig(
@@ -29,25 +31,25 @@ def main():
     print("="*60)
     print()
     
-        print("1. Verificando disponibilidad de Ollama...")
-    if not ensure_ollama_available():
+    print("1. Cargando modelo de embeddings...")
+    provider = get_embedding_provider()
+    if not provider.is_available():
         print()
-        print("❌ Ollama no está disponible.")
+        print(f"❌ No se pudo cargar el modelo {provider.model_name} ({provider.backend_name}).")
         print()
-        print("Para iniciar Ollama:")
-        print("  1. Abre una nueva terminal")
-        print("")
-        print("  3. Vuelve a ejecutar este script")
+        print("Para instalarlo:")
+        print("  1. pip install sentence-transformers")
+        print("  2. Vuelve a ejecutar este script")
         print()
         return 1
     
-    print("✅ Ollama está disponible")
+    print(f"✅ Modelo {provider.model_name} cargado ({provider.backend_name})")
     print()
     
     # Obtener gestor de embeddings
     print("2. Cargando gestor de embeddings...")
     manager = get_embedding_manager()
-    print(f"✅ Cache actual: {len(manager.embeddings_cache)} embeddings")
+    print(f"✅ Cache actual: {len(manager)} embeddings")
     print()
     
     # Preguntar al usuario
@@ -91,8 +93,8 @@ def main():
         print("✅ COMPLETADO")
         print("="*60)
         print()
-        print(f"Total de embeddings en cache: {len(manager.embeddings_cache)}")
-        print(f"Archivo de cache: {manager.embeddings_cache}")
+        print(f"Total de embeddings en cache: {len(manager)}")
+        print(f"Store de embeddings: {EMBEDDINGS_DIR}")
         print()
         print("Los embeddings están listos para usar en búsqueda semántica.")
         print()
@@ -101,7 +103,7 @@ def main():
     except KeyboardInterrupt:
         print()
         print("⚠️ Interrumpido por el usuario")
-        print(f"   Embeddings guardados: {len(manager.embeddings_cache)}")
+        print(f"   Embeddings guardados: {len(manager)}")
         manager.save_cache()
         return 0
         
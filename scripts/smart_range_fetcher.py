@@ -16,7 +16,7 @@ from typing import List, Dict, Optional, Tuple
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from utils.config import config
-from utils.common import _get_credentials, _get_auth_header, _make_request
+from utils.common import _get_credentials, _get_auth_header, _make_request, JiraRateLimitError
 
 logging.basicConfig(
     level=logging.INFO,
@@ -115,6 +115,9 @@ class SmartRangeFetcher:
             url = f"{self.site}/rest/api/3/issue/{project_key}-{issue_id}"
             params = {"fields": "*all", "expand": "changelog,renderedFields"}
             return _make_request("GET", url, self.headers, params=params)
+        except JiraRateLimitError as e:
+            logger.warning(f"    ⏳ {project_key}-{issue_id} omitido por rate limit: {e}")
+            return None
         except:
             return None
     
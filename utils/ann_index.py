@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+"""
+ANN Index Module
+Inverted-file (IVF) approximate nearest neighbour index over unit vectors
+
+Cosine similarity over normalized embeddings is a dot product. Instead of
+scoring every stored vector per query, the vectors are clustered once at
+index time (spherical k-means, ~sqrt(n) lists); a query scores the list
+centroids and then only the vectors of the nprobe closest lists.
+
+nprobe is chosen from a target recall rather than fixed: after clustering,
+a sample of stored rows is used as queries, and for each of their exact
+neighbours the rank of its list among the query's closest centroids is
+measured. The default nprobe is the smallest number of lists at which the
+target share of those neighbours (recall@k, default 0.9) is found. Well
+separated collections get a handful of lists; noisy, overlapping ones probe
+more (up to all of them, i.e. exact search):
+
+    index = IVFIndex.build(embeddings)
+    rows, scores = index.search(query, k=10)                  # approximate top-k
+    rows, scores = index.search(query, k=10, allowed=mask)    # filtered
+    index.add(new_vectors)                                    # incremental insert
+    index.extend(grown_matrix)                                # rows appended to the matrix
+
+Filtered search scores only allowed rows (a mask shorter than the matrix,
+e.g. built before rows were appended, leaves the extra rows out). A filter
+keeping a share f of the rows probes nprobe / f lists, since the filtered
+top-k lies that much deeper in the unfiltered ranking. When the probed lists
+would hold a third or more of the candidate rows, those rows are scored
+exactly instead (gathering scattered rows costs more than one contiguous
+product). Lists are widened until k allowed results are found. Small
+collections (< min_train rows) are always searched exactly.
+
+The index stores row numbers into the caller's embedding matrix (it does not
+copy the vectors, so a memory-mapped matrix stays mapped) and is persisted
+with np.savez next to the embeddings, tagged with their store version.
+Pure NumPy: no hnswlib/faiss dependency.
+"""
+
+import logging
+import math
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_FORMAT_VERSION = 1
+
+TARGET_RECALL = 0.9       # Share of the exact top-k the default nprobe should find
+CALIBRATION_QUERIES = 200  # Stored rows used as queries to choose nprobe
+CALIBRATION_K = 10
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """float32 copy of vectors scaled to unit length (zero rows stay zero)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+def exact_search(vectors: np.ndarray, query: np.ndarray, k: int,
+                 rows: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Exact top-k by dot product (over the given rows only, if any)"""
+    candidates = vectors if rows is None else vectors[rows]
+    if len(candidates) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    scores = candidates @ query
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top], kind="stable")]
+    found = top if rows is None else rows[top]
+    return found.astype(np.int64), scores[top]
+
+class IVFIndex:
+    """Inverted-file ANN index over a unit-vector matrix (see module docstring)"""
+
+    def __init__(self, vectors: np.ndarray, centroids: Optional[np.ndarray], lists: List[np.ndarray],
+                 trained_size: int, nprobe: int = 1, min_train: int = 1000, tag: int = 0):
+        """
+        Args:
+            vectors: (n, d) unit vectors (row numbers are the ids)
+            centroids: (n_lists, d) unit centroids, None for exact-only indexes
+            lists: Row numbers of each list
+            trained_size: Rows the centroids were trained on
+            nprobe: Lists scored per query by default
+            min_train: Below this many rows searches are exact
+            tag: Version of the vectors (e.g. embedding store version)
+        """
+        self.vectors = vectors
+        self.centroids = centroids
+        self.lists = lists
+        self.trained_size = trained_size
+        self.nprobe = nprobe
+        self.min_train = min_train
+        self.tag = tag
+        self.persisted_size: Optional[int] = None  # Rows covered by the saved file (None: never saved)
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, n_lists: Optional[int] = None, iterations: int = 10,
+              nprobe: Optional[int] = None, target_recall: float = TARGET_RECALL,
+              min_train: int = 1000, seed: int = 0, tag: int = 0) -> "IVFIndex":
+        """
+        Cluster vectors into lists (spherical k-means)
+
+        Args:
+            vectors: (n, d) unit vectors
+            n_lists: Number of lists (default: ~sqrt(n))
+            iterations: k-means iterations
+            nprobe: Lists scored per query by default (default: calibrated, see calibrate)
+            target_recall: Recall@k the calibrated nprobe should reach
+            min_train: Below this many rows no clustering is done (exact search)
+            seed: Random seed (deterministic builds)
+            tag: Version of the vectors
+        """
+        n = len(vectors)
+        if n < min_train:
+            return cls(vectors, None, [], n, nprobe or 1, min_train, tag)
+        n_lists = n_lists or max(1, int(math.sqrt(n)))
+        rng = np.random.default_rng(seed)
+        # Train on a sample: centroids converge long before all rows are needed
+        sample = vectors[rng.choice(n, size=min(n, n_lists * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            empty = np.bincount(assign, minlength=n_lists) == 0
+            # Re-seed empty lists with random sample rows
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()), replace=False)]
+            centroids = normalize_rows(sums)
+        index = cls(vectors, centroids, [np.empty(0, dtype=np.int64)] * n_lists, n, nprobe or 1, min_train, tag)
+        index._assign(np.arange(n, dtype=np.int64))
+        if nprobe is None:
+            index.calibrate(target_recall, seed=seed)
+        return index
+
+    def calibrate(self, target_recall: float = TARGET_RECALL, k: int = CALIBRATION_K,
+                  queries: int = CALIBRATION_QUERIES, seed: int = 0) -> int:
+        """
+        Set nprobe to the fewest lists reaching target_recall
+
+        A sample of stored rows is searched exactly (excluding the row itself);
+        a neighbour is found with nprobe lists when its list is among the
+        query's nprobe closest centroids.
+
+        Returns:
+            The chosen nprobe
+        """
+        if self.centroids is None:
+            return self.nprobe
+        n, n_lists = len(self.vectors), len(self.centroids)
+        list_of = np.empty(n, dtype=np.int64)
+        for list_id, rows in enumerate(self.lists):
+            list_of[rows] = list_id
+        rng = np.random.default_rng(seed)
+        sample = rng.choice(n, size=min(n, queries), replace=False)
+        k = min(k, n - 1)
+        needed = []
+        for start in range(0, len(sample), 16):
+            rows = sample[start:start + 16]
+            queries = self.vectors[rows]
+            scores = self.vectors @ queries.T
+            scores[rows, np.arange(len(rows))] = -np.inf  # a row is not its own neighbour
+            neighbours = np.argpartition(-scores, k - 1, axis=0)[:k].T
+            # Rank of every list by centroid similarity to each query
+            order = np.argsort(-(queries @ self.centroids.T), axis=1)
+            rank = np.empty_like(order)
+            np.put_along_axis(rank, order, np.arange(n_lists)[None, :], axis=1)
+            needed.append(np.take_along_axis(rank, list_of[neighbours], axis=1).ravel() + 1)
+        needed = np.sort(np.concatenate(needed))
+        self.nprobe = int(needed[min(len(needed) - 1, math.ceil(target_recall * len(needed)) - 1)])
+        logger.info(f"ANN index: nprobe {self.nprobe}/{n_lists} lists for recall@{k} >= {target_recall:.0%}")
+        return self.nprobe
+
+    def add(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Append unit vectors (incremental insert)
+
+        The new rows go to their closest list; once the collection has doubled
+        since training the lists are rebuilt.
+
+        Returns:
+            Row numbers of the added vectors
+        """
+        start = len(self.vectors)
+        self.extend(np.concatenate([self.vectors, np.asarray(vectors, dtype=np.float32)]))
+        return np.arange(start, len(self.vectors), dtype=np.int64)
+    
+    def extend(self, vectors: np.ndarray):
+        """
+        Switch to a grown matrix whose first rows are the indexed ones (e.g. a
+        store after an append) and index the new rows (see add)
+        """
+        start = len(self.vectors)
+        self.vectors = vectors
+        if len(vectors) == start:
+            return
+        if self.centroids is None or len(vectors) >= 2 * self.trained_size:
+            rebuilt = IVFIndex.build(vectors, min_train=self.min_train)
+            self.centroids, self.lists, self.trained_size = rebuilt.centroids, rebuilt.lists, rebuilt.trained_size
+            self.nprobe = rebuilt.nprobe
+        else:
+            self._assign(np.arange(start, len(vectors), dtype=np.int64))
+
+    def _assign(self, rows: np.ndarray):
+        """Append rows to their closest list"""
+        for start in range(0, len(rows), 65536):
+            chunk = rows[start:start + 65536]
+            assign = np.argmax(self.vectors[chunk] @ self.centroids.T, axis=1)
+            order = np.argsort(assign, kind="stable")
+            bounds = np.searchsorted(assign[order], np.arange(len(self.centroids) + 1))
+            for list_id in np.flatnonzero(np.diff(bounds)):
+                members = chunk[order[bounds[list_id]:bounds[list_id + 1]]]
+                self.lists[list_id] = np.concatenate([self.lists[list_id], members])
+
+    def search(self, query: np.ndarray, k: int = 10, nprobe: Optional[int] = None,
+               allowed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-k rows by cosine similarity
+
+        Args:
+            query: (d,) unit vector
+            k: Results wanted
+            nprobe: Lists scored (default: self.nprobe); more is slower and more exact
+            allowed: Optional boolean mask of rows that may be returned (rows
+                beyond a shorter mask are not allowed)
+
+        Returns:
+            (rows, scores), best first
+        """
+        query = np.asarray(query, dtype=np.float32)
+        allowed_rows = None
+        if allowed is not None:
+            allowed = np.asarray(allowed, dtype=bool)[:len(self.vectors)]
+            if len(allowed) < len(self.vectors):
+                allowed = np.concatenate([allowed, np.zeros(len(self.vectors) - len(allowed), dtype=bool)])
+            allowed_rows = np.flatnonzero(allowed)
+        if self.centroids is None:
+            return exact_search(self.vectors, query, k, allowed_rows)
+
+        n, n_lists = len(self.vectors), len(self.centroids)
+        nprobe = nprobe or self.nprobe
+        pool = n if allowed_rows is None else len(allowed_rows)
+        if allowed_rows is not None and len(allowed_rows):
+            nprobe = math.ceil(nprobe * n / len(allowed_rows))
+        nprobe = min(nprobe, n_lists)
+        if 3 * n * nprobe / n_lists >= pool:
+            return exact_search(self.vectors, query, k, allowed_rows)
+
+        order = np.argsort(-(self.centroids @ query))
+        probed = 0
+        candidates = np.empty(0, dtype=np.int64)
+        while probed < len(order):
+            batch = order[probed:probed + nprobe]
+            probed += len(batch)
+            rows = np.concatenate([self.lists[i] for i in batch])
+            if allowed is not None:
+                rows = rows[allowed[rows]]
+            candidates = np.concatenate([candidates, rows])
+            if len(candidates) >= k:
+                break
+            nprobe *= 2  # too few (allowed) rows in the closest lists: widen
+        return exact_search(self.vectors, query, k, candidates)
+
+    def save(self, path: Path):
+        """Persist centroids, lists and tag (not the vectors) with np.savez"""
+        path = Path(path)
+        lengths = np.array([len(rows) for rows in self.lists], dtype=np.int64)
+        tmp = path.with_name(path.name + ".tmp.npz")
+        np.savez(
+            tmp,
+            version=np.int64(_FORMAT_VERSION),
+            size=np.int64(len(self.vectors)),
+            tag=np.int64(self.tag),
+            trained_size=np.int64(self.trained_size),
+            nprobe=np.int64(self.nprobe),
+            centroids=self.centroids if self.centroids is not None else np.empty((0, 0), dtype=np.float32),
+            rows=np.concatenate(self.lists) if self.lists else np.empty(0, dtype=np.int64),
+            lengths=lengths,
+        )
+        tmp.replace(path)
+        self.persisted_size = len(self.vectors)
+
+    @classmethod
+    def load(cls, path: Path, vectors: np.ndarray, tag: int = 0, nprobe: Optional[int] = None,
+             min_train: int = 1000) -> Optional["IVFIndex"]:
+        """
+        Load a persisted index for vectors
+
+        Rows of vectors beyond the ones the file was saved with are indexed
+        as appended rows (see extend). nprobe defaults to the one calibrated
+        when the index was built (recalibrated for files saved without it).
+        
+        Returns:
+            The index, or None when the file is missing, unreadable, or was
+            built for a different version (tag) or more rows of vectors
+        """
+        path = Path(path)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                size = int(data["size"])
+                if int(data["version"]) != _FORMAT_VERSION or size > len(vectors):
+                    return None
+                if (int(data["tag"]) if "tag" in data.files else 0) != tag:
+                    return None
+                centroids = data["centroids"]
+                bounds = np.concatenate([[0], np.cumsum(data["lengths"])])
+                rows = data["rows"]
+                lists = [rows[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
+                trained_size = int(data["trained_size"])
+                saved_nprobe = int(data["nprobe"]) if "nprobe" in data.files else None
+        except Exception as e:
+            logger.warning(f"Could not load ANN index {path}: {e}")
+            return None
+        index = cls(vectors[:size], centroids if centroids.size else None, lists, trained_size,
+                    nprobe or saved_nprobe or 1, min_train, tag)
+        index.persisted_size = size
+        if nprobe is None and saved_nprobe is None:
+            index.calibrate()
+            index.persisted_size = None  # Save again with the nprobe
+        index.extend(vectors)
+        return index
@@ -11,6 +11,9 @@ from functools import wraps
 from utils.config import config
 from utils.jira_api import JiraAPI
 from utils.common import JiraApiError, invalidate_api_cache, _make_request
+from utils.http_pool import reset_session_pool
+from utils.queue_delta import reset_queue_states
+from utils.record_memo import reset_record_memo
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +31,9 @@ def reset_api_client():
     """Reset the global API client (e.g. after config changes)"""
     global _api_client
     _api_client = None
+    reset_session_pool()
+    reset_queue_states()
+    reset_record_memo()
     invalidate_api_cache()
 
 def api_client_required(func):
@@ -0,0 +1,464 @@
+# -*- coding: utf-8 -*-
+"""
+Async JIRA Client Module
+asyncio-based client for Service Desk and Platform endpoints with concurrent pagination
+
+The first page of a paged endpoint tells us whether more pages exist (and, when
+the endpoint reports it, how many issues there are in total). Remaining pages are
+then requested concurrently, bounded by a semaphore (JiraConfig.max_concurrency).
+
+Requests are dispatched to the shared pooled sessions (utils.http_pool) on a
+thread executor, so async pagination uses the same keep-alive connections,
+timeouts, rate limiter and retries as every other JIRA call. Concurrency is
+capped at the host's pool size, so pages never open connections outside it.
+
+Sync wrappers (fetch_queue_issues, search_all_issues, fetch_issues_by_keys) let
+Flask handlers and other synchronous code use it without touching asyncio.
+
+Listings are all-or-nothing: when any page request fails, IncompleteResultError
+is raised instead of returning the pages that did arrive, so callers never
+mistake a partial list for the full membership of a queue or search.
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from utils.common import IncompleteResultError, _make_request
+from utils.http_pool import get_session_pool
+
+logger = logging.getLogger(__name__)
+
+class AsyncJiraClient:
+    """Async JIRA client with bounded concurrent pagination"""
+
+    def __init__(
+        self,
+        site: str,
+        headers: Dict[str, str],
+        max_concurrency: Optional[int] = None
+    ):
+        """
+        Args:
+            site: JIRA site base URL
+            headers: Auth headers (see utils.common._get_auth_header)
+            max_concurrency: Max in-flight requests (default: JiraConfig.max_concurrency;
+                             never more than the host's pool size, see utils.http_pool)
+        """
+        from utils.config import config
+        self.site = site.rstrip("/")
+        self.headers = headers
+        pool_size = get_session_pool().pool_size_for(self.site)
+        self.max_concurrency = max(1, min(max_concurrency or config.jira.max_concurrency, pool_size))
+        self.request_count = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "AsyncJiraClient":
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="async-jira")
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if self._executor is not None:
+            # Requests already sent finish on their threads; queued ones are dropped
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    # ============================================================
+    # LOW LEVEL
+    # ============================================================
+
+    async def get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        """GET a JIRA endpoint and decode JSON (see request_json)"""
+        return await self.request_json("GET", url, params=params)
+
+    async def request_json(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Optional[Dict[str, Any]] = None
+    ) -> Optional[Any]:
+        """
+        Call a JIRA endpoint and decode JSON (same contract as utils.common._make_request)
+
+        The request runs on the client's executor through the shared session
+        pool, taking a token from the process-wide rate limiter; 429 (and 503
+        for idempotent methods) responses are retried with Retry-After-aware,
+        jittered backoff, and identical concurrent GETs are coalesced.
+
+        Returns:
+            JSON response data or None if the request fails
+
+        Raises:
+            JiraRateLimitError: still throttled after all retries
+        """
+        kwargs: Dict[str, Any] = {"params": params or {}}
+        if json is not None:
+            kwargs["json"] = json
+        async with self._semaphore:
+            self.request_count += 1
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, lambda: _make_request(method.upper(), url, self.headers, **kwargs)
+            )
+
+    async def _gather_pages(
+        self,
+        fetch_page: Callable[[int], Awaitable[Optional[Dict]]],
+        starts: List[int]
+    ) -> List[Dict]:
+        """
+        Fetch several page offsets concurrently, preserving offset order
+
+        Raises:
+            IncompleteResultError: a page request failed
+        """
+        pages = list(await asyncio.gather(*(fetch_page(start) for start in starts)))
+        for start, page in zip(starts, pages):
+            _check_page(page, f"start={start}")
+        return pages
+
+    # ============================================================
+    # SERVICE DESK
+    # ============================================================
+
+    async def get_queue_issue_count(self, desk_id: str, queue_id: str) -> Optional[int]:
+        """Issue count of a queue (GET .../queue/{queueId}?includeCount=true)"""
+        url = f"{self.site}/rest/servicedeskapi/servicedesk/{desk_id}/queue/{queue_id}"
+        data = await self.get_json(url, {"includeCount": "true"})
+        if isinstance(data, dict) and isinstance(data.get("issueCount"), int):
+            return data["issueCount"]
+        return None
+
+    async def get_queue_issues(self, desk_id: str, queue_id: str, page_limit: int = 50) -> List[Dict]:
+        """
+        Fetch every issue of a Service Desk queue
+
+        GET /rest/servicedeskapi/servicedesk/{serviceDeskId}/queue/{queueId}/issue
+
+        The first page and the queue issue count are requested together. If the
+        count is known, all remaining offsets are fetched at once; otherwise pages
+        are requested in windows of max_concurrency until isLastPage is seen.
+
+        Args:
+            desk_id: Service desk ID
+            queue_id: Queue ID
+            page_limit: Requested page size (JIRA may clamp it)
+
+        Returns:
+            List of raw issue dicts (deduplicated by key, queue order preserved)
+
+        Raises:
+            IncompleteResultError: a page request failed
+        """
+        url = f"{self.site}/rest/servicedeskapi/servicedesk/{desk_id}/queue/{queue_id}/issue"
+
+        async def fetch_page(start: int) -> Optional[Dict]:
+            return await self.get_json(url, {"start": start, "limit": page_limit})
+
+        first, total = await asyncio.gather(
+            fetch_page(0),
+            self.get_queue_issue_count(desk_id, queue_id)
+        )
+        _check_page(first, "start=0")
+
+        pages = [first]
+        first_values = first.get("values", [])
+        if first_values and not first.get("isLastPage", True):
+            # JIRA may clamp the requested limit: the first page tells the real page size
+            page_size = len(first_values)
+            next_start = first.get("start", 0) + page_size
+
+            if total is not None and total > next_start:
+                starts = list(range(next_start, total, page_size))
+                pages.extend(await self._gather_pages(fetch_page, starts))
+                next_start = starts[-1] + page_size
+                last = pages[-1]
+                done = not last.get("values") or last.get("isLastPage", True)
+            else:
+                done = False
+
+            # Unknown total (or queue grew since the count): speculative windows
+            while not done:
+                starts = [next_start + i * page_size for i in range(self.max_concurrency)]
+                window = await self._gather_pages(fetch_page, starts)
+                for page in window:
+                    if not page.get("values"):
+                        done = True
+                        break
+                    pages.append(page)
+                    if page.get("isLastPage", True):
+                        done = True
+                        break
+                next_start = starts[-1] + page_size
+
+        issues = []
+        seen = set()
+        for page in pages:
+            for issue in page.get("values", []):
+                key = issue.get("key")
+                if key in seen:
+                    continue
+                if key:
+                    seen.add(key)
+                issues.append(issue)
+        return issues
+
+    # ============================================================
+    # PLATFORM
+    # ============================================================
+
+    async def search_all_issues(
+        self,
+        jql: str,
+        fields: Optional[List[str]] = None,
+        page_size: int = 100,
+        expand: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Run a JQL search and fetch every result page concurrently
+
+        GET /rest/api/2/search (startAt/maxResults pagination, total in first page)
+
+        Args:
+            jql: JQL query
+            fields: Fields to return
+            page_size: maxResults per page
+            expand: Optional expand parameter
+
+        Returns:
+            List of raw issue dicts
+
+        Raises:
+            IncompleteResultError: a page request failed
+        """
+        url = f"{self.site}/rest/api/2/search"
+        base_params: Dict[str, Any] = {"jql": jql, "maxResults": page_size}
+        if fields:
+            base_params["fields"] = fields
+        if expand:
+            base_params["expand"] = expand
+
+        async def fetch_page(start: int) -> Optional[Dict]:
+            return await self.get_json(url, {**base_params, "startAt": start})
+
+        first = _check_page(await fetch_page(0), "startAt=0")
+
+        issues = list(first.get("issues", []))
+        total = first.get("total", len(issues))
+        page_len = len(issues) or page_size
+        if issues and total > len(issues):
+            starts = list(range(len(issues), total, page_len))
+            for page in await self._gather_pages(fetch_page, starts):
+                issues.extend(page.get("issues", []))
+        return issues
+
+    async def search_jql(
+        self,
+        jql: str,
+        fields: Optional[List[str]] = None,
+        expand: Optional[str] = None,
+        page_size: int = 100,
+        on_page: Optional[Callable[[List[Dict]], None]] = None,
+        api_version: int = 3
+    ) -> List[Dict]:
+        """
+        Run a JQL search following nextPageToken until the last page
+
+        POST /rest/api/{2|3}/search/jql (enhanced search; JQL travels in the body
+        so long key lists never hit URL length limits)
+
+        Args:
+            jql: JQL query
+            fields: Fields to return
+            expand: Optional expand string (e.g. "changelog")
+            page_size: maxResults per page (JIRA may return fewer)
+            on_page: Optional callback receiving each page's issues as it
+                     arrives; when given, issues are not accumulated
+            api_version: 3 returns rich text (description, comments, text
+                         custom fields) as ADF documents; 2 returns the plain
+                         strings the Service Desk API and the issue cache use
+
+        Returns:
+            List of raw issue dicts (empty when on_page is used)
+
+        Raises:
+            IncompleteResultError: a page request failed (pages already passed
+                to on_page are not the full result either)
+        """
+        url = f"{self.site}/rest/api/{api_version}/search/jql"
+        body: Dict[str, Any] = {"jql": jql, "maxResults": page_size}
+        if fields:
+            body["fields"] = list(fields)
+        if expand:
+            body["expand"] = expand
+
+        issues: List[Dict] = []
+        pages = 0
+        while True:
+            data = _check_page(await self.request_json("POST", url, json=dict(body)), f"page {pages + 1}")
+            pages += 1
+            page = data.get("issues", [])
+            if on_page is not None:
+                on_page(page)
+            else:
+                issues.extend(page)
+            token = data.get("nextPageToken")
+            if not page or not token or data.get("isLast", False):
+                break
+            body["nextPageToken"] = token
+        return issues
+
+    async def get_issues_by_keys(
+        self,
+        keys: List[str],
+        fields: Optional[List[str]] = None,
+        expand: Optional[str] = None,
+        chunk_size: int = 100,
+        on_page: Optional[Callable[[List[Dict]], None]] = None,
+        api_version: int = 3
+    ) -> List[Dict]:
+        """
+        Fetch issues by key in bounded `key in (...)` chunks searched concurrently
+
+        Args:
+            keys: Issue keys
+            fields: Fields to return
+            expand: Optional expand string
+            chunk_size: Max keys per JQL chunk
+            on_page: Optional per-page callback (see search_jql)
+            api_version: REST API version of the search (see search_jql)
+
+        Returns:
+            List of raw issue dicts (empty when on_page is used)
+
+        Raises:
+            IncompleteResultError: a page of any chunk failed
+        """
+        chunk_size = max(1, chunk_size)
+        chunks = [keys[i:i + chunk_size] for i in range(0, len(keys), chunk_size)]
+        results = await asyncio.gather(*(
+            self.search_jql(
+                f"key in ({','.join(chunk)})",
+                fields=fields,
+                expand=expand,
+                page_size=len(chunk),
+                on_page=on_page,
+                api_version=api_version
+            )
+            for chunk in chunks
+        ))
+        return [issue for chunk_issues in results for issue in chunk_issues]
+
+def _check_page(page: Any, where: str) -> Dict:
+    """A fetched page, or IncompleteResultError when its request failed"""
+    if not isinstance(page, dict):
+        raise IncompleteResultError(f"JIRA page ({where}) could not be fetched; result would be incomplete")
+    return page
+
+# ============================================================
+# SYNC WRAPPERS
+# ============================================================
+
+def run_sync(coro: Awaitable) -> Any:
+    """
+    Run a coroutine to completion from synchronous code
+
+    Uses asyncio.run() on the calling thread, or a helper thread when the
+    calling thread already has a running event loop.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    result: Dict[str, Any] = {}
+
+    def runner():
+        try:
+            result["value"] = asyncio.run(coro)
+        except BaseException as e:  # re-raised in caller thread
+            result["error"] = e
+
+    thread = threading.Thread(target=runner, daemon=True)
+    thread.start()
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result.get("value")
+
+def fetch_queue_issues(
+    site: str,
+    headers: Dict[str, str],
+    desk_id: str,
+    queue_id: str,
+    page_limit: int = 50,
+    max_concurrency: Optional[int] = None
+) -> Tuple[List[Dict], int]:
+    """
+    Sync wrapper: fetch all issues of a Service Desk queue with concurrent pagination
+
+    Returns:
+        Tuple of (issues, number of HTTP requests made)
+    """
+    async def _run():
+        async with AsyncJiraClient(site, headers, max_concurrency=max_concurrency) as client:
+            issues = await client.get_queue_issues(desk_id, queue_id, page_limit=page_limit)
+            return issues, client.request_count
+
+    return run_sync(_run())
+
+def search_all_issues(
+    site: str,
+    headers: Dict[str, str],
+    jql: str,
+    fields: Optional[List[str]] = None,
+    page_size: int = 100,
+    expand: Optional[str] = None,
+    max_concurrency: Optional[int] = None
+) -> List[Dict]:
+    """Sync wrapper: run a JQL search fetching all pages concurrently"""
+    async def _run():
+        async with AsyncJiraClient(site, headers, max_concurrency=max_concurrency) as client:
+            return await client.search_all_issues(jql, fields=fields, page_size=page_size, expand=expand)
+
+    return run_sync(_run())
+
+def fetch_issues_by_keys(
+    site: str,
+    headers: Dict[str, str],
+    keys: List[str],
+    fields: Optional[List[str]] = None,
+    expand: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+    on_page: Optional[Callable[[List[Dict]], None]] = None,
+    max_concurrency: Optional[int] = None,
+    api_version: int = 3
+) -> Tuple[List[Dict], int]:
+    """
+    Sync wrapper: fetch issues by key in concurrent JQL chunks (see get_issues_by_keys)
+
+    on_page runs on the event loop thread, one page at a time, so callers can
+    merge results into a plain dict without locking.
+
+    Returns:
+        Tuple of (issues, number of HTTP requests made); issues is empty when
+        on_page is given
+    """
+    if chunk_size is None:
+        from utils.config import config
+        chunk_size = config.jira.enrich_chunk_size
+
+    async def _run():
+        async with AsyncJiraClient(site, headers, max_concurrency=max_concurrency) as client:
+            issues = await client.get_issues_by_keys(
+                keys, fields=fields, expand=expand, chunk_size=chunk_size, on_page=on_page,
+                api_version=api_version
+            )
+            return issues, client.request_count
+
+    return run_sync(_run())
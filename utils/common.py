@@ -10,13 +10,20 @@ from streamlit.components.v1 import html as st_html
 from functools import wraps
 import logging
 import base64
+import copy
+import hashlib
 import json
 from datetime import datetime, timezone
 from typing import Tuple, Dict, Optional, List, Any, Union
 import pandas as pd
 import re
+import time
 from requests.exceptions import RequestException
 
+from utils.http_pool import get_session_pool
+from utils.rate_limiter import get_rate_limiter, RETRYABLE_STATUS, IDEMPOTENT_METHODS
+from utils.single_flight import get_single_flight
+
 # Project type labels
 TYPE_LABELS = {
     "software": "Software",
@@ -36,6 +43,15 @@ class JiraApiError(Exception):
         self.response = response
         super().__init__(self.message)
 
+class IncompleteResultError(JiraApiError):
+    """Raised when a page of a paginated JIRA listing could not be fetched (the result would be partial)"""
+
+class JiraRateLimitError(JiraApiError):
+    """Raised when JIRA keeps throttling a request (HTTP 429) after all retries"""
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        self.retry_after = retry_after
+        super().__init__(message, status_code=429)
+
 def invalidate_api_cache():
     """
     Invalidate all API-related caches.
@@ -132,9 +148,39 @@ def _get_auth_header(email: str, api_token: str) -> Dict[str, str]:
         "Content-Type": "application/json"
     }
 
+def _normalize_params(params: Any) -> Any:
+    """
+    Normalize query params: convert list values (e.g., fields=['a','b']) to comma-separated strings
+    
+    Args:
+        params: Query params (non-dict values are returned unchanged)
+        
+    Returns:
+        Normalized params
+    """
+    if not isinstance(params, dict):
+        return params
+    normalized = {}
+    for k, v in params.items():
+        if isinstance(v, (list, tuple)):
+            normalized[k] = ",".join(map(str, v))
+        else:
+            normalized[k] = v
+    return normalized
+
+def _request_key(method: str, url: str, headers: Dict[str, str], params: Any) -> Tuple:
+    """Identity of a request for single-flight coalescing (credentials are hashed)"""
+    auth = hashlib.sha1((headers or {}).get("Authorization", "").encode("utf-8")).hexdigest()
+    if isinstance(params, dict):
+        params = tuple(sorted((str(k), str(v)) for k, v in params.items()))
+    return (method.upper(), url, params, auth)
+
 def _make_request(method: str, url: str, headers: Dict[str, str], **kwargs) -> Optional[Dict]:
     """
-    Make HTTP request to JIRA API
+    Make HTTP request to JIRA API through the shared connection pool
+    
+    Identical concurrent GETs (same URL, params and credentials) are coalesced:
+    only one goes to JIRA and the others share a copy of its response.
     
     Args:
         method: HTTP method (GET, POST, etc)
@@ -145,27 +191,57 @@ def _make_request(method: str, url: str, headers: Dict[str, str], **kwargs) -> O
     Returns:
         JSON response data or None if request fails
         
+    Raises:
+        JiraRateLimitError: JIRA still answers 429 after JiraConfig.max_retries
+                            Retry-After-aware retries (so callers don't mistake
+                            throttling for "no data")
+        
     Note: 403 Forbidden errors (permission issues) are silently skipped
     """
-    try:
-        # Normalize params: convert list values (e.g., fields=['a','b']) to comma-separated strings
-        params = kwargs.get('params')
-        if isinstance(params, dict):
-            normalized = {}
-            for k, v in params.items():
-                if isinstance(v, (list, tuple)):
-                    normalized[k] = ",".join(map(str, v))
-                else:
-                    normalized[k] = v
-            kwargs['params'] = normalized
-
-        response = requests.request(
-            method=method,
-            url=url,
-            headers=headers,
-            timeout=30,
-            **kwargs
+    if 'params' in kwargs:
+        kwargs['params'] = _normalize_params(kwargs['params'])
+
+    if method.upper() == "GET" and not ({'data', 'json', 'files'} & kwargs.keys()):
+        key = _request_key(method, url, headers, kwargs.get('params'))
+        return get_single_flight("jira_get", copy_result=copy.deepcopy).do(
+            key, _send_request, method, url, headers, **kwargs
         )
+    return _send_request(method, url, headers, **kwargs)
+
+def _send_request(method: str, url: str, headers: Dict[str, str], **kwargs) -> Optional[Dict]:
+    """Send one request (rate limited, retried on throttling); see _make_request"""
+    limiter = get_rate_limiter()
+    try:
+        attempt = 0
+        while True:
+            # Process-wide token bucket shared by every thread
+            limiter.acquire()
+            # Shared keep-alive pool (per-host sessions, (connect, read) timeouts from JiraConfig)
+            response = get_session_pool().request(
+                method,
+                url,
+                headers=headers,
+                **kwargs
+            )
+            retry_after = limiter.on_response(response.status_code, response.headers)
+            status = response.status_code
+            retryable = status == 429 or (status in RETRYABLE_STATUS and method.upper() in IDEMPOTENT_METHODS)
+            if not retryable:
+                break
+            if attempt < limiter.max_retries:
+                delay = limiter.backoff_delay(attempt, retry_after)
+                logging.warning(f"HTTP {status} for {method} {url}; retry {attempt + 1}/{limiter.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+                attempt += 1
+                continue
+            if status == 429:
+                limiter.record_exhausted()
+                raise JiraRateLimitError(
+                    f"JIRA rate limit exceeded for {method} {url} after {attempt} retries",
+                    retry_after=retry_after
+                )
+            break
+
         response.raise_for_status()
         try:
             return response.json()
@@ -301,3 +377,40 @@ def extract_project_key(url: str) -> str:
             return part
 
     return "UNKNOWN"
+
+# Inline nodes of Atlassian Document Format (joined without separators)
+_ADF_INLINE_NODES = {'text', 'hardBreak', 'mention', 'emoji', 'inlineCard', 'date', 'status'}
+
+def adf_to_text(node: Any) -> str:
+    """
+    Plain text of a JIRA rich-text value
+
+    Strings (v2 API) are returned as is. Atlassian Document Format (v3 API)
+    is flattened: inline nodes of a block are concatenated (hardBreak as a
+    newline), blocks are separated by a blank line.
+
+    Args:
+        node: String, ADF node or list of ADF nodes (None gives "")
+
+    Returns:
+        Plain text string
+    """
+    if isinstance(node, str):
+        return node
+    if isinstance(node, dict):
+        kind = node.get('type')
+        if kind == 'text':
+            return node.get('text', '')
+        if kind == 'hardBreak':
+            return '\n'
+        if kind in _ADF_INLINE_NODES:
+            return (node.get('attrs') or {}).get('text', '')
+        children = node.get('content') or []
+    elif isinstance(node, list):
+        children = node
+    else:
+        return ''
+    texts = [adf_to_text(child) for child in children]
+    if all(isinstance(child, dict) and child.get('type') in _ADF_INLINE_NODES for child in children):
+        return ''.join(texts)
+    return '\n\n'.join(text for text in texts if text)
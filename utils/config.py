@@ -5,7 +5,7 @@ Configuration management for the application.
 
 from typing import Any, Dict, Optional
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 # Load environment variables from .env file
 from dotenv import load_dotenv
@@ -48,6 +48,20 @@ class JiraConfig:
     retry_backoff: list[int] = (1, 2, 4)
     default_page_size: int = 50
     max_page_size: int = 100
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    pool_connections: int = 10
+    pool_maxsize: int = 20
+    host_pool_sizes: str = ""  # "host=size,host2=size" per-host pool overrides
+    max_concurrency: int = 8   # Max concurrent page requests per paged fetch
+    enrich_chunk_size: int = 100   # Issue keys per JQL enrichment chunk
+    delta_sync: bool = True    # Refresh queues with updated-since JQL instead of full reloads
+    full_resync_interval: int = 3600   # Seconds before a delta-synced queue is fully reloaded
+    bulk_sync: bool = True     # Project sync: one `project = X` JQL search, queues read as key lists
+    bulk_page_size: int = 1000 # maxResults of the bulk search (JIRA clamps to what the fields allow)
+    rate_limit: float = 10.0   # Sustained requests/second shared by the whole process
+    rate_limit_burst: int = 20
+    rate_limit_min: float = 0.5
 
 @dataclass
 class UserConfig:
@@ -65,6 +79,23 @@ class CacheConfig:
     enabled: bool = True
     default_ttl: int = 900  # 15 minutes (was 5 - increased for performance)
     max_ttl: int = 3600    # 1 hour
+    snapshot_ttl: int = 30          # Queue snapshots younger than this are served as is
+    snapshot_max_stale: int = 900   # Older snapshots are served while refreshing in background
+    snapshot_max_entries: int = 64  # Queues held in memory (snapshots and delta state), least recently used evicted
+    record_memo_size: int = 20000   # Formatted issue records memoized across queue loads (LRU)
+    issue_log: bool = True          # Export raw issues to the segmented data/cache/issue_log on sync (changed ones only)
+    sync_workers: int = 2           # Project syncs run concurrently in the background (utils.sync_jobs)
+    embedding_dtype: str = "float32"  # Storage dtype of data/cache/embeddings (float32, float16, int8)
+
+@dataclass
+class EmbeddingConfig:
+    """Shared sentence-embedding model (utils.embedding_provider)"""
+    backend: str = "sentence-transformers"
+    model_name: str = "paraphrase-multilingual-MiniLM-L12-v2"
+    max_batch: int = 64         # Max texts per model call (larger calls bypass the batching queue)
+    max_wait_ms: float = 0.0    # Extra wait for queued requests to share a batch (0: only while the model is busy)
+    onnx_dir: str = ""          # Exported int8 ONNX models for backend "onnx-int8" (default: data/models/onnx)
+    onnx_threads: int = 0       # ONNX Runtime intra-op threads (0: runtime default)
 
 @dataclass
 class LoggingConfig:
@@ -83,6 +114,7 @@ class AppConfig:
     user: UserConfig
     env_label: str = "PROD"
     env_color: str = "#2e7d32"
+    embeddings: EmbeddingConfig = field(default_factory=EmbeddingConfig)
 
     @classmethod
     def from_env(cls) -> 'AppConfig':
@@ -96,12 +128,33 @@ class AppConfig:
                 max_retries=int(os.getenv("JIRA_MAX_RETRIES", "3")),
                 retry_backoff=[int(x) for x in os.getenv("JIRA_RETRY_BACKOFF", "1,2,4").split(",")],
                 default_page_size=int(os.getenv("JIRA_DEFAULT_PAGE_SIZE", "50")),
-                max_page_size=int(os.getenv("JIRA_MAX_PAGE_SIZE", "100"))
+                max_page_size=int(os.getenv("JIRA_MAX_PAGE_SIZE", "100")),
+                connect_timeout=float(os.getenv("JIRA_CONNECT_TIMEOUT", "5")),
+                read_timeout=float(os.getenv("JIRA_READ_TIMEOUT", os.getenv("JIRA_REQUEST_TIMEOUT", "30"))),
+                pool_connections=int(os.getenv("JIRA_POOL_CONNECTIONS", "10")),
+                pool_maxsize=int(os.getenv("JIRA_POOL_MAXSIZE", "20")),
+                host_pool_sizes=os.getenv("JIRA_HOST_POOL_SIZES", ""),
+                max_concurrency=int(os.getenv("JIRA_MAX_CONCURRENCY", "8")),
+                enrich_chunk_size=int(os.getenv("JIRA_ENRICH_CHUNK_SIZE", "100")),
+                delta_sync=os.getenv("JIRA_DELTA_SYNC", "true").lower() == "true",
+                full_resync_interval=int(os.getenv("JIRA_FULL_RESYNC_INTERVAL", "3600")),
+                bulk_sync=os.getenv("JIRA_BULK_SYNC", "true").lower() == "true",
+                bulk_page_size=int(os.getenv("JIRA_BULK_PAGE_SIZE", "1000")),
+                rate_limit=float(os.getenv("JIRA_RATE_LIMIT", "10")),
+                rate_limit_burst=int(os.getenv("JIRA_RATE_LIMIT_BURST", "20")),
+                rate_limit_min=float(os.getenv("JIRA_RATE_LIMIT_MIN", "0.5"))
             ),
             cache=CacheConfig(
                 enabled=os.getenv("CACHE_ENABLED", "true").lower() == "true",
                 default_ttl=int(os.getenv("CACHE_DEFAULT_TTL", "300")),
-                max_ttl=int(os.getenv("CACHE_MAX_TTL", "3600"))
+                max_ttl=int(os.getenv("CACHE_MAX_TTL", "3600")),
+                snapshot_ttl=int(os.getenv("QUEUE_SNAPSHOT_TTL", "30")),
+                snapshot_max_stale=int(os.getenv("QUEUE_SNAPSHOT_MAX_STALE", "900")),
+                snapshot_max_entries=int(os.getenv("QUEUE_SNAPSHOT_MAX_ENTRIES", "64")),
+                record_memo_size=int(os.getenv("RECORD_MEMO_SIZE", "20000")),
+                issue_log=os.getenv("ISSUE_CACHE_LOG", "true").lower() == "true",
+                sync_workers=int(os.getenv("SYNC_MAX_WORKERS", "2")),
+                embedding_dtype=os.getenv("EMBEDDING_STORE_DTYPE", "float32").lower()
             ),
             logging=LoggingConfig(
                 level=os.getenv("LOG_LEVEL", "INFO"),
@@ -118,7 +171,15 @@ class AppConfig:
                 jira_token=os.getenv("JIRA_API_TOKEN")
             ),
             env_label=os.getenv("ENV_LABEL", "PROD"),
-            env_color=os.getenv("ENV_COLOR", "#2e7d32")
+            env_color=os.getenv("ENV_COLOR", "#2e7d32"),
+            embeddings=EmbeddingConfig(
+                backend=os.getenv("EMBEDDING_BACKEND", "sentence-transformers").lower(),
+                model_name=os.getenv("EMBEDDING_MODEL", "paraphrase-multilingual-MiniLM-L12-v2"),
+                max_batch=int(os.getenv("EMBEDDING_MAX_BATCH", "64")),
+                max_wait_ms=float(os.getenv("EMBEDDING_MAX_WAIT_MS", "0")),
+                onnx_dir=os.getenv("EMBEDDING_ONNX_DIR", ""),
+                onnx_threads=int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))
+            )
         )
 
     def validate(self) -> list[str]:
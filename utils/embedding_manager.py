@@ -1,57 +1,148 @@
 """
 Embedding Manager - Gestor de embeddings para búsqueda semántica
 Cachea embeddings de tickets y proporciona búsqueda por similitud
+
+Los embeddings se guardan en el store compartido (utils.embedding_store,
+nombre "embedding_manager"): matriz mapeada en memoria + keys + preview de
+texto, en lugar de listas de floats en JSON. Los embeddings se generan con el
+modelo compartido del proceso (utils.embedding_provider); un store generado
+con otro modelo se regenera.
+
+Las búsquedas son por lotes (find_similar_batch / find_duplicates): N
+consultas contra la matriz normalizada en una sola multiplicación, con
+máscaras precalculadas por proyecto/estado/fecha (utils.similarity_search).
+
+find_similar_issues consulta un índice IVF (utils.ann_index) sobre las filas
+del store en lugar de puntuar todos los embeddings. El índice se construye (o
+se extiende con las filas agregadas) en cada save_cache() y se persiste junto
+al store (embedding_manager.ivf.npz); los embeddings pendientes se puntúan
+exactamente.
 """
 
 import json
 import gzip
 import logging
-import os
-from typing import List, Dict, Optional, Tuple
+from typing import Any, List, Dict, Iterable, Optional, Sequence, Tuple
 from pathlib import Path
 from datetime import datetime
 
+import numpy as np
+
+from utils.ann_index import IVFIndex, normalize_rows
+from utils.common import adf_to_text
+from utils.embedding_provider import get_embedding_provider
+from utils.embedding_store import EmbeddingSet, append_embeddings, content_hash, get_embedding_set, write_embeddings
+from utils.issue_columns import IssueColumns
+from utils.similarity_search import SearchMasks, search_batch
+
 logger = logging.getLogger(__name__)
 
-# Ruta al cache de embeddings
-EMBEDDINGS_CACHE_PATH = Path(__file__).parent.parent / "data" / "cache" / "embeddings.json"
+# Store de embeddings (data/cache/embeddings/embedding_manager.*)
+EMBEDDINGS_DIR = Path(__file__).parent.parent / "data" / "cache" / "embeddings"
+EMBEDDINGS_STORE_NAME = "embedding_manager"
+ANN_INDEX_PATH = EMBEDDINGS_DIR / f"{EMBEDDINGS_STORE_NAME}.ivf.npz"
 ISSUES_CACHE_PATH = Path(__file__).parent.parent / "data" / "cache" / "msm_issues.json.gz"  # Compressed cache
 
 class EmbeddingManager:
     """Gestor de embeddings con cache persistente"""
     
     def __init__(self):
-        self.        self.embeddings_cache: Dict[str, Dict] = {}
+        # Modelo compartido del proceso (una sola copia, pedidos en lotes)
+        self.provider = get_embedding_provider()
+        # Versión persistida (memory-mapped, compartida entre workers)
+        self.store: Optional[EmbeddingSet] = None
+        # Índice ANN sobre las filas del store (construido en save_cache o en la primera consulta)
+        self.index: Optional[IVFIndex] = None
+        # Embeddings generados desde el último save_cache(): key -> {'embedding', 'text', 'hash', 'generated_at'}
+        self.pending: Dict[str, Dict] = {}
+        self._pending_version = 0
+        # Estado de búsqueda memoizado (matriz normalizada, keys, máscaras)
+        self._search_cache: Optional[Tuple[Tuple, Dict[str, Any]]] = None
+        # El store guardado es de otro modelo: el próximo save_cache() lo reescribe
+        self._replace_store = False
         self.load_cache()
     
+    def __len__(self) -> int:
+        """Cantidad de issues con embedding (guardados + pendientes)"""
+        stored = 0 if self.store is None else sum(1 for k in self.store.live_hashes() if k not in self.pending)
+        return stored + len(self.pending)
+    
+    def has_embedding(self, issue_key: str) -> bool:
+        return issue_key in self.pending or (self.store is not None and self.store.row_of(issue_key) is not None)
+    
     def load_cache(self):
-        """Cargar cache de embeddings desde disco"""
-        if EMBEDDINGS_CACHE_PATH.exists():
-            try:
-                with open(EMBEDDINGS_CACHE_PATH, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.embeddings_cache = data.get('embeddings', {})
-                    logger.info(f"✅ Loaded {len(self.embeddings_cache)} cached embeddings")
-            except Exception as e:
-                logger.error(f"Error loading embeddings cache: {e}")
-                self.embeddings_cache = {}
+        """Abrir el store de embeddings (descartado si lo generó otro modelo)"""
+        try:
+            self.store = get_embedding_set(EMBEDDINGS_STORE_NAME, EMBEDDINGS_DIR)
+        except Exception as e:
+            logger.error(f"Error loading embeddings cache: {e}")
+            self.store = None
+        if self.store is not None and self.store.model != self.provider.model_tag:
+            # Embeddings de otro modelo (ej: Ollama) no son comparables con las consultas
+            logger.warning(f"Embeddings cache was generated with {self.store.model}, "
+                           f"regenerating with {self.provider.model_tag}")
+            self.store = None
+            self._replace_store = True
+        if self.store is not None:
+            logger.info(f"✅ Loaded {self.store.live_count} cached embeddings ({self.store.dtype})")
         else:
             logger.info("No embeddings cache found, will create new one")
-            self.embeddings_cache = {}
     
     def save_cache(self):
-        """Guardar cache de embeddings a disco"""
+        """Añadir los embeddings pendientes al store (reemplaza las filas de los mismos issues)"""
+        if not self.pending:
+            return
+        from utils.config import config
         try:
-            EMBEDDINGS_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
-            with open(EMBEDDINGS_CACHE_PATH, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'embeddings': self.embeddings_cache,
-                    'updated_at': datetime.now().isoformat(),
-                    'count': len(self.embeddings_cache)
-                }, f, ensure_ascii=False, indent=2)
-            logger.info(f"✅ Saved {len(self.embeddings_cache)} embeddings to cache")
+            keys = list(self.pending)
+            entries = [self.pending[key] for key in keys]
+            # Filas unitarias: la similitud coseno es un producto punto
+            vectors = normalize_rows(np.array([entry['embedding'] for entry in entries], dtype=np.float32))
+            hashes = [entry.get('hash', 0) for entry in entries]
+            records = [{'text': entry.get('text', ''), 'generated_at': entry.get('generated_at')} for entry in entries]
+            if self._replace_store or (self.store is not None and self.store.live_count
+                                       and self.store.dim != vectors.shape[1]):
+                # Otro modelo: los embeddings guardados ya no son comparables
+                write_embeddings(EMBEDDINGS_STORE_NAME, keys, vectors, hashes=hashes, records=records,
+                                 model=self.provider.model_tag, dtype=config.cache.embedding_dtype,
+                                 normalized=True, directory=EMBEDDINGS_DIR)
+            else:
+                append_embeddings(EMBEDDINGS_STORE_NAME, keys, vectors, hashes=hashes, records=records,
+                                  model=self.provider.model_tag, dtype=config.cache.embedding_dtype,
+                                  normalized=True, directory=EMBEDDINGS_DIR)
+            self.store = get_embedding_set(EMBEDDINGS_STORE_NAME, EMBEDDINGS_DIR)
+            self._replace_store = False
+            self.pending = {}
+            self._pending_version += 1
+            logger.info(f"✅ Saved {len(keys)} embeddings to cache ({self.store.live_count} total)")
         except Exception as e:
             logger.error(f"Error saving embeddings cache: {e}")
+            return
+        self._ann_index()
+    
+    def _ann_index(self) -> Optional[IVFIndex]:
+        """
+        Índice IVF de las filas del store: extendido con las filas agregadas,
+        cargado del disco o reconstruido cuando es de otra versión del store,
+        y persistido cuando cambió. None si el store está vacío o no normalizado.
+        """
+        store = self.store
+        if store is None or not store.live_count or not store.normalized:
+            return None
+        index = self.index
+        if index is not None and index.tag == store.version and len(index.vectors) <= len(store):
+            index.extend(store.vectors)
+        else:
+            index = IVFIndex.load(ANN_INDEX_PATH, store.vectors, tag=store.version)
+        if index is None:
+            index = IVFIndex.build(store.vectors, tag=store.version)
+        if index.persisted_size != len(store):
+            try:
+                index.save(ANN_INDEX_PATH)
+            except Exception as e:
+                logger.error(f"Failed to save ANN index: {e}")
+        self.index = index
+        return index
     
     def get_issue_text(self, issue: Dict) -> str:
         """
@@ -71,13 +162,13 @@ class EmbeddingManager:
         elif 'fields' in issue and 'summary' in issue['fields']:
             parts.append(issue['fields']['summary'])
         
-        # Description
+        # Description (plain text; older syncs stored ADF documents)
         if 'description' in issue and issue['description']:
-            parts.append(str(issue['description'])[:500])  # Limitar a 500 chars
+            parts.append(adf_to_text(issue['description'])[:500])  # Limitar a 500 chars
         elif 'fields' in issue and 'description' in issue['fields']:
             desc = issue['fields']['description']
             if desc:
-                parts.append(str(desc)[:500])
+                parts.append(adf_to_text(desc)[:500])
         
         # Type
         if 'issue_type' in issue:
@@ -101,9 +192,12 @@ class EmbeddingManager:
             Embedding o None si falla
         """
         # Verificar cache
-        if issue_key in self.embeddings_cache:
-            cached = self.embeddings_cache[issue_key]
-            return cached.get('embedding')
+        if issue_key in self.pending:
+            return self.pending[issue_key]['embedding']
+        if self.store is not None:
+            stored = self.store.get(issue_key)
+            if stored is not None:
+                return stored.tolist()
         
         # Si no hay datos del issue, intentar cargarlos
         if not issue_data:
@@ -113,28 +207,51 @@ class EmbeddingManager:
                 return None
         
         # Generar embedding
-        text = self.get_issue_text(issue_data)
-        if not text:
-            logger.warning(f"No text extracted for {issue_key}")
-            return None
+        if self.generate_embeddings({issue_key: issue_data}):
+            logger.info(f"✅ Generated embedding for {issue_key}")
+            return self.pending[issue_key]['embedding']
+        return None
+    
+    def generate_embeddings(self, issues: Dict[str, Dict]) -> int:
+        """
+        Generar (en una sola llamada al modelo) los embeddings de varios issues
         
-        if not self.ollama.is_available():
-            logger.warning("Ollama not available, cannot generate embedding")
-            return None
+        Args:
+            issues: Dict issue key -> datos del issue
+        
+        Returns:
+            Cantidad de embeddings generados (quedan pendientes hasta save_cache())
+        """
+        texts = {}
+        for issue_key, issue in issues.items():
+            text = self.get_issue_text(issue)
+            if text:
+                texts[issue_key] = text
+            else:
+                logger.warning(f"No text extracted for {issue_key}")
+        if not texts:
+            return 0
         
-        embedding = self.ollama.generate_embedding(text)
+        if not self.provider.is_available():
+            logger.warning("Embedding model not available, cannot generate embeddings")
+            return 0
+        try:
+            vectors = self.provider.encode(list(texts.values()))
+        except Exception as e:
+            logger.error(f"Error generating embeddings: {e}")
+            return 0
         
-        if embedding:
+        generated_at = datetime.now().isoformat()
+        for (issue_key, text), vector in zip(texts.items(), vectors):
             # Guardar en cache
-            self.embeddings_cache[issue_key] = {
-                'embedding': embedding,
+            self.pending[issue_key] = {
+                'embedding': vector.tolist(),
                 'text': text[:200],  # Preview
-                'generated_at': datetime.now().isoformat()
+                'hash': content_hash(text),
+                'generated_at': generated_at
             }
-            logger.info(f"✅ Generated embedding for {issue_key}")
-            return embedding
-        
-        return None
+        self._pending_version += 1
+        return len(texts)
     
     def find_issue_in_cache(self, issue_key: str) -> Optional[Dict]:
         """
@@ -146,34 +263,64 @@ class EmbeddingManager:
         Returns:
             Datos del issue o None
         """
-        # Try compressed version first
-        if ISSUES_CACHE_PATH.exists():
-            try:
-                with gzip.open(ISSUES_CACHE_PATH, 'rt', encoding='utf-8') as f:
-                    data = json.load(f)
-                    issues = data.get('issues', [])
-                    
-                    for issue in issues:
-                        if issue.get('key') == issue_key:
-                            return issue
-            except Exception as e:
-                logger.error(f"Error reading compressed issues cache: {e}")
+        return self.find_issues_in_cache([issue_key]).get(issue_key)
+    
+    def find_issues_in_cache(self, issue_keys: List[str]) -> Dict[str, Dict]:
+        """
+        Buscar varios issues en el cache con una sola consulta
+        
+        Args:
+            issue_keys: Keys de los issues
+        
+        Returns:
+            Dict key -> datos del issue (solo los encontrados)
+        """
+        # Shared snapshot / indexed store (filled by IssueCacheManager.sync_project)
+        try:
+            from utils.issue_snapshot import get_issue_source
+            source = get_issue_source()
+            if not source.is_empty():
+                return source.get_many(issue_keys)
+        except Exception as e:
+            logger.error(f"Error reading issue snapshot/store: {e}")
         
-        # Fallback to uncompressed version
+        # Legacy JSON cache (before the first sync to the store)
+        index = self._legacy_index()
+        return {key: index[key] for key in issue_keys if key in index}
+    
+    def _legacy_index(self) -> Dict[str, Dict]:
+        """Key -> issue of the legacy JSON cache, rebuilt only when the file changes"""
+        paths = [p for p in (ISSUES_CACHE_PATH, ISSUES_CACHE_PATH.with_suffix('')) if p.exists()]
+        stamp = tuple((str(p), p.stat().st_mtime) for p in paths)
+        cached = getattr(self, '_legacy_index_cache', None)
+        if cached is None or cached[0] != stamp:
+            index = {issue.get('key'): issue for issue in self._load_legacy_issues() if issue.get('key')}
+            self._legacy_index_cache = (stamp, index)
+        return self._legacy_index_cache[1]
+    
+    def _load_legacy_issues(self) -> List[Dict]:
+        """Issues of the legacy msm_issues.json(.gz) cache (compressed first)"""
         uncompressed_path = ISSUES_CACHE_PATH.with_suffix('')
-        if uncompressed_path.exists():
+        for path, opener in ((ISSUES_CACHE_PATH, gzip.open), (uncompressed_path, open)):
+            if not path.exists():
+                continue
             try:
-                with open(uncompressed_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    issues = data.get('issues', [])
-                    
-                    for issue in issues:
-                        if issue.get('key') == issue_key:
-                            return issue
+                with opener(path, 'rt', encoding='utf-8') as f:
+                    return json.load(f).get('issues', [])
             except Exception as e:
-                logger.error(f"Error reading uncompressed issues cache: {e}")
-        
-        return None
+                logger.error(f"Error reading issues cache {path.name}: {e}")
+        return []
+    
+    def _load_cached_issues(self) -> List[Dict]:
+        """All cached issues: issue snapshot/store, else the legacy JSON cache"""
+        try:
+            from utils.issue_snapshot import get_issue_source
+            source = get_issue_source()
+            if not source.is_empty():
+                return source.load_issues()
+        except Exception as e:
+            logger.error(f"Error reading issue snapshot/store: {e}")
+        return self._load_legacy_issues()
     
     def find_similar_issues(
         self,
@@ -194,40 +341,219 @@ class EmbeddingManager:
         Returns:
             Lista de issues similares con scores
         """
-        if not self.ollama.is_available():
-            logger.warning("Ollama not available, returning empty results")
+        index = self._ann_index()
+        if index is None:
+            return self.find_similar_batch([query_text], top_k, min_similarity, filter_keys=filter_keys)[0]
+        queries = self._embed_queries([query_text])
+        if queries is None or not np.linalg.norm(queries[0]):
             return []
-        
-        # Generar embedding para query
-        query_embedding = self.ollama.generate_embedding(query_text)
-        if not query_embedding:
-            logger.error("Failed to generate query embedding")
+        query = queries[0]
+        store = self.store
+        if query.shape[0] != store.dim:
+            logger.error(f"Query embedding dimension {query.shape[0]} != stored {store.dim}")
             return []
         
-        # Calcular similitudes
-        results = []
-        for issue_key, cached in self.embeddings_cache.items():
-            # Filtrar si es necesario
-            if filter_keys and issue_key not in filter_keys:
-                continue
-            
-            embedding = cached.get('embedding')
-            if not embedding:
-                continue
-            
-            similarity = self.ollama.cosine_similarity(query_embedding, embedding)
-            
-            if similarity >= min_similarity:
-                results.append({
-                    'issue_key': issue_key,
-                    'similarity': similarity,
-                    'text_preview': cached.get('text', '')
-                })
-        
-        # Ordenar por similitud y tomar top_k
-        results.sort(key=lambda x: x['similarity'], reverse=True)
+        # Filas del store que pueden aparecer: vivas, no reemplazadas por un pendiente, dentro del filtro
+        wanted = set(filter_keys) if filter_keys is not None else None
+        allowed = store.alive.copy()
+        for issue_key in self.pending:
+            row = store.row_of(issue_key)
+            if row is not None:
+                allowed[row] = False
+        if wanted is not None:
+            in_filter = np.zeros(len(store), dtype=bool)
+            in_filter[[row for row in map(store.row_of, wanted) if row is not None]] = True
+            allowed &= in_filter
+        rows, similarities = index.search(query, k=top_k, allowed=None if allowed.all() else allowed)
+        results = [
+            {'issue_key': store.keys[row], 'similarity': float(sim), 'text_preview': store.records[row].get('text', '')}
+            for row, sim in zip(rows, similarities) if sim >= min_similarity
+        ]
+        
+        # Pendientes (aún no guardados): puntuación exacta
+        pending = [(key, entry) for key, entry in self.pending.items() if wanted is None or key in wanted]
+        if pending:
+            vectors = normalize_rows(np.array([entry['embedding'] for _, entry in pending], dtype=np.float32))
+            for (issue_key, entry), sim in zip(pending, vectors @ query):
+                if sim >= min_similarity:
+                    results.append({'issue_key': issue_key, 'similarity': float(sim), 'text_preview': entry.get('text', '')})
+        results.sort(key=lambda r: -r['similarity'])
         return results[:top_k]
     
+    def find_similar_batch(
+        self,
+        query_texts: Sequence[str],
+        top_k: int = 5,
+        min_similarity: float = 0.5,
+        filter_keys: Optional[Iterable[str]] = None,
+        project=None,
+        status=None,
+        created_from=None,
+        created_to=None,
+        exclude_keys: Optional[Sequence[Optional[str]]] = None
+    ) -> List[List[Dict]]:
+        """
+        Buscar issues similares a varios textos en una sola pasada
+        
+        Args:
+            query_texts: Textos de búsqueda
+            top_k / min_similarity / filter_keys: Ver find_similar_issues
+            project / status: Valor o lista de valores
+            created_from / created_to: Rango de fecha de creación (ISO o epoch)
+            exclude_keys: Por consulta, issue key a excluir (ej: el propio ticket)
+        
+        Returns:
+            Por consulta, lista de issues similares con scores
+        """
+        if not query_texts:
+            return []
+        queries = self._embed_queries(query_texts)
+        if queries is None:
+            return [[] for _ in query_texts]
+        return self._search(queries, top_k, min_similarity, exclude_keys,
+                            keys=filter_keys, project=project, status=status,
+                            created_from=created_from, created_to=created_to)
+    
+    def find_duplicates(
+        self,
+        issue_keys: Sequence[str],
+        min_similarity: float = 0.75,
+        top_k: int = 5,
+        project=None,
+        status=None,
+        created_from=None,
+        created_to=None
+    ) -> Dict[str, List[Dict]]:
+        """
+        Posibles duplicados de una cola completa de issues
+        
+        Las consultas son los embeddings guardados de los issues (solo se
+        generan los que faltan), puntuados todos juntos y excluyendo al
+        propio issue.
+        
+        Returns:
+            Dict issue key -> lista de duplicados con scores (vacía si el issue no tiene embedding)
+        """
+        missing = [key for key in issue_keys if not self.has_embedding(key)]
+        if missing:
+            self.generate_embeddings(self.find_issues_in_cache(missing))
+        state = self._search_state()
+        if state is None:
+            return {key: [] for key in issue_keys}
+        found = [key for key in issue_keys if key in state['rows']]
+        rows = np.array([state['rows'][key] for key in found], dtype=np.int64)
+        results = dict.fromkeys(issue_keys, [])
+        if len(rows):
+            similar = self._search(state['matrix'][rows], top_k, min_similarity, found, project=project,
+                                   status=status, created_from=created_from, created_to=created_to)
+            results.update(zip(found, similar))
+        return results
+    
+    def _embed_queries(self, texts: Sequence[str]) -> Optional[np.ndarray]:
+        """Embeddings de los textos de consulta (filas en cero si fallan), None si no hay modelo"""
+        if not self.provider.is_available():
+            logger.warning("Embedding model not available, returning empty results")
+            return None
+        try:
+            return self.provider.encode(texts)
+        except Exception as e:
+            logger.error(f"Failed to generate query embedding: {e}")
+            return None
+    
+    def _search(self, queries: np.ndarray, top_k: int, min_similarity: float,
+                exclude_keys: Optional[Sequence[Optional[str]]] = None, **filters) -> List[List[Dict]]:
+        """Top-k por consulta sobre el estado de búsqueda actual"""
+        state = self._search_state()
+        if state is None:
+            return [[] for _ in queries]
+        if queries.shape[1] != state['matrix'].shape[1]:
+            logger.error(f"Query embedding dimension {queries.shape[1]} != stored {state['matrix'].shape[1]}")
+            return [[] for _ in queries]
+        allowed = self._search_masks(state, filters).mask(**filters)
+        exclude = None
+        if exclude_keys is not None:
+            exclude = np.array([state['rows'].get(key, -1) if key else -1 for key in exclude_keys], dtype=np.int64)
+        # Consultas sin embedding (fila en cero) no devuelven resultados
+        valid = np.linalg.norm(queries, axis=1) > 0
+        rows, similarities = search_batch(state['matrix'], queries, top_k, allowed=allowed, exclude=exclude,
+                                          min_similarity=min_similarity)
+        keys, preview = state['keys'], state['preview']
+        return [
+            [
+                {'issue_key': keys[row], 'similarity': float(sim), 'text_preview': preview(row)}
+                for row, sim in zip(query_rows, query_similarities) if row >= 0
+            ] if ok else []
+            for query_rows, query_similarities, ok in zip(rows, similarities, valid)
+        ]
+    
+    def _search_state(self) -> Optional[Dict[str, Any]]:
+        """
+        Keys, preview(row) y matriz normalizada de todos los embeddings (los
+        pendientes reemplazan a los guardados), memoizados hasta que cambie el
+        store o los pendientes
+        """
+        if self._search_cache is not None:
+            (store, version), state = self._search_cache
+            if store is self.store and version == self._pending_version:
+                return state
+        
+        keys: List[str] = []
+        parts = []
+        stored_rows = np.empty(0, dtype=np.int64)
+        store = self.store
+        if store is not None and store.live_count:
+            live = store.alive.copy()
+            for issue_key in self.pending:
+                row = store.row_of(issue_key)
+                if row is not None:
+                    live[row] = False
+            stored_rows = np.flatnonzero(live)
+            vectors = store.vectors if store.normalized else normalize_rows(store.vectors)
+            keys.extend(store.keys[i] for i in stored_rows)
+            parts.append(vectors if len(stored_rows) == len(store) else vectors[stored_rows])
+        pending = list(self.pending.items())
+        keys.extend(k for k, _ in pending)
+        if pending:
+            parts.append(normalize_rows(np.array([entry['embedding'] for _, entry in pending], dtype=np.float32)))
+        
+        def preview(row: int) -> str:
+            if row < len(stored_rows):
+                return store.records[stored_rows[row]].get('text', '')
+            return pending[row - len(stored_rows)][1].get('text', '')
+        
+        state = None
+        if parts:
+            state = {
+                'keys': keys,
+                'rows': {key: row for row, key in enumerate(keys)},
+                'preview': preview,
+                'matrix': parts[0] if len(parts) == 1 else np.concatenate(parts),
+                'masks': None,
+            }
+        self._search_cache = ((store, self._pending_version), state)
+        return state
+    
+    def _search_masks(self, state: Dict[str, Any], filters: Dict[str, Any]) -> SearchMasks:
+        """
+        Máscaras de búsqueda del estado: proyecto (prefijo de la key) siempre;
+        estado y fecha de creación desde el cache de issues cuando se filtra por ellos
+        """
+        needs_issue_fields = any(filters.get(f) is not None for f in ('status', 'created_from', 'created_to'))
+        masks = state['masks']
+        if masks is None or (needs_issue_fields and 'status' not in masks.columns.categories):
+            values: Dict[str, List[Any]] = {'project': [key.split('-')[0] for key in state['keys']]}
+            if needs_issue_fields:
+                rows = {}
+                try:
+                    from utils.issue_snapshot import get_issue_source
+                    rows = {row['key']: row for row in get_issue_source().rows(['key', 'status', 'created'])}
+                except Exception as e:
+                    logger.error(f"Error reading issue snapshot/store: {e}")
+                values['status'] = [rows.get(key, {}).get('status') for key in state['keys']]
+                values['created'] = [rows.get(key, {}).get('created') for key in state['keys']]
+            masks = state['masks'] = SearchMasks(IssueColumns.from_lists(values, len(state['keys'])), state['keys'])
+        return masks
+    
     def generate_embeddings_for_all_issues(self, limit: Optional[int] = None):
         """
         Generar embeddings para todos los issues en cache
@@ -235,18 +561,15 @@ class EmbeddingManager:
         Args:
             limit: Límite de issues a procesar (None = todos)
         """
-        if not ISSUES_CACHE_PATH.exists():
-            logger.error("Issues cache not found")
-            return
-        
-        if not self.ollama.is_available():
-            logger.error("Ollama not available")
+        if not self.provider.is_available():
+            logger.error("Embedding model not available")
             return
         
         try:
-            with open(ISSUES_CACHE_PATH, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                issues = data.get('issues', [])
+            issues = self._load_cached_issues()
+            if not issues:
+                logger.error("Issues cache not found")
+                return
             
             total = len(issues) if not limit else min(len(issues), limit)
             logger.info(f"🚀 Generating embeddings for {total} issues...")
@@ -254,24 +577,25 @@ class EmbeddingManager:
             processed = 0
             skipped = 0
             
+            batch = {}
             for i, issue in enumerate(issues[:total] if limit else issues):
                 issue_key = issue.get('key')
                 if not issue_key:
                     continue
                 
                 # Skip si ya existe
-                if issue_key in self.embeddings_cache:
+                if self.has_embedding(issue_key):
                     skipped += 1
                     continue
                 
-                # Generar embedding
-                self.get_embedding(issue_key, issue)
-                processed += 1
-                
-                # Guardar cada 100 issues
-                if processed % 100 == 0:
+                batch[issue_key] = issue
+                # Generar y guardar cada 256 issues (una llamada al modelo por lote)
+                if len(batch) == 256:
+                    processed += self.generate_embeddings(batch)
+                    batch = {}
                     self.save_cache()
                     logger.info(f"  Progress: {processed}/{total} ({skipped} skipped)")
+            processed += self.generate_embeddings(batch)
             
             # Guardar final
             self.save_cache()
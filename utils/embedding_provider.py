@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+Embedding Provider Module
+One shared sentence-embedding model per process, behind a batching queue
+
+    provider = get_embedding_provider()
+    vectors = provider.encode(["texto 1", "texto 2"])    # (n, d) float32, unit length
+    vector = provider.embed("texto")                      # (d,)
+    raw = provider.encode(texts, normalize=False)        # model output as is (e.g. Keras inputs)
+
+Every consumer (ML suggester, embedding manager, ML service predictor,
+training scripts) gets its vectors from the same warm model instead of
+loading its own ~400MB copy.
+
+Backends are pluggable: register_backend(name, factory) where
+factory(model_name) returns an object with encode(texts, batch_size) -> (n, d)
+array of raw (unnormalized) model outputs. The backend and model are chosen
+with EMBEDDING_BACKEND / EMBEDDING_MODEL (default: sentence-transformers with
+paraphrase-multilingual-MiniLM-L12-v2) and loaded on first use. "onnx-int8"
+runs an int8-quantized ONNX export of the same model with ONNX Runtime
+(utils.onnx_encoder; optional onnxruntime dependency).
+
+Batching: small encode() calls from concurrent request threads are queued and
+a single worker thread drains the queue, running up to max_batch texts
+through one model call. Requests that arrive while the model is busy share
+the next call; max_wait_ms > 0 additionally holds a batch open for stragglers
+(0 adds no latency to a lone request). Calls of max_batch texts or more
+(indexing, training) are encoded directly.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from utils.ann_index import normalize_rows
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = "sentence-transformers"
+DEFAULT_MODEL = "paraphrase-multilingual-MiniLM-L12-v2"
+
+class SentenceTransformerBackend:
+    """sentence-transformers model (PyTorch)"""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts: Sequence[str], batch_size: int = 64) -> np.ndarray:
+        return self.model.encode(
+            list(texts),
+            batch_size=batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True
+        )
+
+def _onnx_int8_backend(model_name: str):
+    """int8 ONNX Runtime backend (see utils.onnx_encoder)"""
+    from utils.config import config
+    from utils.onnx_encoder import OnnxInt8Backend
+    settings = config.embeddings
+    return OnnxInt8Backend(model_name, settings.onnx_dir or None, settings.onnx_threads)
+
+_BACKENDS: Dict[str, Callable[[str], object]] = {
+    DEFAULT_BACKEND: SentenceTransformerBackend,
+    "onnx-int8": _onnx_int8_backend,
+}
+
+def register_backend(name: str, factory: Callable[[str], object]):
+    """Make a backend selectable by name (factory(model_name) -> backend with encode())"""
+    _BACKENDS[name] = factory
+
+class EmbeddingProvider:
+    """Shared embedding model with a request batching queue (see module docstring)"""
+
+    def __init__(self, backend: str = DEFAULT_BACKEND, model_name: str = DEFAULT_MODEL,
+                 max_batch: int = 64, max_wait_ms: float = 0.0):
+        """
+        Args:
+            backend: Registered backend name
+            model_name: Model loaded by the backend
+            max_batch: Max texts per model call
+            max_wait_ms: How long the worker waits for more queued texts before running a batch
+        """
+        if backend not in _BACKENDS:
+            raise ValueError(f"Unknown embedding backend {backend!r} (available: {sorted(_BACKENDS)})")
+        self.backend_name = backend
+        self.model_name = model_name
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000
+        self._backend = None
+        self._load_lock = threading.Lock()
+        self._model_lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        # Metrics
+        self.texts_encoded = 0
+        self.model_calls = 0
+
+    @property
+    def model_tag(self) -> str:
+        """Tag stored with the vectors this provider produces (differs per backend)"""
+        if self.backend_name == DEFAULT_BACKEND:
+            return self.model_name
+        return f"{self.model_name}+{self.backend_name}"
+
+    @property
+    def backend(self):
+        """The loaded backend (loaded on first use; raises if it cannot be loaded)"""
+        if self._backend is None:
+            with self._load_lock:
+                if self._backend is None:
+                    try:
+                        logger.info(f"Loading embedding model {self.model_name} ({self.backend_name})...")
+                        start = time.perf_counter()
+                        self._backend = _BACKENDS[self.backend_name](self.model_name)
+                        logger.info(f"✓ Embedding model loaded in {time.perf_counter() - start:.1f}s")
+                    except Exception as e:
+                        logger.error(f"Failed to load embedding model {self.model_name} ({self.backend_name}): {e}")
+                        raise
+        return self._backend
+
+    def is_available(self) -> bool:
+        """Whether the model is (or can be) loaded"""
+        try:
+            self.backend
+            return True
+        except Exception:
+            return False
+
+    def encode(self, texts: Sequence[str], normalize: bool = True) -> np.ndarray:
+        """
+        Embeddings of texts
+
+        Args:
+            texts: Texts to embed
+            normalize: Scale rows to unit length (cosine similarity = dot product)
+
+        Returns:
+            (len(texts), d) float32 array
+        """
+        texts = list(texts)
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        if len(texts) >= self.max_batch:
+            vectors = self._run(texts)
+        else:
+            self.backend  # Load errors are raised in the caller, not the worker
+            future: Future = Future()
+            self._queue.put((texts, future))
+            self._ensure_worker()
+            vectors = future.result()
+        return normalize_rows(vectors) if normalize else vectors
+
+    def embed(self, text: str, normalize: bool = True) -> np.ndarray:
+        """Embedding of one text"""
+        return self.encode([text], normalize)[0]
+
+    def _run(self, texts: List[str]) -> np.ndarray:
+        """One model call (model calls are serialized)"""
+        with self._model_lock:
+            vectors = self.backend.encode(texts, batch_size=self.max_batch)
+            self.model_calls += 1
+            self.texts_encoded += len(texts)
+        return np.asarray(vectors, dtype=np.float32)
+
+    def _ensure_worker(self):
+        """Start the batching thread (again, e.g. after a fork)"""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._drain, name="embedding-batcher", daemon=True)
+                self._worker.start()
+
+    def _drain(self):
+        """Worker loop: gather queued requests into batches and encode them together"""
+        while True:
+            pending = [self._queue.get()]
+            size = len(pending[0][0])
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                pending.append(item)
+                size += len(item[0])
+            texts = [text for batch, _ in pending for text in batch]
+            try:
+                vectors = self._run(texts)
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+            start = 0
+            for batch, future in pending:
+                future.set_result(vectors[start:start + len(batch)])
+                start += len(batch)
+
+    def stats(self) -> Dict[str, object]:
+        """Backend, model and batching counters"""
+        return {
+            "backend": self.backend_name,
+            "model": self.model_name,
+            "loaded": self._backend is not None,
+            "texts_encoded": self.texts_encoded,
+            "model_calls": self.model_calls,
+            "queued": self._queue.qsize(),
+        }
+
+# ============================================================
+# SHARED INSTANCE
+# ============================================================
+
+_provider: Optional[EmbeddingProvider] = None
+_provider_lock = threading.Lock()
+
+def get_embedding_provider() -> EmbeddingProvider:
+    """Process-wide embedding provider (configured from utils.config)"""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                from utils.config import config
+                settings = config.embeddings
+                _provider = EmbeddingProvider(settings.backend, settings.model_name,
+                                              settings.max_batch, settings.max_wait_ms)
+    return _provider
@@ -0,0 +1,414 @@
+# -*- coding: utf-8 -*-
+"""
+Embedding Store Module
+Versioned, memory-mapped, appendable embedding matrices shared by the ML consumers
+
+One named store per consumer (e.g. "ml_suggester", "embedding_manager"):
+
+    data/cache/embeddings/<name>.json                   manifest (written last)
+    data/cache/embeddings/<name>-<version>.vectors.bin    (n, dim) raw float32 | float16 | int8 rows
+    data/cache/embeddings/<name>-<version>.scales.bin     per-row float32 scales (int8 only)
+    data/cache/embeddings/<name>-<version>.hashes.bin     uint64 content hash per row (0 = unknown)
+    data/cache/embeddings/<name>-<version>.keys.txt       row keys, one per line
+    data/cache/embeddings/<name>-<version>.records.jsonl  compact per-row metadata, one per line
+    data/cache/embeddings/<name>-<version>.deleted.bin    int64 tombstoned row numbers
+
+The manifest holds the version, model name/version tags, dimension, dtype,
+row/tombstone counts, whether rows are unit-length, and the committed byte
+size of every file. Readers map exactly the committed rows (np.memmap), so
+startup parses no JSON floats and every thread and worker process shares the
+same page-cache pages. float32 matrices are used in place; float16/int8 ones
+are dequantized to float32 on first access.
+
+- write_embeddings() writes a new version; the manifest is replaced
+  atomically, then older versions are deleted (open maps keep their pages)
+- append_embeddings() upserts rows into the current version: files are cut
+  back to their committed size (a crashed append leaves a torn tail), new
+  rows are appended, replaced/deleted keys get tombstones, and the manifest
+  is replaced last. Once tombstones exceed compact_ratio of the rows the
+  live rows are rewritten as a dense new version (compact_embeddings)
+
+get_embedding_set() reopens a store only when its manifest changes.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDINGS_DIR = Path(__file__).resolve().parent.parent / "data" / "cache" / "embeddings"
+
+STORE_DTYPES = ("float32", "float16", "int8")
+COMPACT_RATIO = 0.25    # Tombstoned share of the rows that triggers compaction on append
+
+_FILE_KINDS = ("vectors", "scales", "hashes", "keys", "records", "deleted")
+_SUFFIXES = {
+    "vectors": "vectors.bin", "scales": "scales.bin", "hashes": "hashes.bin",
+    "keys": "keys.txt", "records": "records.jsonl", "deleted": "deleted.bin",
+}
+
+# Writers are serialized per store directory (sync jobs run in threads)
+_write_locks: Dict[str, threading.Lock] = {}
+_write_locks_guard = threading.Lock()
+
+def content_hash(text: str) -> int:
+    """64-bit hash of the text an embedding was computed from"""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+def _write_lock(directory: Path) -> threading.Lock:
+    with _write_locks_guard:
+        return _write_locks.setdefault(str(Path(directory).resolve()), threading.Lock())
+
+def _encode_rows(vectors: np.ndarray, dtype: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Rows in the storage dtype (+ per-row scales for int8)"""
+    if dtype != "int8":
+        return np.ascontiguousarray(vectors.astype(dtype)), None
+    scales = np.abs(vectors).max(axis=1) / 127.0 if len(vectors) else np.empty(0, dtype=np.float32)
+    scales = np.where(scales == 0, 1.0, scales).astype(np.float32)
+    return np.ascontiguousarray(np.round(vectors / scales[:, None]).astype(np.int8)), scales
+
+def _append(path: Path, data: bytes, size: int) -> int:
+    """Cut path back to size, append data, fsync; returns the new size"""
+    with open(path, "r+b" if path.exists() else "wb") as f:
+        f.truncate(size)
+        f.seek(size)
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    return size + len(data)
+
+def _row_bytes(keys: Sequence[str], vectors: np.ndarray, hashes: Optional[Sequence[int]],
+               records: Optional[List[Dict[str, Any]]], dtype: str) -> Dict[str, bytes]:
+    """Serialized rows per file kind"""
+    if any("\n" in key for key in keys):
+        raise ValueError("Embedding keys cannot contain newlines")
+    stored, scales = _encode_rows(vectors, dtype)
+    rows = {
+        "vectors": stored.tobytes(),
+        "hashes": np.array(list(hashes) if hashes is not None else [0] * len(keys), dtype=np.uint64).tobytes(),
+        "keys": "".join(f"{key}\n" for key in keys).encode("utf-8"),
+        "records": "".join(
+            json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+            for record in (records if records is not None else [{}] * len(keys))
+        ).encode("utf-8"),
+    }
+    if scales is not None:
+        rows["scales"] = scales.tobytes()
+    return rows
+
+def _as_matrix(keys: Sequence[str], vectors: np.ndarray,
+               hashes: Optional[Sequence[int]], records: Optional[List[Dict[str, Any]]]) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim != 2:
+        vectors = vectors.reshape(len(keys), -1)
+    for label, column in (("vectors", vectors), ("hashes", hashes), ("records", records)):
+        if column is not None and len(column) != len(keys):
+            raise ValueError(f"{len(keys)} keys for {len(column)} {label}")
+    return vectors
+
+def _save_manifest(directory: Path, manifest: Dict[str, Any]):
+    manifest_path = directory / f"{manifest['name']}.json"
+    tmp = manifest_path.with_name(manifest_path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, manifest_path)
+
+def _read_manifest(name: str, directory: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(Path(directory) / f"{name}.json", "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def write_embeddings(
+    name: str,
+    keys: Sequence[str],
+    vectors: np.ndarray,
+    model: Optional[str] = None,
+    model_version: Optional[str] = None,
+    hashes: Optional[Sequence[int]] = None,
+    records: Optional[List[Dict[str, Any]]] = None,
+    dtype: str = "float32",
+    normalized: bool = False,
+    directory: Path = DEFAULT_EMBEDDINGS_DIR,
+    version: Optional[int] = None
+) -> int:
+    """
+    Write a new version of a store atomically
+
+    Args:
+        name: Store name
+        keys: Row keys (issue keys), unique
+        vectors: (n, dim) embeddings
+        model / model_version: Tags of the encoder that produced the vectors
+        hashes: Content hash per row (see content_hash)
+        records: JSON-serializable metadata per row
+        dtype: Storage dtype (float32, float16 or int8 with per-row scales)
+        normalized: Rows are unit-length (consumers can skip normalization)
+        directory: Store directory
+        version: Version to write (default: ns timestamp)
+
+    Returns:
+        Store version
+    """
+    directory = Path(directory)
+    with _write_lock(directory):
+        return _write_version(name, keys, vectors, model, model_version, hashes, records,
+                              dtype, normalized, directory, version)
+
+def _write_version(name, keys, vectors, model, model_version, hashes, records,
+                   dtype, normalized, directory: Path, version: Optional[int]) -> int:
+    if dtype not in STORE_DTYPES:
+        raise ValueError(f"Unsupported embedding dtype {dtype!r} (use one of {STORE_DTYPES})")
+    directory.mkdir(parents=True, exist_ok=True)
+    version = version or time.time_ns()
+    vectors = _as_matrix(keys, vectors, hashes, records)
+
+    stem = f"{name}-{version}"
+    files = {kind: f"{stem}.{_SUFFIXES[kind]}" for kind in _FILE_KINDS if kind != "scales" or dtype == "int8"}
+    rows = _row_bytes(keys, vectors, hashes, records, dtype)
+    sizes = {kind: _append(directory / files[kind], rows.get(kind, b""), 0) for kind in files}
+
+    now = time.time()
+    dim = int(vectors.shape[1]) if vectors.size else 0
+    _save_manifest(directory, {
+        "name": name,
+        "version": version,
+        "model": model,
+        "model_version": model_version,
+        "dim": dim,
+        "dtype": dtype,
+        "count": len(keys),
+        "deleted": 0,
+        "normalized": normalized,
+        "created_at": now,
+        "updated_at": now,
+        "files": files,
+        "sizes": sizes,
+    })
+
+    # Older versions are no longer referenced (open maps keep their pages)
+    for path in directory.glob(f"{name}-*.*"):
+        if not path.name.startswith(stem + "."):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+    logger.info(f"🧮 Wrote embedding store {name} v{version}: {len(keys)} x {dim} {dtype}")
+    return version
+
+def append_embeddings(
+    name: str,
+    keys: Sequence[str],
+    vectors: np.ndarray,
+    hashes: Optional[Sequence[int]] = None,
+    records: Optional[List[Dict[str, Any]]] = None,
+    delete: Iterable[str] = (),
+    model: Optional[str] = None,
+    model_version: Optional[str] = None,
+    dtype: str = "float32",
+    normalized: bool = False,
+    directory: Path = DEFAULT_EMBEDDINGS_DIR,
+    compact_ratio: float = COMPACT_RATIO
+) -> int:
+    """
+    Upsert rows into the current version of a store (created when missing)
+
+    Live rows of keys being appended or listed in delete are tombstoned.
+    model/model_version/dtype/normalized only apply when the store is created.
+
+    Returns:
+        Store version (a new one when the append triggered compaction)
+    """
+    directory = Path(directory)
+    with _write_lock(directory):
+        manifest = _read_manifest(name, directory)
+        if manifest is None:
+            _write_version(name, [], np.empty((0, 0), dtype=np.float32), model, model_version,
+                           None, None, dtype, normalized, directory, None)
+            manifest = _read_manifest(name, directory)
+        vectors = _as_matrix(keys, vectors, hashes, records)
+        if len(keys) and manifest["dim"] and vectors.shape[1] != manifest["dim"]:
+            raise ValueError(f"Embedding dimension {vectors.shape[1]} != store dimension {manifest['dim']}")
+
+        current = EmbeddingSet(manifest, directory)
+        tombstones = sorted({row for row in map(current.row_of, [*keys, *delete]) if row is not None})
+        if not len(keys) and not tombstones:
+            return manifest["version"]
+
+        rows = _row_bytes(keys, vectors, hashes, records, manifest["dtype"])
+        rows["deleted"] = np.array(tombstones, dtype=np.int64).tobytes()
+        sizes = manifest["sizes"]
+        for kind, data in rows.items():
+            sizes[kind] = _append(directory / manifest["files"][kind], data, sizes[kind])
+        if len(keys) and not manifest["dim"]:
+            manifest["dim"] = int(vectors.shape[1])
+        manifest["count"] += len(keys)
+        manifest["deleted"] += len(tombstones)
+        manifest["updated_at"] = time.time()
+        _save_manifest(directory, manifest)
+
+        if manifest["deleted"] > compact_ratio * manifest["count"]:
+            return _compact(name, directory)
+        return manifest["version"]
+
+def compact_embeddings(name: str, directory: Path = DEFAULT_EMBEDDINGS_DIR) -> Optional[int]:
+    """Rewrite the live rows of a store as a dense new version (None if the store does not exist)"""
+    directory = Path(directory)
+    with _write_lock(directory):
+        if _read_manifest(name, directory) is None:
+            return None
+        return _compact(name, directory)
+
+def _compact(name: str, directory: Path) -> int:
+    current = EmbeddingSet(_read_manifest(name, directory), directory)
+    live = current.live_rows()
+    records = current.records
+    version = _write_version(
+        name, [current.keys[i] for i in live], current.vectors[live], current.model, current.model_version,
+        current.hashes[live].tolist(), [records[i] for i in live], current.dtype, current.normalized, directory, None
+    )
+    logger.info(f"🧮 Compacted embedding store {name}: {current.count} -> {len(live)} rows")
+    return version
+
+class EmbeddingSet:
+    """Read-only, memory-mapped view of a store's committed rows"""
+
+    def __init__(self, manifest: Dict[str, Any], directory: Path):
+        self.directory = Path(directory)
+        self.name: str = manifest["name"]
+        self.version: int = manifest["version"]
+        self.model: Optional[str] = manifest.get("model")
+        self.model_version: Optional[str] = manifest.get("model_version")
+        self.dim: int = manifest["dim"]
+        self.dtype: str = manifest["dtype"]
+        self.count: int = manifest["count"]
+        self.deleted: int = manifest.get("deleted", 0)
+        self.normalized: bool = manifest.get("normalized", False)
+        self.created_at: float = manifest.get("created_at", 0.0)
+        self.updated_at: float = manifest.get("updated_at", self.created_at)
+        self._files: Dict[str, str] = manifest["files"]
+        self._sizes: Dict[str, int] = manifest["sizes"]
+        self._raw = self._map("vectors", self.dtype, (self.count, self.dim))
+        self.hashes: np.ndarray = self._map("hashes", np.uint64, (self.count,))
+        self.keys: List[str] = self._read_text("keys").split("\n")[:self.count] if self.count else []
+        self._vectors: Optional[np.ndarray] = self._raw if self.dtype == "float32" else None
+        self._records: Optional[List[Dict[str, Any]]] = None
+        self._alive: Optional[np.ndarray] = None
+        self._index: Optional[Dict[str, int]] = None
+        self._lock = threading.Lock()
+
+    def _map(self, kind: str, dtype, shape: Tuple[int, ...]) -> np.ndarray:
+        if not all(shape):
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(self.directory / self._files[kind], dtype=dtype, mode="r", shape=shape)
+
+    def _read_text(self, kind: str) -> str:
+        with open(self.directory / self._files[kind], "rb") as f:
+            return f.read(self._sizes[kind]).decode("utf-8")
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def live_count(self) -> int:
+        return self.count - self.deleted
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """(n, dim) float32 matrix (the map itself for float32 stores), tombstoned rows included"""
+        if self._vectors is None:
+            with self._lock:
+                if self._vectors is None:
+                    if self.dtype == "int8":
+                        scales = self._map("scales", np.float32, (self.count,))
+                        self._vectors = self._raw.astype(np.float32) * scales[:, None]
+                    else:
+                        self._vectors = np.asarray(self._raw, dtype=np.float32)
+        return self._vectors
+
+    @property
+    def alive(self) -> np.ndarray:
+        """(n,) boolean mask of the rows that are not tombstoned"""
+        if self._alive is None:
+            alive = np.ones(self.count, dtype=bool)
+            if self.deleted:
+                with open(self.directory / self._files["deleted"], "rb") as f:
+                    alive[np.frombuffer(f.read(self.deleted * 8), dtype=np.int64)] = False
+            self._alive = alive
+        return self._alive
+
+    def live_rows(self) -> np.ndarray:
+        return np.flatnonzero(self.alive)
+
+    @property
+    def records(self) -> List[Dict[str, Any]]:
+        """Per-row metadata (parsed on first access)"""
+        if self._records is None:
+            with self._lock:
+                if self._records is None:
+                    lines = self._read_text("records").split("\n")[:self.count] if self.count else []
+                    self._records = [json.loads(line) for line in lines]
+        return self._records
+
+    def row_of(self, key: str) -> Optional[int]:
+        """Live row of a key"""
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    alive = self.alive
+                    self._index = {k: row for row, k in enumerate(self.keys) if alive[row]}
+        return self._index.get(key)
+
+    def live_hashes(self) -> Dict[str, int]:
+        """Key -> content hash of the live rows"""
+        return {self.keys[row]: int(self.hashes[row]) for row in self.live_rows()}
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """float32 embedding of a key"""
+        row = self.row_of(key)
+        return None if row is None else self.vectors[row]
+
+def open_embeddings(name: str, directory: Path = DEFAULT_EMBEDDINGS_DIR) -> Optional[EmbeddingSet]:
+    """Current version of a store (None if it was never written or is unreadable)"""
+    try:
+        manifest = _read_manifest(name, directory)
+        return None if manifest is None else EmbeddingSet(manifest, directory)
+    except Exception as e:
+        logger.warning(f"Embedding store {name} unavailable: {e}")
+        return None
+
+# Shared instances (reopened when the manifest is replaced)
+_sets: Dict[Tuple[str, str], Tuple[Tuple[int, int], Optional[EmbeddingSet]]] = {}
+_sets_lock = threading.Lock()
+
+def get_embedding_set(name: str, directory: Path = DEFAULT_EMBEDDINGS_DIR) -> Optional[EmbeddingSet]:
+    """Current version of a store, shared per process"""
+    manifest_path = Path(directory) / f"{name}.json"
+    try:
+        stat = os.stat(manifest_path)
+    except OSError:
+        return None
+    stamp = (stat.st_ino, stat.st_mtime_ns)
+    cache_key = (name, str(directory))
+    cached = _sets.get(cache_key)
+    if cached is None or cached[0] != stamp:
+        with _sets_lock:
+            cached = _sets.get(cache_key)
+            if cached is None or cached[0] != stamp:
+                embedding_set = open_embeddings(name, directory)
+                if embedding_set is not None:
+                    logger.info(f"🧮 Opened embedding store {name} v{embedding_set.version} "
+                                f"({embedding_set.live_count} rows)")
+                cached = _sets[cache_key] = (stamp, embedding_set)
+    return cached[1]
@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+"""
+Field Compiler Module
+Compiles JIRA field metadata into specialized, single-pass issue extractors
+
+Field types are read once from data/CUSTOM_FIELDS_REFERENCE.json and (when
+available) the /rest/api/2/field definitions. Each mapped custom field gets a
+value simplifier chosen for its type, and the formatter turns a raw queue issue
+plus its enrichment into the normalized record used by core.api.load_queue_issues
+without per-issue mapping tables, friendly-name lookups or debug string building.
+
+Usage:
+    plan = compile_field_plan(field_definitions)
+    record = plan.format_issue(raw_issue, enrichment)
+"""
+
+import itertools
+import json
+import logging
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_FILE = Path(__file__).resolve().parent.parent / "data" / "CUSTOM_FIELDS_REFERENCE.json"
+
+# Service Desk custom fields also exposed under a friendly name
+FRIENDLY_FIELD_NAMES = {
+    'customfield_10001': 'epic_link',
+    'customfield_10002': 'sprint',
+    'customfield_10003': 'story_points',
+    'customfield_10125': 'severity',  # Criticidad field (MSM project)
+    'customfield_10020': 'severity_alt',  # Alternative severity field
+    'customfield_10021': 'urgency',   # Common urgency field
+    'customfield_10022': 'impact',    # Common impact field
+    'customfield_10030': 'sla_time',  # SLA fields
+    'customfield_10031': 'time_to_resolution',
+    'customfield_10032': 'customer_satisfaction',
+    'customfield_10040': 'category',  # Request category
+    'customfield_10041': 'subcategory',
+    'customfield_10050': 'business_service',
+    'customfield_10060': 'environment',  # Environment (dev, prod, etc)
+    'customfield_10070': 'affected_systems'
+}
+
+# Severity mapping (Spanish to English if needed)
+SEVERITY_MAP = {
+    'mayor': 'High',
+    'menor': 'Low',
+    'crítico': 'Critical',
+    'critico': 'Critical',
+    'normal': 'Medium',
+    'alta': 'High',
+    'baja': 'Low',
+    'media': 'Medium',
+    # Keep English values as-is
+    'critical': 'Critical',
+    'high': 'High',
+    'medium': 'Medium',
+    'low': 'Low',
+}
+
+# ============================================================
+# VALUE SIMPLIFIERS
+# ============================================================
+
+def simplify_value(value: Any) -> Any:
+    """Generic simplification of a custom field value (displayName > name > value)"""
+    if isinstance(value, dict):
+        if 'displayName' in value:
+            return value['displayName']
+        if 'name' in value:
+            return value['name']
+        if 'value' in value:
+            return value['value']
+        return str(value)
+    if isinstance(value, list):
+        if value and isinstance(value[0], dict):
+            return [item.get('name', str(item)) for item in value]
+        return value
+    return value
+
+def _simplify_option(value: Any) -> Any:
+    """select/option fields: {"value": ...} objects"""
+    if type(value) is dict and 'value' in value and 'name' not in value and 'displayName' not in value:
+        return value['value']
+    return simplify_value(value)
+
+def _simplify_user(value: Any) -> Any:
+    """user fields: {"displayName": ...} objects"""
+    if type(value) is dict and 'displayName' in value:
+        return value['displayName']
+    return simplify_value(value)
+
+def _simplify_scalar(value: Any) -> Any:
+    """text/number/date fields: already plain values"""
+    if value is None or type(value) in (str, int, float, bool):
+        return value
+    return simplify_value(value)
+
+_SIMPLIFIERS: Dict[str, Callable[[Any], Any]] = {
+    'select': _simplify_option,
+    'option': _simplify_option,
+    'user': _simplify_user,
+    'text': _simplify_scalar,
+    'string': _simplify_scalar,
+    'number': _simplify_scalar,
+    'date': _simplify_scalar,
+    'datetime': _simplify_scalar,
+}
+
+def name_of(obj: Any, *attrs: str) -> Any:
+    """First present attribute of a JIRA object dict (e.g. name_of(status, 'name')); non-dicts pass through"""
+    if isinstance(obj, dict):
+        for attr in attrs:
+            value = obj.get(attr)
+            if value:
+                return value
+        return None
+    return obj
+
+def normalize_severity(severity_obj: Any, severity_custom: Any = None) -> Optional[str]:
+    """
+    Normalize a severity value (field object/string, else the friendly custom field)
+
+    Returns:
+        Normalized severity string or None
+    """
+    if severity_obj:
+        if isinstance(severity_obj, dict):
+            severity_name = severity_obj.get("name") or severity_obj.get("value")
+            if severity_name:
+                return SEVERITY_MAP.get(str(severity_name).lower(), severity_name)
+        elif isinstance(severity_obj, str):
+            return SEVERITY_MAP.get(severity_obj.lower(), severity_obj)
+    if severity_custom:
+        return SEVERITY_MAP.get(str(severity_custom).lower(), str(severity_custom))
+    return None
+
+# ============================================================
+# FIELD METADATA
+# ============================================================
+
+def load_reference_types(path: Path = REFERENCE_FILE) -> Dict[str, str]:
+    """Field id -> type from CUSTOM_FIELDS_REFERENCE.json (empty if missing)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            reference = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.debug(f"Custom fields reference unavailable ({path}): {e}")
+        return {}
+    types = {}
+    for category in reference.get('categories', {}).values():
+        for field_id, meta in category.get('fields', {}).items():
+            if isinstance(meta, dict) and meta.get('type'):
+                types[field_id] = meta['type']
+    return types
+
+def definition_types(definitions: Optional[Iterable[Dict[str, Any]]]) -> Dict[str, str]:
+    """Field id -> type from /rest/api/2/field definitions (schema.type)"""
+    types = {}
+    for definition in definitions or []:
+        field_id = definition.get('id')
+        schema = definition.get('schema') or {}
+        if field_id and schema.get('type'):
+            types[field_id] = schema['type']
+    return types
+
+# ============================================================
+# COMPILED PLAN
+# ============================================================
+
+_plan_ids = itertools.count(1)
+
+class FieldPlan:
+    """Precompiled extractors for one set of field metadata"""
+
+    # Distinct field-key sets kept compiled (cleared when exceeded)
+    MAX_LAYOUTS = 256
+
+    def __init__(self, field_types: Dict[str, str], friendly_names: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            field_types: Field id -> type (reference/definition types)
+            friendly_names: Field id -> friendly record key (default: FRIENDLY_FIELD_NAMES)
+        """
+        friendly_names = FRIENDLY_FIELD_NAMES if friendly_names is None else friendly_names
+        self.field_types = dict(field_types)
+        self.friendly: Tuple[Tuple[str, str, Callable[[Any], Any]], ...] = tuple(
+            (field_id, name, _SIMPLIFIERS.get(field_types.get(field_id, ''), simplify_value))
+            for field_id, name in friendly_names.items()
+            if name != field_id
+        )
+        self._layouts: Dict[Tuple[str, ...], Tuple] = {}
+        # Distinguishes records formatted by different plans (see utils.record_memo)
+        self.plan_id = next(_plan_ids)
+
+    def layout_signature(self, fields: Dict[str, Any]) -> Tuple[str, ...]:
+        """Field-key set of fields (the compiled layout's own tuple when it exists)"""
+        signature = tuple(fields)
+        layout = self._layouts.get(signature)
+        return layout[3] if layout is not None else signature
+
+    def custom_values_hash(self, fields: Dict[str, Any]) -> int:
+        """Hash of the customfield values (SLA cycles and the like change without bumping `updated`)"""
+        custom_ids, getter, _, _ = self._layout(fields)
+        if not custom_ids:
+            return 0
+        return hash(repr(getter(fields) if getter is not None else fields[custom_ids[0]]))
+
+    def _layout(self, fields: Dict[str, Any]) -> Tuple[Tuple[str, ...], Optional[Callable], Tuple, Tuple[str, ...]]:
+        """
+        Compiled layout of a field-key set: customfield ids, a C-level getter for
+        them, and the friendly extractors that apply. Issues of one queue share
+        very few key sets, so layouts are built once and reused.
+        """
+        signature = tuple(fields)
+        layout = self._layouts.get(signature)
+        if layout is None:
+            custom_ids = tuple(k for k in signature if k.startswith('customfield_'))
+            getter = itemgetter(*custom_ids) if len(custom_ids) > 1 else None
+            present = set(custom_ids)
+            friendly = tuple(entry for entry in self.friendly if entry[0] in present)
+            layout = (custom_ids, getter, friendly, signature)
+            if len(self._layouts) >= self.MAX_LAYOUTS:
+                self._layouts.clear()
+            self._layouts[signature] = layout
+        return layout
+
+    def extract_custom_fields(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """All customfield_* values plus their friendly-name simplifications"""
+        custom_ids, getter, friendly, _ = self._layout(fields)
+        if getter is not None:
+            custom = dict(zip(custom_ids, getter(fields)))
+        else:
+            custom = {k: fields[k] for k in custom_ids}
+        for field_id, name, simplify in friendly:
+            custom[name] = simplify(custom[field_id])
+        return custom
+
+    def format_issue(self, issue: Dict[str, Any], enrichment: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Normalize one raw queue issue (Service Desk API shape) in a single pass
+
+        Args:
+            issue: Raw issue ({"key", "fields"})
+            enrichment: Optional enrichment entry (see core.api._build_enrichment);
+                        non-None values override the record, assignee included
+
+        Returns:
+            Normalized record (key, summary, status, severity, assignee, dates,
+            custom fields, enrichment, and the original `fields`)
+        """
+        issue_key = issue.get("key", "")
+        fields = issue.get("fields", {})
+
+        assignee_obj = _first(fields, "assignee", "asignado_a", "currentuser")
+        assignee_name = "Unassigned"
+        assignee_id = None
+        if assignee_obj and isinstance(assignee_obj, dict):
+            assignee_name = assignee_obj.get("displayName") or assignee_obj.get("name") or "Unassigned"
+            assignee_id = assignee_obj.get("accountId")
+
+        status_obj = _first(fields, "status", "estado")
+        if isinstance(status_obj, dict):
+            status_name = status_obj.get("name", "Unknown")
+        elif isinstance(status_obj, str):
+            status_name = status_obj
+        else:
+            status_name = "Unknown"
+
+        custom = self.extract_custom_fields(fields)
+        severity_name = normalize_severity(_first(fields, "severity", "severidad"), custom.get('severity'))
+        if not severity_name:
+            logger.debug("%s - No severity found", issue_key)
+
+        issue_type_obj = _first(fields, "issuetype", "tipo_de_asunto")
+        if issue_type_obj and isinstance(issue_type_obj, dict):
+            issue_type_name = issue_type_obj.get("name", "Task")
+        elif isinstance(issue_type_obj, str):
+            issue_type_name = issue_type_obj
+        else:
+            issue_type_name = "Task"
+
+        created = _first(fields, "created", "creado") or ""
+        record = {
+            "key": issue_key,
+            "summary": _first(fields, "summary", "resumen") or "No summary",
+            "status": status_name,
+            "severity": severity_name,
+            "assignee": assignee_name,
+            "assignee_id": assignee_id,
+            "created": created,
+            "updated": _first(fields, "updated", "actualizado") or created or "",
+            "resolved": _first(fields, "resolutionDate", "fecha_de_resolucion") or "",
+            "description": _first(fields, "description", "descripcion") or "",
+            "issue_type": issue_type_name,
+            "labels": [],
+            "components": [],
+            "fields": fields
+        }
+        record.update(custom)
+        if enrichment:
+            for key, value in enrichment.items():
+                if value is not None:
+                    record[key] = value
+        return record
+
+    def format_issues(self, issues: List[Dict[str, Any]],
+                      enriched_data: Optional[Dict[str, Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """format_issue over a list, looking enrichment up by key"""
+        enriched_data = enriched_data or {}
+        format_issue = self.format_issue
+        return [format_issue(issue, enriched_data.get(issue.get("key", ""))) for issue in issues]
+
+def _first(fields: Dict[str, Any], *names: str) -> Any:
+    """Value of the first present field name (English/Spanish field names)"""
+    for name in names:
+        if name in fields:
+            return fields[name]
+    return None
+
+def compile_field_plan(definitions: Optional[Iterable[Dict[str, Any]]] = None,
+                       reference_path: Path = REFERENCE_FILE) -> FieldPlan:
+    """
+    Build a FieldPlan from the reference file and optional field definitions
+
+    Definitions (live JIRA metadata) take precedence over the reference file.
+    """
+    field_types = load_reference_types(reference_path)
+    field_types.update(definition_types(definitions))
+    plan = FieldPlan(field_types)
+    logger.info(f"🧩 Compiled field plan: {len(field_types)} typed fields, {len(plan.friendly)} friendly extractors")
+    return plan
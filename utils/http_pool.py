@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+HTTP Connection Pool Module
+Shared, thread-safe keep-alive sessions for all outbound JIRA traffic
+
+Every JIRA call goes through utils.common._make_request, which uses the
+process-wide pool returned by get_session_pool(). One requests.Session is kept
+per host so TCP+TLS handshakes are paid once and then reused across pages,
+desks and threads.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+class JiraSessionPool:
+    """Per-host pooled requests.Session registry with connection statistics"""
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 20,
+        host_pool_sizes: Optional[Dict[str, int]] = None,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        pool_block: bool = False
+    ):
+        """
+        Args:
+            pool_connections: Number of urllib3 host pools cached per session
+            pool_maxsize: Default max keep-alive connections kept per host
+            host_pool_sizes: Optional per-host override of pool_maxsize
+            connect_timeout: Seconds to wait for the TCP/TLS connection
+            read_timeout: Seconds to wait for the response body
+            pool_block: Block when the pool is exhausted instead of opening extra connections
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.host_pool_sizes = {h.lower(): n for h, n in (host_pool_sizes or {}).items()}
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.pool_block = pool_block
+
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, requests.Session] = {}
+        self._adapters: Dict[str, HTTPAdapter] = {}
+        self._request_count: Dict[str, int] = {}
+        self._error_count: Dict[str, int] = {}
+
+    def _host_key(self, url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme or 'https'}://{parts.netloc.lower()}"
+
+    def _maxsize_for(self, host_key: str) -> int:
+        netloc = urlsplit(host_key).netloc
+        return self.host_pool_sizes.get(netloc, self.pool_maxsize)
+
+    def pool_size_for(self, url: str) -> int:
+        """Max keep-alive connections kept for the host of `url`"""
+        return self._maxsize_for(self._host_key(url))
+
+    def get_session(self, url: str) -> requests.Session:
+        """Return the shared session for the host of `url`, creating it on first use"""
+        host_key = self._host_key(url)
+        session = self._sessions.get(host_key)
+        if session is not None:
+            return session
+
+        with self._lock:
+            session = self._sessions.get(host_key)
+            if session is None:
+                maxsize = self._maxsize_for(host_key)
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=maxsize,
+                    pool_block=self.pool_block,
+                    max_retries=0
+                )
+                session = requests.Session()
+                session.headers.update({"Connection": "keep-alive"})
+                session.mount(host_key, adapter)
+                self._sessions[host_key] = session
+                self._adapters[host_key] = adapter
+                self._request_count[host_key] = 0
+                self._error_count[host_key] = 0
+                logger.info(f"🔌 HTTP pool created for {host_key} (maxsize={maxsize})")
+        return session
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request through the pooled session for the URL's host
+
+        Args:
+            method: HTTP method
+            url: Absolute request URL
+            **kwargs: Passed through to requests.Session.request
+                      (timeout defaults to the pool's (connect, read) tuple)
+
+        Returns:
+            requests.Response
+        """
+        session = self.get_session(url)
+        host_key = self._host_key(url)
+        kwargs.setdefault("timeout", self.timeout)
+        with self._lock:
+            self._request_count[host_key] = self._request_count.get(host_key, 0) + 1
+        try:
+            return session.request(method=method, url=url, **kwargs)
+        except requests.exceptions.RequestException:
+            with self._lock:
+                self._error_count[host_key] = self._error_count.get(host_key, 0) + 1
+            raise
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Pool statistics for inspection
+
+        Returns:
+            Dict with totals and per-host request count, new connections opened,
+            reuse ratio and currently open (idle, kept-alive) connections
+        """
+        hosts = {}
+        total_requests = 0
+        total_new = 0
+        total_open = 0
+        with self._lock:
+            items = list(self._adapters.items())
+            request_count = dict(self._request_count)
+            error_count = dict(self._error_count)
+
+        for host_key, adapter in items:
+            new_connections = 0
+            open_connections = 0
+            try:
+                pools = adapter.poolmanager.pools
+                for pool_key in list(pools.keys()):
+                    pool = pools.get(pool_key)
+                    if pool is None:
+                        continue
+                    new_connections += getattr(pool, "num_connections", 0)
+                    queue = getattr(pool, "pool", None)
+                    if queue is not None:
+                        open_connections += sum(1 for conn in list(queue.queue) if conn is not None)
+            except Exception as e:
+                logger.debug(f"Could not read pool stats for {host_key}: {e}")
+
+            requests_sent = request_count.get(host_key, 0)
+            reused = max(requests_sent - new_connections, 0)
+            hosts[host_key] = {
+                "requests": requests_sent,
+                "errors": error_count.get(host_key, 0),
+                "new_connections": new_connections,
+                "reused_connections": reused,
+                "reuse_ratio": round(reused / requests_sent, 4) if requests_sent else 0.0,
+                "open_connections": open_connections,
+                "pool_maxsize": self._maxsize_for(host_key)
+            }
+            total_requests += requests_sent
+            total_new += new_connections
+            total_open += open_connections
+
+        total_reused = max(total_requests - total_new, 0)
+        return {
+            "requests": total_requests,
+            "new_connections": total_new,
+            "reuse_ratio": round(total_reused / total_requests, 4) if total_requests else 0.0,
+            "open_connections": total_open,
+            "timeout": {"connect": self.timeout[0], "read": self.timeout[1]},
+            "hosts": hosts
+        }
+
+    def close(self):
+        """Close every pooled session (drops all kept-alive connections)"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+            self._adapters.clear()
+            self._request_count.clear()
+            self._error_count.clear()
+        for session in sessions:
+            try:
+                session.close()
+            except Exception as e:
+                logger.debug(f"Error closing pooled session: {e}")
+
+def _parse_host_pool_sizes(raw: str) -> Dict[str, int]:
+    """Parse 'host=size,host2=size' into a dict (invalid entries are ignored)"""
+    sizes = {}
+    for entry in (raw or "").split(","):
+        if "=" not in entry:
+            continue
+        host, _, size = entry.partition("=")
+        try:
+            sizes[host.strip()] = int(size)
+        except ValueError:
+            logger.warning(f"Ignoring invalid pool size entry: {entry}")
+    return sizes
+
+# Global pool instance
+_session_pool: Optional[JiraSessionPool] = None
+_session_pool_lock = threading.Lock()
+
+def get_session_pool() -> JiraSessionPool:
+    """Get or create the process-wide session pool configured from JiraConfig"""
+    global _session_pool
+    if _session_pool is None:
+        with _session_pool_lock:
+            if _session_pool is None:
+                from utils.config import config
+                jira = config.jira
+                _session_pool = JiraSessionPool(
+                    pool_connections=jira.pool_connections,
+                    pool_maxsize=jira.pool_maxsize,
+                    host_pool_sizes=_parse_host_pool_sizes(jira.host_pool_sizes),
+                    connect_timeout=jira.connect_timeout,
+                    read_timeout=jira.read_timeout
+                )
+    return _session_pool
+
+def reset_session_pool():
+    """Close and drop the global pool (e.g. after credentials or site change)"""
+    global _session_pool
+    with _session_pool_lock:
+        if _session_pool is not None:
+            _session_pool.close()
+        _session_pool = None
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Statistics of the global session pool (empty pool if not created yet)"""
+    return get_session_pool().get_stats()
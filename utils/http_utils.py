@@ -11,10 +11,40 @@ from typing import Callable, Optional, Dict, Any
 
 logger = logging.getLogger(__name__)
 
+def _error_status(error: Exception) -> Optional[int]:
+    """HTTP status carried by an error (JiraApiError.status_code or an HTTPError response)"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+def is_retryable_error(error: Exception) -> bool:
+    """
+    Whether retrying the call can help: transport errors and 5xx responses
+
+    429s (JiraRateLimitError) are excluded: the shared rate limiter already
+    retried them with Retry-After-aware backoff. Other 4xx and non-HTTP errors
+    would fail the same way again.
+    """
+    import requests
+    status = _error_status(error)
+    if status is not None:
+        return 500 <= status < 600
+    return isinstance(error, (
+        requests.exceptions.ConnectionError,
+        requests.exceptions.Timeout,
+        ConnectionError,
+        TimeoutError
+    ))
+
 def retry_on_error(max_retries: int = 3, delay: float = 1.0, backoff_factor: float = 2.0):
     """
     Decorator for retrying operations on failure with exponential backoff
     
+    Only transient failures are retried (see is_retryable_error); rate limit,
+    other 4xx and logic errors are re-raised immediately.
+    
     Args:
         max_retries: Maximum number of retry attempts (default: 3)
         delay: Initial delay between retries in seconds (default: 1.0)
@@ -36,6 +66,8 @@ def retry_on_error(max_retries: int = 3, delay: float = 1.0, backoff_factor: flo
                 try:
                     return func(*args, **kwargs)
                 except Exception as e:
+                    if not is_retryable_error(e):
+                        raise
                     last_error = e
                     if attempt < max_retries - 1:
                         wait_time = delay * (backoff_factor ** attempt)
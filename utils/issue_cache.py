@@ -1,41 +1,79 @@
 """
-Issue Cache Manager - JSON Version
-===================================
+Issue Cache Manager
+===================
 Descarga TODOS los tickets del proyecto MSM en un solo fetch masivo.
-Los almacena en JSON y analiza patrones para mejorar sugerencias de IA.
+Los almacena en SQLite (utils.issue_store, data/issue_cache.db) y analiza
+patrones para mejorar sugerencias de IA.
 
 VENTAJAS:
-- Un solo archivo JSON, fácil de inspeccionar
-- Sin dependencias de SQLite
-- Fetch masivo (no incremental)
-- Análisis de patrones en memoria
+- Upserts por issue: un sync solo reescribe los tickets que cambiaron
+- Índices por key, proyecto, estado, asignado, created y updated: los
+  consumidores leen solo la porción que necesitan
+- Fetch masivo inicial; luego delta por cola (updated >= watermark, utils.queue_delta)
 
-DESVENTAJAS:
-- Memoria: ~100MB para 10,000 tickets
-- Lectura completa cada vez
+El export de los tickets crudos es el log segmentado data/cache/issue_log
+(utils.issue_log, ISSUE_CACHE_LOG): cada sync agrega solo los tickets que
+cambiaron y tombstones de los que salieron del proyecto, en lugar de reescribir
+el monolítico msm_issues.json.gz. Ese archivo ya no se escribe; uno existente
+se sigue leyendo como último fallback antes del primer sync.
 """
+import asyncio
+import copy
 import json
 import gzip
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
 from pathlib import Path
-from collections import defaultdict
 
-from utils.common import _make_request, JiraApiError
+from utils.common import _make_request, adf_to_text, IncompleteResultError, JiraApiError
+from utils.async_jira import AsyncJiraClient, run_sync
+from utils.queue_delta import QUEUE_SEARCH_API_VERSION, fetch_delta_async, list_keys
+from utils.field_compiler import name_of
+from utils.issue_store import IssueStore, get_issue_store
+from utils.issue_snapshot import get_issue_source, write_issue_snapshot
+from utils.issue_columns import write_columnar_snapshot
+from utils.pattern_index import PatternIndex
+from utils.issue_log import IssueLog, get_issue_log
 
 logger = logging.getLogger(__name__)
 
+# Phases of IssueCacheManager.sync_project, in order (progress and checkpoints)
+SYNC_PHASES = ('fetch', 'store', 'patterns', 'embeddings')
+
+def plain_rich_text(issue: Dict) -> Dict:
+    """
+    Replace Atlassian Document Format values (v3 rich text: description,
+    environment, textarea custom fields) with their plain text, in place
+
+    Searches are made through the v2 API, which already returns strings; this
+    also converts issues stored by syncs that used v3.
+    """
+    fields = issue.get('fields')
+    if fields:
+        for name, value in fields.items():
+            if isinstance(value, dict) and value.get('type') == 'doc':
+                fields[name] = adf_to_text(value)
+    return issue
+
+class SyncCancelled(Exception):
+    """Raised inside sync_project when should_cancel() asks it to stop"""
+    pass
+
 class IssueCacheManager:
-    """Manages caching and analysis of JIRA issues using JSON files"""
+    """Manages caching and analysis of JIRA issues (SQLite issue store + JSON metadata)"""
     
-    def __init__(self, cache_dir: str = "data/cache"):
+    def __init__(self, cache_dir: str = "data/cache", store: Optional[IssueStore] = None):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        # Use .json.gz for compressed storage
+        self.store = store or get_issue_store()
+        # Legacy monolithic export (no longer written; read as a last fallback)
         self.issues_file = self.cache_dir / "msm_issues.json.gz"
         self.patterns_file = self.cache_dir / "patterns.json"
         self.metadata_file = self.cache_dir / "sync_metadata.json"
+        self.issue_log_dir = self.cache_dir / "issue_log"
+        # Keyword patterns, kept in memory and updated incrementally
+        self.patterns = PatternIndex(self.cache_dir / "pattern_index.json.gz", self.patterns_file)
         self.use_compression = True  # Enable gzip compression for large files
         logger.info(f"Cache manager initialized: {self.cache_dir} (compression: {self.use_compression})")
     
@@ -72,8 +110,8 @@ class IssueCacheManager:
             should_compress = self.use_compression and file_path == self.issues_file
             
             if should_compress:
-                # Save as compressed .json.gz
-                json_str = json.dumps(data, indent=2, ensure_ascii=False)
+                # Save as compressed .json.gz (compact: indentation only costs CPU)
+                json_str = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
                 uncompressed_size = len(json_str.encode('utf-8'))
                 
                 with gzip.open(file_path, 'wt', encoding='utf-8', compresslevel=6) as f:
@@ -101,142 +139,134 @@ class IssueCacheManager:
             logger.error(f"Error saving {file_path}: {e}")
             raise
     
-    def sync_project(self, project_key: str, api_client, service_desk_id: str = None) -> Dict:
+    def sync_project(self, project_key: str, api_client, service_desk_id: str = None, delta: bool = None,
+                     progress: Optional[Callable[[str, float, str], None]] = None,
+                     should_cancel: Optional[Callable[[], bool]] = None,
+                     checkpoint: Optional[Dict] = None) -> Dict:
         """
         Sync ALL issues from a project using JIRA Service Desk API
         Fetches from all queues in the service desk
+        
+        With bulk sync (default: JiraConfig.bulk_sync) the project is fetched
+        with one paged `project = X` JQL search and queues are only read as key
+        lists; otherwise (or when JQL search is unavailable) every queue is
+        fetched. Queues are fetched concurrently under the shared rate limiter,
+        issues are deduplicated by key as they arrive, and queue membership is
+        stored as a side index (IssueStore.queue_keys).
+        
+        With delta (default: JiraConfig.delta_sync), the bulk search and queues
+        synced before are refreshed with an updated-since JQL search against the
+        cached issues; watermarks live in sync_metadata.json under 'bulk' and
+        'queues'. They are only advanced once the fetched issues are stored.
+        
+        The sync runs in SYNC_PHASES order (see utils.sync_jobs):
+            progress: Optional callback(phase, fraction, detail) as phases advance
+            should_cancel: Optional callable polled between phases, queues and
+                           pages; when it returns True SyncCancelled is raised
+            checkpoint: Optional dict updated in place as phases complete
+                        ({'completed': [...], 'stats': {...}}); passing it back
+                        resumes after the last completed phase. Fetch and store
+                        complete together, so a resume before the store commit
+                        fetches again.
+        
         Returns: Dict with sync statistics
         """
-        logger.info(f"Starting sync for project {project_key}")
+        from utils.config import config
+        if delta is None:
+            delta = config.jira.delta_sync
+        checkpoint = checkpoint if checkpoint is not None else {}
+        completed = checkpoint.setdefault('completed', [])
+        report = progress or (lambda phase, fraction, detail='': None)
+        
+        def check_cancel():
+            if should_cancel and should_cancel():
+                raise SyncCancelled(f"Sync of {project_key} cancelled")
         
-        # Update sync metadata - start
+        resumed = 'store' in completed
+        logger.info(f"Starting sync for project {project_key} (delta={delta}, resume after={completed or None})")
+        
+        # Update sync metadata - start (watermarks survive across syncs)
         metadata = self._load_json(self.metadata_file, {})
-        metadata[project_key] = {
-            'last_sync_start': datetime.now().isoformat(),
-            'last_sync_status': 'in_progress'
-        }
+        previous = metadata.get(project_key, {})
+        if resumed:
+            metadata[project_key] = {**previous, 'last_sync_status': 'in_progress'}
+        else:
+            metadata[project_key] = {
+                'last_sync_start': datetime.now().isoformat(),
+                'last_sync_status': 'in_progress',
+                'queues': previous.get('queues', {}),
+                'bulk': previous.get('bulk', {}),
+                'queue_ids': previous.get('queue_ids', [])
+            }
         self._save_json(self.metadata_file, metadata)
         
         try:
-            all_issues = []
-            
-            # If no service_desk_id provided, try to get it from project
-            if not service_desk_id:
-                print(f"🔍 Looking up service desk for project {project_key}...")
-                project = api_client.get_project(project_key)
-                if project:
-                    service_desk_id = project.get("id")
-                    logger.info(f"Found service desk ID: {service_desk_id}")
-            
-            if not service_desk_id:
-                logger.error(f"Could not find service desk ID for project {project_key}")
-                raise JiraApiError(f"Service desk ID not found for project {project_key}")
-            
-            # Get all queues for this service desk
-            print(f"🔄 Fetching queues from Service Desk {service_desk_id}...")
-            queues_url = f"{api_client.site}/rest/servicedeskapi/servicedesk/{service_desk_id}/queue"
-            queues_response = _make_request('GET', queues_url, api_client.headers, params={'limit': 100})
-            
-            if not queues_response or 'values' not in queues_response:
-                logger.error(f"Failed to fetch queues for service desk {service_desk_id}")
-                raise JiraApiError(f"Could not fetch queues for service desk {service_desk_id}")
-            
-            queues = queues_response.get('values', [])
-            print(f"✓ Found {len(queues)} queues")
-            
-            # Fetch issues from each queue
-            for queue_idx, queue in enumerate(queues, 1):
-                queue_id = queue.get('id')
-                queue_name = queue.get('name', f'Queue {queue_id}')
-                print(f"\n📋 [{queue_idx}/{len(queues)}] Fetching from queue: {queue_name}")
-                
-                start = 0
-                limit = 50
-                queue_issues = []
-                
-                while True:
-                    print(f"  📥 Batch: {start} to {start + limit}...")
-                    
-                    issues_url = f"{api_client.site}/rest/servicedeskapi/servicedesk/{service_desk_id}/queue/{queue_id}/issue"
-                    response = _make_request(
-                        'GET',
-                        issues_url,
-                        api_client.headers,
-                        params={'start': start, 'limit': limit}
-                    )
-                    
-                    if response is None:
-                        logger.warning(f"No response from queue {queue_id}")
-                        break
-                    
-                    issues = response.get('values', [])
-                    if not issues:
-                        break
-                    
-                    queue_issues.extend(issues)
-                    
-                    # Check if there are more issues
-                    is_last = response.get('isLastPage', True)
-                    if is_last or len(issues) < limit:
-                        break
-                    
-                    start += limit
-                
-                print(f"  ✓ Fetched {len(queue_issues)} issues from {queue_name}")
-                all_issues.extend(queue_issues)
-            
-            print(f"\n💾 Total issues fetched: {len(all_issues)}")
-            
-            # Save all issues to JSON
-            cache_data = {
-                'project_key': project_key,
-                'total_issues': len(all_issues),
-                'synced_at': datetime.now().isoformat(),
-                'issues': all_issues
-            }
-            
-            self._save_json(self.issues_file, cache_data)
-            logger.info(f"Saved {len(all_issues)} issues to {self.issues_file}")
-            print(f"💾 Saved {len(all_issues)} issues to JSON")
+            all_issues = None
+            if not resumed:
+                check_cancel()
+                # Work on copies: the watermarks are saved by the store phase
+                queue_states = copy.deepcopy(previous.get('queues', {})) if delta else {}
+                bulk_state = copy.deepcopy(previous.get('bulk', {})) if delta else {}
+                issues_by_key, memberships, delta_stats = self._phase_fetch(
+                    project_key, api_client, service_desk_id, queue_states, bulk_state,
+                    delta, config, report, check_cancel
+                )
+                check_cancel()
+                all_issues = list(issues_by_key.values())
+                checkpoint['stats'] = self._phase_store(
+                    project_key, issues_by_key, memberships, previous, metadata,
+                    queue_states, bulk_state, delta_stats, config, report
+                )
+                completed.extend(['fetch', 'store'])
+                report('store', 1.0, f"{len(all_issues)} issues stored")
+            stats = checkpoint['stats']
             
             # Analyze patterns from cached issues
-            print(f"🧠 Analyzing patterns...")
-            self.analyze_patterns(project_key)
+            if 'patterns' not in completed:
+                check_cancel()
+                print("🧠 Analyzing patterns...")
+                report('patterns', 0.0, 'Analyzing patterns')
+                self.analyze_patterns(project_key)
+                completed.append('patterns')
+                report('patterns', 1.0, 'Patterns updated')
             
             # Generate ML embeddings
-            print(f"🤖 Generating ML embeddings...")
-            try:
-                from utils.ml_suggester import get_ml_suggester
-                ml_suggester = get_ml_suggester()
-                
-                # Convert raw issues to simplified format
-                simplified_issues = [self._extract_issue_data(issue) for issue in all_issues]
-                ml_suggester.index_issues(simplified_issues, force_reindex=True)
-                print(f"✓ ML embeddings generated")
-            except ImportError as e:
-                logger.warning(f"ML suggester not available: {e}")
-                print(f"⚠️ ML suggester not available (install: pip install sentence-transformers)")
-            except Exception as e:
-                logger.error(f"Failed to generate ML embeddings: {e}")
-                print(f"⚠️ Failed to generate ML embeddings: {e}")
+            if 'embeddings' not in completed:
+                check_cancel()
+                if all_issues is None:
+                    all_issues = self.load_issues(project_key, source=self.store)
+                report('embeddings', 0.0, f"Embedding {len(all_issues)} issues")
+                self._phase_embeddings(project_key, all_issues)
+                completed.append('embeddings')
+                report('embeddings', 1.0, 'Embeddings updated')
             
             # Update metadata - success
             metadata[project_key].update({
                 'last_sync_end': datetime.now().isoformat(),
                 'last_sync_status': 'success',
-                'total_issues': len(all_issues)
+                **stats
             })
             self._save_json(self.metadata_file, metadata)
             
-            logger.info(f"Sync completed successfully: {len(all_issues)} issues")
+            logger.info(f"Sync completed successfully: {stats['total_issues']} issues")
             
+            result = {k: v for k, v in stats.items() if k != 'total_issues'}
             return {
                 'status': 'success',
-                'total_stored': len(all_issues),
+                'total_stored': stats['total_issues'],
                 'project_key': project_key,
-                'cache_file': str(self.issues_file)
+                'cache_file': str(self.store.db_path),
+                **result
             }
             
+        except SyncCancelled:
+            logger.info(f"Sync cancelled for {project_key} (completed phases: {completed})")
+            metadata[project_key].update({
+                'last_sync_end': datetime.now().isoformat(),
+                'last_sync_status': 'cancelled'
+            })
+            self._save_json(self.metadata_file, metadata)
+            raise
         except Exception as e:
             logger.error(f"Sync failed: {e}")
             # Update metadata - error
@@ -248,36 +278,363 @@ class IssueCacheManager:
             self._save_json(self.metadata_file, metadata)
             raise
     
-    def _extract_issue_data(self, issue_data: Dict) -> Dict:
-        """Extract normalized issue data from raw JIRA issue"""
-        fields = issue_data.get('fields', {})
+    def _phase_fetch(self, project_key: str, api_client, service_desk_id: Optional[str], queue_states: Dict,
+                     bulk_state: Dict, delta: bool, config, report, check_cancel
+                     ) -> Tuple[Dict[str, Dict], Dict[str, List[str]], Dict]:
+        """Fetch phase: resolve the service desk and its queues, then fetch the project"""
+        report('fetch', 0.0, 'Fetching queues')
         
-        # Extract severity from custom field
-        severity = None
-        custom_field_10125 = fields.get('customfield_10125')
-        if custom_field_10125:
-            if isinstance(custom_field_10125, dict):
-                severity = custom_field_10125.get('value')
-            elif isinstance(custom_field_10125, str):
-                severity = custom_field_10125
+        # Previously stored issues are the base that deltas are merged into
+        cached_by_key = {}
+        if delta and (queue_states or bulk_state):
+            cached_by_key = {i['key']: i for i in self.load_issues(project_key, source=self.store)}
         
-        # Extract other fields
-        priority = fields.get('priority', {})
-        if isinstance(priority, dict):
-            priority = priority.get('name')
+        # If no service_desk_id provided, try to get it from project
+        if not service_desk_id:
+            print(f"🔍 Looking up service desk for project {project_key}...")
+            project = api_client.get_project(project_key)
+            if project:
+                service_desk_id = project.get("id")
+                logger.info(f"Found service desk ID: {service_desk_id}")
         
-        assignee = fields.get('assignee', {})
-        if isinstance(assignee, dict):
-            assignee = assignee.get('displayName')
+        if not service_desk_id:
+            logger.error(f"Could not find service desk ID for project {project_key}")
+            raise JiraApiError(f"Service desk ID not found for project {project_key}")
         
-        reporter = fields.get('reporter', {})
-        if isinstance(reporter, dict):
-            reporter = reporter.get('displayName')
+        # Get all queues for this service desk
+        print(f"🔄 Fetching queues from Service Desk {service_desk_id}...")
+        queues_url = f"{api_client.site}/rest/servicedeskapi/servicedesk/{service_desk_id}/queue"
+        queues_response = _make_request('GET', queues_url, api_client.headers, params={'limit': 100})
         
-        status = fields.get('status', {})
-        if isinstance(status, dict):
-            status = status.get('name')
+        if not queues_response or 'values' not in queues_response:
+            logger.error(f"Failed to fetch queues for service desk {service_desk_id}")
+            raise JiraApiError(f"Could not fetch queues for service desk {service_desk_id}")
+        
+        queues = queues_response.get('values', [])
+        print(f"✓ Found {len(queues)} queues")
+        
+        issues_by_key, memberships, delta_stats = run_sync(self._fetch_project(
+            api_client, project_key, service_desk_id, queues,
+            queue_states, bulk_state, cached_by_key, delta, config, report, check_cancel
+        ))
+        member_count = sum(len(keys) for keys in memberships.values())
+        print(f"\n💾 Total issues fetched: {len(issues_by_key)} unique ({member_count} queue memberships)")
+        report('fetch', 1.0, f"{len(issues_by_key)} issues from {len(queues)} queues")
+        return issues_by_key, memberships, delta_stats
+    
+    def _phase_store(self, project_key: str, issues_by_key: Dict[str, Dict], memberships: Dict[str, List[str]],
+                     previous: Dict, metadata: Dict, queue_states: Dict, bulk_state: Dict,
+                     delta_stats: Dict, config, report) -> Dict:
+        """
+        Store phase: upsert the issues, membership index and snapshots, then
+        save the advanced watermarks
+        
+        Returns:
+            Sync statistics (kept in the checkpoint)
+        """
+        all_issues = list(issues_by_key.values())
+        report('store', 0.0, f"Storing {len(all_issues)} issues")
+        
+        # Per-issue upserts (unchanged rows are not rewritten); issues no longer in
+        # the project (bulk) or in any queue are dropped from the store
+        written = self.store.upsert_issues(all_issues)
+        dropped = self.store.delete_missing(project_key, issues_by_key) if all_issues else 0
+        
+        # Queue membership side index (an issue in several queues is stored once)
+        if all_issues:
+            for queue_id, keys in memberships.items():
+                self.store.set_queue_members(queue_id, keys)
+            self.store.remove_queues(q for q in previous.get('queue_ids', []) if q not in memberships)
+            metadata[project_key]['queue_ids'] = list(memberships)
+        
+        logger.info(f"Stored {len(all_issues)} issues in {self.store.db_path} ({written} written, {dropped} dropped)")
+        print(f"💾 Stored {len(all_issues)} issues ({written} written, {dropped} dropped)")
+        report('store', 0.5, 'Writing snapshots')
+        
+        # Immutable mmap snapshot shared by the analytics consumers (utils.issue_snapshot)
+        snapshot_version = None
+        try:
+            snapshot_version = write_issue_snapshot(self.store.export_rows())
+        except Exception as e:
+            logger.warning(f"Failed to write issue snapshot: {e}")
         
+        # Typed columnar (Parquet) snapshot for vectorized reports (utils.issue_columns)
+        try:
+            write_columnar_snapshot(self.store.iter_issues())
+        except Exception as e:
+            logger.warning(f"Failed to write columnar analytics snapshot: {e}")
+        
+        # Raw issue export (append-only issue log): only issues whose content changed are written
+        if config.cache.issue_log:
+            try:
+                log = self.get_issue_log()
+                logged = log.write(all_issues)
+                removed = log.delete_missing(project_key, issues_by_key) if all_issues else 0
+                logger.info(f"Issue log: {logged} issues appended, {removed} removed")
+            except Exception as e:
+                logger.warning(f"Failed to append to issue log: {e}")
+        
+        # Issues are committed: advance the watermarks
+        metadata[project_key].update({'queues': queue_states, 'bulk': bulk_state})
+        self._save_json(self.metadata_file, metadata)
+        
+        return {
+            'total_issues': len(all_issues),
+            'written': written,
+            'dropped': dropped,
+            'snapshot_version': snapshot_version,
+            **delta_stats
+        }
+    
+    def _phase_embeddings(self, project_key: str, issues: List[Dict]):
+        """Embeddings phase: incrementally index the project's issues for ML suggestions (skipped when unavailable)"""
+        print("🤖 Generating ML embeddings...")
+        try:
+            from utils.ml_suggester import get_ml_suggester
+            ml_suggester = get_ml_suggester()
+            
+            # Convert raw issues to simplified format; only new/changed texts are encoded
+            simplified_issues = [self._extract_issue_data(issue) for issue in issues]
+            stats = ml_suggester.update_issues(simplified_issues, project_key)
+            print(f"✓ ML embeddings updated ({stats['encoded']} encoded, {stats['removed']} removed)")
+        except ImportError as e:
+            logger.warning(f"ML suggester not available: {e}")
+            print("⚠️ ML suggester not available (install: pip install sentence-transformers)")
+        except Exception as e:
+            logger.error(f"Failed to generate ML embeddings: {e}")
+            print(f"⚠️ Failed to generate ML embeddings: {e}")
+    
+    async def _fetch_project(self, api_client, project_key: str, service_desk_id: str, queues: List[Dict],
+                             queue_states: Dict, bulk_state: Dict, cached_by_key: Dict[str, Dict],
+                             delta: bool, config, report, check_cancel
+                             ) -> Tuple[Dict[str, Dict], Dict[str, List[str]], Dict]:
+        """
+        Fetch the project's issues on one async client (shared concurrency bound
+        and rate limiter), deduplicated by key as pages arrive
+        
+        Updates queue_states / bulk_state in place. Reports 'fetch' progress per
+        queue and calls check_cancel() before each queue and bulk page; on
+        cancellation (or any queue failing) the queue fetches still running are
+        cancelled and awaited before the client closes.
+        
+        Returns:
+            Tuple of (issues by key, queue id -> member keys in queue order, stats)
+        """
+        issues_by_key: Dict[str, Dict] = {}
+        memberships: Dict[str, List[str]] = {}
+        stats = {'bulk_search': False, 'delta_queues': 0, 'full_queues': 0, 'changed': 0, 'removed': 0, 'requests': 0}
+        done = 0
+        
+        def merge(issues: List[Dict]):
+            # Every fetched or carried-over issue is stored with plain-string rich text
+            for issue in issues:
+                key = issue.get('key')
+                if key:
+                    issues_by_key[key] = plain_rich_text(issue)
+        
+        async with AsyncJiraClient(api_client.site, api_client.headers) as client:
+            if config.jira.bulk_sync:
+                stats['bulk_search'] = await self._fetch_bulk(
+                    client, project_key, bulk_state, cached_by_key, merge, stats, delta, config, check_cancel
+                )
+            
+            async def sync_queue(queue: Dict):
+                nonlocal done
+                check_cancel()
+                queue_id = str(queue.get('id'))
+                queue_name = queue.get('name', f'Queue {queue_id}')
+                jql = queue.get('jql')
+                if stats['bulk_search'] and jql:
+                    # Issues came with the bulk search: the queue is only a key list
+                    keys = await list_keys(client, jql)
+                    missing = [k for k in keys if k not in issues_by_key]
+                    if missing:
+                        merge(await client.get_issues_by_keys(
+                            missing, fields=["*navigable"], api_version=QUEUE_SEARCH_API_VERSION
+                        ))
+                    how = f"{len(keys)} keys"
+                else:
+                    keys = await self._sync_queue_delta(client, queue, queue_states.get(queue_id), cached_by_key, config) \
+                        if delta and cached_by_key else None
+                    if keys is not None:
+                        state = queue_states[queue_id]
+                        merge(cached_by_key[k] for k in keys if k in cached_by_key)
+                        stats['delta_queues'] += 1
+                        stats['changed'] += state['last_changed']
+                        stats['removed'] += state['last_removed']
+                        how = f"delta: {state['last_changed']} changed, {state['last_removed']} removed, {len(keys)} in queue"
+                    else:
+                        synced_at = datetime.now().timestamp()
+                        queue_issues = await client.get_queue_issues(
+                            service_desk_id, queue_id, page_limit=config.jira.max_page_size
+                        )
+                        if not queue_issues:
+                            logger.warning(f"No issues returned from queue {queue_id}")
+                        merge(queue_issues)
+                        keys = [i['key'] for i in queue_issues if i.get('key')]
+                        stats['full_queues'] += 1
+                        if delta and jql:
+                            queue_states[queue_id] = {
+                                'jql': jql,
+                                'watermark': synced_at,
+                                'last_full_sync': synced_at
+                            }
+                        how = f"{len(keys)} issues"
+                memberships[queue_id] = keys
+                done += 1
+                print(f"  ✓ [{done}/{len(queues)}] {queue_name}: {how}")
+                report('fetch', done / len(queues), f"{queue_name}: {how}")
+            
+            check_cancel()
+            # Explicit tasks: when one queue fails or the sync is cancelled, the
+            # others are cancelled and awaited before the client is closed
+            tasks = [asyncio.create_task(sync_queue(queue)) for queue in queues]
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+            stats['requests'] = client.request_count
+        return issues_by_key, memberships, stats
+    
+    async def _fetch_bulk(self, client: AsyncJiraClient, project_key: str, bulk_state: Dict,
+                          cached_by_key: Dict[str, Dict], merge, stats: Dict, delta: bool, config,
+                          check_cancel) -> bool:
+        """
+        Fetch the whole project with one paged JQL search (delta when possible)
+        
+        The issues fetched are taken as the whole project (the store phase
+        drops every other issue), so a page that fails aborts the sync before
+        anything is stored or deleted and the watermarks stay where they were.
+        
+        Returns:
+            False when JQL search returned nothing (fall back to per-queue fetches)
+        
+        Raises:
+            IncompleteResultError: a page of the full search failed
+        """
+        jql = f'project = "{project_key}" ORDER BY key ASC'
+        fresh = datetime.now().timestamp() - bulk_state.get('last_full_sync', 0) <= config.jira.full_resync_interval
+        if delta and cached_by_key and bulk_state.get('watermark') and fresh:
+            try:
+                result = await fetch_delta_async(
+                    client, jql, set(cached_by_key), bulk_state['watermark'], fields=["*navigable"]
+                )
+            except Exception as e:
+                logger.warning(f"Bulk delta sync failed for {project_key}, doing full fetch: {e}")
+                result = None
+            if result is not None and result.keys:
+                for issue in result.changed:
+                    cached_by_key[issue['key']] = issue
+                merge(cached_by_key[k] for k in result.keys if k in cached_by_key)
+                bulk_state.update({'watermark': result.synced_at, 'last_changed': len(result.changed),
+                                   'last_removed': len(result.removed)})
+                stats['changed'] += len(result.changed)
+                stats['removed'] += len(result.removed)
+                print(f"  ✓ Bulk delta: {len(result.changed)} changed, {len(result.removed)} removed, {len(result.keys)} in {project_key}")
+                return True
+        
+        synced_at = datetime.now().timestamp()
+        fetched = 0
+        
+        def on_page(page: List[Dict]):
+            nonlocal fetched
+            check_cancel()
+            fetched += len(page)
+            merge(page)
+        
+        try:
+            await client.search_jql(jql, fields=["*navigable"], page_size=config.jira.bulk_page_size,
+                                    on_page=on_page, api_version=QUEUE_SEARCH_API_VERSION)
+        except IncompleteResultError:
+            logger.error(f"Bulk JQL search of {project_key} stopped after {fetched} issues; aborting sync")
+            raise
+        if not fetched:
+            logger.info(f"Bulk JQL search returned nothing for {project_key}; fetching queues instead")
+            return False
+        bulk_state.update({'jql': jql, 'watermark': synced_at, 'last_full_sync': synced_at})
+        print(f"  ✓ Bulk: {fetched} issues from project {project_key}")
+        return True
+    
+    async def _sync_queue_delta(self, client: AsyncJiraClient, queue: Dict, queue_state: Optional[Dict],
+                                cached_by_key: Dict[str, Dict], config) -> Optional[List[str]]:
+        """
+        Refresh one queue from its watermark (see utils.queue_delta)
+        
+        Updates queue_state in place and merges changed issues into cached_by_key.
+        Returns the queue keys in queue order, or None when a full fetch is
+        needed (no state, stale state or failure).
+        """
+        if not queue_state or not queue_state.get('jql') or not queue_state.get('watermark'):
+            return None
+        if datetime.now().timestamp() - queue_state.get('last_full_sync', 0) > config.jira.full_resync_interval:
+            return None
+        
+        # Membership of the last sync (older metadata kept it in the queue state)
+        members = self.store.queue_keys(queue.get('id')) or queue_state.get('keys', [])
+        known_keys = {k for k in members if k in cached_by_key}
+        try:
+            result = await fetch_delta_async(
+                client,
+                queue.get('jql') or queue_state['jql'],
+                known_keys,
+                queue_state['watermark'],
+                fields=["*navigable"]
+            )
+        except Exception as e:
+            logger.warning(f"Delta sync failed for queue {queue.get('id')}, doing full fetch: {e}")
+            return None
+        if not result.keys:
+            return None
+        
+        for issue in result.changed:
+            cached_by_key[issue['key']] = issue
+        queue_state.pop('keys', None)
+        queue_state.update({
+            'jql': queue.get('jql') or queue_state['jql'],
+            'watermark': result.synced_at,
+            'last_changed': len(result.changed),
+            'last_removed': len(result.removed)
+        })
+        return [k for k in result.keys if k in cached_by_key]
+    
+    def get_issue_log(self) -> IssueLog:
+        """Append-only issue log of this cache directory (utils.issue_log)"""
+        return get_issue_log(self.issue_log_dir)
+    
+    def load_issues(self, project_key: Optional[str] = None, source=None, **filters) -> List[Dict]:
+        """
+        Raw cached issues of a project (see IssueStore.iter_issues for filters)
+        
+        Reads the shared issue snapshot when available, else the store (or the
+        given source). Falls back to the issue log, then to the legacy
+        msm_issues.json.gz (filters are not applied to the fallbacks).
+        """
+        source = source or get_issue_source(self.store)
+        if not source.is_empty(project_key):
+            return source.load_issues(project_key, **filters)
+        if self.issue_log_dir.exists():
+            log = self.get_issue_log()
+            if not log.is_empty(project_key):
+                return list(log.iter_issues(project_key))
+        cached = self._load_json(self.issues_file, {})
+        if project_key and cached.get('project_key') not in (None, project_key):
+            return []
+        return [i for i in cached.get('issues', []) if i.get('key')]
+    
+    def _extract_issue_data(self, issue_data: Dict) -> Dict:
+        """Extract normalized issue data from raw JIRA issue"""
+        fields = issue_data.get('fields', {})
+        
+        # Severity from custom field (Criticidad option or plain string)
+        custom_field_10125 = fields.get('customfield_10125')
+        severity = name_of(custom_field_10125, 'value') if isinstance(custom_field_10125, (dict, str)) else None
+        
+        priority = name_of(fields.get('priority'), 'name')
+        assignee = name_of(fields.get('assignee'), 'displayName')
+        reporter = name_of(fields.get('reporter'), 'displayName')
+        status = name_of(fields.get('status'), 'name')
         labels = fields.get('labels', [])
         
         return {
@@ -297,127 +654,42 @@ class IssueCacheManager:
         }
     
     def analyze_patterns(self, project_key: str):
-        """Analyze issues to extract patterns (keywords -> severity/priority)"""
-        logger.info(f"Analyzing patterns for {project_key}")
-        
-        cache_data = self._load_json(self.issues_file)
-        if not cache_data or cache_data.get('project_key') != project_key:
-            logger.warning(f"No cached issues found for {project_key}")
-            print(f"⚠️ No cached issues found for {project_key}")
-            return
-        
-        issues = cache_data.get('issues', [])
-        
-        # Analyze severity patterns
-        severity_keywords = defaultdict(lambda: defaultdict(int))
-        priority_keywords = defaultdict(lambda: defaultdict(int))
+        """
+        Update the keyword patterns (keywords -> severity/priority) of a project
         
-        for issue_data in issues:
-            extracted = self._extract_issue_data(issue_data)
-            
-            summary = extracted.get('summary') or ''
-            description = extracted.get('description') or ''
-            labels = ' '.join(extracted.get('labels') or [])
-            severity = extracted.get('severity')
-            priority = extracted.get('priority')
-            
-            text = f"{summary} {description} {labels}".lower()
-            words = text.split()
-            
-            # Track keyword -> severity
-            if severity:
-                for word in words:
-                    if len(word) > 3:  # Skip short words
-                        severity_keywords[word][severity] += 1
-            
-            # Track keyword -> priority
-            if priority:
-                for word in words:
-                    if len(word) > 3:
-                        priority_keywords[word][priority] += 1
-        
-        # Build patterns with confidence scores
-        patterns = {
-            'severity': {},
-            'priority': {}
-        }
+        Incremental (utils.pattern_index): only issues updated since the last
+        run are re-tokenized. Before the first sync to the store, the patterns
+        are rebuilt from the legacy JSON export.
+        """
+        logger.info(f"Analyzing patterns for {project_key}")
         
-        for keyword, severities in severity_keywords.items():
-            total = sum(severities.values())
-            if total >= 3:  # Minimum occurrences
-                for severity, count in severities.items():
-                    confidence = count / total
-                    if confidence >= 0.5:  # Minimum confidence
-                        if keyword not in patterns['severity']:
-                            patterns['severity'][keyword] = []
-                        patterns['severity'][keyword].append({
-                            'value': severity,
-                            'confidence': confidence,
-                            'count': count
-                        })
-        
-        for keyword, priorities in priority_keywords.items():
-            total = sum(priorities.values())
-            if total >= 3:
-                for priority, count in priorities.items():
-                    confidence = count / total
-                    if confidence >= 0.5:
-                        if keyword not in patterns['priority']:
-                            patterns['priority'][keyword] = []
-                        patterns['priority'][keyword].append({
-                            'value': priority,
-                            'confidence': confidence,
-                            'count': count
-                        })
-        
-        # Save patterns to JSON
-        self._save_json(self.patterns_file, patterns)
+        if not self.store.is_empty(project_key):
+            stats = self.patterns.refresh(self.store, project_key)
+        else:
+            issues = self.load_issues(project_key)
+            if not issues:
+                logger.warning(f"No cached issues found for {project_key}")
+                print(f"⚠️ No cached issues found for {project_key}")
+                return
+            stats = self.patterns.rebuild(issues, project_key)
         
         # Log statistics
-        severity_count = sum(len(v) for v in patterns['severity'].values())
-        priority_count = sum(len(v) for v in patterns['priority'].values())
+        index_stats = self.patterns.get_stats()
+        severity_count = index_stats['severity_patterns']
+        priority_count = index_stats['priority_patterns']
         
-        logger.info(f"Found {severity_count} severity patterns, {priority_count} priority patterns")
-        print(f"✓ Analyzed {len(issues)} issues")
+        logger.info(f"Pattern index: {stats['changed']} issues re-indexed, {stats['removed']} removed, "
+                    f"{severity_count} severity patterns, {priority_count} priority patterns")
+        print(f"✓ Analyzed {stats['changed']} changed issues ({stats['removed']} removed, {stats['indexed']} indexed)")
         print(f"✓ Found {severity_count} severity patterns, {priority_count} priority patterns")
         print(f"💾 Patterns saved to {self.patterns_file}")
     
     def get_suggestion_from_patterns(self, text: str, field_type: str) -> Optional[Tuple[str, float, str]]:
         """
-        Get field suggestion based on learned patterns
+        Get field suggestion based on learned patterns (in-memory index)
         Returns: (value, confidence, reason) or None
         """
-        if not text:
-            return None
-        
-        patterns = self._load_json(self.patterns_file)
-        if not patterns or field_type not in patterns:
-            return None
-        
-        text_lower = text.lower()
-        words = text_lower.split()
-        
-        # Find matching patterns
-        matches = []
-        for word in words:
-            if len(word) > 3 and word in patterns[field_type]:
-                for pattern in patterns[field_type][word]:
-                    matches.append({
-                        'value': pattern['value'],
-                        'confidence': pattern['confidence'],
-                        'count': pattern['count'],
-                        'keyword': word
-                    })
-        
-        if not matches:
-            return None
-        
-        # Return best match
-        best = max(matches, key=lambda x: (x['confidence'], x['count']))
-        
-        reason = f"Keyword '{best['keyword']}' suggests {best['value']} ({best['confidence']:.0%} confidence from {best['count']} occurrences)"
-        
-        return (best['value'], best['confidence'], reason)
+        return self.patterns.suggest(text, field_type)
     
     def get_sync_status(self, project_key: str) -> Optional[Dict]:
         """Get sync status for a project"""
@@ -439,10 +711,7 @@ class IssueCacheManager:
     
     def get_patterns(self, field_type: str = None) -> Dict:
         """Get all learned patterns"""
-        patterns = self._load_json(self.patterns_file)
-        if field_type:
-            return patterns.get(field_type, {})
-        return patterns
+        return self.patterns.patterns(field_type)
 
 # Global instance
 _cache_manager = None
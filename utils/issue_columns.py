@@ -0,0 +1,370 @@
+# -*- coding: utf-8 -*-
+"""
+Issue Columns Module
+Typed, columnar view of issues for vectorized analytics
+
+IssueColumns holds one NumPy array per column:
+- categorical columns (status, assignee, issue type, priority, ...) are
+  dictionary-encoded: int32 codes (-1 = missing) + the list of categories
+- timestamps are parsed once into float64 epoch seconds (NaN = missing),
+  plus the UTC offset (minutes) they were written with, so calendar buckets
+  can follow the wall clock of the original JIRA value
+- SLA fields (first running SLA of the issue) are float64 milliseconds
+
+sync_project writes the columns of all stored issues to a Parquet file
+(data/cache/issue_analytics.parquet, requires pyarrow). load_issue_columns()
+reads only the requested columns from it; without pyarrow or before the
+first sync it builds them from the issue snapshot/store instead.
+
+    cols = load_issue_columns(["status", "created"], project_key="MSM")
+    cols.counts("status")                  # {"Cerrado": 812, ...}
+    cols.wallclock("created")              # float64 local-time seconds
+"""
+
+import logging
+import math
+import os
+import threading
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.field_compiler import name_of
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COLUMNS_PATH = Path(__file__).resolve().parent.parent / "data" / "cache" / "issue_analytics.parquet"
+
+CATEGORICAL_COLUMNS = ("project", "status", "assignee", "issue_type", "priority", "severity", "sla_status")
+TIMESTAMP_COLUMNS = ("created", "updated", "resolved")
+NUMERIC_COLUMNS = ("comment_count", "sla_goal_ms", "sla_elapsed_ms", "sla_remaining_ms", "sla_breached", "sla_paused")
+ALL_COLUMNS = ("key",) + CATEGORICAL_COLUMNS + TIMESTAMP_COLUMNS + NUMERIC_COLUMNS
+
+# Columns available from issue snapshot/store rows (no raw JSON parsing)
+_ROW_COLUMNS = {"key", "project", "status", "assignee", "issue_type", "priority", "severity",
+                "created", "updated", "resolved", "comment_count"}
+
+# SLA fields, primary SLAs first ("Cierre Ticket" last), as in api.blueprints.sla
+SLA_FIELD_IDS = (
+    "customfield_10170", "customfield_10181", "customfield_10182", "customfield_10183",
+    "customfield_10184", "customfield_10185", "customfield_10186", "customfield_10187",
+    "customfield_10190", "customfield_10259", "customfield_11957", "customfield_10176",
+)
+
+@lru_cache(maxsize=65536)
+def _parse_iso(value: str) -> Tuple[float, float]:
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return math.nan, math.nan
+    offset = dt.utcoffset()
+    return dt.timestamp(), (offset.total_seconds() / 60 if offset is not None else 0.0)
+
+def parse_timestamp(value: Any) -> Tuple[float, float]:
+    """ISO timestamp (JIRA format included) -> (epoch seconds, UTC offset minutes); NaN if missing/invalid"""
+    if not value or not isinstance(value, str):
+        return math.nan, math.nan
+    return _parse_iso(value)
+
+def sla_values(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Numeric values of the first SLA field with a running (else last completed) cycle"""
+    for field_id in SLA_FIELD_IDS:
+        sla = fields.get(field_id)
+        if not isinstance(sla, dict):
+            continue
+        cycle = sla.get("ongoingCycle")
+        if cycle:
+            status = "paused" if cycle.get("paused") else "breached" if cycle.get("breached") else "ongoing"
+        else:
+            completed = sla.get("completedCycles") or []
+            if not completed:
+                continue
+            cycle = completed[-1]
+            status = "breached" if cycle.get("breached") else "met"
+        return {
+            "sla_status": status,
+            "sla_goal_ms": (cycle.get("goalDuration") or {}).get("millis"),
+            "sla_elapsed_ms": (cycle.get("elapsedTime") or {}).get("millis"),
+            "sla_remaining_ms": (cycle.get("remainingTime") or {}).get("millis"),
+            "sla_breached": 1.0 if cycle.get("breached") else 0.0,
+            "sla_paused": 1.0 if cycle.get("paused") else 0.0,
+        }
+    return {}
+
+def _comment_count(fields: Dict[str, Any]) -> int:
+    comments = fields.get("comment")
+    if isinstance(comments, dict):
+        return comments.get("total", len(comments.get("comments") or []))
+    return 0
+
+def _severity(fields: Dict[str, Any]) -> Optional[str]:
+    severity = fields.get("customfield_10125")
+    return name_of(severity, "value", "name") if isinstance(severity, (dict, str)) else None
+
+# Column getters (item, item fields) of raw JIRA issues
+_ISSUE_GETTERS = {
+    "key": lambda i, f: i.get("key") or "",
+    "project": lambda i, f: (i.get("key") or "").split("-")[0],
+    "status": lambda i, f: name_of(f.get("status"), "name"),
+    "assignee": lambda i, f: name_of(f.get("assignee"), "displayName", "name"),
+    "issue_type": lambda i, f: name_of(f.get("issuetype"), "name"),
+    "priority": lambda i, f: name_of(f.get("priority"), "name"),
+    "severity": lambda i, f: _severity(f),
+    "created": lambda i, f: f.get("created"),
+    "updated": lambda i, f: f.get("updated"),
+    "resolved": lambda i, f: f.get("resolutiondate"),
+    "comment_count": lambda i, f: _comment_count(f),
+}
+
+# Column getters of formatted queue records (core.api.load_queue_issues) and of
+# flat issue dicts (status/priority/... as names or JIRA objects)
+_RECORD_GETTERS = {
+    "key": lambda r, f: r.get("key") or "",
+    "status": lambda r, f: name_of(r.get("status"), "name"),
+    "assignee": lambda r, f: name_of(r.get("assignee"), "displayName"),
+    "issue_type": lambda r, f: name_of(r.get("issuetype") or r.get("issue_type"), "name"),
+    "priority": lambda r, f: name_of(r.get("priority") or f.get("priority"), "name"),
+    "severity": lambda r, f: r.get("severity"),
+    "created": lambda r, f: r.get("created"),
+    "updated": lambda r, f: r.get("updated"),
+    "resolved": lambda r, f: r.get("resolutiondate") or r.get("resolved") or f.get("resolutiondate"),
+    "comment_count": lambda r, f: r.get("comment_count") or 0,
+}
+
+class IssueColumns:
+    """Column arrays of a set of issues (see module docstring)"""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], categories: Dict[str, List[str]], size: int):
+        self.arrays = arrays
+        self.categories = categories
+        self.size = size
+
+    def __len__(self) -> int:
+        return self.size
+
+    @classmethod
+    def from_lists(cls, values: Dict[str, List[Any]], size: int) -> "IssueColumns":
+        """Build from one list of Python values per column"""
+        arrays: Dict[str, np.ndarray] = {}
+        categories: Dict[str, List[str]] = {}
+        for name, column in values.items():
+            if name in CATEGORICAL_COLUMNS:
+                index: Dict[str, int] = {}
+                codes = [-1 if v is None else index.setdefault(str(v), len(index)) for v in column]
+                arrays[name] = np.array(codes, dtype=np.int32)
+                categories[name] = list(index)
+            elif name in TIMESTAMP_COLUMNS:
+                parsed = np.array([parse_timestamp(v) for v in column], dtype=np.float64).reshape(size, 2)
+                arrays[name] = parsed[:, 0].copy()
+                arrays[f"{name}_offset"] = parsed[:, 1].copy()
+            elif name in NUMERIC_COLUMNS:
+                arrays[name] = np.array([math.nan if v is None else v for v in column], dtype=np.float64)
+            else:
+                arrays[name] = np.array(column, dtype=object)
+        return cls(arrays, categories, size)
+
+    @classmethod
+    def from_values(cls, rows: Iterable[Dict[str, Any]], columns: Optional[Sequence[str]] = None) -> "IssueColumns":
+        """Build from per-issue value dicts (e.g. issue snapshot/store rows)"""
+        rows = rows if isinstance(rows, list) else list(rows)
+        columns = tuple(columns or ALL_COLUMNS)
+        return cls.from_lists({name: [row.get(name) for row in rows] for name in columns}, len(rows))
+
+    @classmethod
+    def _from_items(cls, items: Iterable[Dict[str, Any]], getters: Dict[str, Any],
+                    columns: Optional[Sequence[str]]) -> "IssueColumns":
+        """Extract only the requested columns (SLA fields parsed only when requested)"""
+        items = items if isinstance(items, list) else list(items)
+        columns = tuple(columns or ALL_COLUMNS)
+        fields = [item.get("fields") or {} for item in items]
+        values = {
+            name: [getters[name](item, f) for item, f in zip(items, fields)]
+            for name in columns if name in getters
+        }
+        if any(name.startswith("sla_") for name in columns):
+            slas = [sla_values(f) if f else {} for f in fields]
+            for name in columns:
+                if name.startswith("sla_"):
+                    values[name] = [sla.get(name) for sla in slas]
+        return cls.from_lists({name: values[name] for name in columns}, len(items))
+
+    @classmethod
+    def from_issues(cls, issues: Iterable[Dict[str, Any]], columns: Optional[Sequence[str]] = None) -> "IssueColumns":
+        """Build from raw JIRA issues"""
+        return cls._from_items(issues, _ISSUE_GETTERS, columns)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]], columns: Optional[Sequence[str]] = None) -> "IssueColumns":
+        """Build from queue records / flat issue dicts (a record's own sla_status wins)"""
+        records = records if isinstance(records, list) else list(records)
+        result = cls._from_items(records, _RECORD_GETTERS, columns)
+        if "sla_status" in result.categories and any(r.get("sla_status") for r in records):
+            labels = result.labels("sla_status", default=None)
+            status = [r.get("sla_status") or label for r, label in zip(records, labels)]
+            override = cls.from_lists({"sla_status": status}, len(records))
+            result.arrays["sla_status"] = override.arrays["sla_status"]
+            result.categories["sla_status"] = override.categories["sla_status"]
+        return result
+
+    # -- accessors ---------------------------------------------------------
+
+    def codes(self, name: str) -> Tuple[np.ndarray, List[str]]:
+        """Categorical column: int32 codes (-1 = missing) and categories"""
+        return self.arrays[name], self.categories[name]
+
+    def counts(self, name: str, default: Optional[str] = "Unknown", mask: Optional[np.ndarray] = None) -> Dict[str, int]:
+        """Occurrences per category (missing values counted under default unless it is None)"""
+        codes, categories = self.codes(name)
+        if mask is not None:
+            codes = codes[mask]
+        tally = np.bincount(codes + 1, minlength=len(categories) + 1)
+        result: Dict[str, int] = {}
+        if default is not None and tally[0]:
+            result[default] = int(tally[0])
+        for category, count in zip(categories, tally[1:]):
+            if count:
+                result[category] = result.get(category, 0) + int(count)
+        return result
+
+    def labels(self, name: str, default: Optional[str] = "Unknown") -> np.ndarray:
+        """Categorical column decoded to an object array"""
+        codes, categories = self.codes(name)
+        lookup = np.array([default] + categories, dtype=object)
+        return lookup[codes + 1]
+
+    def epoch(self, name: str) -> np.ndarray:
+        """Timestamp column as float64 epoch seconds (NaN = missing)"""
+        return self.arrays[name]
+
+    def wallclock(self, name: str) -> np.ndarray:
+        """Timestamp column as seconds of the original local wall clock (for day/hour buckets)"""
+        return self.arrays[name] + self.arrays[f"{name}_offset"] * 60
+
+    def numeric(self, name: str) -> np.ndarray:
+        """Numeric column as float64 (NaN = missing)"""
+        return self.arrays[name]
+
+    def filter(self, mask: np.ndarray) -> "IssueColumns":
+        """Subset of rows (categories are kept)"""
+        return IssueColumns({k: v[mask] for k, v in self.arrays.items()}, self.categories, int(np.count_nonzero(mask)))
+
+    # -- Arrow ---------------------------------------------------------------
+
+    def to_arrow(self):
+        """pyarrow Table (dictionary-encoded categoricals, UTC timestamps)"""
+        import pyarrow as pa
+        columns = {}
+        for name, values in self.arrays.items():
+            if name in CATEGORICAL_COLUMNS:
+                indices = pa.array(values, type=pa.int32(), mask=values < 0)
+                columns[name] = pa.DictionaryArray.from_arrays(indices, pa.array(self.categories[name], type=pa.string()))
+            elif name in TIMESTAMP_COLUMNS:
+                missing = np.isnan(values)
+                micros = np.where(missing, 0, values * 1e6).astype(np.int64)
+                columns[name] = pa.array(micros, type=pa.timestamp("us", tz="UTC"), mask=missing)
+            elif values.dtype == object:
+                columns[name] = pa.array(values.tolist(), type=pa.string())
+            else:
+                columns[name] = pa.array(values)
+        return pa.table(columns)
+
+    @classmethod
+    def from_arrow(cls, table) -> "IssueColumns":
+        """Inverse of to_arrow (zero-copy where Arrow allows it)"""
+        import pyarrow as pa
+        arrays: Dict[str, np.ndarray] = {}
+        categories: Dict[str, List[str]] = {}
+        for name in table.column_names:
+            column = table.column(name).combine_chunks()
+            if pa.types.is_dictionary(column.type):
+                arrays[name] = column.indices.fill_null(-1).to_numpy(zero_copy_only=False).astype(np.int32)
+                categories[name] = column.dictionary.to_pylist()
+            elif pa.types.is_timestamp(column.type):
+                micros = column.cast(pa.int64()).to_numpy(zero_copy_only=False).astype(np.float64)
+                micros[np.asarray(column.is_null())] = math.nan
+                arrays[name] = micros / 1e6
+            elif pa.types.is_string(column.type):
+                arrays[name] = np.array(column.to_pylist(), dtype=object)
+            else:
+                arrays[name] = column.to_numpy(zero_copy_only=False)
+        return cls(arrays, categories, table.num_rows)
+
+# ============================================================
+# PERSISTENCE
+# ============================================================
+
+def write_columnar_snapshot(issues: Iterable[Dict[str, Any]], path: Path = DEFAULT_COLUMNS_PATH) -> Optional[int]:
+    """
+    Write the analytics columns of raw issues to Parquet (atomic replace)
+
+    Returns:
+        Row count, or None when pyarrow is not installed
+    """
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        logger.debug("pyarrow not installed; columnar analytics snapshot skipped")
+        return None
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    columns = IssueColumns.from_issues(issues)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    pq.write_table(columns.to_arrow(), tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+    _loaded.clear()
+    logger.info(f"📊 Wrote columnar analytics snapshot: {len(columns)} issues → {path.name}")
+    return len(columns)
+
+_loaded: Dict[Tuple, IssueColumns] = {}
+_loaded_lock = threading.Lock()
+_MAX_LOADED = 8
+
+def load_issue_columns(columns: Optional[Sequence[str]] = None, project_key: Optional[str] = None,
+                       path: Path = DEFAULT_COLUMNS_PATH) -> IssueColumns:
+    """
+    Analytics columns of the cached issues, reading only the requested columns
+
+    Prefers the Parquet snapshot (pyarrow); otherwise builds the columns from
+    the issue snapshot/store rows, parsing raw issues only when SLA columns are
+    requested. Results are memoized until the next sync rewrites the file.
+    """
+    columns = tuple(columns or ALL_COLUMNS)
+    try:
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        stamp = None
+    cache_key = (str(path), stamp, columns, project_key)
+    with _loaded_lock:
+        if stamp is not None and cache_key in _loaded:
+            return _loaded[cache_key]
+
+    result = None
+    if stamp is not None:
+        try:
+            import pyarrow.parquet as pq
+            read = list(columns) + [f"{name}_offset" for name in columns if name in TIMESTAMP_COLUMNS]
+            table = pq.read_table(path, columns=read, filters=[("project", "=", project_key)] if project_key else None)
+            result = IssueColumns.from_arrow(table)
+        except ImportError:
+            pass
+        except Exception as e:
+            logger.warning(f"Columnar analytics snapshot unreadable ({path}): {e}")
+
+    if result is None:
+        from utils.issue_snapshot import get_issue_source
+        source = get_issue_source()
+        if set(columns) <= _ROW_COLUMNS:
+            result = IssueColumns.from_values(source.rows(list(columns), project_key=project_key), columns)
+        else:
+            result = IssueColumns.from_issues(source.iter_issues(project_key), columns)
+
+    if stamp is not None:
+        with _loaded_lock:
+            if len(_loaded) >= _MAX_LOADED:
+                _loaded.clear()
+            _loaded[cache_key] = result
+    return result
@@ -0,0 +1,448 @@
+# -*- coding: utf-8 -*-
+"""
+Issue Log Module
+Append-only, segmented and compressed log of raw JIRA issues
+
+Streamable replacement for the monolithic msm_issues.json.gz export: a sync
+appends only the issues whose content changed (plus tombstones for issues that
+left the project), and readers stream live issues segment by segment.
+
+Layout (data/cache/issue_log/):
+    segment-000001.log   header (magic, version, codec, dictionary id) + frames
+    dict-000001.bin      compression dictionary trained on sampled issues
+
+Each frame is one issue: payload length, CRC32, content fingerprint, key, and
+the issue JSON compressed on its own with the segment's dictionary (so small
+records still compress well and any record can be read without its
+neighbours). An empty payload is a tombstone.
+
+Crash safety: segments are only appended to and fsynced per batch; new
+segments appear through an atomic rename; a torn tail in the last segment is
+truncated on open. The newest record of a key (segment order, then offset)
+wins, so no manifest is needed.
+
+The active segment rotates at segment_bytes. When more than half of the log
+is dead records, compaction rewrites the live issues into new segments with a
+freshly trained dictionary, then deletes the old segments and dictionaries.
+
+Compression uses zstd with a trained dictionary when the optional zstandard
+package is installed, else raw deflate with a preset dictionary (zlib).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import struct
+import threading
+import zlib
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+try:
+    import zstandard
+except ImportError:  # optional: deflate with a preset dictionary instead
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOG_DIR = Path("data/cache/issue_log")
+
+CODEC_ZSTD = 1
+CODEC_DEFLATE = 2
+
+_MAGIC = b"ISLG"
+_VERSION = 1
+_SEGMENT_HEADER = struct.Struct("<4sBBI")   # magic, version, codec, dictionary id
+_FRAME_HEADER = struct.Struct("<IIQH")      # payload length, crc32, fingerprint, key length
+
+ZSTD_LEVEL = 3
+DICT_SIZE = 64 * 1024          # zstd dictionary size
+DEFLATE_DICT_SIZE = 4 * 1024   # deflate re-reads its preset dictionary per record: keep it small
+TRAIN_MIN_SAMPLES = 100        # Issues needed before a dictionary is trained
+TRAIN_MAX_SAMPLES = 2000
+
+class _Entry(NamedTuple):
+    segment: int
+    offset: int
+    length: int        # frame length (header + key + payload)
+    fingerprint: int
+
+def fingerprint(payload: bytes) -> int:
+    """64-bit content hash of a serialized issue"""
+    return int.from_bytes(hashlib.blake2b(payload, digest_size=8).digest(), "little")
+
+def _serialize(issue: Dict[str, Any]) -> bytes:
+    # Canonical compact JSON: equal issues give equal fingerprints
+    return json.dumps(issue, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+class _Codec:
+    """Per-record compressor of one segment (codec + dictionary)"""
+
+    def __init__(self, codec: int, dictionary: Optional[bytes]):
+        self.codec = codec
+        self.dictionary = dictionary
+        if codec == CODEC_ZSTD:
+            if zstandard is None:
+                raise RuntimeError("Issue log segment uses zstd but zstandard is not installed")
+            dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+            self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dict_data)
+            self._decompressor = zstandard.ZstdDecompressor(dict_data=dict_data)
+        elif codec != CODEC_DEFLATE:
+            raise ValueError(f"Unknown issue log codec: {codec}")
+
+    def compress(self, data: bytes) -> bytes:
+        if self.codec == CODEC_ZSTD:
+            return self._compressor.compress(data)
+        if self.dictionary:
+            compressor = zlib.compressobj(6, zlib.DEFLATED, -15, zdict=self.dictionary)
+        else:
+            compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+        return compressor.compress(data) + compressor.flush()
+
+    def decompress(self, data: bytes) -> bytes:
+        if self.codec == CODEC_ZSTD:
+            return self._decompressor.decompress(data)
+        if self.dictionary:
+            decompressor = zlib.decompressobj(-15, zdict=self.dictionary)
+        else:
+            decompressor = zlib.decompressobj(-15)
+        return decompressor.decompress(data) + decompressor.flush()
+
+def train_dictionary(samples: List[bytes]) -> Optional[bytes]:
+    """Compression dictionary for the available codec (None with too few samples)"""
+    if len(samples) < TRAIN_MIN_SAMPLES:
+        return None
+    if zstandard is not None:
+        try:
+            return zstandard.train_dictionary(DICT_SIZE, samples).as_bytes()
+        except Exception as e:
+            logger.warning(f"zstd dictionary training failed: {e}")
+            return None
+    # Deflate matches against the tail of the sampled issues (priming costs per record)
+    return b"".join(samples)[-DEFLATE_DICT_SIZE:]
+
+class IssueLog:
+    """Thread-safe append-only issue log (see module docstring)"""
+
+    def __init__(self, path: Path = DEFAULT_LOG_DIR, segment_bytes: int = 64 * 1024 * 1024,
+                 compact_min_bytes: int = 8 * 1024 * 1024):
+        """
+        Args:
+            path: Log directory
+            segment_bytes: Size at which the active segment is rotated
+            compact_min_bytes: Logs smaller than this are never compacted
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.compact_min_bytes = compact_min_bytes
+        self._lock = threading.RLock()
+        self._index: Dict[str, _Entry] = {}
+        self._segments: Dict[int, Path] = {}
+        self._codecs: Dict[int, _Codec] = {}
+        self._sizes: Dict[int, int] = {}
+        self._dict_id = 0
+        self._active: Optional[int] = None
+        self._stats = {"written": 0, "skipped": 0, "deleted": 0, "compactions": 0}
+        self._open()
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def write(self, issues: Iterable[Dict[str, Any]]) -> int:
+        """
+        Append issues whose content changed since they were last written
+
+        Returns:
+            Number of issues appended
+        """
+        records = []
+        for issue in issues:
+            key = issue.get("key")
+            if key:
+                payload = _serialize(issue)
+                records.append((key, payload, fingerprint(payload)))
+        with self._lock:
+            changed = [r for r in records if r[0] not in self._index or self._index[r[0]].fingerprint != r[2]]
+            self._stats["skipped"] += len(records) - len(changed)
+            if changed:
+                if self._active is None and not self._dict_id:
+                    self._train([payload for _, payload, _ in changed])
+                self._append(changed)
+                self._stats["written"] += len(changed)
+            self._maybe_compact()
+            return len(changed)
+
+    def delete(self, keys: Iterable[str]) -> int:
+        """Append tombstones for stored keys. Returns the number deleted."""
+        with self._lock:
+            stale = [k for k in dict.fromkeys(keys) if k in self._index]
+            if stale:
+                self._append([(k, b"", 0) for k in stale])
+                self._stats["deleted"] += len(stale)
+                self._maybe_compact()
+            return len(stale)
+
+    def delete_missing(self, project_key: str, keep_keys: Iterable[str]) -> int:
+        """Delete issues of a project (key prefix) that are not in keep_keys"""
+        keep = set(keep_keys)
+        prefix = f"{project_key}-"
+        with self._lock:
+            return self.delete([k for k in self._index if k.startswith(prefix) and k not in keep])
+
+    def compact(self):
+        """Rewrite the live issues into new segments with a freshly trained dictionary"""
+        with self._lock:
+            old_segments = dict(self._segments)
+            old_dicts = set(self.path.glob("dict-*.bin"))
+            keys = list(self._index)
+            sample = random.sample(keys, min(len(keys), TRAIN_MAX_SAMPLES))
+            self._train([payload for _, payload in self._read(sample)])
+            self._active = None
+            index: Dict[str, _Entry] = {}
+            batch = []
+            for key, payload in self._read(keys):
+                batch.append((key, payload, fingerprint(payload)))
+                if len(batch) >= 1000:
+                    index.update(self._append(batch, update_index=False))
+                    batch = []
+            if batch:
+                index.update(self._append(batch, update_index=False))
+            # New segments are durable: drop the old ones and their dictionaries
+            self._index = index
+            for segment_id, path in old_segments.items():
+                path.unlink(missing_ok=True)
+                self._segments.pop(segment_id, None)
+                self._codecs.pop(segment_id, None)
+                self._sizes.pop(segment_id, None)
+            current = self._dict_path(self._dict_id)
+            for path in old_dicts:
+                if path != current:
+                    path.unlink(missing_ok=True)
+            self._stats["compactions"] += 1
+            logger.info(f"Compacted issue log: {len(index)} issues in {len(self._segments)} segment(s)")
+
+    def _maybe_compact(self):
+        total = sum(self._sizes.values())
+        live = sum(entry.length for entry in self._index.values())
+        if total >= self.compact_min_bytes and live * 2 < total:
+            self.compact()
+
+    def _train(self, samples: List[bytes]):
+        dictionary = train_dictionary(samples[:TRAIN_MAX_SAMPLES])
+        if dictionary:
+            self._dict_id += 1
+            tmp = self._dict_path(self._dict_id).with_suffix(".tmp")
+            tmp.write_bytes(dictionary)
+            os.replace(tmp, self._dict_path(self._dict_id))
+
+    def _append(self, records: List[tuple], update_index: bool = True) -> Dict[str, _Entry]:
+        """
+        Append (key, payload, fingerprint) frames (empty payload: tombstone),
+        rotating segments as needed, and fsync
+
+        Returns:
+            Entries of the non-tombstone frames
+        """
+        written: Dict[str, _Entry] = {}
+        pending = deque(records)
+        while pending:
+            if self._active is None or self._sizes[self._active] >= self.segment_bytes:
+                self._new_segment()
+            segment_id = self._active
+            codec = self._codecs[segment_id]
+            offset = self._sizes[segment_id]
+            chunks = []
+            while pending and offset < self.segment_bytes:
+                key, payload, fp = pending.popleft()
+                data = codec.compress(payload) if payload else b""
+                key_bytes = key.encode("utf-8")
+                crc = zlib.crc32(data, zlib.crc32(key_bytes))
+                frame = _FRAME_HEADER.pack(len(data), crc, fp, len(key_bytes)) + key_bytes + data
+                chunks.append(frame)
+                if payload:
+                    written[key] = _Entry(segment_id, offset, len(frame), fp)
+                else:
+                    written[key] = None
+                offset += len(frame)
+            with open(self._segments[segment_id], "ab") as f:
+                f.write(b"".join(chunks))
+                f.flush()
+                os.fsync(f.fileno())
+            self._sizes[segment_id] = offset
+        if update_index:
+            for key, entry in written.items():
+                if entry is None:
+                    self._index.pop(key, None)
+                else:
+                    self._index[key] = entry
+        return {k: e for k, e in written.items() if e is not None}
+
+    def _new_segment(self):
+        segment_id = max(self._segments, default=0) + 1
+        path = self.path / f"segment-{segment_id:06d}.log"
+        codec = CODEC_ZSTD if zstandard is not None else CODEC_DEFLATE
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(_SEGMENT_HEADER.pack(_MAGIC, _VERSION, codec, self._dict_id))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        self._segments[segment_id] = path
+        self._codecs[segment_id] = _Codec(codec, self._load_dict(self._dict_id))
+        self._sizes[segment_id] = _SEGMENT_HEADER.size
+        self._active = segment_id
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Latest version of one issue"""
+        for _, payload in self._read([key]):
+            return json.loads(payload)
+        return None
+
+    def iter_issues(self, project_key: Optional[str] = None, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the live issues (segment by segment, in write order)
+
+        Issues are read batch by batch under the lock; a concurrent write or
+        compaction may land between batches.
+        """
+        prefix = f"{project_key}-" if project_key else ""
+        with self._lock:
+            keys = [k for k in self._index if k.startswith(prefix)]
+        for start in range(0, len(keys), batch_size):
+            for _, payload in self._read(keys[start:start + batch_size]):
+                yield json.loads(payload)
+
+    def _read(self, keys: Iterable[str]) -> List[tuple]:
+        """(key, serialized issue) of the live keys, read in segment/offset order"""
+        with self._lock:
+            entries = sorted(
+                ((self._index[k], k) for k in keys if k in self._index),
+                key=lambda item: item[0][:2]
+            )
+            result = []
+            handle, handle_segment = None, None
+            try:
+                for entry, key in entries:
+                    if entry.segment != handle_segment:
+                        if handle:
+                            handle.close()
+                        handle, handle_segment = open(self._segments[entry.segment], "rb"), entry.segment
+                    handle.seek(entry.offset)
+                    result.append((key, self._decode(entry.segment, handle.read(entry.length))))
+            finally:
+                if handle:
+                    handle.close()
+            return result
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._index)
+
+    def is_empty(self, project_key: Optional[str] = None) -> bool:
+        prefix = f"{project_key}-" if project_key else ""
+        with self._lock:
+            return not any(k.startswith(prefix) for k in self._index)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "issues": len(self._index),
+                "segments": len(self._segments),
+                "total_bytes": sum(self._sizes.values()),
+                "live_bytes": sum(entry.length for entry in self._index.values()),
+                "codec": "zstd" if zstandard is not None else "deflate",
+                "dictionary": self._dict_id or None,
+            }
+
+    def _decode(self, segment_id: int, frame: bytes) -> bytes:
+        length, _, _, key_length = _FRAME_HEADER.unpack_from(frame)
+        start = _FRAME_HEADER.size + key_length
+        return self._codecs[segment_id].decompress(frame[start:start + length])
+
+    # ------------------------------------------------------------------
+    # Recovery
+    # ------------------------------------------------------------------
+
+    def _dict_path(self, dict_id: int) -> Path:
+        return self.path / f"dict-{dict_id:06d}.bin"
+
+    def _load_dict(self, dict_id: int) -> Optional[bytes]:
+        return self._dict_path(dict_id).read_bytes() if dict_id else None
+
+    def _open(self):
+        """Rebuild the key index from the segments (truncating a torn tail)"""
+        for tmp in self.path.glob("*.tmp"):
+            tmp.unlink(missing_ok=True)
+        dict_ids = [int(p.stem.split("-")[1]) for p in self.path.glob("dict-*.bin")]
+        self._dict_id = max(dict_ids, default=0)
+        paths = sorted(self.path.glob("segment-*.log"))
+        for position, path in enumerate(paths):
+            segment_id = int(path.stem.split("-")[1])
+            try:
+                self._scan(segment_id, path, last=position == len(paths) - 1)
+            except Exception as e:
+                logger.error(f"Unreadable issue log segment {path.name}, skipping: {e}")
+        # Keep appending to the last segment if it uses the current codec and dictionary
+        if self._segments:
+            last = max(self._segments)
+            codec = self._codecs[last]
+            expected = CODEC_ZSTD if zstandard is not None else CODEC_DEFLATE
+            if codec.codec == expected and codec.dictionary == self._load_dict(self._dict_id):
+                self._active = last
+        if self._index:
+            logger.info(f"Issue log opened: {len(self._index)} issues in {len(self._segments)} segment(s)")
+
+    def _scan(self, segment_id: int, path: Path, last: bool):
+        with open(path, "rb") as f:
+            header = f.read(_SEGMENT_HEADER.size)
+            magic, version, codec, dict_id = _SEGMENT_HEADER.unpack(header)
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError("bad segment header")
+            self._segments[segment_id] = path
+            self._codecs[segment_id] = _Codec(codec, self._load_dict(dict_id))
+            offset = _SEGMENT_HEADER.size
+            while True:
+                head = f.read(_FRAME_HEADER.size)
+                if len(head) < _FRAME_HEADER.size:
+                    valid = not head
+                    break
+                length, crc, fp, key_length = _FRAME_HEADER.unpack(head)
+                body = f.read(key_length + length)
+                if len(body) < key_length + length or (last and zlib.crc32(body[key_length:], zlib.crc32(body[:key_length])) != crc):
+                    valid = False
+                    break
+                key = body[:key_length].decode("utf-8")
+                frame_length = _FRAME_HEADER.size + key_length + length
+                if length:
+                    self._index[key] = _Entry(segment_id, offset, frame_length, fp)
+                else:
+                    self._index.pop(key, None)
+                offset += frame_length
+        if not valid:
+            logger.warning(f"Truncating torn tail of issue log segment {path.name} at {offset}")
+            with open(path, "r+b") as f:
+                f.truncate(offset)
+        self._sizes[segment_id] = offset
+
+# Global instances (one per directory: a log has a single writer per process)
+_issue_logs: Dict[Path, IssueLog] = {}
+_issue_log_lock = threading.Lock()
+
+def get_issue_log(path: Path = DEFAULT_LOG_DIR) -> IssueLog:
+    """Get the global issue log of a directory"""
+    path = Path(path).resolve()
+    with _issue_log_lock:
+        log = _issue_logs.get(path)
+        if log is None:
+            log = _issue_logs[path] = IssueLog(path)
+        return log
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Issue Records Module
+Compact, read-only collection of formatted queue issues
+
+core.api.load_queue_issues returns an IssueRecords instead of a DataFrame:
+- list views use compact(): JSON-ready records without the raw `fields`
+  object, built once per collection (no fillna / to_dict / recursive
+  sanitize over the full payload on every request)
+- analytic callers use to_dataframe(), built lazily on first use
+
+The records themselves are shared between callers (snapshots, coalesced
+loads); accessors that hand records out return shallow copies so callers can
+add keys (e.g. SLA data) without affecting each other.
+"""
+
+import datetime
+import math
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+# Top-level keys kept in list/kanban payloads (plus every customfield_*)
+ESSENTIAL_FIELDS = frozenset({
+    'key', 'summary', 'status', 'severity', 'assignee', 'assignee_id',
+    'created', 'updated', 'resolved', 'description', 'issue_type',
+    'labels', 'components', 'sla_agreements', 'last_real_change',
+    'watcher_count', 'is_watching', 'comment_count', 'reporter', 'creator'
+})
+
+def json_safe(value: Any) -> Any:
+    """Replace None/NaN with '' and dates with ISO strings (recursively)"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and math.isnan(value):
+        return ''
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {k: json_safe(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [json_safe(item) for item in value]
+    return value
+
+class IssueRecords(Sequence):
+    """Read-only sequence of formatted issue records with lazy views"""
+
+    def __init__(self, records: List[Dict[str, Any]]):
+        self._records = records
+        self._lock = threading.Lock()
+        self._compact: Optional[List[Dict[str, Any]]] = None
+        self._dataframe = None
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __getitem__(self, index):
+        return self._records[index]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._records)
+
+    @property
+    def empty(self) -> bool:
+        return not self._records
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Full records (including `fields`) as shallow copies"""
+        return [dict(record) for record in self._records]
+
+    def compact(self, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        JSON-ready list-view records (shallow copies of records[start:stop])
+
+        Every record has the same keys: ESSENTIAL_FIELDS and customfield_* keys
+        present in any record, missing values as ''. The raw `fields` object is
+        dropped. Built once per collection.
+        """
+        if self._compact is None:
+            with self._lock:
+                if self._compact is None:
+                    columns: Dict[str, None] = {}
+                    for record in self._records:
+                        for key in record:
+                            if key not in columns and (key in ESSENTIAL_FIELDS or key.startswith('customfield_')):
+                                columns[key] = None
+                    self._compact = [
+                        {key: json_safe(record.get(key)) for key in columns}
+                        for record in self._records
+                    ]
+        return [dict(record) for record in self._compact[start:stop]]
+
+    def to_dataframe(self):
+        """pandas DataFrame of the records (built lazily; each call returns a copy)"""
+        if self._dataframe is None:
+            with self._lock:
+                if self._dataframe is None:
+                    import pandas as pd
+                    self._dataframe = pd.DataFrame(self._records)
+        return self._dataframe.copy()
+
+    def value_counts(self, key: str) -> Dict[Any, int]:
+        """Occurrences of each value of a top-level key"""
+        return dict(Counter(record.get(key) for record in self._records))
+
+    def group_by(self, key: str) -> Dict[Any, List[Dict[str, Any]]]:
+        """Records grouped by a top-level key (shallow copies)"""
+        groups: Dict[Any, List[Dict[str, Any]]] = {}
+        for record in self._records:
+            groups.setdefault(record.get(key), []).append(dict(record))
+        return groups
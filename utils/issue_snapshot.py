@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+"""
+Issue Snapshot Module
+Immutable, memory-mapped snapshot of the issue store for analytics consumers
+
+Written once per sync (IssueCacheManager.sync_project) from the issue store,
+then opened read-only via mmap by every consumer (anomaly detection, comment
+suggestions, pattern analysis, embeddings). Pages live in the OS page cache,
+so all threads and worker processes share one copy instead of each parsing
+its own object graph.
+
+File layout (data/cache/issue_snapshot.bin):
+
+    MAGIC (8 bytes) | header length (uint32) | header JSON | sections...
+
+The header holds the snapshot version (ns timestamp of the sync), the row
+count and, per column, its type and section offsets (relative to the first
+8-byte-aligned position after the header):
+
+    dict  int32 codes (-1 = null) + dictionary in the header
+          (project, status, assignee, issue type, priority, severity)
+    text  int64 offsets (count + 1) + uint8 null mask + UTF-8 bytes
+          (key, summary, dates as received, and `raw`: the issue JSON blob)
+    f64   float64 values, NaN = null (parsed *_ts epoch timestamps, synced_at)
+    i32   int32 values (comment_count)
+
+Files are replaced atomically; get_issue_snapshot() reopens only when the
+file changes, so consumers reload exactly when a new sync lands. Snapshots
+expose the read API of utils.issue_store.IssueStore (is_empty, get_issue,
+get_many, load_issues, rows), and get_issue_source() returns the snapshot
+when available, else the store.
+"""
+
+import json
+import logging
+import math
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_PATH = Path(__file__).resolve().parent.parent / "data" / "cache" / "issue_snapshot.bin"
+
+MAGIC = b"ISNAP01\0"
+_HEADER_LEN = struct.Struct("<I")
+
+# Column name -> storage type (see module docstring)
+SNAPSHOT_COLUMNS = {
+    "key": "text",
+    "project": "dict",
+    "status": "dict",
+    "assignee": "dict",
+    "assignee_id": "dict",
+    "issue_type": "dict",
+    "priority": "dict",
+    "severity": "dict",
+    "summary": "text",
+    "created": "text",
+    "updated": "text",
+    "resolved": "text",
+    "created_ts": "f64",
+    "updated_ts": "f64",
+    "resolved_ts": "f64",
+    "comment_count": "i32",
+    "synced_at": "f64",
+    "raw": "text",
+}
+
+_ARRAY_CODES = {"dict": ("i", 4), "f64": ("d", 8), "i32": ("i", 4)}
+
+def parse_timestamp(value: Any) -> float:
+    """ISO timestamp (JIRA format included) -> epoch seconds; NaN if missing/invalid"""
+    if not value:
+        return math.nan
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return math.nan
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+# ============================================================
+# WRITER
+# ============================================================
+
+def write_issue_snapshot(rows: Iterable[Dict[str, Any]], path: Path = DEFAULT_SNAPSHOT_PATH,
+                         version: Optional[int] = None) -> int:
+    """
+    Write a snapshot from issue store rows (IssueStore.export_rows) atomically
+
+    Returns:
+        Snapshot version
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    version = version or time.time_ns()
+
+    values: Dict[str, List[Any]] = {name: [] for name in SNAPSHOT_COLUMNS}
+    blob = tempfile.TemporaryFile(dir=path.parent)
+    raw_offsets = [0]
+    for row in rows:
+        for name in SNAPSHOT_COLUMNS:
+            if name == "raw":
+                continue
+            if name.endswith("_ts"):
+                values[name].append(parse_timestamp(row.get(name[:-3])))
+            else:
+                values[name].append(row.get(name))
+        raw = row["raw"]
+        data = raw.encode("utf-8") if isinstance(raw, str) else raw
+        blob.write(data)
+        raw_offsets.append(raw_offsets[-1] + len(data))
+    count = len(raw_offsets) - 1
+
+    sections = bytearray()
+    columns_meta: Dict[str, Dict[str, Any]] = {}
+
+    def add_section(data: bytes) -> int:
+        offset = len(sections)
+        sections.extend(data)
+        sections.extend(b"\0" * (_align(len(sections)) - len(sections)))
+        return offset
+
+    for name, kind in SNAPSHOT_COLUMNS.items():
+        meta: Dict[str, Any] = {"type": kind}
+        if kind == "dict":
+            dictionary: Dict[str, int] = {}
+            codes = [-1 if v is None else dictionary.setdefault(str(v), len(dictionary)) for v in values[name]]
+            meta["dictionary"] = list(dictionary)
+            meta["data"] = add_section(struct.pack(f"<{count}i", *codes))
+        elif kind == "f64":
+            meta["data"] = add_section(struct.pack(f"<{count}d", *(math.nan if v is None else float(v) for v in values[name])))
+        elif kind == "i32":
+            meta["data"] = add_section(struct.pack(f"<{count}i", *(int(v or 0) for v in values[name])))
+        elif name == "raw":
+            meta["offsets"] = add_section(struct.pack(f"<{count + 1}q", *raw_offsets))
+            meta["nulls"] = add_section(bytes(count))
+            meta["data"] = None  # streamed after the other sections
+        else:
+            encoded = [None if v is None else str(v).encode("utf-8") for v in values[name]]
+            offsets = [0]
+            for item in encoded:
+                offsets.append(offsets[-1] + (len(item) if item else 0))
+            meta["offsets"] = add_section(struct.pack(f"<{count + 1}q", *offsets))
+            meta["nulls"] = add_section(bytes(1 if item is None else 0 for item in encoded))
+            meta["data"] = add_section(b"".join(item for item in encoded if item))
+        columns_meta[name] = meta
+    columns_meta["raw"]["data"] = len(sections)
+
+    header = json.dumps({
+        "version": version,
+        "count": count,
+        "written_at": time.time(),
+        "columns": columns_meta,
+    }, separators=(",", ":")).encode("utf-8")
+    prefix = MAGIC + _HEADER_LEN.pack(len(header)) + header
+    prefix += b"\0" * (_align(len(prefix)) - len(prefix))
+
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(prefix)
+            f.write(sections)
+            blob.seek(0)
+            shutil.copyfileobj(blob, f, 1024 * 1024)
+        os.replace(tmp_name, path)
+    except Exception:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+    finally:
+        blob.close()
+    logger.info(f"📦 Wrote issue snapshot v{version}: {count} issues, {path.stat().st_size / 1024 / 1024:.1f} MB")
+    return version
+
+# ============================================================
+# READER
+# ============================================================
+
+class IssueSnapshot:
+    """Read-only, memory-mapped view of one snapshot file"""
+
+    def __init__(self, path: Path = DEFAULT_SNAPSHOT_PATH):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"Not an issue snapshot: {self.path}")
+        start = len(MAGIC) + _HEADER_LEN.size
+        (header_len,) = _HEADER_LEN.unpack_from(self._mm, len(MAGIC))
+        header = json.loads(self._mm[start:start + header_len])
+        self._base = _align(start + header_len)
+        self.version: int = header["version"]
+        self.count: int = header["count"]
+        self.written_at: float = header["written_at"]
+        self._columns: Dict[str, Dict[str, Any]] = header["columns"]
+        self._view = memoryview(self._mm)
+        self._index: Optional[Dict[str, int]] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.count
+
+    # -- column access ---------------------------------------------------
+
+    def _array(self, offset: int, code: str, length: int) -> memoryview:
+        start = self._base + offset
+        size = struct.calcsize(code)
+        return self._view[start:start + length * size].cast(code)
+
+    def codes(self, name: str) -> Tuple[memoryview, List[str]]:
+        """Dictionary column: int32 codes (-1 = null) and the dictionary"""
+        meta = self._columns[name]
+        return self._array(meta["data"], "i", self.count), meta["dictionary"]
+
+    def numeric(self, name: str) -> memoryview:
+        """f64/i32 column as a zero-copy memoryview (numpy.asarray() works on it)"""
+        meta = self._columns[name]
+        code, _ = _ARRAY_CODES[meta["type"]]
+        return self._array(meta["data"], code, self.count)
+
+    def _text(self, name: str, index: int) -> Optional[str]:
+        meta = self._columns[name]
+        if self._view[self._base + meta["nulls"] + index]:
+            return None
+        offsets = self._array(meta["offsets"], "q", self.count + 1)
+        start = self._base + meta["data"]
+        return bytes(self._view[start + offsets[index]:start + offsets[index + 1]]).decode("utf-8")
+
+    def column(self, name: str) -> List[Any]:
+        """Decoded values of one column"""
+        kind = self._columns[name]["type"]
+        if kind == "dict":
+            codes, dictionary = self.codes(name)
+            return [dictionary[c] if c >= 0 else None for c in codes]
+        if kind in ("f64", "i32"):
+            values = self.numeric(name).tolist()
+            return [None if isinstance(v, float) and math.isnan(v) else v for v in values] if kind == "f64" else values
+        return [self._text(name, i) for i in range(self.count)]
+
+    # -- issue access ----------------------------------------------------
+
+    def index_of(self, key: str) -> Optional[int]:
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = {k: i for i, k in enumerate(self.column("key"))}
+        return self._index.get(key)
+
+    def raw(self, index: int) -> Dict[str, Any]:
+        """Parsed issue JSON of one row"""
+        return json.loads(self._text("raw", index))
+
+    def is_empty(self, project_key: Optional[str] = None) -> bool:
+        return not self._select(project_key) if project_key else self.count == 0
+
+    def get_issue(self, key: str) -> Optional[Dict[str, Any]]:
+        index = self.index_of(key)
+        return self.raw(index) if index is not None else None
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        found = {}
+        for key in keys:
+            index = self.index_of(key)
+            if index is not None:
+                found[key] = self.raw(index)
+        return found
+
+    def _select(self, project_key: Optional[str] = None, status: Optional[str] = None,
+                assignee: Optional[str] = None, created_since: Optional[str] = None,
+                updated_since: Optional[str] = None, min_comments: Optional[int] = None) -> List[int]:
+        """Row indexes matching the IssueStore filters"""
+        selected = range(self.count)
+        for name, value in (("project", project_key), ("status", status), ("assignee", assignee)):
+            if value is None:
+                continue
+            codes, dictionary = self.codes(name)
+            try:
+                code = dictionary.index(value)
+            except ValueError:
+                return []
+            selected = [i for i in selected if codes[i] == code]
+        for name, value in (("created_ts", created_since), ("updated_ts", updated_since)):
+            if value is None:
+                continue
+            threshold = parse_timestamp(value)
+            values = self.numeric(name)
+            selected = [i for i in selected if values[i] >= threshold]
+        if min_comments is not None:
+            counts = self.numeric("comment_count")
+            selected = [i for i in selected if counts[i] >= min_comments]
+        return list(selected)
+
+    def iter_issues(self, project_key: Optional[str] = None, **filters) -> Iterator[Dict[str, Any]]:
+        for index in self._select(project_key, **filters):
+            yield self.raw(index)
+
+    def load_issues(self, project_key: Optional[str] = None, **filters) -> List[Dict[str, Any]]:
+        return list(self.iter_issues(project_key, **filters))
+
+    def rows(self, columns: Sequence[str], project_key: Optional[str] = None, **filters) -> List[Dict[str, Any]]:
+        """Column values of the matching rows (no JSON parsing)"""
+        unknown = [c for c in columns if c not in self._columns or c == "raw"]
+        if unknown:
+            raise ValueError(f"Unknown issue snapshot columns: {unknown}")
+        selected = self._select(project_key, **filters)
+        decoded = {name: self.column(name) for name in columns}
+        return [{name: decoded[name][i] for name in columns} for i in selected]
+
+# ============================================================
+# SHARED INSTANCE
+# ============================================================
+
+_snapshot: Optional[IssueSnapshot] = None
+_snapshot_stamp: Optional[Tuple[int, int, int]] = None
+_snapshot_lock = threading.Lock()
+
+def get_issue_snapshot(path: Path = DEFAULT_SNAPSHOT_PATH) -> Optional[IssueSnapshot]:
+    """Current snapshot (reopened only when the file was replaced); None if missing"""
+    global _snapshot, _snapshot_stamp
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    if stamp != _snapshot_stamp:
+        with _snapshot_lock:
+            if stamp != _snapshot_stamp:
+                try:
+                    _snapshot = IssueSnapshot(path)
+                    logger.info(f"📦 Opened issue snapshot v{_snapshot.version} ({_snapshot.count} issues)")
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Issue snapshot unavailable ({path}): {e}")
+                    _snapshot = None
+                _snapshot_stamp = stamp
+    return _snapshot
+
+def get_issue_source(store=None):
+    """Snapshot when one has been written, else the issue store"""
+    snapshot = get_issue_snapshot()
+    if snapshot is not None and snapshot.count:
+        return snapshot
+    if store is None:
+        from utils.issue_store import get_issue_store
+        store = get_issue_store()
+    return store
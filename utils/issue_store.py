@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""
+Issue Store Module
+SQLite-backed, indexed store of synced JIRA issues (data/issue_cache.db)
+
+One row per issue: the raw issue JSON plus extracted columns (project, status,
+assignee, issue type, priority, severity, summary, dates, comment count).
+Indexed columns let consumers read only the slice they need instead of
+decompressing and parsing the whole project:
+
+    store = get_issue_store()
+    store.upsert_issues(issues)                                # per-issue upserts
+    store.get_issue("MSM-123")                                 # one raw issue
+    store.get_many(["MSM-1", "MSM-7"])                         # key -> raw issue
+    store.iter_issues("MSM", updated_since="2025-10-01")       # raw issues, streamed
+    store.rows(["key", "status", "created"], project_key="MSM")  # columns only, no JSON parsing
+    store.queue_keys("12")                                     # queue membership, queue order
+
+Issues that sit in several queues are stored once; queue membership is a
+separate (queue_id, position, key) index.
+
+The database runs in WAL mode: readers (one connection per thread) never block
+on the sync writer, and writes are serialized by a lock.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from utils.field_compiler import name_of
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parent.parent / "data" / "issue_cache.db"
+
+# Extracted (queryable) columns, in table order
+COLUMNS = (
+    "key", "project", "status", "assignee", "assignee_id", "issue_type",
+    "priority", "severity", "summary", "created", "updated", "resolved",
+    "comment_count", "synced_at"
+)
+
+SCHEMA_ISSUES = """
+CREATE TABLE IF NOT EXISTS issues (
+    key TEXT PRIMARY KEY,
+    project TEXT NOT NULL,
+    status TEXT,
+    assignee TEXT,
+    assignee_id TEXT,
+    issue_type TEXT,
+    priority TEXT,
+    severity TEXT,
+    summary TEXT,
+    created TEXT,
+    updated TEXT,
+    resolved TEXT,
+    comment_count INTEGER DEFAULT 0,
+    synced_at REAL NOT NULL,
+    raw TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_issues_project ON issues(project);
+CREATE INDEX IF NOT EXISTS idx_issues_status ON issues(status);
+CREATE INDEX IF NOT EXISTS idx_issues_assignee ON issues(assignee);
+CREATE INDEX IF NOT EXISTS idx_issues_created ON issues(created);
+CREATE INDEX IF NOT EXISTS idx_issues_updated ON issues(updated);
+CREATE INDEX IF NOT EXISTS idx_issues_project_updated ON issues(project, updated);
+
+CREATE TABLE IF NOT EXISTS queue_members (
+    queue_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (queue_id, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_queue_members_key ON queue_members(key);
+"""
+
+# Bound parameters per IN (...) query (SQLite's historical limit is 999)
+MAX_SQL_PARAMS = 500
+
+_UPSERT_SQL = f"""
+INSERT INTO issues ({', '.join(COLUMNS)}, raw)
+VALUES ({', '.join('?' * (len(COLUMNS) + 1))})
+ON CONFLICT(key) DO UPDATE SET
+    {', '.join(f'{c} = excluded.{c}' for c in COLUMNS if c != 'key')},
+    raw = excluded.raw
+WHERE issues.raw IS NOT excluded.raw
+"""
+
+def extract_columns(issue: Dict[str, Any], synced_at: float) -> Tuple:
+    """Row values (COLUMNS order + raw JSON) of one raw JIRA issue"""
+    key = issue.get("key") or ""
+    fields = issue.get("fields") or {}
+    assignee = fields.get("assignee")
+    comments = fields.get("comment")
+    if isinstance(comments, dict):
+        comment_count = comments.get("total", len(comments.get("comments") or []))
+    else:
+        comment_count = 0
+    severity = fields.get("customfield_10125")
+    return (
+        key,
+        key.split("-")[0] if "-" in key else key,
+        name_of(fields.get("status"), "name"),
+        name_of(assignee, "displayName", "name"),
+        assignee.get("accountId") if isinstance(assignee, dict) else None,
+        name_of(fields.get("issuetype"), "name"),
+        name_of(fields.get("priority"), "name"),
+        name_of(severity, "value", "name") if isinstance(severity, (dict, str)) else None,
+        fields.get("summary"),
+        fields.get("created"),
+        fields.get("updated"),
+        fields.get("resolutiondate"),
+        comment_count or 0,
+        synced_at,
+        json.dumps(issue, ensure_ascii=False, separators=(",", ":"))
+    )
+
+class IssueStore:
+    """Indexed SQLite store of raw JIRA issues"""
+
+    def __init__(self, db_path: Path = DEFAULT_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        with self._write_lock:
+            conn = self._conn()
+            conn.executescript(SCHEMA_ISSUES)
+            conn.commit()
+        logger.info(f"Issue store initialized: {self.db_path}")
+
+    def _conn(self) -> sqlite3.Connection:
+        """Connection of the current thread (WAL: readers never block the writer)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def upsert_issues(self, issues: Iterable[Dict[str, Any]], synced_at: Optional[float] = None) -> int:
+        """
+        Insert or update issues (rows whose raw JSON is unchanged are not rewritten)
+
+        Returns:
+            Number of rows inserted or updated
+        """
+        synced_at = synced_at or time.time()
+        rows = [extract_columns(issue, synced_at) for issue in issues if issue.get("key")]
+        if not rows:
+            return 0
+        with self._write_lock:
+            conn = self._conn()
+            before = conn.total_changes
+            with conn:
+                conn.executemany(_UPSERT_SQL, rows)
+            return conn.total_changes - before
+
+    def delete_missing(self, project_key: str, keep_keys: Iterable[str]) -> int:
+        """Delete issues of a project that are not in keep_keys (no longer in any queue)"""
+        keep = set(keep_keys)
+        stale = [k for k in self.keys(project_key) if k not in keep]
+        if not stale:
+            return 0
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                conn.executemany("DELETE FROM issues WHERE key = ?", [(k,) for k in stale])
+        return len(stale)
+
+    def set_queue_members(self, queue_id: str, keys: Sequence[str]):
+        """Replace the membership of a queue (keys in queue order)"""
+        queue_id = str(queue_id)
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                conn.execute("DELETE FROM queue_members WHERE queue_id = ?", (queue_id,))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO queue_members (queue_id, position, key) VALUES (?, ?, ?)",
+                    [(queue_id, position, key) for position, key in enumerate(keys)]
+                )
+
+    def remove_queues(self, queue_ids: Iterable[str]):
+        """Drop the membership of queues (e.g. queues deleted in JIRA)"""
+        stale = [(str(q),) for q in queue_ids]
+        if stale:
+            with self._write_lock:
+                conn = self._conn()
+                with conn:
+                    conn.executemany("DELETE FROM queue_members WHERE queue_id = ?", stale)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _where(
+        project_key: Optional[str] = None,
+        status: Optional[str] = None,
+        assignee: Optional[str] = None,
+        created_since: Optional[str] = None,
+        updated_since: Optional[str] = None,
+        min_comments: Optional[int] = None
+    ) -> Tuple[str, List[Any]]:
+        """WHERE clause + params for the indexed filters"""
+        clauses, params = [], []
+        for column, op, value in (
+            ("project", "=", project_key),
+            ("status", "=", status),
+            ("assignee", "=", assignee),
+            ("created", ">=", created_since),
+            ("updated", ">=", updated_since),
+            ("comment_count", ">=", min_comments),
+        ):
+            if value is not None:
+                clauses.append(f"{column} {op} ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def get_issue(self, key: str) -> Optional[Dict[str, Any]]:
+        """Raw issue by key (None if not stored)"""
+        row = self._conn().execute("SELECT raw FROM issues WHERE key = ?", (key,)).fetchone()
+        return json.loads(row["raw"]) if row else None
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Raw issues by key (primary-key lookups; keys not stored are omitted)"""
+        keys = list(dict.fromkeys(k for k in keys if k))
+        found: Dict[str, Dict[str, Any]] = {}
+        conn = self._conn()
+        for start in range(0, len(keys), MAX_SQL_PARAMS):
+            chunk = keys[start:start + MAX_SQL_PARAMS]
+            cursor = conn.execute(
+                f"SELECT key, raw FROM issues WHERE key IN ({', '.join('?' * len(chunk))})", chunk
+            )
+            for row in cursor:
+                found[row["key"]] = json.loads(row["raw"])
+        return found
+
+    def iter_issues(self, project_key: Optional[str] = None, batch_size: int = 500, **filters) -> Iterator[Dict[str, Any]]:
+        """
+        Raw issues matching the filters, parsed batch by batch
+
+        Filters: status, assignee, created_since, updated_since (ISO strings),
+        min_comments.
+        """
+        where, params = self._where(project_key, **filters)
+        cursor = self._conn().execute(f"SELECT raw FROM issues{where} ORDER BY key", params)
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            for row in batch:
+                yield json.loads(row["raw"])
+
+    def load_issues(self, project_key: Optional[str] = None, **filters) -> List[Dict[str, Any]]:
+        """iter_issues as a list"""
+        return list(self.iter_issues(project_key, **filters))
+
+    def rows(self, columns: Sequence[str], project_key: Optional[str] = None, **filters) -> List[Dict[str, Any]]:
+        """Extracted columns only (no raw JSON parsing); see COLUMNS"""
+        unknown = [c for c in columns if c not in COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown issue store columns: {unknown}")
+        where, params = self._where(project_key, **filters)
+        cursor = self._conn().execute(f"SELECT {', '.join(columns)} FROM issues{where} ORDER BY key", params)
+        return [dict(row) for row in cursor]
+
+    def export_rows(self, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Every row (COLUMNS + the raw JSON text, unparsed), ordered by key"""
+        cursor = self._conn().execute(f"SELECT {', '.join(COLUMNS)}, raw FROM issues ORDER BY key")
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            for row in batch:
+                yield dict(row)
+
+    def queue_keys(self, queue_id: str) -> List[str]:
+        """Keys of a queue in queue order (as of the last sync)"""
+        cursor = self._conn().execute(
+            "SELECT key FROM queue_members WHERE queue_id = ? ORDER BY position", (str(queue_id),)
+        )
+        return [row[0] for row in cursor]
+
+    def queues_of(self, key: str) -> List[str]:
+        """Queue ids an issue belongs to"""
+        return [row[0] for row in self._conn().execute("SELECT queue_id FROM queue_members WHERE key = ?", (key,))]
+
+    def queue_counts(self) -> Dict[str, int]:
+        """Member count per queue id"""
+        cursor = self._conn().execute("SELECT queue_id, COUNT(*) FROM queue_members GROUP BY queue_id")
+        return {row[0]: row[1] for row in cursor}
+
+    def keys(self, project_key: Optional[str] = None) -> List[str]:
+        """Stored issue keys (optionally of one project)"""
+        where, params = self._where(project_key)
+        return [row[0] for row in self._conn().execute(f"SELECT key FROM issues{where}", params)]
+
+    def is_empty(self, project_key: Optional[str] = None) -> bool:
+        """True until a sync has stored issues (of the project)"""
+        where, params = self._where(project_key)
+        return self._conn().execute(f"SELECT 1 FROM issues{where} LIMIT 1", params).fetchone() is None
+
+    def count(self, project_key: Optional[str] = None, **filters) -> int:
+        where, params = self._where(project_key, **filters)
+        return self._conn().execute(f"SELECT COUNT(*) FROM issues{where}", params).fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Issue counts per project, last sync time and database size"""
+        conn = self._conn()
+        projects = {
+            row["project"]: {"issues": row["n"], "synced_at": row["synced_at"]}
+            for row in conn.execute(
+                "SELECT project, COUNT(*) AS n, MAX(synced_at) AS synced_at FROM issues GROUP BY project"
+            )
+        }
+        size = self.db_path.stat().st_size if self.db_path.exists() else 0
+        return {"db_path": str(self.db_path), "size_bytes": size, "projects": projects, "queues": self.queue_counts()}
+
+# Global instance
+_issue_store: Optional[IssueStore] = None
+_issue_store_lock = threading.Lock()
+
+def get_issue_store() -> IssueStore:
+    """Get global issue store instance"""
+    global _issue_store
+    if _issue_store is None:
+        with _issue_store_lock:
+            if _issue_store is None:
+                _issue_store = IssueStore()
+    return _issue_store
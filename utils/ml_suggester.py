@@ -11,44 +11,57 @@ Ventajas:
 - Explicable (muestra tickets similares)
 
 Tecnología:
-- Sentence-BERT (paraphrase-multilingual-MiniLM-L12-v2)
-- ~400MB modelo, ~500ms por predicción
+- Sentence-BERT (paraphrase-multilingual-MiniLM-L12-v2), compartido con el
+  resto del proceso vía utils.embedding_provider (una sola copia del modelo)
+- Embeddings en el store compartido (utils.embedding_store, nombre
+  "ml_suggester"): matriz float32 mapeada en memoria + keys, hashes y metadata
+- Índice ANN (IVF, utils.ann_index) junto al store: cada consulta puntúa solo
+  las listas más cercanas, con filtros por key/proyecto/estado
+- Indexado incremental (update_issues): solo se codifican los tickets cuyo
+  texto cambió (hash de contenido); los borrados quedan como tombstones
+- Búsqueda por lotes (find_similar_batch / suggest_fields_batch): N textos se
+  codifican juntos y se puntúan con una sola multiplicación de matrices, con
+  máscaras precalculadas por proyecto/estado/fecha (utils.similarity_search)
 """
 import json
 import logging
+import threading
 import numpy as np
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from utils.ann_index import IVFIndex, normalize_rows
+from utils.common import adf_to_text
+from utils.embedding_provider import get_embedding_provider
+from utils.embedding_store import (
+    EmbeddingSet, append_embeddings, content_hash, get_embedding_set, write_embeddings
+)
+from utils.issue_columns import IssueColumns
+from utils.similarity_search import SearchMasks, search_batch
 
 logger = logging.getLogger(__name__)
 
-# Lazy imports para no cargar en cada request
-_sentence_transformer = None
-_cosine_similarity = None
+STORE_NAME = 'ml_suggester'
 
-def _get_transformer():
-    """Lazy load de SentenceTransformer"""
-    global _sentence_transformer
-    if _sentence_transformer is None:
-        try:
-            from sentence_transformers import SentenceTransformer
-            logger.info("Loading multilingual sentence transformer model...")
-            _sentence_transformer = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
-            logger.info("✓ Model loaded successfully")
-        except Exception as e:
-            logger.error(f"Failed to load sentence transformer: {e}")
-            logger.error("Install with: pip install sentence-transformers")
-            raise
-    return _sentence_transformer
+def embedding_text(issue: Dict) -> str:
+    """Text embedded for an issue: summary + start of the description"""
+    summary = issue.get('summary') or ''
+    description = issue.get('description')
+    if description and not isinstance(description, str):
+        description = adf_to_text(description)
+    # Combine summary + description (limit description to avoid too long texts)
+    return f"{summary} {description[:500] if description else ''}"
 
-def _get_cosine_similarity():
-    """Lazy load de cosine_similarity"""
-    global _cosine_similarity
-    if _cosine_similarity is None:
-        from sklearn.metrics.pairwise import cosine_similarity
-        _cosine_similarity = cosine_similarity
-    return _cosine_similarity
+def issue_record(issue: Dict) -> Dict:
+    """Metadata stored next to an issue's embedding"""
+    return {
+        'key': issue.get('key'),
+        'summary': issue.get('summary', ''),
+        'severity': issue.get('severity'),
+        'priority': issue.get('priority'),
+        'status': issue.get('status'),
+        'created_at': issue.get('created_at')
+    }
 
 class MLSuggester:
     """ML-based suggester using semantic similarity"""
@@ -57,57 +70,139 @@ class MLSuggester:
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         
+        self.store_dir = self.cache_dir / "embeddings"
+        self.index_file = self.store_dir / f"{STORE_NAME}.ivf.npz"
+        # Legacy cache (migrated to the store on first load)
         self.embeddings_file = self.cache_dir / "embeddings.npy"
         self.embeddings_metadata_file = self.cache_dir / "embeddings_metadata.json"
         
         self.embeddings = None
         self.issues_data = None
-        self.model = None
+        self.embedding_set: Optional[EmbeddingSet] = None
+        self.store_version = 0
+        self.index: Optional[IVFIndex] = None
+        self.provider = get_embedding_provider()
+        # Per-row filter masks (project/status/created/key, live rows)
+        self._masks: Optional[SearchMasks] = None
+        self._lock = threading.RLock()
         
         logger.info(f"ML Suggester initialized: {self.cache_dir}")
     
+    def _current_set(self) -> Optional[EmbeddingSet]:
+        """Current store version (the legacy cache is migrated on first use)"""
+        embedding_set = get_embedding_set(STORE_NAME, self.store_dir)
+        if embedding_set is None and self._migrate_legacy_cache():
+            embedding_set = get_embedding_set(STORE_NAME, self.store_dir)
+        return embedding_set
+    
     def _load_embeddings_cache(self) -> bool:
-        """Load pre-computed embeddings from cache"""
-        if not self.embeddings_file.exists() or not self.embeddings_metadata_file.exists():
-            return False
-        
+        """Load pre-computed embeddings from the store (memory-mapped, shared with other workers)"""
         try:
-            self.embeddings = np.load(self.embeddings_file)
-            with open(self.embeddings_metadata_file, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
-            self.issues_data = metadata['issues_data']
-            
-            logger.info(f"✓ Loaded {len(self.issues_data)} embeddings from cache")
+            embedding_set = self._current_set()
+            if embedding_set is None or not embedding_set.live_count:
+                with self._lock:
+                    # Every indexed issue was removed: nothing to search
+                    if embedding_set is not None and self.embedding_set is not None:
+                        self.embeddings = self.issues_data = self.index = None
+                        self.embedding_set = embedding_set
+                return False
+            with self._lock:
+                if embedding_set is not self.embedding_set:
+                    self._open_set(embedding_set)
+            logger.info(f"✓ Loaded {embedding_set.live_count} embeddings from store ({embedding_set.dtype})")
             return True
         except Exception as e:
             logger.error(f"Failed to load embeddings cache: {e}")
             return False
     
-    def _save_embeddings_cache(self):
-        """Save embeddings to cache"""
+    def _maybe_reload(self):
+        """Pick up store versions/appends written since the last load (e.g. by another worker)"""
+        embedding_set = get_embedding_set(STORE_NAME, self.store_dir)
+        if embedding_set is not None and embedding_set is not self.embedding_set and embedding_set.live_count:
+            with self._lock:
+                if embedding_set is not self.embedding_set:
+                    self._open_set(embedding_set)
+    
+    def _open_set(self, embedding_set: EmbeddingSet):
+        """Serve searches from a store version (caller holds the lock)"""
+        # Cosine similarity is a dot product over unit vectors
+        self.embeddings = embedding_set.vectors if embedding_set.normalized else normalize_rows(embedding_set.vectors)
+        self.issues_data = embedding_set.records
+        self.store_version = embedding_set.version
+        self.embedding_set = embedding_set
+        self._load_index()
+    
+    def _migrate_legacy_cache(self) -> bool:
+        """Import embeddings.npy + embeddings_metadata.json into the store (once)"""
+        if not self.embeddings_file.exists() or not self.embeddings_metadata_file.exists():
+            return False
+        logger.info("Migrating legacy embeddings cache to the embedding store...")
+        embeddings = normalize_rows(np.load(self.embeddings_file))
+        with open(self.embeddings_metadata_file, 'r', encoding='utf-8') as f:
+            issues_data = json.load(f)['issues_data']
+        self._save_embeddings_cache(embeddings, issues_data)
+        return True
+    
+    def _save_embeddings_cache(self, embeddings: np.ndarray, issues_data: List[Dict],
+                               texts: Optional[List[str]] = None):
+        """Write embeddings + metadata as a new (dense) store version"""
+        from utils.config import config
         try:
-            np.save(self.embeddings_file, self.embeddings)
-            
-            metadata = {
-                'total_issues': len(self.issues_data),
-                'created_at': str(np.datetime64('now')),
-                'issues_data': self.issues_data
-            }
-            
-            with open(self.embeddings_metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
-            
-            logger.info(f"✓ Saved {len(self.issues_data)} embeddings to cache")
+            write_embeddings(
+                STORE_NAME,
+                [d.get('key') or '' for d in issues_data],
+                embeddings,
+                model=self.provider.model_tag,
+                hashes=[content_hash(t) for t in texts] if texts is not None else None,
+                records=issues_data,
+                dtype=config.cache.embedding_dtype,
+                normalized=True,
+                directory=self.store_dir
+            )
+            logger.info(f"✓ Saved {len(issues_data)} embeddings to store")
         except Exception as e:
             logger.error(f"Failed to save embeddings cache: {e}")
     
+    def _load_index(self):
+        """Load the ANN index of the embeddings (extended with appended rows, rebuilt when stale)"""
+        index = self.index
+        if index is not None and index.tag == self.store_version and len(index.vectors) <= len(self.embeddings):
+            index.extend(self.embeddings)
+        else:
+            index = IVFIndex.load(self.index_file, self.embeddings, tag=self.store_version)
+        if index is None:
+            index = IVFIndex.build(self.embeddings, tag=self.store_version)
+        if index.persisted_size != len(self.embeddings):
+            try:
+                index.save(self.index_file)
+            except Exception as e:
+                logger.error(f"Failed to save ANN index: {e}")
+        self.index = index
+        keys = [d.get('key') or '' for d in self.issues_data]
+        columns = IssueColumns.from_lists({
+            'project': [k.split('-')[0] for k in keys],
+            'status': [d.get('status') for d in self.issues_data],
+            'created': [d.get('created_at') for d in self.issues_data],
+        }, len(keys))
+        self._masks = SearchMasks(columns, keys, self.embedding_set.alive if self.embedding_set.deleted else None)
+    
+    def _filter_mask(self, filter_keys: Optional[Iterable[str]] = None, project=None, status=None,
+                     created_from=None, created_to=None) -> Optional[np.ndarray]:
+        """Boolean row mask of the filters and live rows (None when everything is allowed)"""
+        return self._masks.mask(project=project, status=status, created_from=created_from,
+                                created_to=created_to, keys=filter_keys)
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Unit-length embeddings of texts (shared model, batched)"""
+        return self.provider.encode(texts)
+    
     def index_issues(self, issues: List[Dict], force_reindex: bool = False):
         """
         Create embedding index from issues
         
         Args:
             issues: List of issue dicts with 'summary', 'description', 'severity', 'priority'
-            force_reindex: Force recomputation even if cache exists
+            force_reindex: Force recomputation of every embedding (writes a dense store)
         """
         # Try loading from cache first
         if not force_reindex and self._load_embeddings_cache():
@@ -116,54 +211,98 @@ class MLSuggester:
         logger.info(f"Indexing {len(issues)} issues...")
         print(f"🧠 Generating embeddings for {len(issues)} tickets...")
         
-        # Initialize model
-        if self.model is None:
-            self.model = _get_transformer()
-        
-        # Extract text and metadata
-        texts = []
-        self.issues_data = []
-        
-        for issue in issues:
-            summary = issue.get('summary', '')
-            description = issue.get('description', '')
-            
-            # Combine summary + description (limit description to avoid too long texts)
-            text = f"{summary} {description[:500] if description else ''}"
-            texts.append(text)
-            
-            # Store metadata
-            self.issues_data.append({
-                'key': issue.get('key'),
-                'summary': summary,
-                'severity': issue.get('severity'),
-                'priority': issue.get('priority'),
-                'status': issue.get('status'),
-                'created_at': issue.get('created_at')
-            })
+        texts = [embedding_text(issue) for issue in issues]
+        issues_data = [issue_record(issue) for issue in issues]
         
         # Generate embeddings (batch processing con batch_size para velocidad)
         logger.info("Encoding texts to embeddings...")
-        self.embeddings = self.model.encode(
-            texts,
-            batch_size=64,
-            show_progress_bar=False,
-            convert_to_numpy=True,
-            normalize_embeddings=True
-        )
+        embeddings = self._encode(texts)
         
-        # Save to cache
-        self._save_embeddings_cache()
+        # Save to the store, then serve from its memory map (+ ANN index)
+        self._save_embeddings_cache(embeddings, issues_data, texts)
+        self._load_embeddings_cache()
         
         logger.info(f"✓ Indexed {len(issues)} issues")
-        print(f"✓ Embeddings generated and cached")
+        print("✓ Embeddings generated and cached")
+    
+    def update_issues(self, issues: List[Dict], project_key: Optional[str] = None) -> Dict[str, int]:
+        """
+        Incrementally index issues
+        
+        Only issues whose embedding text changed (content hash) are encoded;
+        issues whose metadata alone changed reuse their stored vector. Rows
+        are appended to the store and replaced rows are tombstoned; with
+        project_key, indexed issues of that project missing from issues are
+        tombstoned too. The store compacts itself once tombstones pile up.
+        
+        Args:
+            issues: Issue dicts (see index_issues)
+            project_key: Project the issues are the complete set of
+        
+        Returns:
+            Dict with 'indexed', 'encoded', 'updated' and 'removed' counts
+        """
+        from utils.config import config
+        by_key = {issue['key']: issue for issue in issues if issue.get('key')}
+        keys = list(by_key)
+        texts = [embedding_text(by_key[key]) for key in keys]
+        hashes = [content_hash(text) for text in texts]
+        records = [issue_record(by_key[key]) for key in keys]
+        
+        embedding_set = self._current_set()
+        if embedding_set is not None and embedding_set.model != self.provider.model_tag:
+            logger.warning(f"Embedding store was built with {embedding_set.model}, re-indexing")
+            self.index_issues(issues, force_reindex=True)
+            return {'indexed': len(keys), 'encoded': len(keys), 'updated': 0, 'removed': 0}
+        known = embedding_set.live_hashes() if embedding_set is not None else {}
+        stored_records = embedding_set.records if known else []
+        
+        encode, reuse = [], []
+        for i, key in enumerate(keys):
+            if known.get(key) != hashes[i]:
+                encode.append(i)
+            elif stored_records[embedding_set.row_of(key)] != records[i]:
+                reuse.append(i)
+        removed = []
+        if project_key:
+            removed = [k for k in known if k.split('-')[0] == project_key and k not in by_key]
+        
+        stats = {'encoded': len(encode), 'updated': len(reuse), 'removed': len(removed)}
+        if encode or reuse or removed:
+            if encode:
+                logger.info(f"Encoding {len(encode)} new/changed issues...")
+            vectors = [self._encode([texts[i] for i in encode])] if encode else []
+            if reuse:
+                vectors.append(embedding_set.vectors[[embedding_set.row_of(keys[i]) for i in reuse]])
+            rows = encode + reuse
+            dim = embedding_set.dim if embedding_set is not None else 0
+            append_embeddings(
+                STORE_NAME,
+                [keys[i] for i in rows],
+                np.concatenate(vectors) if vectors else np.empty((0, dim), dtype=np.float32),
+                hashes=[hashes[i] for i in rows],
+                records=[records[i] for i in rows],
+                delete=removed,
+                model=self.provider.model_tag,
+                dtype=config.cache.embedding_dtype,
+                normalized=True,
+                directory=self.store_dir
+            )
+        self._load_embeddings_cache()
+        stats['indexed'] = self.embedding_set.live_count if self.embedding_set is not None else 0
+        
+        logger.info(f"✓ Embeddings updated: {stats}")
+        return stats
     
     def suggest_field(
         self,
         text: str,
         field_type: str,
         top_k: int = 10,
-        min_confidence: float = 0.3
+        min_confidence: float = 0.3,
+        filter_keys: Optional[Iterable[str]] = None,
+        project: Optional[str] = None,
+        status: Optional[str] = None
     ) -> Optional[Tuple[str, float, str, List[Dict]]]:
         """
         Suggest field value based on similar tickets
@@ -173,6 +312,7 @@ class MLSuggester:
             field_type: 'severity' or 'priority'
             top_k: Number of similar tickets to consider
             min_confidence: Minimum confidence threshold
+            filter_keys / project / status: Only consider matching tickets
         
         Returns:
             (value, confidence, reason, similar_tickets) or None
@@ -181,27 +321,38 @@ class MLSuggester:
             logger.warning("Embeddings not loaded. Call index_issues() first.")
             return None
         
-        # Initialize model if needed
-        if self.model is None:
-            self.model = _get_transformer()
-        
-        # Encode query text
-        query_embedding = self.model.encode([text], convert_to_numpy=True)
-        
-        # Calculate similarities
-        cosine_sim = _get_cosine_similarity()
-        similarities = cosine_sim(query_embedding, self.embeddings)[0]
-        
-        # Get top K similar tickets
-        top_indices = similarities.argsort()[-top_k:][::-1]
-        top_similarities = similarities[top_indices]
+        similar_tickets = self.find_similar(text, top_k, filter_keys=filter_keys, project=project, status=status)
+        return self._vote(similar_tickets, field_type, min_confidence)
+    
+    def suggest_fields_batch(
+        self,
+        texts: List[str],
+        field_types: Sequence[str] = ('severity', 'priority'),
+        top_k: int = 10,
+        min_confidence: float = 0.3,
+        **filters
+    ) -> List[Dict[str, Optional[Tuple[str, float, str, List[Dict]]]]]:
+        """
+        Suggest several fields for many texts with one batched search
         
-        similar_tickets = []
-        for idx, sim in zip(top_indices, top_similarities):
-            ticket = self.issues_data[idx].copy()
-            ticket['similarity'] = float(sim)
-            similar_tickets.append(ticket)
+        Args:
+            texts: Issue summary + description per ticket
+            field_types: Fields to suggest
+            top_k / min_confidence: See suggest_field
+            **filters: See find_similar_batch
         
+        Returns:
+            Per text, {field_type: (value, confidence, reason, similar_tickets) or None}
+        """
+        similar = self.find_similar_batch(texts, top_k, **filters)
+        return [
+            {field_type: self._vote(tickets, field_type, min_confidence) for field_type in field_types}
+            for tickets in similar
+        ]
+    
+    def _vote(self, similar_tickets: List[Dict], field_type: str,
+              min_confidence: float) -> Optional[Tuple[str, float, str, List[Dict]]]:
+        """Similarity-weighted majority vote of similar tickets on field_type"""
         # Filter tickets with valid field values
         valid_tickets = [
             t for t in similar_tickets 
@@ -254,10 +405,115 @@ class MLSuggester:
             for t in valid_tickets[:3]
         ]
         
-        logger.info(f"Suggested {field_type}={value} with confidence {confidence:.0%}")
+        logger.debug(f"Suggested {field_type}={value} with confidence {confidence:.0%}")
         
         return (value, confidence, reason, explanation_tickets)
     
+    def find_similar(
+        self,
+        text: str,
+        top_k: int = 10,
+        min_similarity: float = 0.0,
+        filter_keys: Optional[Iterable[str]] = None,
+        project: Optional[str] = None,
+        status: Optional[str] = None,
+        created_from=None,
+        created_to=None
+    ) -> List[Dict]:
+        """
+        Most similar indexed tickets (ANN search), best first
+        
+        Args:
+            text: Query text
+            top_k: Tickets to return
+            min_similarity: Minimum cosine similarity
+            filter_keys: Only these issue keys
+            project: Only issues of this project (key prefix)
+            status: Only issues in this status (as of indexing)
+            created_from / created_to: Only issues created in this range (ISO date or epoch seconds)
+        
+        Returns:
+            Ticket metadata dicts with 'similarity'
+        """
+        self._maybe_reload()
+        if self.index is None or self.issues_data is None:
+            logger.warning("Embeddings not loaded. Call index_issues() first.")
+            return []
+        
+        # Encode query text (unit length: similarity is a dot product)
+        query_embedding = self._encode([text])[0]
+        
+        with self._lock:
+            index, issues_data = self.index, self.issues_data
+            allowed = self._filter_mask(filter_keys, project, status, created_from, created_to)
+        rows, similarities = index.search(query_embedding, k=top_k, allowed=allowed)
+        
+        similar_tickets = []
+        for idx, sim in zip(rows, similarities):
+            if sim < min_similarity:
+                break
+            ticket = issues_data[idx].copy()
+            ticket['similarity'] = float(sim)
+            similar_tickets.append(ticket)
+        return similar_tickets
+    
+    def find_similar_batch(
+        self,
+        texts: List[str],
+        top_k: int = 10,
+        min_similarity: float = 0.0,
+        filter_keys: Optional[Iterable[str]] = None,
+        project=None,
+        status=None,
+        created_from=None,
+        created_to=None,
+        exclude_keys: Optional[Sequence[Optional[str]]] = None
+    ) -> List[List[Dict]]:
+        """
+        Most similar indexed tickets for many texts at once (exact, one matrix multiply)
+        
+        Args:
+            texts: Query texts (encoded in one batch)
+            top_k / min_similarity / filter_keys: See find_similar
+            project / status: Value or list of values
+            created_from / created_to: Created date range (ISO date or epoch seconds)
+            exclude_keys: Per text, an issue key not to return (e.g. the ticket itself)
+        
+        Returns:
+            Per text, ticket metadata dicts with 'similarity', best first
+        """
+        self._maybe_reload()
+        if self.embeddings is None or self.issues_data is None:
+            logger.warning("Embeddings not loaded. Call index_issues() first.")
+            return [[] for _ in texts]
+        if not texts:
+            return []
+        
+        queries = self._encode(list(texts))
+        with self._lock:
+            embeddings, issues_data, embedding_set = self.embeddings, self.issues_data, self.embedding_set
+            allowed = self._filter_mask(filter_keys, project, status, created_from, created_to)
+        exclude = None
+        if exclude_keys is not None:
+            exclude = np.array([
+                -1 if not key or embedding_set.row_of(key) is None else embedding_set.row_of(key)
+                for key in exclude_keys
+            ], dtype=np.int64)
+        rows, similarities = search_batch(embeddings, queries, top_k, allowed=allowed, exclude=exclude,
+                                          min_similarity=min_similarity)
+        
+        results = []
+        for query_rows, query_similarities in zip(rows, similarities):
+            tickets = []
+            for idx, sim in zip(query_rows, query_similarities):
+                if idx < 0:
+                    break
+                ticket = issues_data[idx].copy()
+                ticket['similarity'] = float(sim)
+                tickets.append(ticket)
+            results.append(tickets)
+        return results
+    
     def suggest_severity(self, text: str, top_k: int = 10) -> Optional[Tuple[str, float, str, List[Dict]]]:
         """Suggest severity based on similar tickets"""
         return self.suggest_field(text, 'severity', top_k)
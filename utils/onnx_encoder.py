@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+ONNX Encoder Module
+int8-quantized ONNX Runtime backend for the sentence encoder (CPU)
+
+    EMBEDDING_BACKEND=onnx-int8      # utils.embedding_provider uses OnnxInt8Backend
+
+The transformer of the sentence-transformers model is exported to ONNX once
+(torch.onnx.export, needs torch + sentence-transformers at export time), its
+weights quantized to int8 with onnxruntime.quantization.quantize_dynamic and
+saved with the tokenizer under data/models/onnx/<model>/:
+
+    model-int8.onnx    quantized transformer (input ids/mask -> token embeddings)
+    tokenizer.json     fast tokenizer (tokenizers library)
+    encoder.json       max sequence length, pooling and padding token
+
+At runtime only onnxruntime and tokenizers are needed (pip install -r
+api/requirements-onnx.txt). Token embeddings are mean-pooled over the
+attention mask in NumPy, like the sentence-transformers pooling layer, so
+vectors match the PyTorch model up to quantization error.
+
+Every export is checked against the fp32 model before it is used: the
+cosine agreement on PARITY_TEXTS must reach MIN_PARITY_COSINE per text and
+MEAN_PARITY_COSINE on average, else the export is discarded and
+export_onnx_int8 raises. The measured agreement is kept in encoder.json and
+logged when the backend loads. scripts/benchmark_embedding_backends.py
+repeats the check on issue summaries and measures latency.
+"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+from utils.ann_index import normalize_rows
+
+logger = logging.getLogger(__name__)
+
+ONNX_DIR = Path(__file__).parent.parent / "data" / "models" / "onnx"
+MODEL_FILE = "model-int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+ENCODER_FILE = "encoder.json"
+
+# Export parity check: int8 vs fp32 cosine agreement
+MIN_PARITY_COSINE = 0.97
+MEAN_PARITY_COSINE = 0.99
+PARITY_TEXTS = [
+    "No puedo acceder a la VPN desde casa",
+    "El servidor de correo está caído desde esta mañana",
+    "Error 500 al generar la factura del cliente",
+    "Solicitud de alta de usuario en el sistema de nómina",
+    "La impresora del piso 3 no imprime en color",
+    "Printer on the third floor is not printing",
+    "Cannot log in to the customer portal after password reset",
+    "Timeout al consultar el estado de la orden en la API",
+    "Lentitud general en la aplicación de ventas",
+    "Please restore the deleted shared folder from yesterday's backup",
+]
+
+_export_lock = threading.Lock()
+
+def model_dir(model_name: str, directory: Optional[Path] = None) -> Path:
+    """Directory of the exported model"""
+    return Path(directory or ONNX_DIR) / model_name.replace("/", "__")
+
+def cosine_agreement(reference: np.ndarray, candidate: np.ndarray) -> np.ndarray:
+    """Per-row cosine similarity between two embedding matrices of the same texts"""
+    return np.sum(normalize_rows(reference) * normalize_rows(candidate), axis=1)
+
+def export_onnx_int8(model_name: str, directory: Optional[Path] = None, opset: int = 14) -> Path:
+    """
+    Export model_name to an int8-quantized ONNX model (see module docstring)
+
+    Returns:
+        Directory holding the exported files
+
+    Raises:
+        ValueError: The quantized model fails the parity check
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers import SentenceTransformer
+
+    target = model_dir(model_name, directory)
+    with _export_lock:
+        logger.info(f"Exporting {model_name} to ONNX (int8)...")
+        st_model = SentenceTransformer(model_name, device="cpu")
+        transformer = st_model[0].auto_model.eval()
+        tokenizer = st_model.tokenizer
+        pooling = st_model[1].get_pooling_mode_str() if len(st_model) > 1 else "mean"
+        if pooling != "mean":
+            raise ValueError(f"{model_name} uses {pooling} pooling; only mean pooling is supported")
+
+        sample = tokenizer(["exportar modelo", "export model"], padding=True, return_tensors="pt")
+        inputs = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+        dynamic = {name: {0: "batch", 1: "sequence"} for name in inputs}
+        dynamic["token_embeddings"] = {0: "batch", 1: "sequence"}
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        work = Path(tempfile.mkdtemp(prefix=target.name + ".", dir=target.parent))
+        try:
+            fp32_path = work / "model-fp32.onnx"
+            with torch.no_grad():
+                torch.onnx.export(
+                    transformer,
+                    tuple(sample[name] for name in inputs),
+                    str(fp32_path),
+                    input_names=inputs,
+                    output_names=["token_embeddings"],
+                    dynamic_axes=dynamic,
+                    opset_version=opset,
+                )
+            quantize_dynamic(str(fp32_path), str(work / MODEL_FILE), weight_type=QuantType.QInt8)
+            fp32_path.unlink()
+            tokenizer.backend_tokenizer.save(str(work / TOKENIZER_FILE))
+            settings = {
+                "model": model_name,
+                "max_seq_length": st_model.get_max_seq_length(),
+                "pooling": pooling,
+                "inputs": inputs,
+                "pad_token": tokenizer.pad_token,
+                "pad_token_id": tokenizer.pad_token_id,
+            }
+            (work / ENCODER_FILE).write_text(json.dumps(settings), encoding="utf-8")
+
+            cosines = cosine_agreement(
+                st_model.encode(PARITY_TEXTS, show_progress_bar=False, convert_to_numpy=True),
+                OnnxInt8Backend.from_directory(work).encode(PARITY_TEXTS)
+            )
+            settings["parity"] = {"texts": len(PARITY_TEXTS), "mean_cosine": round(float(cosines.mean()), 5),
+                                  "min_cosine": round(float(cosines.min()), 5)}
+            if cosines.min() < MIN_PARITY_COSINE or cosines.mean() < MEAN_PARITY_COSINE:
+                raise ValueError(f"int8 export of {model_name} disagrees with the fp32 model: {settings['parity']} "
+                                 f"(needs min >= {MIN_PARITY_COSINE}, mean >= {MEAN_PARITY_COSINE})")
+            (work / ENCODER_FILE).write_text(json.dumps(settings), encoding="utf-8")
+            # Swap the finished directory in whole (concurrent loaders never see a partial export)
+            if target.exists():
+                shutil.rmtree(target)
+            os.replace(work, target)
+        finally:
+            if work.exists():
+                shutil.rmtree(work, ignore_errors=True)
+    logger.info(f"✓ ONNX int8 model saved to {target} (fp32 parity {settings['parity']})")
+    return target
+
+class OnnxInt8Backend:
+    """Embedding backend running the int8 ONNX export with ONNX Runtime"""
+
+    def __init__(self, model_name: str, directory: Optional[Path] = None, threads: int = 0,
+                 export: bool = True):
+        """
+        Args:
+            model_name: sentence-transformers model name
+            directory: Root of the exported models (default: data/models/onnx)
+            threads: ONNX Runtime intra-op threads (0: runtime default)
+            export: Export the model if it has not been exported yet
+        """
+        path = model_dir(model_name, directory)
+        if not (path / MODEL_FILE).exists():
+            if not export:
+                raise FileNotFoundError(f"No ONNX export of {model_name} in {path}")
+            export_onnx_int8(model_name, directory)
+        self._open(path, threads)
+        parity = self.settings.get("parity")
+        if parity:
+            logger.info(f"ONNX int8 {model_name}: fp32 parity {parity}")
+        else:
+            logger.warning(f"ONNX int8 export of {model_name} has no parity check; re-export it")
+
+    @classmethod
+    def from_directory(cls, path: Path, threads: int = 0) -> "OnnxInt8Backend":
+        """Backend of an export directory (no export, no parity logging)"""
+        backend = cls.__new__(cls)
+        backend._open(Path(path), threads)
+        return backend
+
+    def _open(self, path: Path, threads: int):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        settings = self.settings = json.loads((path / ENCODER_FILE).read_text(encoding="utf-8"))
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(str(path / MODEL_FILE), options, providers=["CPUExecutionProvider"])
+        self.inputs = [i.name for i in self.session.get_inputs()]
+
+        self.tokenizer = Tokenizer.from_file(str(path / TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=int(settings["max_seq_length"]))
+        self.tokenizer.enable_padding(pad_id=int(settings["pad_token_id"]), pad_token=settings["pad_token"])
+
+    def encode(self, texts: Sequence[str], batch_size: int = 64) -> np.ndarray:
+        """Mean-pooled token embeddings of texts (unnormalized, like the PyTorch model)"""
+        parts = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(list(texts[start:start + batch_size]))
+            mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feed = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": mask,
+                "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+            }
+            tokens = self.session.run(None, {name: feed[name] for name in self.inputs})[0]
+            weights = mask[:, :, None].astype(np.float32)
+            parts.append((tokens * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9))
+        return np.concatenate(parts).astype(np.float32)
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""
+Pattern Index Module
+Memory-resident keyword -> field value index for pattern suggestions
+
+Learns which keywords (summary, description, labels) predict a field value
+(severity, priority) and answers IssueCacheManager.get_suggestion_from_patterns
+from memory:
+
+- tokens are normalized (accents stripped, casefolded), split on word
+  boundaries, and short, numeric and stop words are dropped; each issue
+  counts once per keyword
+- every indexed issue keeps its contribution (tokens, field values and its
+  `updated` stamp), so a refresh only re-tokenizes issues whose `updated`
+  changed since the last refresh and subtracts issues that left the store
+- only the keywords touched by a refresh are recompiled into the best-match
+  table used by suggest()
+- the index is persisted to data/cache/pattern_index.json.gz (contributions)
+  and patterns.json (compiled patterns, same format as before); the in-memory
+  index reloads when another process rewrites it (mtime check, throttled)
+"""
+
+import gzip
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from utils.common import adf_to_text
+from utils.field_compiler import name_of
+
+logger = logging.getLogger(__name__)
+
+PATTERN_FIELDS = ('severity', 'priority')
+MIN_OCCURRENCES = 3     # Issues with a keyword before it becomes a pattern
+MIN_CONFIDENCE = 0.5    # Share of those issues that must agree on the value
+MIN_TOKEN_LENGTH = 4
+
+STOP_WORDS = frozenset("""
+    para como pero porque cuando donde esta este esto estos estas sobre entre
+    desde hasta tiene tienen tengo hace hacer puede pueden solo tambien ahora
+    favor buen buenas buenos dias tardes hola gracias saludos mismo misma
+    with that this from have will would should could there their they what
+    when which been were into about please thanks hello regards
+""".split())
+
+_TOKEN_RE = re.compile(r"[^\W\d_]+")
+
+def normalize(text: str) -> str:
+    """Casefolded text without accents ("Conexión" -> "conexion")"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+def tokenize(text: str) -> Set[str]:
+    """Distinct normalized keywords of a text"""
+    if not text:
+        return set()
+    return {
+        token for token in _TOKEN_RE.findall(normalize(text))
+        if len(token) >= MIN_TOKEN_LENGTH and token not in STOP_WORDS
+    }
+
+def issue_contribution(issue: Dict[str, Any]) -> Dict[str, Any]:
+    """What one raw issue adds to the index: updated stamp, field values, keywords"""
+    fields = issue.get('fields') or {}
+    severity = fields.get('customfield_10125')
+    values = {
+        'severity': name_of(severity, 'value') if isinstance(severity, (dict, str)) else None,
+        'priority': name_of(fields.get('priority'), 'name'),
+    }
+    text = ' '.join((
+        fields.get('summary') or '',
+        adf_to_text(fields.get('description')),
+        ' '.join(fields.get('labels') or [])
+    ))
+    return {
+        'u': fields.get('updated'),
+        'v': {f: v for f, v in values.items() if v},
+        't': sorted(tokenize(text)),
+    }
+
+class PatternIndex:
+    """Incrementally maintained keyword pattern index (see module docstring)"""
+
+    def __init__(self, state_path: Path, patterns_path: Path, check_interval: float = 1.0):
+        """
+        Args:
+            state_path: Gzip JSON file with the per-issue contributions
+            patterns_path: JSON file the compiled patterns are exported to
+            check_interval: Min seconds between mtime checks of state_path
+        """
+        self.state_path = Path(state_path)
+        self.patterns_path = Path(patterns_path)
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._issues: Dict[str, Dict[str, Any]] = {}
+        # field -> keyword -> value -> issues
+        self._counts: Dict[str, Dict[str, Counter]] = {f: defaultdict(Counter) for f in PATTERN_FIELDS}
+        # field -> keyword -> [{'value', 'confidence', 'count'}] (patterns.json format)
+        self._patterns: Dict[str, Dict[str, List[Dict]]] = {f: {} for f in PATTERN_FIELDS}
+        # field -> keyword -> best (value, confidence, count)
+        self._best: Dict[str, Dict[str, Tuple[str, float, int]]] = {f: {} for f in PATTERN_FIELDS}
+        self._loaded_mtime: Optional[int] = None
+        self._next_check = 0.0
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def suggest(self, text: str, field_type: str) -> Optional[Tuple[str, float, str]]:
+        """
+        Best learned value of field_type for a text
+
+        Returns: (value, confidence, reason) or None
+        """
+        if not text:
+            return None
+        tokens = tokenize(text)
+        self._maybe_reload()
+        best = None
+        with self._lock:
+            best_by_keyword = self._best.get(field_type) or {}
+            for token in tokens:
+                match = best_by_keyword.get(token)
+                if match is not None and (best is None or match[1:] > best[1][1:]):
+                    best = (token, match)
+        if best is None:
+            return None
+        keyword, (value, confidence, count) = best
+        reason = f"Keyword '{keyword}' suggests {value} ({confidence:.0%} confidence from {count} occurrences)"
+        return (value, confidence, reason)
+
+    def patterns(self, field_type: Optional[str] = None) -> Dict:
+        """Compiled patterns ({field: {keyword: [{'value', 'confidence', 'count'}]}})"""
+        self._maybe_reload()
+        with self._lock:
+            if field_type:
+                return {k: list(v) for k, v in self._patterns.get(field_type, {}).items()}
+            return {f: {k: list(v) for k, v in p.items()} for f, p in self._patterns.items()}
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'issues': len(self._issues),
+                **{f"{f}_patterns": sum(len(v) for v in p.values()) for f, p in self._patterns.items()}
+            }
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def refresh(self, store, project_key: str) -> Dict[str, int]:
+        """
+        Bring the project's part of the index up to date with an IssueStore
+
+        Only issues whose `updated` stamp changed are parsed and re-tokenized;
+        issues gone from the store are subtracted.
+
+        Returns:
+            Dict with 'indexed', 'changed' and 'removed' issue counts
+        """
+        self._maybe_reload(force=True)
+        stamps = {row['key']: row['updated'] for row in store.rows(['key', 'updated'], project_key=project_key)}
+        with self._lock:
+            known = {k for k, c in self._issues.items() if c.get('p') == project_key}
+            changed = [k for k, updated in stamps.items() if k not in self._issues or self._issues[k].get('u') != updated]
+            removed = known - stamps.keys()
+        raw = store.get_many(changed) if changed else {}
+        return self.apply(raw.values(), removed, project_key)
+
+    def rebuild(self, issues: Iterable[Dict[str, Any]], project_key: str) -> Dict[str, int]:
+        """Replace the project's part of the index with issues (full scan)"""
+        self._maybe_reload(force=True)
+        issues = [i for i in issues if i.get('key')]
+        with self._lock:
+            keep = {i['key'] for i in issues}
+            removed = {k for k, c in self._issues.items() if c.get('p') == project_key and k not in keep}
+        return self.apply(issues, removed, project_key)
+
+    def apply(self, changed: Iterable[Dict[str, Any]], removed: Iterable[str], project_key: str) -> Dict[str, int]:
+        """Add/replace changed raw issues, drop removed keys, recompile touched keywords and persist"""
+        contributions = {}
+        for issue in changed:
+            if issue.get('key'):
+                contributions[issue['key']] = {**issue_contribution(issue), 'p': project_key}
+        with self._lock:
+            touched: Dict[str, Set[str]] = {f: set() for f in PATTERN_FIELDS}
+            removed = [k for k in removed if k in self._issues]
+            for key in list(contributions) + removed:
+                old = self._issues.pop(key, None)
+                if old:
+                    self._count(old, -1, touched)
+            for key, contribution in contributions.items():
+                self._issues[key] = contribution
+                self._count(contribution, 1, touched)
+            for field_type, keywords in touched.items():
+                self._compile(field_type, keywords)
+            if contributions or removed or self._loaded_mtime is None:
+                self._save()
+            return {'indexed': len(self._issues), 'changed': len(contributions), 'removed': len(removed)}
+
+    def _count(self, contribution: Dict[str, Any], sign: int, touched: Dict[str, Set[str]]):
+        for field_type, value in contribution['v'].items():
+            counts = self._counts[field_type]
+            for token in contribution['t']:
+                by_value = counts[token]
+                by_value[value] += sign
+                if by_value[value] <= 0:
+                    del by_value[value]
+                    if not by_value:
+                        del counts[token]
+            touched[field_type].update(contribution['t'])
+
+    def _compile(self, field_type: str, keywords: Iterable[str]):
+        """Recompute the patterns and best match of keywords"""
+        counts, patterns, best = self._counts[field_type], self._patterns[field_type], self._best[field_type]
+        for keyword in keywords:
+            patterns.pop(keyword, None)
+            best.pop(keyword, None)
+            by_value = counts.get(keyword)
+            if not by_value:
+                continue
+            total = sum(by_value.values())
+            if total < MIN_OCCURRENCES:
+                continue
+            entries = [
+                {'value': value, 'confidence': count / total, 'count': count}
+                for value, count in by_value.items() if count / total >= MIN_CONFIDENCE
+            ]
+            if entries:
+                patterns[keyword] = entries
+                top = max(entries, key=lambda e: (e['confidence'], e['count']))
+                best[keyword] = (top['value'], top['confidence'], top['count'])
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _maybe_reload(self, force: bool = False):
+        """Load the persisted index on first use or when its file changed"""
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+        try:
+            mtime = self.state_path.stat().st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._loaded_mtime:
+            return
+        with self._lock:
+            if mtime == self._loaded_mtime:
+                return
+            try:
+                with gzip.open(self.state_path, 'rt', encoding='utf-8') as f:
+                    issues = json.load(f).get('issues', {})
+            except Exception as e:
+                logger.warning(f"Could not load pattern index {self.state_path}: {e}")
+                self._loaded_mtime = mtime
+                return
+            self._issues = {}
+            self._counts = {f: defaultdict(Counter) for f in PATTERN_FIELDS}
+            self._patterns = {f: {} for f in PATTERN_FIELDS}
+            self._best = {f: {} for f in PATTERN_FIELDS}
+            touched: Dict[str, Set[str]] = {f: set() for f in PATTERN_FIELDS}
+            for key, contribution in issues.items():
+                self._issues[key] = contribution
+                self._count(contribution, 1, touched)
+            for field_type, keywords in touched.items():
+                self._compile(field_type, keywords)
+            self._loaded_mtime = mtime
+            logger.info(f"Loaded pattern index: {len(self._issues)} issues from {self.state_path.name}")
+
+    def _save(self):
+        """Persist contributions and compiled patterns atomically (caller holds the lock)"""
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        for path, opener, data in (
+            (self.state_path, lambda p: gzip.open(p, 'wt', encoding='utf-8', compresslevel=6), {'issues': self._issues}),
+            (self.patterns_path, lambda p: open(p, 'w', encoding='utf-8'), self._patterns),
+        ):
+            tmp = path.with_name(path.name + '.tmp')
+            with opener(tmp) as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        self._loaded_mtime = self.state_path.stat().st_mtime_ns
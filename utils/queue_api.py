@@ -4,10 +4,10 @@
 Queue extraction using JIRA REST API directly
 More reliable than Selenium web scraping
 """
-import requests
 import logging
 from typing import List, Dict, Any, Optional
 from utils.config import config
+from utils.http_pool import get_session_pool
 import base64
 
 logger = logging.getLogger(__name__)
@@ -86,7 +86,7 @@ def _get_service_desk_id(
     """Find the service desk ID for a given project key"""
     try:
         url = f"{site}/rest/servicedeskapi/servicedesk"
-        response = requests.get(url, headers=auth_header, timeout=timeout)
+        response = get_session_pool().request("GET", url, headers=auth_header, timeout=timeout)
         
         if response.status_code != 200:
             logger.debug(f"Failed to get service desks: {response.status_code}")
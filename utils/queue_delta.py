@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""
+Queue Delta Sync Module
+Incremental queue refresh using updated-since watermarks
+
+A Service Desk queue is defined by a JQL query (GET .../queue/{queueId} returns
+it). After one full load we keep, per (desk, queue), the raw issues and a
+high-water mark (the time the last sync started). A refresh then costs:
+
+1. A key-only search over the queue JQL (cheap, fields=["id"]): the current
+   membership in queue order. Keys that disappeared are removals.
+2. A search for `(<queue jql>) AND updated >= -Nm` covering the time since the
+   watermark (plus a safety overlap): the changed issues.
+3. A key fetch for members we hold no data for (e.g. moved into the queue
+   through a change that did not touch `updated`).
+
+Steps 1 and 2 run concurrently; network cost is O(changes), not O(queue size).
+If any of the searches fails, the delta raises (IncompleteResultError for a
+failed page) instead of returning a partial result: a short key list would
+report real members as removed and a missing changed-issue search would
+advance the watermark past updates never seen. Callers then do a full load
+and keep their old watermark.
+JQL relative dates ("-Nm") are used so the watermark never depends on the
+JIRA user's timezone.
+
+Changed issues are searched through the v2 API (plain-string rich text, like
+the Service Desk queue endpoint) and reduced to the fields the queue returned
+on its last full load (to_queue_shape), so a held queue never mixes shapes.
+"""
+
+import asyncio
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from utils.async_jira import AsyncJiraClient, run_sync
+
+logger = logging.getLogger(__name__)
+
+# Overlap added to every delta window (covers clock skew and minute rounding)
+DELTA_OVERLAP_SECONDS = 60
+# Page size of the key-only membership search (JIRA allows large pages for id/key)
+KEY_LIST_PAGE_SIZE = 1000
+# REST API version of queue issue searches (v2: same value shapes as the Service Desk API)
+QUEUE_SEARCH_API_VERSION = 2
+# Top-level keys of a Service Desk queue issue
+QUEUE_ISSUE_KEYS = ("id", "key", "self")
+
+_ORDER_BY_RE = re.compile(r"\s+ORDER\s+BY\s+.*$", re.IGNORECASE | re.DOTALL)
+
+def strip_order_by(jql: str) -> str:
+    """Remove a trailing ORDER BY clause so the JQL can be combined with AND"""
+    return _ORDER_BY_RE.sub("", jql or "").strip()
+
+def updated_since_clause(watermark: float, now: Optional[float] = None) -> str:
+    """JQL clause matching issues updated since watermark (epoch seconds)"""
+    now = now or time.time()
+    minutes = max(1, math.ceil((now - watermark + DELTA_OVERLAP_SECONDS) / 60))
+    return f"updated >= -{minutes}m"
+
+def to_queue_shape(issue: Dict[str, Any], field_names: Set[str]) -> Dict[str, Any]:
+    """
+    A search result issue reduced to the shape of a Service Desk queue issue
+
+    Args:
+        issue: Raw issue from a JQL search (extra top-level keys such as
+               changelog/expand are dropped)
+        field_names: Fields of the queue's issues (empty: keep every field)
+    """
+    fields = issue.get("fields") or {}
+    shaped = {name: issue[name] for name in QUEUE_ISSUE_KEYS if name in issue}
+    shaped["fields"] = {name: fields.get(name) for name in field_names} if field_names else dict(fields)
+    return shaped
+
+@dataclass
+class QueueDelta:
+    """Result of one delta refresh"""
+    keys: List[str]                  # Current membership, queue order
+    changed: List[Dict[str, Any]]    # Raw issues updated since the watermark or newly seen
+    removed: List[str]               # Previously known keys no longer in the queue
+    request_count: int
+    synced_at: float                 # New watermark (time the refresh started)
+
+@dataclass
+class QueueState:
+    """Locally held copy of one queue"""
+    jql: Optional[str] = None
+    watermark: float = 0.0
+    last_full_sync: float = 0.0
+    issues: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    enriched: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    order: List[str] = field(default_factory=list)
+    field_names: Set[str] = field(default_factory=set)   # Fields of the full-load (queue) issues
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def is_warm(self, full_resync_interval: float) -> bool:
+        """True if a delta refresh is possible (previous full load still fresh enough)"""
+        return bool(
+            self.jql and self.order and self.watermark
+            and time.time() - self.last_full_sync < full_resync_interval
+        )
+
+    def replace(self, issues: List[Dict[str, Any]], enriched: Dict[str, Dict[str, Any]], synced_at: float):
+        """Store the result of a full load"""
+        self.issues = {issue["key"]: issue for issue in issues if issue.get("key")}
+        self.enriched = dict(enriched)
+        self.order = [issue["key"] for issue in issues if issue.get("key")]
+        self.field_names = {name for issue in issues for name in (issue.get("fields") or {})}
+        self.watermark = synced_at
+        self.last_full_sync = synced_at
+
+    def apply(self, delta: QueueDelta, enriched: Dict[str, Dict[str, Any]]):
+        """Merge a delta refresh into the held issue set (changed issues in queue shape)"""
+        for issue in delta.changed:
+            key = issue.get("key")
+            if key:
+                self.issues[key] = to_queue_shape(issue, self.field_names)
+        self.enriched.update(enriched)
+        for key in delta.removed:
+            self.issues.pop(key, None)
+            self.enriched.pop(key, None)
+        self.order = [key for key in delta.keys if key in self.issues]
+        self.watermark = delta.synced_at
+
+    def ordered_issues(self) -> List[Dict[str, Any]]:
+        return [self.issues[key] for key in self.order]
+
+async def list_keys(client: AsyncJiraClient, jql: str) -> List[str]:
+    """Keys matching a JQL query in result order (key-only search, large pages)"""
+    keys = []
+    seen = set()
+    for issue in await client.search_jql(jql, fields=["id"], page_size=KEY_LIST_PAGE_SIZE):
+        key = issue.get("key")
+        if key and key not in seen:
+            seen.add(key)
+            keys.append(key)
+    return keys
+
+async def fetch_delta_async(
+    client: AsyncJiraClient,
+    queue_jql: str,
+    known_keys: Set[str],
+    watermark: float,
+    fields: Optional[List[str]] = None,
+    expand: Optional[str] = None,
+    api_version: int = QUEUE_SEARCH_API_VERSION
+) -> QueueDelta:
+    """
+    fetch_queue_delta on an open client (several queues can share one client,
+    its concurrency bound and the process-wide rate limiter)
+
+    Raises:
+        IncompleteResultError: the membership or changed-issue search failed
+    """
+    started = time.time()
+    requests_before = client.request_count
+    base_jql = strip_order_by(queue_jql)
+    changed_jql = f"({base_jql}) AND {updated_since_clause(watermark)}" if base_jql else updated_since_clause(watermark)
+
+    tasks = [
+        asyncio.ensure_future(list_keys(client, queue_jql)),
+        asyncio.ensure_future(client.search_jql(changed_jql, fields=fields, expand=expand, api_version=api_version)),
+    ]
+    try:
+        keys, changed = await asyncio.gather(*tasks)
+    finally:
+        # One search failed: don't leave the other running on the client
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    changed_keys = {issue.get("key") for issue in changed}
+    missing = [key for key in keys if key not in known_keys and key not in changed_keys]
+    if missing:
+        logger.info(f"🔎 Delta sync: fetching {len(missing)} unseen queue member(s)")
+        changed.extend(await client.get_issues_by_keys(
+            missing, fields=fields, expand=expand, api_version=api_version
+        ))
+
+    current = set(keys)
+    return QueueDelta(
+        keys=keys,
+        changed=[issue for issue in changed if issue.get("key") in current],
+        removed=[key for key in known_keys if key not in current],
+        request_count=client.request_count - requests_before,
+        synced_at=started
+    )
+
+def fetch_queue_delta(
+    site: str,
+    headers: Dict[str, str],
+    queue_jql: str,
+    known_keys: Set[str],
+    watermark: float,
+    fields: Optional[List[str]] = None,
+    expand: Optional[str] = None
+) -> QueueDelta:
+    """
+    Fetch what changed in a queue since watermark
+
+    Args:
+        site: JIRA site base URL
+        headers: Auth headers
+        queue_jql: The queue's JQL (ORDER BY is kept for the membership order)
+        known_keys: Keys of the locally held issues
+        watermark: Epoch seconds of the previous sync start
+        fields: Fields to return for changed issues
+        expand: Optional expand string for changed issues
+
+    Returns:
+        QueueDelta
+
+    Raises:
+        IncompleteResultError: a search failed (do a full load, keep the watermark)
+    """
+    async def _run():
+        async with AsyncJiraClient(site, headers) as client:
+            return await fetch_delta_async(client, queue_jql, known_keys, watermark, fields, expand)
+
+    return run_sync(_run())
+
+# ============================================================
+# QUEUE JQL + STATE REGISTRY
+# ============================================================
+
+_queue_jql_cache: Dict[Tuple[str, str], str] = {}
+
+def get_queue_jql(site: str, headers: Dict[str, str], desk_id: str, queue_id: str) -> Optional[str]:
+    """JQL that defines a Service Desk queue (cached; queue definitions rarely change)"""
+    cache_key = (str(desk_id), str(queue_id))
+    if cache_key in _queue_jql_cache:
+        return _queue_jql_cache[cache_key]
+    from utils.common import _make_request
+    url = f"{site.rstrip('/')}/rest/servicedeskapi/servicedesk/{desk_id}/queue/{queue_id}"
+    data = _make_request("GET", url, headers)
+    jql = data.get("jql") if isinstance(data, dict) else None
+    if jql:
+        _queue_jql_cache[cache_key] = jql
+    return jql
+
+_queue_states: "OrderedDict[Tuple[str, str], QueueState]" = OrderedDict()
+_queue_states_lock = threading.Lock()
+
+def get_queue_state(desk_id: str, queue_id: str) -> QueueState:
+    """
+    Get or create the held state of a queue
+
+    At most CacheConfig.snapshot_max_entries queues are held; the least
+    recently used is forgotten (its next load is a full load).
+    """
+    from utils.config import config
+    key = (str(desk_id), str(queue_id))
+    with _queue_states_lock:
+        state = _queue_states.get(key)
+        if state is None:
+            state = QueueState()
+            _queue_states[key] = state
+        _queue_states.move_to_end(key)
+        max_entries = config.cache.snapshot_max_entries
+        while max_entries > 0 and len(_queue_states) > max_entries:
+            evicted, _ = _queue_states.popitem(last=False)
+            _queue_jql_cache.pop(evicted, None)
+        return state
+
+def reset_queue_states():
+    """Forget every held queue (next load of each queue is a full load)"""
+    with _queue_states_lock:
+        _queue_states.clear()
+    _queue_jql_cache.clear()
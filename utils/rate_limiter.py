@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+Rate Limiter Module
+Process-wide adaptive token bucket for all outbound JIRA traffic
+
+Every request (utils.common._make_request and utils.async_jira) takes a token
+from the same bucket, so threads, async pagination and scripts share one budget.
+
+Adaptation (AIMD):
+- 429 responses halve the rate and pause all traffic for Retry-After seconds
+- X-RateLimit-Remaining == 0 pauses traffic until X-RateLimit-Reset
+- X-RateLimit-NearLimit slows the rate down slightly
+- Successful responses raise the rate additively back towards the maximum
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+# Status codes that mean "slow down and retry"
+RETRYABLE_STATUS = (429, 503)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header (delta seconds or HTTP date)
+
+    Returns:
+        Seconds to wait, or None if missing/invalid
+    """
+    if not value:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+def _parse_reset(value: Optional[str]) -> Optional[float]:
+    """Parse X-RateLimit-Reset (ISO 8601 timestamp in JIRA Cloud) into seconds from now"""
+    if not value:
+        return None
+    try:
+        when = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except ValueError:
+        return parse_retry_after(value)
+
+class AdaptiveRateLimiter:
+    """Thread-safe token bucket whose rate adapts to JIRA throttling signals"""
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: int = 20,
+        min_rate: float = 0.5,
+        max_rate: Optional[float] = None,
+        decrease_factor: float = 0.5,
+        increase_step: float = 0.2,
+        max_retries: int = 3
+    ):
+        """
+        Args:
+            rate: Initial sustained rate (requests/second)
+            burst: Bucket capacity (max requests sent back-to-back)
+            min_rate: Lower bound for the adapted rate
+            max_rate: Upper bound for the adapted rate (default: initial rate)
+            decrease_factor: Multiplier applied to the rate on each 429
+            increase_step: Rate added back on each successful response
+            max_retries: Retries allowed for a throttled request
+        """
+        self.max_rate = max_rate or rate
+        self.min_rate = min(min_rate, self.max_rate)
+        self.rate = rate
+        self.capacity = float(burst)
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self.max_retries = max_retries
+
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+
+        self._stats = {
+            "acquired": 0,
+            "waited_seconds": 0.0,
+            "throttled": 0,
+            "retries": 0,
+            "exhausted": 0,
+            "near_limit": 0
+        }
+
+    # ============================================================
+    # TOKEN BUCKET
+    # ============================================================
+
+    def _reserve(self) -> float:
+        """Take one token (possibly borrowing ahead) and return the delay before it may be used"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+            self._tokens -= 1.0
+            delay = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            delay = max(delay, self._blocked_until - now)
+            self._stats["acquired"] += 1
+            self._stats["waited_seconds"] += delay
+            return delay
+
+    def acquire(self):
+        """Block the calling thread until a request may be sent"""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        """Async variant of acquire() (does not block the event loop)"""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    # ============================================================
+    # FEEDBACK
+    # ============================================================
+
+    def on_response(self, status_code: int, headers: Optional[Mapping[str, str]] = None) -> Optional[float]:
+        """
+        Feed a response back into the limiter
+
+        Args:
+            status_code: HTTP status code
+            headers: Response headers (Retry-After, X-RateLimit-*)
+
+        Returns:
+            Retry-After seconds when the server asked us to wait, else None
+        """
+        headers = headers or {}
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+
+        with self._lock:
+            now = time.monotonic()
+            if status_code == 429 or (status_code == 503 and retry_after is not None):
+                self._stats["throttled"] += 1
+                self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                self._tokens = min(self._tokens, 0.0)
+                if retry_after is not None:
+                    self._blocked_until = max(self._blocked_until, now + retry_after)
+                logger.warning(
+                    f"⏳ JIRA throttled (HTTP {status_code}); rate → {self.rate:.2f} req/s"
+                    + (f", pausing {retry_after:.1f}s" if retry_after is not None else "")
+                )
+                return retry_after
+
+            remaining = headers.get("X-RateLimit-Remaining")
+            if remaining is not None and str(remaining).strip() == "0":
+                reset_in = _parse_reset(headers.get("X-RateLimit-Reset"))
+                if reset_in:
+                    self._blocked_until = max(self._blocked_until, now + reset_in)
+            if str(headers.get("X-RateLimit-NearLimit", "")).lower() == "true":
+                self._stats["near_limit"] += 1
+                self.rate = max(self.min_rate, self.rate * 0.9)
+            elif 200 <= status_code < 400 and self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
+        return retry_after
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None,
+                      base: float = 1.0, cap: float = 60.0) -> float:
+        """
+        Delay before retry number `attempt` (0-based)
+
+        Honours Retry-After (plus a little jitter so threads don't wake together),
+        otherwise exponential backoff with full jitter.
+        """
+        with self._lock:
+            self._stats["retries"] += 1
+        if retry_after is not None:
+            return retry_after + random.uniform(0, min(1.0, retry_after * 0.1 + 0.1))
+        return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+    def record_exhausted(self):
+        """Count a request that stayed throttled after all retries"""
+        with self._lock:
+            self._stats["exhausted"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Current rate, bucket state and counters"""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "rate": round(self.rate, 3),
+                "max_rate": self.max_rate,
+                "min_rate": self.min_rate,
+                "capacity": self.capacity,
+                "tokens": round(min(self.capacity, self._tokens + (now - self._last_refill) * self.rate), 2),
+                "paused_seconds": round(max(0.0, self._blocked_until - now), 2),
+                **{k: (round(v, 3) if isinstance(v, float) else v) for k, v in self._stats.items()}
+            }
+
+# Global limiter instance
+_rate_limiter: Optional[AdaptiveRateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> AdaptiveRateLimiter:
+    """Get or create the process-wide limiter configured from JiraConfig"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                from utils.config import config
+                jira = config.jira
+                _rate_limiter = AdaptiveRateLimiter(
+                    rate=jira.rate_limit,
+                    burst=jira.rate_limit_burst,
+                    min_rate=jira.rate_limit_min,
+                    max_retries=jira.max_retries
+                )
+    return _rate_limiter
+
+def get_rate_limiter_stats() -> Dict[str, Any]:
+    """Statistics of the global limiter"""
+    return get_rate_limiter().get_stats()
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Record Memo Module
+Bounded LRU memo of formatted issue records
+
+Formatting a queue issue (utils.field_compiler.FieldPlan.format_issue)
+depends on the plan, the raw issue's field layout and values, and its
+enrichment. Records are memoized under the plan id, the field-key set, the
+issue key and fields.updated, a hash of the customfield values (SLA cycles'
+remaining time and breach state change without bumping `updated`), plus the
+enrichment's key set, last_real_change, comment count and watcher values
+(watching does not bump `updated` either). A record
+formatted for one queue's plan or layout is never served to another, and
+unchanged issues are reused across loads instead of being reformatted.
+
+Memoized records are shared: callers must treat them as read-only (IssueRecords
+hands out copies).
+
+Hit/miss/eviction counters (see get_stats) help size the memo against the
+number of issues held across all queues.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+class RecordMemo:
+    """Thread-safe LRU memo with hit/miss/eviction metrics"""
+
+    def __init__(self, max_entries: int = 20000):
+        """
+        Args:
+            max_entries: Max records kept (least recently used are evicted)
+        """
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Memoized record for key, built (outside the lock) on a miss"""
+        with self._lock:
+            record = self._entries.get(key)
+            if record is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return record
+            self._stats["misses"] += 1
+
+        record = build()
+        with self._lock:
+            self._entries[key] = record
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        return record
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters, size and hit ratio"""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["size"] = len(self._entries)
+        stats["max_entries"] = self.max_entries
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+def record_key(plan, issue: Dict[str, Any], enrichment: Optional[Dict[str, Any]]) -> Hashable:
+    """Memo key: issue key + the values that change whenever the issue, plan or enrichment does"""
+    fields = issue.get("fields") or {}
+    enrichment = enrichment or {}
+    return (
+        issue.get("key", ""),
+        fields.get("updated") or fields.get("actualizado"),
+        plan.plan_id,
+        plan.layout_signature(fields),
+        plan.custom_values_hash(fields),
+        hash(tuple(enrichment)),
+        enrichment.get("last_real_change"),
+        enrichment.get("comment_count"),
+        enrichment.get("watcher_count"),
+        enrichment.get("is_watching")
+    )
+
+def format_issues_memoized(
+    plan,
+    issues: List[Dict[str, Any]],
+    enriched_data: Optional[Dict[str, Dict[str, Any]]],
+    memo: Optional["RecordMemo"] = None
+) -> List[Dict[str, Any]]:
+    """
+    FieldPlan.format_issues with per-issue memoization
+
+    Issues without a key or an `updated` timestamp are always formatted
+    (nothing identifies their version).
+    """
+    memo = memo or get_record_memo()
+    enriched_data = enriched_data or {}
+    format_issue = plan.format_issue
+    records = []
+    for issue in issues:
+        enrichment = enriched_data.get(issue.get("key", ""))
+        key = record_key(plan, issue, enrichment)
+        if not key[0] or not key[1]:
+            records.append(format_issue(issue, enrichment))
+            continue
+        records.append(memo.get_or_build(key, lambda: format_issue(issue, enrichment)))
+    return records
+
+# Global memo instance
+_record_memo: Optional[RecordMemo] = None
+_record_memo_lock = threading.Lock()
+
+def get_record_memo() -> RecordMemo:
+    """Get or create the process-wide memo (size: CacheConfig.record_memo_size)"""
+    global _record_memo
+    if _record_memo is None:
+        with _record_memo_lock:
+            if _record_memo is None:
+                from utils.config import config
+                _record_memo = RecordMemo(config.cache.record_memo_size)
+    return _record_memo
+
+def reset_record_memo():
+    """Drop all memoized records (e.g. after the JIRA site/user changes)"""
+    if _record_memo is not None:
+        _record_memo.clear()
+
+def get_record_memo_stats() -> Dict[str, Any]:
+    """Statistics of the global memo"""
+    return get_record_memo().get_stats()
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Similarity Search Module
+Vectorized exact top-k cosine search for many queries at once
+
+    masks = SearchMasks(columns, keys=keys, alive=embedding_set.alive)
+    allowed = masks.mask(project="MSM", status=["Open", "En curso"], created_from="2025-01-01")
+    rows, scores = search_batch(vectors, queries, k=10, allowed=allowed, exclude=self_rows)
+
+search_batch() normalizes the queries and scores a whole block of them with
+one matrix multiply against the unit-length stored rows (blocks bound the
+score matrix to max_scores floats). Each query's top-k is selected with
+np.argpartition (linear in the rows) and only those k are sorted. Selective
+filters gather the allowed rows first; broad ones score every row and blank
+out the rest. Result rows are padded with -1 (score -inf) when fewer than k
+rows match or pass min_similarity.
+
+SearchMasks precomputes one boolean mask per project/status value (cached)
+and ANDs them with the live-row mask, key filters and created-date ranges.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from utils.ann_index import normalize_rows
+from utils.issue_columns import IssueColumns, parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+Wanted = Optional[Union[str, Iterable[str]]]
+
+def search_batch(vectors: np.ndarray, queries: np.ndarray, k: int = 10, allowed: Optional[np.ndarray] = None,
+                 exclude: Optional[np.ndarray] = None, min_similarity: Optional[float] = None,
+                 max_scores: int = 1 << 24) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exact top-k rows by cosine similarity for every query
+
+    Args:
+        vectors: (n, d) unit-length rows
+        queries: (q, d) or (d,) query embeddings (normalized here)
+        k: Results per query
+        allowed: Optional (n,) boolean mask of rows that may be returned
+        exclude: Optional (q,) row per query that may not be returned (-1 = none), e.g. the query's own row
+        min_similarity: Drop results below this similarity
+        max_scores: Max floats in one block's score matrix
+
+    Returns:
+        (rows, scores): (q, k) int64 rows and float32 similarities, best first, padded with -1 / -inf
+    """
+    queries = normalize_rows(np.atleast_2d(queries))
+    n, q = len(vectors), len(queries)
+    rows_out = np.full((q, k), -1, dtype=np.int64)
+    scores_out = np.full((q, k), -np.inf, dtype=np.float32)
+    if not n or not q or not k:
+        return rows_out, scores_out
+
+    candidates = None
+    if allowed is not None:
+        allowed = allowed[:n]
+        if not allowed.any():
+            return rows_out, scores_out
+        if np.count_nonzero(allowed) < n // 2:
+            candidates = np.flatnonzero(allowed)
+    matrix = vectors if candidates is None else vectors[candidates]
+    blank = None if candidates is not None or allowed is None else ~allowed
+    if exclude is not None:
+        exclude = np.asarray(exclude, dtype=np.int64)
+        if candidates is not None:
+            position = np.full(n, -1, dtype=np.int64)
+            position[candidates] = np.arange(len(candidates))
+            exclude = np.where(exclude >= 0, position[np.clip(exclude, 0, n - 1)], -1)
+
+    m = len(matrix)
+    kk = min(k, m)
+    block = max(1, max_scores // m)
+    for start in range(0, q, block):
+        scores = queries[start:start + block] @ matrix.T
+        if blank is not None:
+            scores[:, blank] = -np.inf
+        if exclude is not None:
+            own = exclude[start:start + block]
+            hit = np.flatnonzero(own >= 0)
+            scores[hit, own[hit]] = -np.inf
+        top = np.argpartition(-scores, kk - 1, axis=1)[:, :kk] if kk < m else np.broadcast_to(np.arange(m), (len(scores), m))
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        found = top if candidates is None else candidates[top]
+        keep = np.isfinite(top_scores)
+        if min_similarity is not None:
+            keep &= top_scores >= min_similarity
+        rows_out[start:start + len(scores), :kk] = np.where(keep, found, -1)
+        scores_out[start:start + len(scores), :kk] = np.where(keep, top_scores, -np.inf)
+    return rows_out, scores_out
+
+def _epoch(value: Any) -> float:
+    """Epoch seconds of a date bound (ISO string or number)"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    return parse_timestamp(value)[0]
+
+class SearchMasks:
+    """Boolean row masks over a search matrix (see module docstring)"""
+
+    def __init__(self, columns: IssueColumns, keys: Optional[Sequence[str]] = None,
+                 alive: Optional[np.ndarray] = None):
+        """
+        Args:
+            columns: Row-aligned columns (categorical "project"/"status", timestamp "created")
+            keys: Row keys, for key filters
+            alive: Rows that may be returned at all (e.g. not tombstoned)
+        """
+        self.columns = columns
+        self.keys = None if keys is None else np.asarray(keys, dtype=object)
+        self.alive = alive
+        self._cache: Dict[Tuple[str, frozenset], np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def values(self, name: str, wanted: Union[str, Iterable[str]]) -> np.ndarray:
+        """Rows whose categorical column name is (one of) wanted"""
+        wanted = frozenset([wanted] if isinstance(wanted, str) else wanted)
+        cache_key = (name, wanted)
+        mask = self._cache.get(cache_key)
+        if mask is None:
+            if name in self.columns.categories:
+                codes, categories = self.columns.codes(name)
+                wanted_codes = [code for code, category in enumerate(categories) if category in wanted]
+                mask = np.isin(codes, wanted_codes)
+            else:
+                mask = np.zeros(len(self.columns), dtype=bool)
+            self._cache[cache_key] = mask
+        return mask
+
+    def mask(self, project: Wanted = None, status: Wanted = None, created_from: Any = None,
+             created_to: Any = None, keys: Optional[Iterable[str]] = None) -> Optional[np.ndarray]:
+        """AND of the live rows and the given filters (None when everything is allowed)"""
+        mask = self.alive
+        parts = []
+        if project is not None:
+            parts.append(self.values("project", project))
+        if status is not None:
+            parts.append(self.values("status", status))
+        if created_from is not None or created_to is not None:
+            created = self.columns.epoch("created") if "created" in self.columns.arrays else np.full(len(self), np.nan)
+            in_range = ~np.isnan(created)
+            if created_from is not None:
+                in_range &= created >= _epoch(created_from)
+            if created_to is not None:
+                in_range &= created <= _epoch(created_to)
+            parts.append(in_range)
+        if keys is not None:
+            keys = [keys] if isinstance(keys, str) else list(keys)
+            parts.append(np.isin(self.keys, np.array(keys, dtype=object)))
+        for part in parts:
+            mask = part if mask is None else mask & part
+        return mask
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+Single-Flight Module
+Coalesces identical concurrent operations into one execution
+
+When several threads ask for the same key while a call is already in flight,
+they wait for that call and share its result (or its exception) instead of
+running a duplicate. Used for identical JIRA GETs (utils.common._make_request)
+and for whole queue loads (core.api.load_queue_issues).
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+class _Call:
+    """An in-flight call that followers wait on"""
+    __slots__ = ("event", "result", "copies", "error", "waiters")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.copies: list = []
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+class SingleFlight:
+    """Thread-safe single-flight group with coalesce metrics"""
+
+    def __init__(self, name: str, copy_result: Optional[Callable[[Any], Any]] = None):
+        """
+        Args:
+            name: Group name (used in logs and metrics)
+            copy_result: Optional function applied to the shared result for each
+                         follower, so callers that mutate their result don't
+                         affect each other (copies are made before anyone,
+                         leader included, gets the result)
+        """
+        self.name = name
+        self.copy_result = copy_result
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._stats = {"calls": 0, "executions": 0, "coalesced": 0, "errors": 0}
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) once per key among concurrent callers
+
+        Args:
+            key: Hashable identity of the operation
+            fn: Function to execute (only by the first caller)
+
+        Returns:
+            The shared result (copied for followers if copy_result is set)
+        """
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._stats["coalesced"] += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._stats["executions"] += 1
+                leader = True
+
+        if not leader:
+            logger.debug(f"🔗 [{self.name}] coalesced onto in-flight call: {key}")
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            if self.copy_result:
+                with self._lock:
+                    return call.copies.pop()
+            return call.result
+
+        try:
+            result = fn(*args, **kwargs)
+            with self._lock:
+                self._calls.pop(key, None)  # No new followers from here on
+            if self.copy_result:
+                # One copy per follower, taken before the leader's caller can touch the result
+                call.copies = [self.copy_result(result) for _ in range(call.waiters)]
+            call.result = result
+            return result
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self._stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def in_flight(self) -> int:
+        """Number of keys currently executing"""
+        with self._lock:
+            return len(self._calls)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters: calls, executions, coalesced (saved executions), errors"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._calls)
+        stats["coalesce_ratio"] = round(stats["coalesced"] / stats["calls"], 4) if stats["calls"] else 0.0
+        return stats
+
+# Named groups registry
+_groups: Dict[str, SingleFlight] = {}
+_groups_lock = threading.Lock()
+
+def get_single_flight(name: str, copy_result: Optional[Callable[[Any], Any]] = None) -> SingleFlight:
+    """Get or create a named single-flight group (copy_result applies on creation)"""
+    group = _groups.get(name)
+    if group is None:
+        with _groups_lock:
+            group = _groups.get(name)
+            if group is None:
+                group = SingleFlight(name, copy_result=copy_result)
+                _groups[name] = group
+    return group
+
+def get_single_flight_stats() -> Dict[str, Dict[str, Any]]:
+    """Metrics of every named group"""
+    with _groups_lock:
+        groups = list(_groups.values())
+    return {group.name: group.get_stats() for group in groups}
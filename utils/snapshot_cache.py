@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Snapshot Cache Module
+Versioned stale-while-revalidate cache
+
+Each key holds one immutable snapshot (data + version + fetch time):
+- fresh (age < ttl): returned as is
+- stale (ttl <= age < max_stale): returned immediately while one background
+  thread refreshes it
+- missing or expired (age >= max_stale): loaded synchronously
+
+Versions increase on every successful refresh, so consumers can memoize views
+derived from a snapshot by (key, version). A failed refresh keeps the previous
+snapshot (returned with the error attached) until a refresh succeeds.
+
+At most max_entries snapshots are held; the least recently used ones are
+evicted (and simply reloaded on their next read). Versions come from one
+cache-wide counter, so a reloaded key never reuses a version.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from utils.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class Snapshot:
+    """One immutable cached value"""
+    key: Hashable
+    data: Any
+    version: int
+    fetched_at: float
+    error: Optional[str] = None
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+class SnapshotCache:
+    """Thread-safe stale-while-revalidate cache of versioned snapshots"""
+
+    def __init__(
+        self,
+        name: str,
+        loader: Callable[[Hashable], Any],
+        ttl: float,
+        max_stale: float,
+        max_entries: int = 0
+    ):
+        """
+        Args:
+            name: Cache name (used in logs and metrics)
+            loader: Function key -> data; raising marks the refresh as failed
+            ttl: Seconds a snapshot is served without revalidation
+            max_stale: Seconds a stale snapshot may still be served while refreshing
+            max_entries: Max snapshots held, least recently used evicted first (0: unbounded)
+        """
+        self.name = name
+        self.loader = loader
+        self.ttl = ttl
+        self.max_stale = max(max_stale, ttl)
+        self.max_entries = max(0, max_entries)
+        self._lock = threading.Lock()
+        self._snapshots: "OrderedDict[Hashable, Snapshot]" = OrderedDict()
+        self._version = 0
+        self._refreshing: Dict[Hashable, threading.Thread] = {}
+        # Concurrent misses/refreshes of one key share a single load (and version)
+        self._flight = SingleFlight(f"{name}_refresh")
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0, "evictions": 0}
+
+    def get(self, key: Hashable, force: bool = False) -> Snapshot:
+        """
+        Get the snapshot of key (see module docstring for freshness rules)
+
+        Args:
+            key: Cache key
+            force: Load synchronously even if a snapshot exists
+        """
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None and not force:
+                self._snapshots.move_to_end(key)
+                age = snapshot.age
+                if age < self.ttl:
+                    self._stats["hits"] += 1
+                    return snapshot
+                if age < self.max_stale:
+                    self._stats["stale_hits"] += 1
+                    self._start_refresh(key)
+                    return snapshot
+            self._stats["misses"] += 1
+        return self._refresh(key)
+
+    def peek(self, key: Hashable) -> Optional[Snapshot]:
+        """Current snapshot of key without loading or refreshing"""
+        with self._lock:
+            return self._snapshots.get(key)
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Drop one snapshot (or all); versions keep increasing"""
+        with self._lock:
+            if key is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(key, None)
+
+    def _start_refresh(self, key: Hashable):
+        """Start a background refresh unless one is running (caller holds the lock)"""
+        if key in self._refreshing:
+            return
+        thread = threading.Thread(
+            target=self._background_refresh,
+            args=(key,),
+            name=f"{self.name}-refresh",
+            daemon=True
+        )
+        self._refreshing[key] = thread
+        thread.start()
+
+    def _background_refresh(self, key: Hashable):
+        try:
+            self._refresh(key)
+        except Exception as e:
+            logger.warning(f"[{self.name}] background refresh of {key} failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.pop(key, None)
+
+    def _refresh(self, key: Hashable) -> Snapshot:
+        """Load key once among concurrent callers"""
+        return self._flight.do(key, self._load, key)
+
+    def _load(self, key: Hashable) -> Snapshot:
+        """Load key and store the result as a new version (unless loading fails)"""
+        data, error = None, None
+        try:
+            data = self.loader(key)
+        except Exception as e:
+            error = str(e)
+
+        with self._lock:
+            self._stats["refreshes"] += 1
+            previous = self._snapshots.get(key)
+            if error is not None:
+                self._stats["refresh_errors"] += 1
+                if previous is not None:
+                    logger.warning(f"[{self.name}] refresh of {key} failed, keeping v{previous.version}: {error}")
+                    return replace(previous, error=error)
+                # Nothing to fall back to: hand the error to the caller without caching it
+                return Snapshot(key=key, data=data, version=0, fetched_at=time.time(), error=error)
+            self._version += 1
+            snapshot = Snapshot(key=key, data=data, version=self._version, fetched_at=time.time())
+            self._snapshots[key] = snapshot
+            self._snapshots.move_to_end(key)
+            while self.max_entries and len(self._snapshots) > self.max_entries:
+                evicted, _ = self._snapshots.popitem(last=False)
+                self._stats["evictions"] += 1
+                logger.debug(f"[{self.name}] evicted least recently used snapshot {evicted}")
+            return snapshot
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters plus per-key version and age"""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["refreshing"] = len(self._refreshing)
+            stats["size"] = len(self._snapshots)
+            stats["max_entries"] = self.max_entries
+            stats["coalesced"] = self._flight.get_stats()["coalesced"]
+            stats["snapshots"] = {
+                str(key): {"version": s.version, "age_seconds": round(s.age, 1)}
+                for key, s in self._snapshots.items()
+            }
+        return stats
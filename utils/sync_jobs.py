@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+"""
+Sync Jobs Module
+Background project syncs with progress, cancellation and resumable checkpoints
+
+IssueCacheManager.sync_project runs for minutes (fetch, store, patterns,
+embeddings), so the API submits it here instead of running it in the request:
+- a bounded worker pool (CacheConfig.sync_workers) runs the jobs
+- a sync requested while one is queued or running for the same project is
+  coalesced into the existing job
+- every job reports per-phase progress (utils.issue_cache.SYNC_PHASES)
+- cancellation is cooperative: sync_project polls it between phases, queues
+  and pages
+- jobs and their checkpoints are persisted to data/cache/sync_jobs.json, so
+  jobs interrupted by a crash or restart resume after their last completed
+  phase (resume_interrupted, called at server startup)
+"""
+
+import copy
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.issue_cache import SYNC_PHASES, SyncCancelled
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOBS_PATH = Path("data/cache/sync_jobs.json")
+
+ACTIVE_STATUSES = ('queued', 'running')
+TERMINAL_STATUSES = ('succeeded', 'failed', 'cancelled')
+
+def _new_phases() -> Dict[str, Dict]:
+    return {phase: {'status': 'pending', 'progress': 0.0, 'detail': ''} for phase in SYNC_PHASES}
+
+@dataclass
+class SyncJob:
+    """One project sync (mutated only under SyncJobRunner's lock)"""
+    job_id: str
+    project_key: str
+    service_desk_id: Optional[str] = None
+    status: str = 'queued'
+    phase: Optional[str] = None
+    phases: Dict[str, Dict] = field(default_factory=_new_phases)
+    checkpoint: Dict[str, Any] = field(default_factory=dict)
+    attempts: int = 0
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+    cancel_requested: bool = False
+
+    @property
+    def progress(self) -> float:
+        """Overall progress (0-1), phases weighted equally"""
+        return sum(p['progress'] for p in self.phases.values()) / len(self.phases)
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data['progress'] = round(self.progress, 3)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SyncJob':
+        fields = cls.__dataclass_fields__
+        return cls(**{k: v for k, v in data.items() if k in fields})
+
+class SyncJobRunner:
+    """Bounded pool of background project syncs (see module docstring)"""
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        path: Path = DEFAULT_JOBS_PATH,
+        history: int = 50,
+        max_attempts: int = 3,
+        sync_factory: Optional[Callable[[], Tuple[Any, Any]]] = None
+    ):
+        """
+        Args:
+            max_workers: Concurrent syncs
+            path: JSON file the jobs are persisted to
+            history: Finished jobs kept (newest first)
+            max_attempts: Runs of one job (interrupted runs included) before it fails
+            sync_factory: Function () -> (cache manager, api client); defaults
+                          to get_cache_manager() and core.api.get_api_client()
+        """
+        self.path = Path(path)
+        self.history = history
+        self.max_attempts = max_attempts
+        self.sync_factory = sync_factory or _default_sync_factory
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="sync-job")
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, SyncJob] = {}
+        self._active: Dict[str, str] = {}  # project_key -> job_id
+        self._stats = {"submitted": 0, "coalesced": 0, "resumed": 0, "succeeded": 0, "failed": 0, "cancelled": 0}
+        self._load()
+
+    def submit(self, project_key: str, service_desk_id: Optional[str] = None) -> Tuple[SyncJob, bool]:
+        """
+        Queue a sync of project_key
+
+        Returns:
+            Tuple of (job, created); created is False when the request was
+            coalesced into the project's queued or running job
+        """
+        with self._lock:
+            job_id = self._active.get(project_key)
+            if job_id is not None:
+                self._stats["coalesced"] += 1
+                return self._copy(self._jobs[job_id]), False
+            job = SyncJob(job_id=uuid.uuid4().hex[:12], project_key=project_key, service_desk_id=service_desk_id)
+            self._jobs[job.job_id] = job
+            self._active[project_key] = job.job_id
+            self._stats["submitted"] += 1
+            self._save()
+            snapshot = self._copy(job)
+        self._executor.submit(self._run, job.job_id)
+        logger.info(f"Sync job {job.job_id} queued for {project_key}")
+        return snapshot, True
+
+    def cancel(self, job_id: str) -> Optional[SyncJob]:
+        """
+        Cancel a job: queued jobs are dropped, running jobs stop at their next
+        cancellation point. Returns the job (None if unknown).
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status == 'queued':
+                self._finish(job, 'cancelled')
+            elif job.status == 'running':
+                job.cancel_requested = True
+                self._save()
+            return self._copy(job)
+
+    def get(self, job_id: str) -> Optional[SyncJob]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._copy(job) if job else None
+
+    def active_job(self, project_key: str) -> Optional[SyncJob]:
+        """Queued or running job of a project"""
+        with self._lock:
+            job_id = self._active.get(project_key)
+            return self._copy(self._jobs[job_id]) if job_id else None
+
+    def list_jobs(self, project_key: Optional[str] = None) -> List[SyncJob]:
+        """Jobs, newest first"""
+        with self._lock:
+            jobs = [self._copy(j) for j in self._jobs.values() if project_key in (None, j.project_key)]
+        return sorted(jobs, key=lambda j: j.created_at, reverse=True)
+
+    def resume_interrupted(self) -> List[str]:
+        """
+        Requeue the jobs left queued or running by a previous process
+        (their checkpoints skip the phases already completed)
+
+        Returns:
+            IDs of the resumed jobs
+        """
+        resumed = []
+        with self._lock:
+            for job in sorted(self._jobs.values(), key=lambda j: j.created_at):
+                if job.status not in ACTIVE_STATUSES or job.job_id in self._active.values():
+                    continue
+                if job.cancel_requested:
+                    self._finish(job, 'cancelled')
+                elif job.project_key in self._active:
+                    self._finish(job, 'cancelled', error='Superseded by another sync of the project')
+                elif job.attempts >= self.max_attempts:
+                    self._finish(job, 'failed', error=f'Interrupted {job.attempts} times')
+                else:
+                    job.status = 'queued'
+                    self._active[job.project_key] = job.job_id
+                    self._stats["resumed"] += 1
+                    resumed.append(job.job_id)
+            self._save()
+        for job_id in resumed:
+            self._executor.submit(self._run, job_id)
+        if resumed:
+            logger.info(f"Resumed {len(resumed)} interrupted sync job(s): {resumed}")
+        return resumed
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self._stats, "active": len(self._active), "jobs": len(self._jobs)}
+
+    def _run(self, job_id: str):
+        with self._lock:
+            job = self._jobs[job_id]
+            if job.status != 'queued':
+                return  # cancelled while queued
+            job.status = 'running'
+            job.attempts += 1
+            job.started_at = job.started_at or time.time()
+            # sync_project owns the working checkpoint; the job keeps a copy
+            checkpoint = copy.deepcopy(job.checkpoint)
+            self._save()
+
+        def progress(phase: str, fraction: float, detail: str = ''):
+            with self._lock:
+                job.phase = phase
+                job.phases[phase] = {
+                    'status': 'running',
+                    'progress': round(min(max(fraction, 0.0), 1.0), 3),
+                    'detail': detail
+                }
+                for done in checkpoint.get('completed', ()):
+                    job.phases[done].update(status='done', progress=1.0)
+                job.checkpoint = copy.deepcopy(checkpoint)
+                self._save()
+
+        try:
+            cache, client = self.sync_factory()
+            result = cache.sync_project(
+                job.project_key, client, job.service_desk_id,
+                progress=progress,
+                should_cancel=lambda: job.cancel_requested,
+                checkpoint=checkpoint
+            )
+        except SyncCancelled:
+            with self._lock:
+                self._finish(job, 'cancelled')
+            logger.info(f"Sync job {job_id} cancelled")
+        except Exception as e:
+            with self._lock:
+                self._finish(job, 'failed', error=str(e))
+            logger.error(f"Sync job {job_id} failed: {e}")
+        else:
+            with self._lock:
+                job.result = result
+                self._finish(job, 'succeeded')
+            logger.info(f"Sync job {job_id} succeeded: {result.get('total_stored')} issues")
+
+    def _finish(self, job: SyncJob, status: str, error: Optional[str] = None):
+        """Mark a job terminal and persist (caller holds the lock)"""
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        for state in job.phases.values():
+            if state['status'] == 'running':
+                state['status'] = 'done' if status == 'succeeded' else status
+        if self._active.get(job.project_key) == job.job_id:
+            del self._active[job.project_key]
+        self._stats[status] += 1
+        self._save()
+
+    @staticmethod
+    def _copy(job: SyncJob) -> SyncJob:
+        return SyncJob.from_dict(copy.deepcopy(asdict(job)))
+
+    def _load(self):
+        """Load persisted jobs (interrupted ones wait for resume_interrupted)"""
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for item in data.get('jobs', []):
+                job = SyncJob.from_dict(item)
+                self._jobs[job.job_id] = job
+        except Exception as e:
+            logger.warning(f"Could not load sync jobs from {self.path}: {e}")
+
+    def _save(self):
+        """Persist jobs atomically, capping finished history (caller holds the lock)"""
+        finished = sorted(
+            (j for j in self._jobs.values() if j.status in TERMINAL_STATUSES),
+            key=lambda j: j.created_at, reverse=True
+        )
+        for job in finished[self.history:]:
+            del self._jobs[job.job_id]
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(self.path.suffix + '.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'jobs': [j.to_dict() for j in self._jobs.values()]}, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            logger.warning(f"Could not persist sync jobs to {self.path}: {e}")
+
+def _default_sync_factory() -> Tuple[Any, Any]:
+    from core.api import get_api_client
+    from utils.issue_cache import get_cache_manager
+    return get_cache_manager(), get_api_client()
+
+# Global instance
+_sync_job_runner: Optional[SyncJobRunner] = None
+_sync_job_runner_lock = threading.Lock()
+
+def get_sync_job_runner() -> SyncJobRunner:
+    """Get global sync job runner instance"""
+    global _sync_job_runner
+    if _sync_job_runner is None:
+        with _sync_job_runner_lock:
+            if _sync_job_runner is None:
+                from utils.config import config
+                _sync_job_runner = SyncJobRunner(max_workers=config.cache.sync_workers)
+    return _sync_job_runner